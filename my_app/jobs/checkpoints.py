@@ -0,0 +1,197 @@
+"""Checkpoints that let an interrupted automation job resume where it stopped.
+
+Every (account, automation) pair that completes is recorded under the job's
+run id. When the job is started again with the same run id (``--resume``),
+completed pairs are skipped and accounts whose automations all completed are
+not even loaded.
+
+Two stores are available:
+
+* :class:`FileCheckpointStore` appends one JSON line per pair to
+  ``<directory>/<run_id>.jsonl`` (useful locally and on persistent volumes);
+* :class:`FirestoreCheckpointStore` writes one document per pair under
+  ``buildium_job_checkpoints/{run_id}/completed`` so every task of a Cloud Run
+  job execution, and every retry of it, shares the same checkpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional, Protocol, Set, Tuple
+from urllib.parse import quote
+
+from ..services.clients import get_client_registry
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_COLLECTION_PATH = "buildium_job_checkpoints"
+DEFAULT_CHECKPOINT_DIRECTORY = ".buildium-job-checkpoints"
+
+CHECKPOINT_STORE_NONE = "none"
+CHECKPOINT_STORE_FILE = "file"
+CHECKPOINT_STORE_FIRESTORE = "firestore"
+
+_CHECKPOINT_TTL = timedelta(days=30)
+
+CompletedPair = Tuple[str, str]
+
+
+class CheckpointStore(Protocol):
+    """Persistence for the (account, automation) pairs completed by a run."""
+
+    def load(self, run_id: str) -> Set[CompletedPair]:
+        ...
+
+    def record(self, run_id: str, account_id: str, automation: str) -> None:
+        ...
+
+
+class FileCheckpointStore:
+    """Append-only JSON lines file per run."""
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIRECTORY) -> None:
+        self._directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        return self._directory / f"{quote(run_id, safe='')}.jsonl"
+
+    def load(self, run_id: str) -> Set[CompletedPair]:
+        path = self._path(run_id)
+        completed: Set[CompletedPair] = set()
+        if not path.exists():
+            return completed
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                    completed.add((str(record["account_id"]), str(record["automation"])))
+                except (ValueError, KeyError, TypeError):
+                    # A crash mid-write can leave a torn final line; that pair reruns.
+                    logger.warning(
+                        "Ignoring unreadable job checkpoint line.",
+                        extra={"run_id": run_id, "path": str(path)},
+                    )
+        return completed
+
+    def record(self, run_id: str, account_id: str, automation: str) -> None:
+        line = json.dumps({"account_id": account_id, "automation": automation}) + "\n"
+        path = self._path(run_id)
+        with self._lock:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+
+class FirestoreCheckpointStore:
+    """One Firestore document per completed pair, grouped by run id."""
+
+    def __init__(
+        self,
+        *,
+        firestore_client: Optional[Any] = None,
+        collection_path: str = CHECKPOINTS_COLLECTION_PATH,
+    ) -> None:
+        self._firestore_client = firestore_client
+        self._collection_path = collection_path
+
+    def _completed(self, run_id: str) -> Any:
+        if self._firestore_client is None:
+            self._firestore_client = get_client_registry().firestore()
+        return (
+            self._firestore_client.collection(self._collection_path)
+            .document(run_id)
+            .collection("completed")
+        )
+
+    def load(self, run_id: str) -> Set[CompletedPair]:
+        completed: Set[CompletedPair] = set()
+        for snapshot in self._completed(run_id).stream():
+            data = snapshot.to_dict() or {}
+            account_id = data.get("account_id")
+            automation = data.get("automation")
+            if account_id and automation:
+                completed.add((str(account_id), str(automation)))
+        return completed
+
+    def record(self, run_id: str, account_id: str, automation: str) -> None:
+        now = datetime.now(timezone.utc)
+        document_id = quote(f"{account_id}:{automation}", safe="")
+        self._completed(run_id).document(document_id).set(
+            {
+                "account_id": account_id,
+                "automation": automation,
+                "completed_at": now,
+                "expires_at": now + _CHECKPOINT_TTL,
+            }
+        )
+
+
+class JobCheckpoint:
+    """Completed pairs for one run, loaded once and updated as handlers finish."""
+
+    def __init__(self, store: CheckpointStore, run_id: str) -> None:
+        self.run_id = run_id
+        self._store = store
+        self._completed = store.load(run_id)
+        self._lock = threading.Lock()
+        logger.info(
+            "Loaded Buildium job checkpoint.",
+            extra={"run_id": run_id, "completed_pairs": len(self._completed)},
+        )
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+    def is_complete(self, account_id: str, automation: str) -> bool:
+        return (account_id, automation) in self._completed
+
+    def account_complete(self, account_id: str, automations: Iterable[str]) -> bool:
+        return all((account_id, automation) in self._completed for automation in automations)
+
+    def mark_complete(self, account_id: str, automation: str) -> None:
+        """Record a completed pair; a failed write only means the pair may rerun."""
+
+        try:
+            self._store.record(self.run_id, account_id, automation)
+        except Exception:
+            logger.warning(
+                "Failed to record Buildium job checkpoint.",
+                extra={"run_id": self.run_id, "account_id": account_id, "automation": automation},
+                exc_info=True,
+            )
+            return
+        with self._lock:
+            self._completed.add((account_id, automation))
+
+
+def create_checkpoint_store(
+    kind: str, *, directory: str = DEFAULT_CHECKPOINT_DIRECTORY
+) -> Optional[CheckpointStore]:
+    """Return the store selected by ``--checkpoint-store``, or ``None`` for ``none``."""
+
+    if kind == CHECKPOINT_STORE_FILE:
+        return FileCheckpointStore(directory)
+    if kind == CHECKPOINT_STORE_FIRESTORE:
+        return FirestoreCheckpointStore()
+    return None
+
+
+__all__ = [
+    "CHECKPOINTS_COLLECTION_PATH",
+    "CHECKPOINT_STORE_FILE",
+    "CHECKPOINT_STORE_FIRESTORE",
+    "CHECKPOINT_STORE_NONE",
+    "CheckpointStore",
+    "FileCheckpointStore",
+    "FirestoreCheckpointStore",
+    "JobCheckpoint",
+    "create_checkpoint_store",
+]
@@ -0,0 +1,329 @@
+"""Dry-run cost estimates for automation jobs (``--plan``).
+
+For every selected account the planner performs one cheap enumeration
+and projects how many Buildium API calls, Firestore reads and writes and PDF
+renders the real run would make. The projections mirror the handlers:
+
+* ``n1increase`` / ``taskcreated`` lists active leases (the same listing the
+  handler starts with, one call per page of ``BUILDIUM_MAX_PAGE_SIZE``
+  leases) and assumes every lease is eligible. For each lease,
+  ``gather_leases_for_increase`` fetches lease notes, building notes,
+  recurring transactions, the above-guideline summary and market rent: five
+  calls. The handler adds one call for the Ontario rates and renders one
+  summary PDF. The estimate is an upper bound because excluded leases stop
+  after the two notes calls.
+* ``n1increase`` / ``taskstatuschanged`` (Completed) reads the prepared
+  schedules from the account document. ``fulfill_n1_completion`` updates
+  every lease that is not ignored, extends or renews where the schedule asks
+  for it, renders and uploads one notice per lease, requests one presigned
+  upload per summary file, and creates or comments on one task per property.
+* ``initiation`` / ``taskcreated`` makes a fixed five calls.
+
+Projected duration assumes calls are spread evenly at ``requests_per_second``.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from ..services.account_context import BuildiumAccountContext, get_buildium_account_contexts
+from ..services.buildium_pagination import BUILDIUM_MAX_PAGE_SIZE
+from ..tasks.buildium_processor import get_account_profile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# Calls made by ``gather_leases_for_increase`` for each eligible lease.
+N1_CALLS_PER_LEASE = 5
+# ``get_ontario_increase_rates``; the paged lease listing is counted separately.
+N1_PREPARE_FIXED_CALLS = 1
+# ``fulfill_n1_completion`` updates the rent and uploads the notice for each lease.
+N1_COMPLETION_CALLS_PER_LEASE = 2
+# Listing task categories, then creating one when none matches.
+N1_CATEGORY_LOOKUP_CALLS = 2
+# GL accounts, task categories, company profile, templates and the onboarding task.
+INITIATION_CALLS = 5
+
+_PLAN_CHUNK_SIZE = 100
+
+ApiFactory = Callable[[Mapping[str, str]], Any]
+
+
+@dataclass
+class CostEstimate:
+    """Projected external operations for one or more (account, automation) pairs."""
+
+    buildium_calls: int = 0
+    firestore_reads: int = 0
+    firestore_writes: int = 0
+    pdf_renders: int = 0
+
+    def merge(self, other: "CostEstimate") -> None:
+        self.buildium_calls += other.buildium_calls
+        self.firestore_reads += other.firestore_reads
+        self.firestore_writes += other.firestore_writes
+        self.pdf_renders += other.pdf_renders
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "buildium_calls": self.buildium_calls,
+            "firestore_reads": self.firestore_reads,
+            "firestore_writes": self.firestore_writes,
+            "pdf_renders": self.pdf_renders,
+        }
+
+
+@dataclass(frozen=True)
+class PairPlan:
+    """Projection for one (account, automation) pair and the counts it is based on."""
+
+    account_id: str
+    automation: str
+    estimate: CostEstimate
+    basis: Mapping[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "account_id": self.account_id,
+            "automation": self.automation,
+            "basis": dict(self.basis),
+            **self.estimate.as_dict(),
+        }
+
+
+@dataclass
+class JobPlan:
+    """Projection for a whole job run."""
+
+    event_type: str
+    requests_per_second: float
+    pairs: List[PairPlan] = field(default_factory=list)
+    unavailable: Dict[str, str] = field(default_factory=dict)
+    planning_calls: int = 0
+
+    @property
+    def total(self) -> CostEstimate:
+        total = CostEstimate()
+        for pair in self.pairs:
+            total.merge(pair.estimate)
+        return total
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.total
+        duration = (
+            total.buildium_calls / self.requests_per_second if self.requests_per_second > 0 else None
+        )
+        return {
+            "event_type": self.event_type,
+            "accounts": len({pair.account_id for pair in self.pairs}),
+            "total": total.as_dict(),
+            "planning_buildium_calls": self.planning_calls,
+            "requests_per_second": self.requests_per_second,
+            "projected_seconds": round(duration, 1) if duration is not None else None,
+            "unavailable": dict(self.unavailable),
+            "pairs": [pair.as_dict() for pair in self.pairs],
+        }
+
+
+def _default_api_factory(api_headers: Mapping[str, str]) -> Any:
+    from ..tasks.n1_increase import RequestsBuildiumAPI
+
+    return RequestsBuildiumAPI(api_headers=api_headers)
+
+
+def _lease_property_id(lease: Mapping[str, Any]) -> str:
+    property_block = lease.get("property")
+    if isinstance(property_block, Mapping) and property_block.get("id") is not None:
+        return str(property_block["id"])
+    return str(lease.get("propertyId") or "")
+
+
+def _lease_listing_calls(lease_count: int) -> int:
+    """Pages ``list_eligible_leases`` requests for ``lease_count`` active leases."""
+
+    return max(1, -(-lease_count // BUILDIUM_MAX_PAGE_SIZE))
+
+
+def _estimate_n1_prepare(api: Any) -> Tuple[Dict[str, int], CostEstimate, int]:
+    leases = [lease for lease in api.list_eligible_leases() if isinstance(lease, Mapping)]
+    properties = {_lease_property_id(lease) for lease in leases}
+    listing_calls = _lease_listing_calls(len(leases))
+    estimate = CostEstimate(
+        buildium_calls=N1_PREPARE_FIXED_CALLS + listing_calls + N1_CALLS_PER_LEASE * len(leases),
+        firestore_reads=1,
+        firestore_writes=1,
+        pdf_renders=1,
+    )
+    return {"leases": len(leases), "properties": len(properties)}, estimate, listing_calls
+
+
+def _estimate_n1_completion(
+    account_document: Mapping[str, Any],
+) -> Tuple[Dict[str, int], CostEstimate, int]:
+    from ..tasks import n1_completion
+
+    if not account_document:
+        return {"leases": 0, "properties": 0, "extended": 0, "renewals": 0}, CostEstimate(firestore_reads=1), 0
+
+    n1_block = account_document.get("n1_increase")
+    n1_block = n1_block if isinstance(n1_block, Mapping) else {}
+    ignored = set(n1_completion._collect_ignored_leases(n1_block))
+    renewals = n1_completion._collect_lease_renewals(n1_block)
+
+    leases = extended = renewed = 0
+    properties = set()
+    for schedule in n1_block.get("schedules") or []:
+        if not isinstance(schedule, Mapping):
+            continue
+        lease_id = n1_completion._coerce_string(schedule.get("lease_id") or schedule.get("leaseId"))
+        property_id = n1_completion._coerce_string(
+            schedule.get("property_id") or schedule.get("propertyId")
+        )
+        if not lease_id or not property_id or lease_id in ignored:
+            continue
+        leases += 1
+        properties.add(property_id)
+        extended += int(n1_completion._should_extend(schedule))
+        renewed += int(lease_id in renewals)
+
+    summary_files = n1_block.get("summary_files")
+    summary_uploads = len(summary_files) if isinstance(summary_files, Mapping) else 0
+    has_category = any(
+        n1_completion._coerce_string(source.get("automated_tasks_category_id"))
+        for source in (n1_block, account_document)
+    )
+    estimate = CostEstimate(
+        buildium_calls=(
+            N1_COMPLETION_CALLS_PER_LEASE * leases
+            + extended
+            + renewed
+            + summary_uploads
+            + len(properties)
+            + (0 if has_category else N1_CATEGORY_LOOKUP_CALLS)
+        ),
+        firestore_reads=1,
+        firestore_writes=1 + (0 if has_category else 1),
+        pdf_renders=leases,
+    )
+    basis = {
+        "leases": leases,
+        "properties": len(properties),
+        "extended": extended,
+        "renewals": renewed,
+    }
+    return basis, estimate, 0
+
+
+def _read_account_document(firestore_client: Any, account_id: str) -> Mapping[str, Any]:
+    from ..services.account_context import _FIRESTORE_COLLECTION_PATH
+
+    snapshot = firestore_client.collection(_FIRESTORE_COLLECTION_PATH).document(account_id).get()
+    if not getattr(snapshot, "exists", False):
+        return {}
+    return snapshot.to_dict() or {}
+
+
+def _plan_pair(
+    account_id: str,
+    account_context: BuildiumAccountContext,
+    automation: str,
+    *,
+    event_type: str,
+    status: Optional[str],
+    firestore_client: Any,
+    api_factory: ApiFactory,
+) -> Tuple[Optional[PairPlan], int]:
+    if automation == "initiation":
+        if event_type != "taskcreated":
+            return None, 0
+        estimate = CostEstimate(buildium_calls=INITIATION_CALLS, firestore_reads=1, firestore_writes=1)
+        return PairPlan(account_id, automation, estimate), 0
+
+    if automation == "n1increase":
+        if event_type == "taskcreated":
+            api_headers = get_account_profile(account_id, account_context).api_headers
+            basis, estimate, calls = _estimate_n1_prepare(api_factory(api_headers))
+            return PairPlan(account_id, automation, estimate, basis), calls
+        if event_type == "taskstatuschanged" and (status or "").strip().lower() == "completed":
+            document = _read_account_document(firestore_client, account_id)
+            basis, estimate, calls = _estimate_n1_completion(document)
+            return PairPlan(account_id, automation, estimate, basis), calls
+        return None, 0
+
+    return None, 0
+
+
+def plan_job(
+    *,
+    account_ids: Iterable[str],
+    automations: Sequence[str],
+    event_type: str,
+    status: Optional[str],
+    firestore_client: Any,
+    secret_manager_client: Any,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    api_factory: ApiFactory = _default_api_factory,
+) -> JobPlan:
+    """Project the cost of running ``automations`` for ``account_ids`` without running them."""
+
+    normalized_event = event_type.strip().lower()
+    if normalized_event == "taskstatuschanged" and not (status or "").strip():
+        status = "Completed"
+    plan = JobPlan(event_type=normalized_event, requests_per_second=requests_per_second)
+
+    chunk: List[str] = []
+
+    def _flush() -> None:
+        loaded = get_buildium_account_contexts(
+            chunk,
+            firestore_client=firestore_client,
+            secret_manager_client=secret_manager_client,
+        )
+        for account_id in chunk:
+            account_context = loaded.contexts.get(account_id)
+            if account_context is None:
+                error = loaded.errors.get(account_id)
+                plan.unavailable[account_id] = str(getattr(error, "detail", error))
+                continue
+            for automation in automations:
+                try:
+                    pair, calls = _plan_pair(
+                        account_id,
+                        account_context,
+                        automation,
+                        event_type=normalized_event,
+                        status=status,
+                        firestore_client=firestore_client,
+                        api_factory=api_factory,
+                    )
+                except Exception as exc:
+                    logger.warning(
+                        "Unable to plan Buildium automation for account.",
+                        extra={"account_id": account_id, "automation": automation},
+                        exc_info=True,
+                    )
+                    plan.unavailable[account_id] = str(exc) or type(exc).__name__
+                    continue
+                plan.planning_calls += calls
+                if pair is not None:
+                    plan.pairs.append(pair)
+        chunk.clear()
+
+    for account_id in account_ids:
+        chunk.append(account_id)
+        if len(chunk) >= _PLAN_CHUNK_SIZE:
+            _flush()
+    if chunk:
+        _flush()
+    return plan
+
+
+__all__ = [
+    "CostEstimate",
+    "JobPlan",
+    "PairPlan",
+    "plan_job",
+]
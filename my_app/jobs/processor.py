@@ -3,17 +3,52 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import itertools
+import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from types import SimpleNamespace
-from typing import Any, Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from fastapi import HTTPException
 
 from ..services.account_context import (
     BUILDUM_FIRESTORE_DATABASE,
     BuildiumAccountContext,
-    get_buildium_account_context,
+    get_buildium_account_contexts,
+    iter_buildium_account_ids,
+)
+from ..services.clients import (
+    GoogleClientRegistry,
+    configure_client_registry,
+    reset_client_registry,
 )
+from .checkpoints import (
+    CHECKPOINT_STORE_FILE,
+    CHECKPOINT_STORE_FIRESTORE,
+    CHECKPOINT_STORE_NONE,
+    DEFAULT_CHECKPOINT_DIRECTORY,
+    JobCheckpoint,
+    create_checkpoint_store,
+)
+from .planner import DEFAULT_REQUESTS_PER_SECOND, plan_job
 from ..tasks import initiation as initiation_tasks
 from ..tasks.buildium_processor import BuildiumProcessingContext, BuildiumWebhookProcessor
 from ..tasks.initiation import handle_initiation_automation
@@ -86,6 +121,13 @@ _AUTOMATION_REGISTRY: Dict[str, Dict[str, Any]] = {
 
 FIRESTORE_COLLECTION_PATH = initiation_tasks.FIRESTORE_COLLECTION_PATH
 
+_ACCOUNT_LOAD_CHUNK_SIZE = 100
+
+JOB_CONCURRENCY_ENV = "BUILDIUM_JOB_CONCURRENCY"
+CLOUD_RUN_TASK_INDEX_ENV = "CLOUD_RUN_TASK_INDEX"
+CLOUD_RUN_TASK_COUNT_ENV = "CLOUD_RUN_TASK_COUNT"
+CLOUD_RUN_EXECUTION_ENV = "CLOUD_RUN_EXECUTION"
+
 
 def _unique(sequence: Iterable[str]) -> List[str]:
     seen: MutableMapping[str, None] = {}
@@ -112,48 +154,152 @@ def _build_processing_context(account_context: BuildiumAccountContext) -> Buildi
     return processor.processing_context
 
 
+def _iter_unique(sequence: Iterable[str]) -> Iterator[str]:
+    seen: Set[str] = set()
+    for item in sequence:
+        value = item.strip()
+        if not value or value in seen:
+            continue
+        seen.add(value)
+        yield value
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def _fetch_all_account_ids(firestore_client: Any) -> List[str]:
+    return list(_iter_all_account_ids(firestore_client))
+
+
+def _iter_all_account_ids(firestore_client: Any) -> Iterator[str]:
+    discovered = 0
+    for account_id in iter_buildium_account_ids(firestore_client):
+        discovered += 1
+        yield account_id
+    logger.info(
+        "Discovered Buildium accounts from Firestore.",
+        extra={"count": discovered},
+    )
+
+
+@dataclass
+class JobSummary:
+    """Outcome counts for a job run, merged across accounts and workers.
+
+    ``handled`` counts automation handlers that completed and ``failed``
+    counts handlers that raised plus accounts that could not be loaded or
+    prepared. ``skipped`` counts accounts skipped for configuration errors
+    and automations that do not handle the requested event. ``resumed``
+    counts pairs already completed by an earlier attempt of the same run.
+    """
+
+    handled: int = 0
+    failed: int = 0
+    skipped: int = 0
+    resumed: int = 0
+
+    def merge(self, other: "JobSummary") -> None:
+        self.handled += other.handled
+        self.failed += other.failed
+        self.skipped += other.skipped
+        self.resumed += other.resumed
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "handled": self.handled,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "resumed": self.resumed,
+        }
+
+
+def _shard_of(account_id: str, shard_count: int) -> int:
+    digest = hashlib.sha256(account_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def _select_shard(account_ids: Iterable[str], shard_index: int, shard_count: int) -> Iterator[str]:
+    """Yield the accounts owned by ``shard_index`` out of ``shard_count`` shards."""
+
+    if shard_count <= 1:
+        yield from account_ids
+        return
+    for account_id in account_ids:
+        if _shard_of(account_id, shard_count) == shard_index:
+            yield account_id
+
+
+def _env_int(env_name: str, default: int) -> int:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
     try:
-        collection = firestore_client.collection(FIRESTORE_COLLECTION_PATH)
-    except Exception:  # pragma: no cover - defensive
-        logger.exception(
-            "Unable to access Buildium account collection in Firestore.",
-            extra={"collection_path": FIRESTORE_COLLECTION_PATH},
+        return int(raw_value)
+    except ValueError:
+        logger.warning(
+            "Ignoring non-integer environment value.",
+            extra={"env": env_name, "value": raw_value},
         )
-        raise
+        return default
 
-    account_ids: List[str] = []
-    try:
-        for snapshot in collection.stream():
-            doc_id = getattr(snapshot, "id", None)
-            if not doc_id and hasattr(snapshot, "reference"):
-                doc_id = getattr(snapshot.reference, "id", None)
-            if doc_id:
-                account_ids.append(str(doc_id))
-            else:
-                logger.warning(
-                    "Encountered Firestore document without identifier; skipping.",
-                    extra={"collection_path": FIRESTORE_COLLECTION_PATH},
-                )
-    except Exception:  # pragma: no cover - defensive
-        logger.exception(
-            "Failed to enumerate Buildium accounts from Firestore.",
-            extra={"collection_path": FIRESTORE_COLLECTION_PATH},
+
+def _task_shard() -> Tuple[int, int]:
+    """Return ``(index, count)`` for this Cloud Run job task."""
+
+    shard_count = _env_int(CLOUD_RUN_TASK_COUNT_ENV, 1)
+    shard_index = _env_int(CLOUD_RUN_TASK_INDEX_ENV, 0)
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        logger.warning(
+            "Ignoring invalid Cloud Run task sharding; processing every account.",
+            extra={"task_index": shard_index, "task_count": shard_count},
         )
-        raise
+        return 0, 1
+    return shard_index, shard_count
 
-    return account_ids
+
+def _skip_completed_accounts(
+    account_ids: Iterable[str],
+    checkpoint: JobCheckpoint,
+    automations: List[str],
+    summary: JobSummary,
+) -> Iterator[str]:
+    """Drop accounts whose automations all completed, without loading them."""
+
+    for account_id in account_ids:
+        if checkpoint.account_complete(account_id, automations):
+            summary.resumed += len(automations)
+            continue
+        yield account_id
 
 
 def run_job(
     *,
-    account_ids: Sequence[str],
+    account_ids: Iterable[str],
     automations: Optional[Sequence[str]] = None,
     event_type: str = "taskcreated",
     status: Optional[str] = None,
     firestore_client: Any,
     secret_manager_client: Any,
+    concurrency: int = 1,
+    summary: Optional[JobSummary] = None,
+    checkpoint: Optional[JobCheckpoint] = None,
 ) -> int:
+    """Run the selected automations for every account and return the handlers invoked.
+
+    With ``concurrency`` above one, accounts run on a thread pool of that
+    width; each account's automations still run in order. Pass ``summary``
+    to collect handled, failed and skipped counts, and ``checkpoint`` to skip
+    pairs an earlier attempt of the run completed and record new ones.
+    """
+
     selected_automations = (
         _unique(automations) if automations else list(_AUTOMATION_REGISTRY.keys())
     )
@@ -162,84 +308,165 @@ def run_job(
     if normalized_event == "taskstatuschanged" and not normalized_status:
         normalized_status = "Completed"
 
-    processed = 0
-    for account_id in _unique(account_ids):
+    def _run_account(account_id: str, account_context: BuildiumAccountContext) -> JobSummary:
         try:
-            account_context = get_buildium_account_context(
+            return _run_account_automations(
                 account_id,
+                account_context,
+                selected_automations=selected_automations,
+                normalized_event=normalized_event,
+                normalized_status=normalized_status,
+                firestore_client=firestore_client,
+                checkpoint=checkpoint,
+            )
+        except Exception:
+            logger.exception(
+                "Unexpected failure while running Buildium automations for account.",
+                extra={"account_id": account_id},
+            )
+            return JobSummary(failed=1)
+
+    total = JobSummary()
+    pending_accounts = _iter_unique(account_ids)
+    if checkpoint is not None:
+        checkpointed = [
+            automation
+            for automation in selected_automations
+            if normalized_event in _AUTOMATION_REGISTRY.get(automation, {}).get("event_builders", {})
+        ]
+        if checkpointed:
+            pending_accounts = _skip_completed_accounts(
+                pending_accounts, checkpoint, checkpointed, total
+            )
+
+    executor = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+    try:
+        # Accounts are loaded a chunk at a time so work starts while a lazy
+        # ``account_ids`` iterable is still being enumerated.
+        for chunk in _chunked(pending_accounts, _ACCOUNT_LOAD_CHUNK_SIZE):
+            loaded = get_buildium_account_contexts(
+                chunk,
                 firestore_client=firestore_client,
                 secret_manager_client=secret_manager_client,
             )
-        except HTTPException as exc:
+            runnable: List[Tuple[str, BuildiumAccountContext]] = []
+            for account_id in chunk:
+                account_context = loaded.contexts.get(account_id)
+                if account_context is not None:
+                    runnable.append((account_id, account_context))
+                    continue
+                error = loaded.errors.get(account_id)
+                if isinstance(error, HTTPException):
+                    logger.warning(
+                        "Skipping Buildium account due to configuration error.",
+                        extra={"account_id": account_id, "status_code": error.status_code},
+                    )
+                    total.skipped += 1
+                else:
+                    logger.error(
+                        "Unexpected failure while loading Buildium account context.",
+                        extra={"account_id": account_id},
+                        exc_info=error,
+                    )
+                    total.failed += 1
+
+            if executor is None:
+                results: Iterable[JobSummary] = (
+                    _run_account(account_id, account_context)
+                    for account_id, account_context in runnable
+                )
+            else:
+                results = executor.map(lambda item: _run_account(*item), runnable)
+            for result in results:
+                total.merge(result)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    if summary is not None:
+        summary.merge(total)
+    return total.handled
+
+
+def _run_account_automations(
+    account_id: str,
+    account_context: BuildiumAccountContext,
+    *,
+    selected_automations: List[str],
+    normalized_event: str,
+    normalized_status: Optional[str],
+    firestore_client: Any,
+    checkpoint: Optional[JobCheckpoint] = None,
+) -> JobSummary:
+    result = JobSummary()
+    processing_context = _build_processing_context(account_context)
+    for automation in selected_automations:
+        config = _AUTOMATION_REGISTRY.get(automation)
+        if not config:
             logger.warning(
-                "Skipping Buildium account due to configuration error.",
-                extra={"account_id": account_id, "status_code": exc.status_code},
+                "Skipping unknown Buildium automation.",
+                extra={"account_id": account_id, "automation": automation},
             )
+            result.skipped += 1
             continue
-        except Exception:
-            logger.exception(
-                "Unexpected failure while loading Buildium account context.",
-                extra={"account_id": account_id},
+
+        event_builders: Dict[str, EventBuilder] = config["event_builders"]
+        builder = event_builders.get(normalized_event)
+        if builder is None:
+            logger.info(
+                "Automation does not handle requested event type; skipping.",
+                extra={
+                    "account_id": account_id,
+                    "automation": automation,
+                    "event_type": normalized_event,
+                },
             )
+            result.skipped += 1
             continue
 
-        processing_context = _build_processing_context(account_context)
-        for automation in selected_automations:
-            config = _AUTOMATION_REGISTRY.get(automation)
-            if not config:
-                logger.warning(
-                    "Skipping unknown Buildium automation.",
-                    extra={"account_id": account_id, "automation": automation},
-                )
-                continue
-
-            event_builders: Dict[str, EventBuilder] = config["event_builders"]
-            builder = event_builders.get(normalized_event)
-            if builder is None:
-                logger.info(
-                    "Automation does not handle requested event type; skipping.",
-                    extra={
-                        "account_id": account_id,
-                        "automation": automation,
-                        "event_type": normalized_event,
-                    },
-                )
-                continue
+        if checkpoint is not None and checkpoint.is_complete(account_id, automation):
+            result.resumed += 1
+            continue
+
+        webhook_payload = builder(normalized_status)
+        handler: AutomationHandler = config["handler"]
+        handler_kwargs: Dict[str, Any] = {
+            "account_id": account_id,
+            "api_headers": dict(processing_context.api_headers),
+            "gl_mapping": dict(processing_context.gl_mapping),
+            "webhook": webhook_payload,
+        }
+        if config.get("requires_firestore"):
+            handler_kwargs["firestore_client"] = firestore_client
 
-            webhook_payload = builder(normalized_status)
-            handler: AutomationHandler = config["handler"]
-            handler_kwargs: Dict[str, Any] = {
+        logger.info(
+            "Dispatching Buildium automation handler.",
+            extra={
                 "account_id": account_id,
-                "api_headers": dict(processing_context.api_headers),
-                "gl_mapping": dict(processing_context.gl_mapping),
-                "webhook": webhook_payload,
-            }
-            if config.get("requires_firestore"):
-                handler_kwargs["firestore_client"] = firestore_client
+                "automation": automation,
+                "event_type": normalized_event,
+            },
+        )
 
-            logger.info(
-                "Dispatching Buildium automation handler.",
+        try:
+            handler(**handler_kwargs)
+        except Exception:
+            logger.exception(
+                "Automation handler raised an exception.",
                 extra={
                     "account_id": account_id,
                     "automation": automation,
                     "event_type": normalized_event,
                 },
             )
+            result.failed += 1
+            continue
 
-            try:
-                handler(**handler_kwargs)
-                processed += 1
-            except Exception:
-                logger.exception(
-                    "Automation handler raised an exception.",
-                    extra={
-                        "account_id": account_id,
-                        "automation": automation,
-                        "event_type": normalized_event,
-                    },
-                )
+        result.handled += 1
+        if checkpoint is not None:
+            checkpoint.mark_complete(account_id, automation)
 
-    return processed
+    return result
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -278,6 +505,55 @@ def _build_parser() -> argparse.ArgumentParser:
         "--status",
         help="Task status to include when emulating taskstatuschanged events.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help=(
+            "Number of accounts to process in parallel "
+            f"(default: ${JOB_CONCURRENCY_ENV} or 1)."
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-store",
+        default=CHECKPOINT_STORE_NONE,
+        choices=[CHECKPOINT_STORE_NONE, CHECKPOINT_STORE_FILE, CHECKPOINT_STORE_FIRESTORE],
+        help="Record completed (account, automation) pairs so the run can be resumed (default: none).",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=DEFAULT_CHECKPOINT_DIRECTORY,
+        help=f"Directory used by the file checkpoint store (default: {DEFAULT_CHECKPOINT_DIRECTORY}).",
+    )
+    parser.add_argument(
+        "--run-id",
+        help=(
+            "Identifier under which checkpoints are recorded "
+            f"(default: ${CLOUD_RUN_EXECUTION_ENV} or a timestamp)."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume an earlier run, skipping the pairs it completed. Requires --checkpoint-store.",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Print projected Buildium calls, Firestore reads and writes and PDF renders "
+            "as JSON instead of running the automations."
+        ),
+    )
+    parser.add_argument(
+        "--plan-requests-per-second",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help=(
+            "Buildium request rate used to project the run's duration with --plan "
+            f"(default: {DEFAULT_REQUESTS_PER_SECOND:g})."
+        ),
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -286,45 +562,112 @@ def _build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _default_run_id() -> str:
+    execution = os.getenv(CLOUD_RUN_EXECUTION_ENV)
+    if execution:
+        # Shared by every task and retry of one Cloud Run job execution.
+        return execution
+    return datetime.now(timezone.utc).strftime("run-%Y%m%dT%H%M%SZ")
+
+
 def main(argv: Optional[Sequence[str]] = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
     logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
 
-    account_ids: List[str] = list(args.accounts)
-
     if firestore is None or secretmanager is None:  # pragma: no cover - dependency guard
         parser.error("google-cloud-firestore and google-cloud-secret-manager must be installed.")
 
-    firestore_client = firestore.Client(database=BUILDUM_FIRESTORE_DATABASE)
-    secret_manager_client = secretmanager.SecretManagerServiceClient()
+    if args.resume and args.checkpoint_store == CHECKPOINT_STORE_NONE:
+        parser.error("--resume requires --checkpoint-store file or firestore.")
 
-    if args.all_accounts:
-        discovered = _fetch_all_account_ids(firestore_client)
-        account_ids.extend(discovered)
-        logger.info(
-            "Discovered Buildium accounts from Firestore.",
-            extra={"count": len(discovered)},
+    registry = configure_client_registry(
+        GoogleClientRegistry(
+            firestore_factory=lambda: firestore.Client(database=BUILDUM_FIRESTORE_DATABASE),
+            secret_manager_factory=secretmanager.SecretManagerServiceClient,
         )
-
-    account_ids = _unique(account_ids)
-    if not account_ids:
-        parser.error("No Buildium accounts were provided or discovered.")
-
-    processed = run_job(
-        account_ids=account_ids,
-        automations=args.automations,
-        event_type=args.event,
-        status=args.status,
-        firestore_client=firestore_client,
-        secret_manager_client=secret_manager_client,
     )
+    try:
+        firestore_client = registry.firestore()
+        secret_manager_client = registry.secret_manager()
+
+        candidates: Iterable[str] = args.accounts
+        if args.all_accounts:
+            candidates = itertools.chain(candidates, _iter_all_account_ids(firestore_client))
+
+        # Enumeration continues while the first accounts are processed.
+        remaining = _iter_unique(candidates)
+        first_account = next(remaining, None)
+        if first_account is None:
+            parser.error("No Buildium accounts were provided or discovered.")
+
+        shard_index, shard_count = _task_shard()
+        account_count = 0
+
+        def _counted() -> Iterator[str]:
+            nonlocal account_count
+            accounts = itertools.chain([first_account], remaining)
+            for account_id in _select_shard(accounts, shard_index, shard_count):
+                account_count += 1
+                yield account_id
+
+        if args.plan:
+            plan = plan_job(
+                account_ids=_counted(),
+                automations=args.automations or list(_AUTOMATION_REGISTRY.keys()),
+                event_type=args.event,
+                status=args.status,
+                firestore_client=firestore_client,
+                secret_manager_client=secret_manager_client,
+                requests_per_second=args.plan_requests_per_second,
+            )
+            print(json.dumps(plan.as_dict(), indent=2))
+            return 0
+
+        checkpoint: Optional[JobCheckpoint] = None
+        store = create_checkpoint_store(args.checkpoint_store, directory=args.checkpoint_dir)
+        if store is not None:
+            run_id = args.resume or args.run_id or _default_run_id()
+            checkpoint = JobCheckpoint(store, run_id)
+            logger.info(
+                "Recording Buildium job checkpoints; rerun with --resume to continue this run.",
+                extra={"run_id": run_id, "checkpoint_store": args.checkpoint_store},
+            )
 
-    logger.info(
-        "Completed Buildium automation job.",
-        extra={"accounts": len(account_ids), "handlers_invoked": processed},
-    )
+        summary = JobSummary()
+        processed = run_job(
+            account_ids=_counted(),
+            automations=args.automations,
+            event_type=args.event,
+            status=args.status,
+            firestore_client=firestore_client,
+            secret_manager_client=secret_manager_client,
+            concurrency=max(1, args.concurrency or _env_int(JOB_CONCURRENCY_ENV, 1)),
+            summary=summary,
+            checkpoint=checkpoint,
+        )
+
+        logger.info(
+            "Completed Buildium automation job.",
+            extra={
+                "accounts": account_count,
+                "handlers_invoked": processed,
+                "task_index": shard_index,
+                "task_count": shard_count,
+                **summary.as_dict(),
+            },
+        )
+        if summary.failed:
+            # A non-zero exit makes Cloud Run retry the task; the retry shares
+            # the run id, so it resumes only the pairs that did not complete.
+            logger.error(
+                "Buildium automation job finished with failures.",
+                extra={"failed": summary.failed, "task_index": shard_index},
+            )
+            return 1
+    finally:
+        reset_client_registry()
 
     return 0
 
@@ -333,4 +676,4 @@ if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
     raise SystemExit(main())
 
 
-__all__ = ["main", "run_job", "FIRESTORE_COLLECTION_PATH"]
+__all__ = ["JobSummary", "main", "run_job", "FIRESTORE_COLLECTION_PATH"]
@@ -0,0 +1,508 @@
+"""In-process cache of resolved :class:`BuildiumAccountContext` objects.
+
+Resolving an account costs a Firestore read plus up to two Secret Manager
+reads. Webhooks and queued tasks for the same account arrive in bursts, so
+contexts are cached per process:
+
+* entries expire after ``BUILDIUM_ACCOUNT_CACHE_TTL_SECONDS`` (``0`` disables
+  the cache) and the least recently used entries are evicted beyond
+  ``BUILDIUM_ACCOUNT_CACHE_MAX_ENTRIES``;
+* concurrent misses for one account share a single load, whether the callers
+  are threads or coroutines;
+* :meth:`AccountContextCache.observe` drops an entry as soon as an account
+  document is seen whose secret references differ from the cached ones, so a
+  rotated secret name or pinned version takes effect without waiting for the
+  TTL. Other document changes are applied to the cached metadata in place
+  (see :mod:`my_app.services.account_watch`).
+
+Lookups that fail because the account does not exist (``404``) or is
+misconfigured (``500``, e.g. a broken secret reference) are remembered in a
+separate negative cache for ``BUILDIUM_ACCOUNT_NEGATIVE_CACHE_TTL_SECONDS``,
+keyed by account id and failure class, and re-raised without touching
+Firestore or Secret Manager. Transient failures (``503``) are never cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from . import metrics
+from .account_context import (
+    BuildiumAccountContext,
+    account_metadata,
+    get_buildium_account_context,
+    get_buildium_account_context_async,
+    secret_references,
+)
+
+ACCOUNT_CACHE_TTL_ENV = "BUILDIUM_ACCOUNT_CACHE_TTL_SECONDS"
+ACCOUNT_CACHE_MAX_ENTRIES_ENV = "BUILDIUM_ACCOUNT_CACHE_MAX_ENTRIES"
+ACCOUNT_NEGATIVE_CACHE_TTL_ENV = "BUILDIUM_ACCOUNT_NEGATIVE_CACHE_TTL_SECONDS"
+
+_DEFAULT_TTL_SECONDS = 300.0
+_DEFAULT_MAX_ENTRIES = 1000
+_DEFAULT_NEGATIVE_TTL_SECONDS = 30.0
+
+FAILURE_NOT_FOUND = "not_found"
+FAILURE_MISCONFIGURED = "misconfigured"
+_NEGATIVE_FAILURE_CLASSES = {
+    status.HTTP_404_NOT_FOUND: FAILURE_NOT_FOUND,
+    status.HTTP_500_INTERNAL_SERVER_ERROR: FAILURE_MISCONFIGURED,
+}
+
+ACCOUNT_CACHE_REQUESTS_METRIC = "buildium_account_cache_requests_total"
+ACCOUNT_CACHE_INVALIDATIONS_METRIC = "buildium_account_cache_invalidations_total"
+ACCOUNT_CACHE_SIZE_METRIC = "buildium_account_cache_entries"
+ACCOUNT_NEGATIVE_CACHE_HITS_METRIC = "buildium_account_negative_cache_hits_total"
+ACCOUNT_CACHE_UPDATES_METRIC = "buildium_account_cache_updates_total"
+
+SecretFingerprint = Tuple[Optional[str], Optional[str], Optional[str]]
+_LoadFuture = "concurrent.futures.Future[BuildiumAccountContext]"
+
+
+def _fingerprint(
+    api_secret_name: Optional[str],
+    webhook_secret_name: Optional[str],
+    inline_webhook_secret: Optional[str],
+) -> SecretFingerprint:
+    inline_digest = None
+    if inline_webhook_secret:
+        # Secrets stored inline in Firestore have no version; compare a digest.
+        inline_digest = hashlib.sha256(inline_webhook_secret.encode("utf-8")).hexdigest()
+    return api_secret_name, webhook_secret_name, inline_digest
+
+
+def _context_fingerprint(context: BuildiumAccountContext) -> SecretFingerprint:
+    # The resolved metadata no longer carries an inline secret, so use the value.
+    api_secret_name, webhook_secret_name, _ = secret_references(context.metadata)
+    inline = context.webhook_secret if webhook_secret_name is None else None
+    return _fingerprint(api_secret_name, webhook_secret_name, inline)
+
+
+def _document_fingerprint(document: Mapping[str, Any]) -> SecretFingerprint:
+    return _fingerprint(*secret_references(document))
+
+
+class _CacheEntry:
+    __slots__ = ("context", "loaded_at", "fingerprint")
+
+    def __init__(
+        self, context: BuildiumAccountContext, loaded_at: float, fingerprint: SecretFingerprint
+    ) -> None:
+        self.context = context
+        self.loaded_at = loaded_at
+        self.fingerprint = fingerprint
+
+
+class _NegativeEntry:
+    __slots__ = ("status_code", "detail", "expires_at")
+
+    def __init__(self, status_code: int, detail: Any, expires_at: float) -> None:
+        self.status_code = status_code
+        self.detail = detail
+        self.expires_at = expires_at
+
+
+class AccountContextCache:
+    """TTL + LRU cache of account contexts with single-flight loading."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = _DEFAULT_TTL_SECONDS,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        negative_ttl_seconds: float = _DEFAULT_NEGATIVE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_seconds = max(0.0, ttl_seconds)
+        self._max_entries = max(1, max_entries)
+        self._negative_ttl_seconds = max(0.0, negative_ttl_seconds)
+        self._clock = clock
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._negative: "OrderedDict[Tuple[str, str], _NegativeEntry]" = OrderedDict()
+        self._inflight: Dict[str, _LoadFuture] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0 or self._negative_ttl_seconds > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_negative(self, account_id: str, now: float) -> None:
+        """Raise the remembered failure for ``account_id`` if one is still fresh."""
+
+        for failure_class in _NEGATIVE_FAILURE_CLASSES.values():
+            key = (account_id, failure_class)
+            negative = self._negative.get(key)
+            if negative is None:
+                continue
+            if negative.expires_at <= now:
+                del self._negative[key]
+                continue
+            metrics.increment(ACCOUNT_NEGATIVE_CACHE_HITS_METRIC, failure=failure_class)
+            raise HTTPException(status_code=negative.status_code, detail=negative.detail)
+
+    def _remember_failure(self, account_id: str, error: BaseException) -> None:
+        if not isinstance(error, HTTPException) or self._negative_ttl_seconds <= 0:
+            return
+        failure_class = _NEGATIVE_FAILURE_CLASSES.get(error.status_code)
+        if failure_class is None:
+            return
+        key = (account_id, failure_class)
+        self._negative[key] = _NegativeEntry(
+            error.status_code, error.detail, self._clock() + self._negative_ttl_seconds
+        )
+        self._negative.move_to_end(key)
+        while len(self._negative) > self._max_entries:
+            self._negative.popitem(last=False)
+
+    def _store(self, account_id: str, context: BuildiumAccountContext) -> None:
+        if self._ttl_seconds <= 0:
+            return
+        self._entries[account_id] = _CacheEntry(
+            context,
+            self._clock(),
+            _context_fingerprint(context),
+        )
+        self._entries.move_to_end(account_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _claim(
+        self, account_id: str
+    ) -> Tuple[Optional[BuildiumAccountContext], Optional[_LoadFuture], bool, int]:
+        """Return a fresh cached context, or the load future and whether we own it.
+
+        Raises the cached ``HTTPException`` when the account recently failed to
+        resolve.
+        """
+
+        with self._lock:
+            if self._negative:
+                self._check_negative(account_id, self._clock())
+            entry = self._entries.get(account_id)
+            if entry is not None:
+                if self._clock() - entry.loaded_at < self._ttl_seconds:
+                    self._entries.move_to_end(account_id)
+                    return entry.context, None, False, self._epoch
+                del self._entries[account_id]
+            future = self._inflight.get(account_id)
+            if future is not None:
+                return None, future, False, self._epoch
+            future = concurrent.futures.Future()
+            self._inflight[account_id] = future
+            return None, future, True, self._epoch
+
+    def _finish(
+        self,
+        account_id: str,
+        future: _LoadFuture,
+        epoch: int,
+        context: Optional[BuildiumAccountContext] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            if self._inflight.get(account_id) is future:
+                del self._inflight[account_id]
+            if error is not None:
+                if epoch == self._epoch:
+                    self._remember_failure(account_id, error)
+            elif context is not None and epoch == self._epoch:
+                self._store(account_id, context)
+            size = len(self._entries)
+        metrics.set_gauge(ACCOUNT_CACHE_SIZE_METRIC, size)
+        if future.done():  # pragma: no cover - futures are never cancelled
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(context)
+
+    def get(
+        self, account_id: str, loader: Callable[[], BuildiumAccountContext]
+    ) -> BuildiumAccountContext:
+        """Return the cached context for ``account_id``, calling ``loader`` on a miss."""
+
+        if not self.enabled:
+            return loader()
+        context, future, owner, epoch = self._claim(account_id)
+        if context is not None:
+            metrics.increment(ACCOUNT_CACHE_REQUESTS_METRIC, result="hit")
+            return context
+        if not owner:
+            metrics.increment(ACCOUNT_CACHE_REQUESTS_METRIC, result="coalesced")
+            return future.result()  # type: ignore[union-attr]
+
+        metrics.increment(ACCOUNT_CACHE_REQUESTS_METRIC, result="miss")
+        try:
+            context = loader()
+        except BaseException as exc:
+            self._finish(account_id, future, epoch, error=exc)
+            raise
+        self._finish(account_id, future, epoch, context=context)
+        return context
+
+    async def get_async(
+        self, account_id: str, loader: Callable[[], Awaitable[BuildiumAccountContext]]
+    ) -> BuildiumAccountContext:
+        """Async counterpart of :meth:`get`; waiters share the owner's load."""
+
+        if not self.enabled:
+            return await loader()
+        context, future, owner, epoch = self._claim(account_id)
+        if context is not None:
+            metrics.increment(ACCOUNT_CACHE_REQUESTS_METRIC, result="hit")
+            return context
+        if not owner:
+            metrics.increment(ACCOUNT_CACHE_REQUESTS_METRIC, result="coalesced")
+            # Shield so a cancelled waiter does not cancel the shared load.
+            return await asyncio.shield(asyncio.wrap_future(future))  # type: ignore[arg-type]
+
+        metrics.increment(ACCOUNT_CACHE_REQUESTS_METRIC, result="miss")
+        try:
+            context = await loader()
+        except BaseException as exc:
+            self._finish(account_id, future, epoch, error=exc)
+            raise
+        self._finish(account_id, future, epoch, context=context)
+        return context
+
+    async def refresh_async(
+        self, account_id: str, loader: Callable[[], Awaitable[BuildiumAccountContext]]
+    ) -> bool:
+        """Reload ``account_id`` and replace its entry without blocking readers.
+
+        Lookups keep receiving the current entry while ``loader`` runs. The new
+        context is discarded if the account was invalidated in the meantime.
+        An account that no longer resolves (``404``/``500``) is evicted and
+        remembered in the negative cache, so it is not refreshed again every
+        cycle. Returns ``True`` when the entry was replaced.
+        """
+
+        with self._lock:
+            epoch = self._epoch
+        try:
+            context = await loader()
+        except HTTPException as exc:
+            self._evict_failed_refresh(account_id, epoch, exc)
+            raise
+        with self._lock:
+            if epoch != self._epoch:
+                return False
+            self._store(account_id, context)
+            size = len(self._entries)
+        metrics.set_gauge(ACCOUNT_CACHE_SIZE_METRIC, size)
+        return True
+
+    def _evict_failed_refresh(self, account_id: str, epoch: int, error: HTTPException) -> None:
+        if error.status_code not in _NEGATIVE_FAILURE_CLASSES:
+            return
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            removed = self._entries.pop(account_id, None) is not None
+            self._remember_failure(account_id, error)
+            size = len(self._entries)
+        metrics.set_gauge(ACCOUNT_CACHE_SIZE_METRIC, size)
+        if removed:
+            metrics.increment(ACCOUNT_CACHE_INVALIDATIONS_METRIC, reason="refresh_failed")
+
+    def expiring(self, within_seconds: float) -> List[str]:
+        """Return cached account ids whose entries expire within ``within_seconds``."""
+
+        threshold = self._ttl_seconds - within_seconds
+        now = self._clock()
+        with self._lock:
+            return [
+                account_id
+                for account_id, entry in self._entries.items()
+                if now - entry.loaded_at >= threshold
+            ]
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds
+
+    def age(self, account_id: str) -> Optional[float]:
+        """Seconds since the cached entry for ``account_id`` was loaded, if any."""
+
+        with self._lock:
+            entry = self._entries.get(account_id)
+            return None if entry is None else self._clock() - entry.loaded_at
+
+    def invalidate(self, account_id: str, *, reason: str = "explicit") -> bool:
+        """Drop ``account_id`` (including remembered failures); loads in flight are not stored."""
+
+        with self._lock:
+            removed = self._entries.pop(account_id, None) is not None
+            for failure_class in _NEGATIVE_FAILURE_CLASSES.values():
+                removed = self._negative.pop((account_id, failure_class), None) is not None or removed
+            self._epoch += 1
+            size = len(self._entries)
+        metrics.set_gauge(ACCOUNT_CACHE_SIZE_METRIC, size)
+        if removed:
+            metrics.increment(ACCOUNT_CACHE_INVALIDATIONS_METRIC, reason=reason)
+        return removed
+
+    def observe(self, account_id: str, document: Optional[Mapping[str, Any]]) -> bool:
+        """Reconcile the cached entry for ``account_id`` with its account document.
+
+        ``document`` is the raw ``buildium_accounts/{account_id}`` data, or
+        ``None`` when the document was deleted. The entry is dropped when the
+        document is gone or references different secrets; otherwise its
+        metadata (GL mapping, category ids, ...) is replaced in place. Returns
+        ``True`` when a cached entry was dropped.
+        """
+
+        with self._lock:
+            entry = self._entries.get(account_id)
+            known_failure = any(
+                (account_id, failure_class) in self._negative
+                for failure_class in _NEGATIVE_FAILURE_CLASSES.values()
+            )
+            if document is None:
+                reason = "document_deleted"
+            elif known_failure:
+                # The account exists (again) or was reconfigured; retry it.
+                reason = "document_changed"
+            elif entry is None:
+                if account_id in self._inflight:
+                    # A load may have read the previous document; do not store it.
+                    self._epoch += 1
+                return False
+            elif entry.fingerprint != _document_fingerprint(document):
+                reason = "secret_changed"
+            else:
+                try:
+                    metadata = account_metadata(document)
+                except TypeError:
+                    reason = "document_changed"
+                else:
+                    if metadata != entry.context.metadata:
+                        entry.context = dataclasses.replace(entry.context, metadata=metadata)
+                        metrics.increment(ACCOUNT_CACHE_UPDATES_METRIC)
+                    return False
+        return self.invalidate(account_id, reason=reason)
+
+    def purge_negative(self, account_id: Optional[str] = None) -> int:
+        """Forget remembered failures for ``account_id`` (every account if ``None``)."""
+
+        with self._lock:
+            if account_id is None:
+                purged = len(self._negative)
+                self._negative.clear()
+            else:
+                purged = 0
+                for failure_class in _NEGATIVE_FAILURE_CLASSES.values():
+                    if self._negative.pop((account_id, failure_class), None) is not None:
+                        purged += 1
+        return purged
+
+    def negative_entries(self) -> Dict[str, str]:
+        """Return ``{account_id: failure_class}`` for failures that are still fresh."""
+
+        now = self._clock()
+        with self._lock:
+            return {
+                account_id: failure_class
+                for (account_id, failure_class), negative in self._negative.items()
+                if negative.expires_at > now
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._negative.clear()
+            self._epoch += 1
+        metrics.set_gauge(ACCOUNT_CACHE_SIZE_METRIC, 0)
+
+
+def _env_number(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
+    try:
+        return float(raw_value)
+    except ValueError:
+        return default
+
+
+def create_account_context_cache() -> AccountContextCache:
+    """Build the cache described by the environment."""
+
+    return AccountContextCache(
+        ttl_seconds=_env_number(ACCOUNT_CACHE_TTL_ENV, _DEFAULT_TTL_SECONDS),
+        max_entries=int(_env_number(ACCOUNT_CACHE_MAX_ENTRIES_ENV, _DEFAULT_MAX_ENTRIES)),
+        negative_ttl_seconds=_env_number(
+            ACCOUNT_NEGATIVE_CACHE_TTL_ENV, _DEFAULT_NEGATIVE_TTL_SECONDS
+        ),
+    )
+
+
+_ACCOUNT_CONTEXT_CACHE: Optional[AccountContextCache] = None
+_ACCOUNT_CONTEXT_CACHE_LOCK = threading.Lock()
+
+
+def get_account_context_cache() -> AccountContextCache:
+    """Return the process-wide account context cache."""
+
+    global _ACCOUNT_CONTEXT_CACHE
+    cache = _ACCOUNT_CONTEXT_CACHE
+    if cache is None:
+        with _ACCOUNT_CONTEXT_CACHE_LOCK:
+            if _ACCOUNT_CONTEXT_CACHE is None:
+                _ACCOUNT_CONTEXT_CACHE = create_account_context_cache()
+            cache = _ACCOUNT_CONTEXT_CACHE
+    return cache
+
+
+def reset_account_context_cache() -> None:
+    """Drop the process-wide cache so the next use re-reads the environment."""
+
+    global _ACCOUNT_CONTEXT_CACHE
+    with _ACCOUNT_CONTEXT_CACHE_LOCK:
+        _ACCOUNT_CONTEXT_CACHE = None
+
+
+def resolve_account_context(account_id: str) -> BuildiumAccountContext:
+    """Cached :func:`get_buildium_account_context` using the shared clients."""
+
+    return get_account_context_cache().get(
+        account_id, lambda: get_buildium_account_context(account_id)
+    )
+
+
+async def resolve_account_context_async(account_id: str) -> BuildiumAccountContext:
+    """Cached :func:`get_buildium_account_context_async` using the shared clients."""
+
+    return await get_account_context_cache().get_async(
+        account_id, lambda: get_buildium_account_context_async(account_id)
+    )
+
+
+__all__ = [
+    "ACCOUNT_CACHE_MAX_ENTRIES_ENV",
+    "ACCOUNT_CACHE_TTL_ENV",
+    "ACCOUNT_NEGATIVE_CACHE_TTL_ENV",
+    "AccountContextCache",
+    "FAILURE_MISCONFIGURED",
+    "FAILURE_NOT_FOUND",
+    "create_account_context_cache",
+    "get_account_context_cache",
+    "reset_account_context_cache",
+    "resolve_account_context",
+    "resolve_account_context_async",
+]
@@ -4,14 +4,19 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 import google.auth
 from google.auth import exceptions as google_auth_exceptions
 from fastapi import HTTPException, status
 
 from ..config import DEFAULT_GCP_PROJECT_ID
+from .clients import GoogleClientRegistry, get_client_registry
+from .executors import WORKLOAD_GOOGLE_IO, run_in_workload
 
 if TYPE_CHECKING:  # pragma: no cover - imported for static analysis only
     from google.api_core import exceptions as google_exceptions
@@ -32,6 +37,10 @@ class BuildiumAccountContext:
 
 BUILDUM_FIRESTORE_DATABASE = "buildium"
 _FIRESTORE_COLLECTION_PATH = "buildium_accounts"
+_GET_ALL_BATCH_SIZE = 100
+_ACCOUNT_ID_PAGE_SIZE = 500
+_DOCUMENT_NAME_FIELD = "__name__"
+_BULK_SECRET_WORKERS = 16
 _WEBHOOK_SECRET_METADATA_KEYS = (
     "webhook_secret",
     "webhookSecret",
@@ -56,6 +65,40 @@ _PROJECT_ID_ENV_CANDIDATES = (
 )
 
 
+_UNRESOLVED = object()
+_DEFAULT_CREDENTIALS_PROJECT: Any = _UNRESOLVED
+_DEFAULT_CREDENTIALS_LOCK = threading.Lock()
+
+
+def _default_credentials_project_id() -> Optional[str]:
+    """Return the project of the application default credentials.
+
+    Credential discovery can probe the metadata server, so the outcome
+    (including a ``DefaultCredentialsError``) is remembered for the process.
+    """
+
+    global _DEFAULT_CREDENTIALS_PROJECT
+    if _DEFAULT_CREDENTIALS_PROJECT is _UNRESOLVED:
+        with _DEFAULT_CREDENTIALS_LOCK:
+            if _DEFAULT_CREDENTIALS_PROJECT is _UNRESOLVED:
+                try:
+                    _, project_id = google.auth.default()
+                except google_auth_exceptions.DefaultCredentialsError as exc:
+                    _DEFAULT_CREDENTIALS_PROJECT = exc
+                else:
+                    _DEFAULT_CREDENTIALS_PROJECT = project_id
+    resolved = _DEFAULT_CREDENTIALS_PROJECT
+    if isinstance(resolved, google_auth_exceptions.DefaultCredentialsError):
+        raise resolved
+    return resolved
+
+
+def _reset_default_credentials_project_id() -> None:
+    global _DEFAULT_CREDENTIALS_PROJECT
+    with _DEFAULT_CREDENTIALS_LOCK:
+        _DEFAULT_CREDENTIALS_PROJECT = _UNRESOLVED
+
+
 def _get_secret_project_id(*, account_id: str, secret_type: str) -> str:
     """Resolve the GCP project id that stores Buildium secrets."""
 
@@ -65,7 +108,7 @@ def _get_secret_project_id(*, account_id: str, secret_type: str) -> str:
 
     credentials_error: Optional[google_auth_exceptions.DefaultCredentialsError] = None
     try:
-        _, project_id = google.auth.default()
+        project_id = _default_credentials_project_id()
     except google_auth_exceptions.DefaultCredentialsError as exc:
         credentials_error = exc
         project_id = None
@@ -151,16 +194,10 @@ def _normalize_secret_resource_name(
     return f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
 
 
-def _access_secret(
-    *,
-    client: secretmanager.SecretManagerServiceClient,
-    secret_name: str,
-    account_id: str,
-    secret_type: str,
+def _resolve_secret_reference(
+    secret_name: Optional[str], *, account_id: str, secret_type: str
 ) -> str:
-    from google.api_core import exceptions as google_exceptions
-
-    """Resolve a secret version and return its UTF-8 decoded payload."""
+    """Validate a configured secret reference and return its full resource name."""
 
     if not secret_name:
         message = f"Missing {secret_type} secret reference for Buildium account."
@@ -173,59 +210,57 @@ def _access_secret(
             detail="Buildium account configuration is incomplete.",
         )
 
-    normalized_secret_name = _normalize_secret_resource_name(
+    return _normalize_secret_resource_name(
         secret_name,
         account_id=account_id,
         secret_type=secret_type,
     )
 
-    try:
-        response = client.access_secret_version(request={"name": normalized_secret_name})
-    except (google_exceptions.PermissionDenied, google_exceptions.Forbidden) as exc:
-        message = "Access to Buildium secret in Google Secret Manager was denied."
+
+def _secret_access_error(
+    exc: Exception, *, secret_name: str, account_id: str, secret_type: str
+) -> Optional[HTTPException]:
+    """Translate a Secret Manager failure into the HTTP error callers expect."""
+
+    from google.api_core import exceptions as google_exceptions
+
+    extra = {"account_id": account_id, "secret_type": secret_type, "secret_name": secret_name}
+    if isinstance(exc, (google_exceptions.PermissionDenied, google_exceptions.Forbidden)):
         logger.error(
-            message,
-            extra={
-                "account_id": account_id,
-                "secret_type": secret_type,
-                "secret_name": normalized_secret_name,
-            },
+            "Access to Buildium secret in Google Secret Manager was denied.",
+            extra=extra,
             exc_info=exc,
         )
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Buildium secret storage is not authorized.",
-        ) from exc
-    except google_exceptions.NotFound as exc:
-        message = "Referenced secret was not found in Google Secret Manager."
+        )
+    if isinstance(exc, google_exceptions.NotFound):
         logger.error(
-            message,
-            extra={
-                "account_id": account_id,
-                "secret_type": secret_type,
-                "secret_name": normalized_secret_name,
-            },
+            "Referenced secret was not found in Google Secret Manager.",
+            extra=extra,
             exc_info=exc,
         )
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Buildium account configuration is invalid.",
-        ) from exc
-    except google_exceptions.GoogleAPICallError as exc:
-        message = "Failed to access secret in Google Secret Manager."
-        logger.exception(
-            message,
-            extra={
-                "account_id": account_id,
-                "secret_type": secret_type,
-                "secret_name": normalized_secret_name,
-            },
         )
-        raise HTTPException(
+    if isinstance(exc, google_exceptions.GoogleAPICallError):
+        logger.error(
+            "Failed to access secret in Google Secret Manager.",
+            extra=extra,
+            exc_info=exc,
+        )
+        return HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Unable to resolve Buildium account secrets.",
-        ) from exc
+        )
+    return None
+
 
+def _decode_secret_payload(
+    response: Any, *, secret_name: str, normalized_secret_name: str, account_id: str, secret_type: str
+) -> str:
     try:
         payload = response.payload.data.decode("utf-8")
     except UnicodeDecodeError as exc:
@@ -253,23 +288,86 @@ def _access_secret(
     return payload
 
 
+def _access_secret(
+    *,
+    client: secretmanager.SecretManagerServiceClient,
+    secret_name: str,
+    account_id: str,
+    secret_type: str,
+) -> str:
+    """Resolve a secret version and return its UTF-8 decoded payload."""
+
+    normalized_secret_name = _resolve_secret_reference(
+        secret_name, account_id=account_id, secret_type=secret_type
+    )
+    try:
+        response = client.access_secret_version(request={"name": normalized_secret_name})
+    except Exception as exc:
+        error = _secret_access_error(
+            exc, secret_name=normalized_secret_name, account_id=account_id, secret_type=secret_type
+        )
+        if error is None:
+            raise
+        raise error from exc
+
+    return _decode_secret_payload(
+        response,
+        secret_name=secret_name,
+        normalized_secret_name=normalized_secret_name,
+        account_id=account_id,
+        secret_type=secret_type,
+    )
+
+
+async def _access_secret_async(
+    *,
+    client: Any,
+    secret_name: str,
+    account_id: str,
+    secret_type: str,
+) -> str:
+    """Async counterpart of :func:`_access_secret` for ``SecretManagerServiceAsyncClient``."""
+
+    normalized_secret_name = _resolve_secret_reference(
+        secret_name, account_id=account_id, secret_type=secret_type
+    )
+    try:
+        response = await client.access_secret_version(request={"name": normalized_secret_name})
+    except Exception as exc:
+        error = _secret_access_error(
+            exc, secret_name=normalized_secret_name, account_id=account_id, secret_type=secret_type
+        )
+        if error is None:
+            raise
+        raise error from exc
+
+    return _decode_secret_payload(
+        response,
+        secret_name=secret_name,
+        normalized_secret_name=normalized_secret_name,
+        account_id=account_id,
+        secret_type=secret_type,
+    )
+
+
 def _create_firestore_client(*, database: str) -> "firestore.Client":
     from google.cloud import firestore
 
     return firestore.Client(database=database)
 
 
-def get_buildium_account_context(
-    account_id: str,
-    *,
-    firestore_client: Optional[firestore.Client] = None,
-    secret_manager_client: Optional[secretmanager.SecretManagerServiceClient] = None,
-) -> BuildiumAccountContext:
-    from google.api_core import exceptions as google_exceptions
-    from google.cloud import firestore, secretmanager
+@dataclass(frozen=True)
+class _AccountSecretPlan:
+    """Where the secrets for an account document live."""
+
+    metadata: Mapping[str, Any]
+    document_path: str
+    api_secret_name: Optional[str]
+    webhook_secret: Optional[str]
+    webhook_secret_name: Optional[str]
 
-    """Fetch persisted Buildium account metadata and resolve associated secrets."""
 
+def _require_account_id(account_id: str) -> None:
     if not account_id:
         logger.error(
             "No Buildium account identifier was provided.",
@@ -280,14 +378,11 @@ def get_buildium_account_context(
             detail="Buildium account id is required.",
         )
 
-    if firestore_client is None:
-        firestore_client = _create_firestore_client(database=BUILDUM_FIRESTORE_DATABASE)
-    if secret_manager_client is None:
-        secret_manager_client = secretmanager.SecretManagerServiceClient()
 
+def _account_document(firestore_client: Any, account_id: str) -> Any:
     try:
         collection_ref = firestore_client.collection(_FIRESTORE_COLLECTION_PATH)
-        doc_ref = collection_ref.document(account_id)
+        return collection_ref.document(account_id)
     except ValueError as exc:
         logger.exception(
             "Invalid Firestore path configuration for Buildium accounts.",
@@ -301,43 +396,115 @@ def get_buildium_account_context(
             detail="Buildium account storage path is misconfigured.",
         ) from exc
 
-    document_path = doc_ref.path
+
+def _snapshot_account_id(snapshot: Any) -> Optional[str]:
+    doc_id = getattr(snapshot, "id", None)
+    if not doc_id and hasattr(snapshot, "reference"):
+        doc_id = getattr(snapshot.reference, "id", None)
+    return str(doc_id) if doc_id else None
+
+
+def _iter_account_snapshots(collection: Any, page_size: int) -> Iterator[Any]:
+    if not hasattr(collection, "select"):
+        # Clients without query support can only stream whole documents.
+        yield from collection.stream()
+        return
+
+    # Firestore reads an empty projection as "all fields", so project the
+    # document name alone; the large N1 blocks stored on account documents
+    # are then never transferred.
+    query = (
+        collection.select([_DOCUMENT_NAME_FIELD])
+        .order_by(_DOCUMENT_NAME_FIELD)
+        .limit(page_size)
+    )
+    last_snapshot = None
+    while True:
+        page_query = query if last_snapshot is None else query.start_after(last_snapshot)
+        page = list(page_query.stream())
+        yield from page
+        if len(page) < page_size:
+            return
+        last_snapshot = page[-1]
+
+
+def iter_buildium_account_ids(
+    firestore_client: Any, *, page_size: int = _ACCOUNT_ID_PAGE_SIZE
+) -> Iterator[str]:
+    """Yield the id of every ``buildium_accounts`` document, one page at a time.
+
+    Only document names are read, ``page_size`` at a time with cursor paging,
+    so callers can start on the first accounts before enumeration finishes.
+    """
 
     try:
-        snapshot = doc_ref.get()
-    except google_exceptions.NotFound as exc:
-        message = "Buildium account document was not found in Firestore."
-        logger.warning(
-            message,
-            extra={"account_id": account_id, "document_path": document_path},
+        collection = firestore_client.collection(_FIRESTORE_COLLECTION_PATH)
+    except Exception:  # pragma: no cover - defensive
+        logger.exception(
+            "Unable to access Buildium account collection in Firestore.",
+            extra={"collection_path": _FIRESTORE_COLLECTION_PATH},
         )
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Buildium account was not found.",
-        ) from exc
-    except google_exceptions.GoogleAPICallError as exc:
-        message = "Failed to load Buildium account document from Firestore."
+        raise
+
+    try:
+        for snapshot in _iter_account_snapshots(collection, max(1, page_size)):
+            doc_id = _snapshot_account_id(snapshot)
+            if doc_id:
+                yield doc_id
+            else:
+                logger.warning(
+                    "Encountered Firestore document without identifier; skipping.",
+                    extra={"collection_path": _FIRESTORE_COLLECTION_PATH},
+                )
+    except Exception:  # pragma: no cover - defensive
         logger.exception(
-            message,
-            extra={"account_id": account_id, "document_path": document_path},
+            "Failed to enumerate Buildium accounts from Firestore.",
+            extra={"collection_path": _FIRESTORE_COLLECTION_PATH},
         )
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to load Buildium account configuration.",
-        ) from exc
+        raise
 
-    if not snapshot.exists:
+
+def list_buildium_account_ids(firestore_client: Any) -> List[str]:
+    """Return the id of every document in the ``buildium_accounts`` collection."""
+
+    return list(iter_buildium_account_ids(firestore_client))
+
+
+def _account_document_error(
+    exc: Exception, *, account_id: str, document_path: str
+) -> Optional[HTTPException]:
+    from google.api_core import exceptions as google_exceptions
+
+    if isinstance(exc, google_exceptions.NotFound):
         logger.warning(
-            "Buildium account document does not exist.",
+            "Buildium account document was not found in Firestore.",
             extra={"account_id": account_id, "document_path": document_path},
         )
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Buildium account was not found.",
         )
+    if isinstance(exc, google_exceptions.GoogleAPICallError):
+        logger.error(
+            "Failed to load Buildium account document from Firestore.",
+            extra={"account_id": account_id, "document_path": document_path},
+            exc_info=exc,
+        )
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Unable to load Buildium account configuration.",
+        )
+    return None
 
-    metadata: Dict[str, Any] = snapshot.to_dict() or {}
-    sanitized_metadata = dict(metadata)
+
+def secret_references(
+    metadata: Mapping[str, Any],
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Return ``(api_secret_name, webhook_secret_name, inline_webhook_secret)``.
+
+    An inline webhook secret stored in Firestore takes precedence, in which
+    case the webhook secret name is ``None``.
+    """
 
     api_secret_name = (
         metadata.get("api_secret_name")
@@ -346,33 +513,37 @@ def get_buildium_account_context(
         or metadata.get("apiSecretVersionName")
     )
 
-    api_secret = _access_secret(
-        client=secret_manager_client,
-        secret_name=api_secret_name,
-        account_id=account_id,
-        secret_type="api_secret",
-    )
+    for key in _WEBHOOK_SECRET_METADATA_KEYS:
+        candidate = metadata.get(key)
+        if isinstance(candidate, str) and candidate:
+            return api_secret_name, None, candidate
+
+    webhook_secret_name = None
+    for key in _WEBHOOK_SECRET_NAME_KEYS:
+        value = metadata.get(key)
+        if value:
+            webhook_secret_name = value
+            break
+    return api_secret_name, webhook_secret_name, None
+
+
+def _split_inline_webhook_secret(
+    metadata: Mapping[str, Any],
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Return ``(metadata without the inline secret, inline webhook secret)``.
 
+    Raises ``TypeError`` with the offending key when an inline secret is not a
+    string.
+    """
+
+    sanitized_metadata = dict(metadata)
     webhook_secret = None
-    webhook_secret_source = "firestore"
     for key in _WEBHOOK_SECRET_METADATA_KEYS:
         candidate = metadata.get(key)
         if candidate is None:
             continue
         if not isinstance(candidate, str):
-            logger.error(
-                "Webhook secret stored in Firestore is not a string.",
-                extra={
-                    "account_id": account_id,
-                    "document_path": document_path,
-                    "metadata_key": key,
-                    "metadata_type": type(candidate).__name__,
-                },
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Buildium account webhook secret is invalid.",
-            )
+            raise TypeError(key)
         if not candidate:
             # Treat empty strings as missing values and continue searching.
             continue
@@ -380,46 +551,343 @@ def get_buildium_account_context(
         sanitized_metadata.pop(key, None)
         break
 
-    if webhook_secret is None:
-        webhook_secret_source = "secret_manager"
-        webhook_secret_name = None
-        for key in _WEBHOOK_SECRET_NAME_KEYS:
-            value = metadata.get(key)
-            if value:
-                webhook_secret_name = value
-                break
-        webhook_secret = _access_secret(
-            client=secret_manager_client,
-            secret_name=webhook_secret_name,
-            account_id=account_id,
-            secret_type="webhook_secret",
-        )
-    elif webhook_secret_source == "firestore":
+    if webhook_secret is not None:
         # Remove any legacy secret name metadata when the direct secret is stored.
         for key in _WEBHOOK_SECRET_NAME_KEYS:
             sanitized_metadata.pop(key, None)
+    return sanitized_metadata, webhook_secret
+
+
+def account_metadata(document: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return the metadata a context built from ``document`` would carry.
+
+    Inline webhook secrets are removed. Raises ``TypeError`` when the document
+    holds an inline secret that is not a string.
+    """
 
+    return _split_inline_webhook_secret(document)[0]
+
+
+def _plan_account_secrets(
+    snapshot: Any, *, account_id: str, document_path: str
+) -> _AccountSecretPlan:
+    """Validate an account snapshot and work out which secrets must be fetched."""
+
+    if not snapshot.exists:
+        logger.warning(
+            "Buildium account document does not exist.",
+            extra={"account_id": account_id, "document_path": document_path},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Buildium account was not found.",
+        )
+
+    metadata: Dict[str, Any] = snapshot.to_dict() or {}
+    api_secret_name, webhook_secret_name, _ = secret_references(metadata)
+
+    try:
+        sanitized_metadata, webhook_secret = _split_inline_webhook_secret(metadata)
+    except TypeError as exc:
+        key = exc.args[0]
+        logger.error(
+            "Webhook secret stored in Firestore is not a string.",
+            extra={
+                "account_id": account_id,
+                "document_path": document_path,
+                "metadata_key": key,
+                "metadata_type": type(metadata[key]).__name__,
+            },
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Buildium account webhook secret is invalid.",
+        ) from None
+
+    if webhook_secret is not None:
+        webhook_secret_name = None
+
+    return _AccountSecretPlan(
+        metadata=sanitized_metadata,
+        document_path=document_path,
+        api_secret_name=api_secret_name,
+        webhook_secret=webhook_secret,
+        webhook_secret_name=webhook_secret_name,
+    )
+
+
+def _build_account_context(
+    plan: _AccountSecretPlan, *, account_id: str, api_secret: str, webhook_secret: str
+) -> BuildiumAccountContext:
     logger.info(
         "Resolved Buildium account context.",
         extra={
             "account_id": account_id,
-            "document_path": document_path,
+            "document_path": plan.document_path,
             "has_api_secret": bool(api_secret),
             "has_webhook_secret": bool(webhook_secret),
-            "webhook_secret_source": webhook_secret_source,
+            "webhook_secret_source": "firestore" if plan.webhook_secret is not None else "secret_manager",
         },
     )
 
     return BuildiumAccountContext(
         account_id=account_id,
-        metadata=sanitized_metadata,
+        metadata=plan.metadata,
         api_secret=api_secret,
         webhook_secret=webhook_secret,
     )
 
 
+def get_buildium_account_context(
+    account_id: str,
+    *,
+    firestore_client: Optional[firestore.Client] = None,
+    secret_manager_client: Optional[secretmanager.SecretManagerServiceClient] = None,
+) -> BuildiumAccountContext:
+    """Fetch persisted Buildium account metadata and resolve associated secrets.
+
+    Clients that are not supplied come from the process-wide
+    :class:`~my_app.services.clients.GoogleClientRegistry`.
+    """
+
+    _require_account_id(account_id)
+
+    registry = get_client_registry()
+    if firestore_client is None:
+        firestore_client = registry.firestore()
+    if secret_manager_client is None:
+        secret_manager_client = registry.secret_manager()
+
+    doc_ref = _account_document(firestore_client, account_id)
+    document_path = doc_ref.path
+
+    try:
+        snapshot = doc_ref.get()
+    except Exception as exc:
+        error = _account_document_error(exc, account_id=account_id, document_path=document_path)
+        if error is None:
+            raise
+        raise error from exc
+
+    plan = _plan_account_secrets(snapshot, account_id=account_id, document_path=document_path)
+    return _resolve_planned_context(plan, account_id=account_id, client=secret_manager_client)
+
+
+def _resolve_planned_context(
+    plan: _AccountSecretPlan,
+    *,
+    account_id: str,
+    client: secretmanager.SecretManagerServiceClient,
+) -> BuildiumAccountContext:
+    api_secret = _access_secret(
+        client=client,
+        secret_name=plan.api_secret_name,
+        account_id=account_id,
+        secret_type="api_secret",
+    )
+    webhook_secret = plan.webhook_secret
+    if webhook_secret is None:
+        webhook_secret = _access_secret(
+            client=client,
+            secret_name=plan.webhook_secret_name,
+            account_id=account_id,
+            secret_type="webhook_secret",
+        )
+
+    return _build_account_context(
+        plan, account_id=account_id, api_secret=api_secret, webhook_secret=webhook_secret
+    )
+
+
+@dataclass(frozen=True)
+class BuildiumAccountContextBatch:
+    """Result of :func:`get_buildium_account_contexts`."""
+
+    contexts: Dict[str, BuildiumAccountContext]
+    errors: Dict[str, Exception]
+
+
+def _get_account_snapshots(
+    firestore_client: Any, account_ids: List[str], errors: Dict[str, Exception]
+) -> Dict[str, Tuple[str, Any]]:
+    """Fetch account documents with batched ``get_all`` calls.
+
+    Returns ``{account_id: (document_path, snapshot)}``; accounts whose
+    document could not be read are recorded in ``errors`` (as
+    ``HTTPException`` where the failure maps to one).
+    """
+
+    references: Dict[str, Any] = {}
+    for account_id in account_ids:
+        try:
+            _require_account_id(account_id)
+            references[account_id] = _account_document(firestore_client, account_id)
+        except HTTPException as exc:
+            errors[account_id] = exc
+
+    snapshots: Dict[str, Tuple[str, Any]] = {}
+    pending = list(references.items())
+    for start in range(0, len(pending), _GET_ALL_BATCH_SIZE):
+        batch = dict(pending[start : start + _GET_ALL_BATCH_SIZE])
+        try:
+            for snapshot in firestore_client.get_all(list(batch.values())):
+                account_id = _snapshot_account_id(snapshot)
+                if account_id in batch:
+                    snapshots[account_id] = (batch[account_id].path, snapshot)
+        except Exception as exc:
+            for account_id, doc_ref in batch.items():
+                error = _account_document_error(
+                    exc, account_id=account_id, document_path=doc_ref.path
+                )
+                errors[account_id] = exc if error is None else error
+            continue
+        for account_id, doc_ref in batch.items():
+            if account_id not in snapshots:
+                # get_all yields a non-existent snapshot for missing documents;
+                # treat anything it skipped the same way.
+                snapshots[account_id] = (doc_ref.path, SimpleNamespace(exists=False))
+    return snapshots
+
+
+def get_buildium_account_contexts(
+    account_ids: Iterable[str],
+    *,
+    firestore_client: Optional[firestore.Client] = None,
+    secret_manager_client: Optional[secretmanager.SecretManagerServiceClient] = None,
+    max_workers: int = _BULK_SECRET_WORKERS,
+) -> BuildiumAccountContextBatch:
+    """Resolve many account contexts at once.
+
+    Account documents are read with batched ``get_all`` calls instead of one
+    round trip per account, and secrets are fetched for up to ``max_workers``
+    accounts concurrently. Failures are reported per account in
+    :attr:`BuildiumAccountContextBatch.errors` (``HTTPException`` for the
+    errors :func:`get_buildium_account_context` would raise) rather than
+    aborting the batch.
+    """
+
+    unique_ids = list(dict.fromkeys(account_ids))
+    registry = get_client_registry()
+    if firestore_client is None:
+        firestore_client = registry.firestore()
+    if secret_manager_client is None:
+        secret_manager_client = registry.secret_manager()
+
+    errors: Dict[str, Exception] = {}
+    plans: Dict[str, _AccountSecretPlan] = {}
+    for account_id, (document_path, snapshot) in _get_account_snapshots(
+        firestore_client, unique_ids, errors
+    ).items():
+        try:
+            plans[account_id] = _plan_account_secrets(
+                snapshot, account_id=account_id, document_path=document_path
+            )
+        except HTTPException as exc:
+            errors[account_id] = exc
+
+    contexts: Dict[str, BuildiumAccountContext] = {}
+    if plans:
+        workers = max(1, min(max_workers, len(plans)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account-secrets") as pool:
+            futures = {
+                account_id: pool.submit(
+                    _resolve_planned_context,
+                    plan,
+                    account_id=account_id,
+                    client=secret_manager_client,
+                )
+                for account_id, plan in plans.items()
+            }
+            for account_id, future in futures.items():
+                try:
+                    contexts[account_id] = future.result()
+                except Exception as exc:
+                    errors[account_id] = exc
+
+    logger.info(
+        "Resolved Buildium account contexts in bulk.",
+        extra={"requested": len(unique_ids), "resolved": len(contexts), "failed": len(errors)},
+    )
+    # Preserve the caller's ordering.
+    return BuildiumAccountContextBatch(
+        contexts={account_id: contexts[account_id] for account_id in unique_ids if account_id in contexts},
+        errors={account_id: errors[account_id] for account_id in unique_ids if account_id in errors},
+    )
+
+
+async def get_buildium_account_context_async(
+    account_id: str,
+    *,
+    registry: Optional[GoogleClientRegistry] = None,
+) -> BuildiumAccountContext:
+    """Resolve an account context without blocking the event loop.
+
+    Uses the registry's async Firestore and Secret Manager clients when
+    ``BUILDIUM_GOOGLE_ASYNC_CLIENTS`` is enabled, and otherwise runs
+    :func:`get_buildium_account_context` with the shared sync clients in a
+    worker thread.
+    """
+
+    registry = registry or get_client_registry()
+    if not registry.async_enabled:
+        sync_registry = registry
+
+        def _resolve() -> BuildiumAccountContext:
+            # Clients are built (on first use) in the worker thread, not on the loop.
+            return get_buildium_account_context(
+                account_id,
+                firestore_client=sync_registry.firestore(),
+                secret_manager_client=sync_registry.secret_manager(),
+            )
+
+        return await run_in_workload(WORKLOAD_GOOGLE_IO, _resolve)
+
+    _require_account_id(account_id)
+    firestore_client = registry.async_firestore()
+    secret_manager_client = registry.async_secret_manager()
+
+    doc_ref = _account_document(firestore_client, account_id)
+    document_path = doc_ref.path
+
+    try:
+        snapshot = await doc_ref.get()
+    except Exception as exc:
+        error = _account_document_error(exc, account_id=account_id, document_path=document_path)
+        if error is None:
+            raise
+        raise error from exc
+
+    plan = _plan_account_secrets(snapshot, account_id=account_id, document_path=document_path)
+
+    api_secret = await _access_secret_async(
+        client=secret_manager_client,
+        secret_name=plan.api_secret_name,
+        account_id=account_id,
+        secret_type="api_secret",
+    )
+    webhook_secret = plan.webhook_secret
+    if webhook_secret is None:
+        webhook_secret = await _access_secret_async(
+            client=secret_manager_client,
+            secret_name=plan.webhook_secret_name,
+            account_id=account_id,
+            secret_type="webhook_secret",
+        )
+
+    return _build_account_context(
+        plan, account_id=account_id, api_secret=api_secret, webhook_secret=webhook_secret
+    )
+
+
 __all__ = [
     "BuildiumAccountContext",
+    "BuildiumAccountContextBatch",
+    "account_metadata",
     "BUILDUM_FIRESTORE_DATABASE",
     "get_buildium_account_context",
+    "get_buildium_account_context_async",
+    "get_buildium_account_contexts",
+    "iter_buildium_account_ids",
+    "list_buildium_account_ids",
+    "secret_references",
 ]
@@ -0,0 +1,241 @@
+"""Startup prefetch and refresh-ahead for the account context cache.
+
+A cold worker otherwise pays a Firestore read plus Secret Manager reads on the
+first webhook for every account. When ``BUILDIUM_ACCOUNT_CACHE_PREFETCH`` is
+enabled the listener enumerates ``buildium_accounts`` at startup, loads every
+context with bounded concurrency, and then reloads entries shortly before they
+expire so steady-state traffic never waits on a miss.
+
+:attr:`AccountCacheWarmer.ready` turns true once the first pass has finished
+and backs the listener's ``/readyz`` endpoint. Accounts that fail to load are
+reported but do not hold readiness back; they are resolved on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from . import metrics
+from .account_cache import AccountContextCache, get_account_context_cache
+from .account_context import (
+    BuildiumAccountContext,
+    get_buildium_account_context_async,
+    list_buildium_account_ids,
+)
+from .clients import get_client_registry
+from .executors import WORKLOAD_GOOGLE_IO, run_in_workload
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_PREFETCH_ENV = "BUILDIUM_ACCOUNT_CACHE_PREFETCH"
+ACCOUNT_PREFETCH_CONCURRENCY_ENV = "BUILDIUM_ACCOUNT_CACHE_PREFETCH_CONCURRENCY"
+ACCOUNT_REFRESH_AHEAD_ENV = "BUILDIUM_ACCOUNT_CACHE_REFRESH_AHEAD_SECONDS"
+
+_DEFAULT_CONCURRENCY = 8
+_DEFAULT_REFRESH_AHEAD_SECONDS = 60.0
+_MIN_REFRESH_INTERVAL_SECONDS = 1.0
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+ACCOUNT_PREFETCH_METRIC = "buildium_account_cache_prefetch_total"
+ACCOUNT_REFRESH_METRIC = "buildium_account_cache_refresh_total"
+
+AccountLoader = Callable[[str], Awaitable[BuildiumAccountContext]]
+AccountLister = Callable[[], Awaitable[List[str]]]
+
+
+async def _list_account_ids() -> List[str]:
+    return await run_in_workload(
+        WORKLOAD_GOOGLE_IO,
+        lambda: list_buildium_account_ids(get_client_registry().firestore()),
+    )
+
+
+class AccountCacheWarmer:
+    """Fill the account cache at startup and keep its entries from expiring."""
+
+    def __init__(
+        self,
+        *,
+        cache: AccountContextCache,
+        loader: AccountLoader = get_buildium_account_context_async,
+        list_accounts: AccountLister = _list_account_ids,
+        concurrency: int = _DEFAULT_CONCURRENCY,
+        refresh_ahead_seconds: float = _DEFAULT_REFRESH_AHEAD_SECONDS,
+    ) -> None:
+        self._cache = cache
+        self._loader = loader
+        self._list_accounts = list_accounts
+        self._concurrency = max(1, concurrency)
+        # Refreshing earlier than half the TTL would reload entries continuously.
+        self._refresh_ahead_seconds = min(
+            max(0.0, refresh_ahead_seconds), cache.ttl_seconds / 2
+        )
+        self._ready = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._accounts = 0
+        self._loaded = 0
+        self._failed = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "accounts": self._accounts,
+            "loaded": self._loaded,
+            "failed": self._failed,
+        }
+
+    async def _bounded(
+        self, semaphore: asyncio.Semaphore, account_id: str, work: Callable[[], Awaitable[Any]]
+    ) -> bool:
+        async with semaphore:
+            try:
+                await work()
+            except HTTPException as exc:
+                logger.warning(
+                    "Unable to load Buildium account context ahead of traffic.",
+                    extra={"account_id": account_id, "status_code": exc.status_code},
+                )
+                return False
+            except Exception:
+                logger.exception(
+                    "Unexpected failure while loading Buildium account context ahead of traffic.",
+                    extra={"account_id": account_id},
+                )
+                return False
+        return True
+
+    async def warm(self) -> None:
+        """Load every account once, then mark the warmer ready."""
+
+        try:
+            account_ids = list(dict.fromkeys(await self._list_accounts()))
+        except Exception:
+            logger.warning(
+                "Unable to enumerate Buildium accounts for cache prefetch.", exc_info=True
+            )
+            self._ready.set()
+            return
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+        results = await asyncio.gather(
+            *(
+                self._bounded(
+                    semaphore,
+                    account_id,
+                    lambda account_id=account_id: self._cache.get_async(
+                        account_id, lambda: self._loader(account_id)
+                    ),
+                )
+                for account_id in account_ids
+            )
+        )
+        self._accounts = len(account_ids)
+        self._loaded = sum(results)
+        self._failed = self._accounts - self._loaded
+        metrics.increment(ACCOUNT_PREFETCH_METRIC, self._loaded, result="loaded")
+        metrics.increment(ACCOUNT_PREFETCH_METRIC, self._failed, result="failed")
+        self._ready.set()
+        logger.info("Prefetched Buildium account contexts.", extra=self.status())
+
+    async def refresh_expiring(self) -> int:
+        """Reload entries that expire within the refresh-ahead window."""
+
+        account_ids = self._cache.expiring(self._refresh_ahead_seconds)
+        if not account_ids:
+            return 0
+        semaphore = asyncio.Semaphore(self._concurrency)
+        results = await asyncio.gather(
+            *(
+                self._bounded(
+                    semaphore,
+                    account_id,
+                    lambda account_id=account_id: self._cache.refresh_async(
+                        account_id, lambda: self._loader(account_id)
+                    ),
+                )
+                for account_id in account_ids
+            )
+        )
+        refreshed = sum(results)
+        metrics.increment(ACCOUNT_REFRESH_METRIC, refreshed, result="refreshed")
+        metrics.increment(ACCOUNT_REFRESH_METRIC, len(results) - refreshed, result="failed")
+        return refreshed
+
+    async def run(self) -> None:
+        await self.warm()
+        if self._refresh_ahead_seconds <= 0:
+            return
+        interval = max(_MIN_REFRESH_INTERVAL_SECONDS, self._refresh_ahead_seconds / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_expiring()
+            except Exception:  # pragma: no cover - keep refreshing on the next tick
+                logger.exception("Buildium account cache refresh failed.")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def _env_number(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
+    try:
+        return float(raw_value)
+    except ValueError:
+        return default
+
+
+def create_account_cache_warmer(
+    cache: Optional[AccountContextCache] = None,
+) -> Optional[AccountCacheWarmer]:
+    """Build the warmer described by the environment, or ``None`` when disabled."""
+
+    if os.getenv(ACCOUNT_PREFETCH_ENV, "").strip().lower() not in _TRUE_VALUES:
+        return None
+    if cache is None:
+        cache = get_account_context_cache()
+    if cache.ttl_seconds <= 0:
+        logger.warning(
+            "Account cache prefetch is enabled but the account cache is disabled; skipping.",
+            extra={"env": ACCOUNT_PREFETCH_ENV},
+        )
+        return None
+    return AccountCacheWarmer(
+        cache=cache,
+        concurrency=int(_env_number(ACCOUNT_PREFETCH_CONCURRENCY_ENV, _DEFAULT_CONCURRENCY)),
+        refresh_ahead_seconds=_env_number(
+            ACCOUNT_REFRESH_AHEAD_ENV, _DEFAULT_REFRESH_AHEAD_SECONDS
+        ),
+    )
+
+
+__all__ = [
+    "ACCOUNT_PREFETCH_CONCURRENCY_ENV",
+    "ACCOUNT_PREFETCH_ENV",
+    "ACCOUNT_REFRESH_AHEAD_ENV",
+    "AccountCacheWarmer",
+    "create_account_cache_warmer",
+]
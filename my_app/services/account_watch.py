@@ -0,0 +1,134 @@
+"""Push account document changes into the account context cache.
+
+With ``BUILDIUM_ACCOUNT_CACHE_WATCH`` enabled the listener registers a
+Firestore ``on_snapshot`` listener on ``buildium_accounts``. Every added,
+modified or removed document is handed to
+:meth:`AccountContextCache.observe`, which replaces the cached metadata (GL
+mappings, ``automated_tasks_category_id`` and so on) or evicts the entry when
+its secrets changed or the document was deleted. Cached contexts therefore
+stay current without waiting for the TTL, and the TTL can be raised so
+webhooks almost never read Firestore.
+
+The snapshot source is injectable so the watcher can be exercised without
+Firestore: it is any callable that accepts the snapshot callback and returns
+an object with ``unsubscribe()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional, Sequence
+
+from . import metrics
+from .account_cache import AccountContextCache, get_account_context_cache
+from .account_context import _FIRESTORE_COLLECTION_PATH
+from .clients import get_client_registry
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_CACHE_WATCH_ENV = "BUILDIUM_ACCOUNT_CACHE_WATCH"
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+ACCOUNT_WATCH_CHANGES_METRIC = "buildium_account_watch_changes_total"
+
+SnapshotCallback = Callable[[Sequence[Any], Sequence[Any], Any], None]
+SnapshotSource = Callable[[SnapshotCallback], Any]
+
+
+def _firestore_snapshot_source(callback: SnapshotCallback) -> Any:
+    collection = get_client_registry().firestore().collection(_FIRESTORE_COLLECTION_PATH)
+    return collection.on_snapshot(callback)
+
+
+def _change_type(change: Any) -> str:
+    change_type = getattr(change, "type", None)
+    name = getattr(change_type, "name", change_type)
+    return str(name or "").upper()
+
+
+class AccountSnapshotWatcher:
+    """Apply ``buildium_accounts`` snapshot changes to an account cache."""
+
+    def __init__(
+        self,
+        *,
+        cache: AccountContextCache,
+        source: SnapshotSource = _firestore_snapshot_source,
+    ) -> None:
+        self._cache = cache
+        self._source = source
+        self._watch: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def watching(self) -> bool:
+        return self._watch is not None
+
+    def start(self) -> None:
+        """Register the snapshot listener (blocking; call from a worker thread)."""
+
+        with self._lock:
+            if self._watch is None:
+                self._watch = self._source(self._on_snapshot)
+        logger.info(
+            "Watching Buildium account documents for changes.",
+            extra={"collection_path": _FIRESTORE_COLLECTION_PATH},
+        )
+
+    def stop(self) -> None:
+        with self._lock:
+            watch, self._watch = self._watch, None
+        if watch is None:
+            return
+        try:
+            watch.unsubscribe()
+        except Exception:  # pragma: no cover - best effort during shutdown
+            logger.warning("Failed to stop Buildium account watch.", exc_info=True)
+
+    def _on_snapshot(self, _documents: Sequence[Any], changes: Sequence[Any], _read_time: Any) -> None:
+        # Runs on the Firestore watch thread; an exception here would stop the stream.
+        for change in changes:
+            try:
+                self._apply(change)
+            except Exception:
+                logger.exception("Failed to apply Buildium account document change.")
+
+    def _apply(self, change: Any) -> None:
+        document = getattr(change, "document", None)
+        account_id = getattr(document, "id", None)
+        if not account_id:
+            return
+        change_type = _change_type(change)
+        if change_type == "REMOVED":
+            data = None
+        else:
+            data = document.to_dict() or {}
+        evicted = self._cache.observe(str(account_id), data)
+        metrics.increment(ACCOUNT_WATCH_CHANGES_METRIC, type=change_type.lower())
+        if evicted:
+            logger.info(
+                "Evicted cached Buildium account context after document change.",
+                extra={"account_id": account_id, "change": change_type.lower()},
+            )
+
+
+def create_account_snapshot_watcher(
+    cache: Optional[AccountContextCache] = None,
+) -> Optional[AccountSnapshotWatcher]:
+    """Build the watcher described by the environment, or ``None`` when disabled."""
+
+    if os.getenv(ACCOUNT_CACHE_WATCH_ENV, "").strip().lower() not in _TRUE_VALUES:
+        return None
+    if cache is None:
+        cache = get_account_context_cache()
+    return AccountSnapshotWatcher(cache=cache)
+
+
+__all__ = [
+    "ACCOUNT_CACHE_WATCH_ENV",
+    "AccountSnapshotWatcher",
+    "create_account_snapshot_watcher",
+]
@@ -0,0 +1,185 @@
+"""Async HTTP transport for Buildium API calls made on the event loop.
+
+The async processor pipeline (``BUILDIUM_PROCESSOR_ASYNC``) fetches task
+details through :class:`HttpxBuildiumTransport`, and async-capable automation
+handlers can use the same shared transport. One pooled ``httpx.AsyncClient``
+serves every concurrent webhook, so the number of in-flight Buildium calls is
+bounded by ``BUILDIUM_ASYNC_HTTP_MAX_CONNECTIONS`` rather than by a thread pool.
+Requests take tokens from the per-account Buildium rate limiter first.
+
+``httpx`` is optional. Without it :func:`get_async_buildium_transport` returns
+``None`` and callers fall back to the blocking clients on a worker thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Mapping, Optional, Protocol
+
+try:  # pragma: no cover - optional dependency guard
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency guard
+    httpx = None  # type: ignore
+
+from .buildium_rate_limit import (
+    HTTP_TOO_MANY_REQUESTS,
+    MAX_THROTTLED_ATTEMPTS,
+    get_buildium_rate_limiter,
+    parse_retry_after,
+    rate_limit_key,
+)
+
+logger = logging.getLogger(__name__)
+
+BUILDIUM_API_BASE_URL = "https://api.buildium.com/v1"
+
+ASYNC_HTTP_MAX_CONNECTIONS_ENV = "BUILDIUM_ASYNC_HTTP_MAX_CONNECTIONS"
+ASYNC_HTTP_TIMEOUT_ENV = "BUILDIUM_ASYNC_HTTP_TIMEOUT_SECONDS"
+
+_DEFAULT_MAX_CONNECTIONS = 100
+_DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+class AsyncBuildiumTransport(Protocol):
+    """Minimal async Buildium client used by the processor and async handlers."""
+
+    async def get_json(
+        self,
+        path: str,
+        *,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Any:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class HttpxBuildiumTransport:
+    """Pooled ``httpx.AsyncClient`` against the Buildium REST API."""
+
+    def __init__(
+        self,
+        *,
+        base_url: str = BUILDIUM_API_BASE_URL,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        timeout_seconds: float = _DEFAULT_TIMEOUT_SECONDS,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("httpx must be installed to use the async Buildium transport.")
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + "/",
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def get_json(
+        self,
+        path: str,
+        *,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Any:
+        account_key = rate_limit_key(headers)
+        limiter = get_buildium_rate_limiter()
+        attempt = 0
+        while True:
+            attempt += 1
+            await limiter.acquire_async(account_key)
+            response = await self._client.get(
+                path.lstrip("/"),
+                headers={str(key): str(value) for key, value in headers.items()},
+                params=dict(params) if params else None,
+            )
+            if response.status_code != HTTP_TOO_MANY_REQUESTS:
+                break
+            limiter.penalize(account_key, parse_retry_after(response.headers.get("Retry-After")))
+            if attempt >= MAX_THROTTLED_ATTEMPTS:
+                break
+        response.raise_for_status()
+        if not response.content:
+            return None
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _env_number(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
+    try:
+        return float(raw_value)
+    except ValueError:
+        return default
+
+
+_TRANSPORT: Optional[AsyncBuildiumTransport] = None
+_TRANSPORT_UNAVAILABLE = False
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_async_buildium_transport() -> Optional[AsyncBuildiumTransport]:
+    """Return the shared transport, creating it on first use, or ``None`` without httpx."""
+
+    global _TRANSPORT, _TRANSPORT_UNAVAILABLE
+    if _TRANSPORT is not None or _TRANSPORT_UNAVAILABLE:
+        return _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None and not _TRANSPORT_UNAVAILABLE:
+            try:
+                _TRANSPORT = HttpxBuildiumTransport(
+                    max_connections=max(
+                        1, int(_env_number(ASYNC_HTTP_MAX_CONNECTIONS_ENV, _DEFAULT_MAX_CONNECTIONS))
+                    ),
+                    timeout_seconds=_env_number(ASYNC_HTTP_TIMEOUT_ENV, _DEFAULT_TIMEOUT_SECONDS),
+                )
+            except ImportError:
+                _TRANSPORT_UNAVAILABLE = True
+                logger.warning(
+                    "httpx is not installed; Buildium calls in the async pipeline use worker threads."
+                )
+    return _TRANSPORT
+
+
+def configure_async_buildium_transport(
+    transport: Optional[AsyncBuildiumTransport],
+) -> Optional[AsyncBuildiumTransport]:
+    """Install ``transport`` as the shared instance (``None`` re-enables lazy creation)."""
+
+    global _TRANSPORT, _TRANSPORT_UNAVAILABLE
+    with _TRANSPORT_LOCK:
+        _TRANSPORT = transport
+        _TRANSPORT_UNAVAILABLE = False
+    return transport
+
+
+async def close_async_buildium_transport() -> None:
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        transport, _TRANSPORT = _TRANSPORT, None
+    if transport is None:
+        return
+    try:
+        await transport.aclose()
+    except Exception:  # pragma: no cover - best effort during shutdown
+        logger.warning("Failed to close the async Buildium transport.", exc_info=True)
+
+
+__all__ = [
+    "ASYNC_HTTP_MAX_CONNECTIONS_ENV",
+    "ASYNC_HTTP_TIMEOUT_ENV",
+    "AsyncBuildiumTransport",
+    "BUILDIUM_API_BASE_URL",
+    "HttpxBuildiumTransport",
+    "close_async_buildium_transport",
+    "configure_async_buildium_transport",
+    "get_async_buildium_transport",
+]
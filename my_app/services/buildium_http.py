@@ -0,0 +1,283 @@
+"""Pooled keep-alive HTTP transport for the hand-rolled Buildium clients.
+
+``RequestsBuildiumAPI`` in :mod:`my_app.tasks.initiation` and
+:mod:`my_app.tasks.n1_increase` used to call ``urllib.request.urlopen`` for
+every request. Each call paid a fresh TCP and TLS handshake, had no timeout,
+and downloaded uncompressed JSON. They now share :class:`BuildiumHttpTransport`,
+which uses ``urllib3`` like the vendored ``openapi_client.rest``:
+
+* one ``PoolManager`` per account keeps up to ``BUILDIUM_HTTP_POOL_SIZE``
+  connections alive, so one account's burst cannot claim every socket;
+* responses are requested with ``Accept-Encoding: gzip`` and decoded
+  transparently;
+* connect and read timeouts come from ``BUILDIUM_HTTP_CONNECT_TIMEOUT_SECONDS``
+  and ``BUILDIUM_HTTP_READ_TIMEOUT_SECONDS``.
+
+:func:`send_buildium_request` adds the per-account rate limiter from
+:mod:`my_app.services.buildium_rate_limit` and raises
+:class:`urllib.error.HTTPError` for error statuses, as ``urlopen`` did.
+"""
+
+from __future__ import annotations
+
+import http.client
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
+from urllib import error as urllib_error
+
+import urllib3
+
+from .buildium_rate_limit import (
+    HTTP_TOO_MANY_REQUESTS,
+    MAX_THROTTLED_ATTEMPTS,
+    get_buildium_rate_limiter,
+    parse_retry_after,
+    rate_limit_key,
+)
+
+logger = logging.getLogger(__name__)
+
+BUILDIUM_HTTP_POOL_SIZE_ENV = "BUILDIUM_HTTP_POOL_SIZE"
+BUILDIUM_HTTP_CONNECT_TIMEOUT_ENV = "BUILDIUM_HTTP_CONNECT_TIMEOUT_SECONDS"
+BUILDIUM_HTTP_READ_TIMEOUT_ENV = "BUILDIUM_HTTP_READ_TIMEOUT_SECONDS"
+BUILDIUM_HTTP_MAX_ACCOUNT_POOLS_ENV = "BUILDIUM_HTTP_MAX_ACCOUNT_POOLS"
+
+_DEFAULT_POOL_SIZE = 4
+_DEFAULT_CONNECT_TIMEOUT_SECONDS = 5.0
+_DEFAULT_READ_TIMEOUT_SECONDS = 30.0
+_DEFAULT_MAX_ACCOUNT_POOLS = 256
+# Host pools per account: the Buildium API plus presigned document storage.
+_HOSTS_PER_ACCOUNT = 4
+
+PoolFactory = Callable[..., Any]
+
+
+@dataclass(frozen=True)
+class BuildiumHttpResponse:
+    status: int
+    reason: str
+    data: bytes
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+class BuildiumHttpTransport:
+    """Keep-alive connection pools, one per account, shared by every client."""
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = _DEFAULT_POOL_SIZE,
+        connect_timeout: float = _DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = _DEFAULT_READ_TIMEOUT_SECONDS,
+        max_account_pools: int = _DEFAULT_MAX_ACCOUNT_POOLS,
+        pool_factory: PoolFactory = urllib3.PoolManager,
+    ) -> None:
+        self._pool_size = max(1, pool_size)
+        self._timeout = urllib3.Timeout(connect=connect_timeout, read=read_timeout)
+        self._max_account_pools = max(1, max_account_pools)
+        self._pool_factory = pool_factory
+        self._pools: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pool(self, account_key: str) -> Any:
+        evicted = None
+        with self._lock:
+            pool = self._pools.get(account_key)
+            if pool is None:
+                pool = self._pool_factory(
+                    num_pools=_HOSTS_PER_ACCOUNT,
+                    maxsize=self._pool_size,
+                    block=False,
+                )
+                self._pools[account_key] = pool
+                if len(self._pools) > self._max_account_pools:
+                    _, evicted = self._pools.popitem(last=False)
+            self._pools.move_to_end(account_key)
+        if evicted is not None:
+            evicted.clear()
+        return pool
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: Optional[bytes] = None,
+        account_key: Optional[str] = None,
+    ) -> BuildiumHttpResponse:
+        key = account_key or rate_limit_key(headers)
+        response = self._pool(key).request(
+            method,
+            url,
+            body=body,
+            headers={"Accept-Encoding": "gzip", **{str(k): str(v) for k, v in headers.items()}},
+            timeout=self._timeout,
+            # Only connection failures are retried here: a POST may not be
+            # repeated once sent, and 429s belong to the rate limiter.
+            retries=urllib3.Retry(
+                total=None,
+                connect=2,
+                read=0,
+                status=0,
+                redirect=3,
+                raise_on_status=False,
+                respect_retry_after_header=False,
+            ),
+            preload_content=True,
+            decode_content=True,
+        )
+        return BuildiumHttpResponse(
+            status=response.status,
+            reason=getattr(response, "reason", "") or "",
+            data=response.data or b"",
+            headers=response.headers,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.clear()
+
+
+def _env_number(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
+    try:
+        return float(raw_value)
+    except ValueError:
+        return default
+
+
+_TRANSPORT: Optional[BuildiumHttpTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_buildium_http_transport() -> BuildiumHttpTransport:
+    """Return the process-wide transport, creating it from the environment on first use."""
+
+    global _TRANSPORT
+    if _TRANSPORT is None:
+        with _TRANSPORT_LOCK:
+            if _TRANSPORT is None:
+                _TRANSPORT = BuildiumHttpTransport(
+                    pool_size=int(_env_number(BUILDIUM_HTTP_POOL_SIZE_ENV, _DEFAULT_POOL_SIZE)),
+                    connect_timeout=_env_number(
+                        BUILDIUM_HTTP_CONNECT_TIMEOUT_ENV, _DEFAULT_CONNECT_TIMEOUT_SECONDS
+                    ),
+                    read_timeout=_env_number(
+                        BUILDIUM_HTTP_READ_TIMEOUT_ENV, _DEFAULT_READ_TIMEOUT_SECONDS
+                    ),
+                    max_account_pools=int(
+                        _env_number(BUILDIUM_HTTP_MAX_ACCOUNT_POOLS_ENV, _DEFAULT_MAX_ACCOUNT_POOLS)
+                    ),
+                )
+    return _TRANSPORT
+
+
+def configure_buildium_http_transport(
+    transport: Optional[BuildiumHttpTransport],
+) -> Optional[BuildiumHttpTransport]:
+    """Install ``transport`` as the shared instance (``None`` re-reads the environment)."""
+
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        _TRANSPORT = transport
+    return transport
+
+
+def close_buildium_http_transport() -> None:
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        transport, _TRANSPORT = _TRANSPORT, None
+    if transport is not None:
+        transport.clear()
+
+
+def _raise_for_status(url: str, response: BuildiumHttpResponse) -> None:
+    if response.status < 400:
+        return
+    headers = http.client.HTTPMessage()
+    for name, value in response.headers.items():
+        headers[name] = value
+    raise urllib_error.HTTPError(
+        url, response.status, response.reason, headers, io.BytesIO(response.data)
+    )
+
+
+def fetch_buildium_response(
+    method: str,
+    url: str,
+    *,
+    headers: Mapping[str, str],
+    body: Optional[bytes] = None,
+    rate_limited: bool = True,
+    max_attempts: int = MAX_THROTTLED_ATTEMPTS,
+) -> BuildiumHttpResponse:
+    """Send a request over the pooled transport and return the whole response.
+
+    Buildium API calls (``rate_limited``) take a token from the account's
+    bucket first. ``429`` responses block the bucket for ``Retry-After`` and
+    the request is sent again, up to ``max_attempts`` times in total. Presigned
+    document URLs are not Buildium API calls and pass ``rate_limited=False``.
+    """
+
+    transport = get_buildium_http_transport()
+    key = rate_limit_key(headers)
+    limiter = get_buildium_rate_limiter() if rate_limited else None
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter is not None:
+            limiter.acquire(key)
+        response = transport.request(method, url, headers=headers, body=body, account_key=key)
+        if limiter is not None and response.status == HTTP_TOO_MANY_REQUESTS:
+            limiter.penalize(key, parse_retry_after(response.headers.get("Retry-After")))
+            if attempt < max_attempts:
+                continue
+        _raise_for_status(url, response)
+        return response
+
+
+def send_buildium_request(
+    method: str,
+    url: str,
+    *,
+    headers: Mapping[str, str],
+    body: Optional[bytes] = None,
+    rate_limited: bool = True,
+    max_attempts: int = MAX_THROTTLED_ATTEMPTS,
+) -> bytes:
+    """Like :func:`fetch_buildium_response` but return only the response body."""
+
+    return fetch_buildium_response(
+        method,
+        url,
+        headers=headers,
+        body=body,
+        rate_limited=rate_limited,
+        max_attempts=max_attempts,
+    ).data
+
+
+__all__ = [
+    "BUILDIUM_HTTP_CONNECT_TIMEOUT_ENV",
+    "BUILDIUM_HTTP_MAX_ACCOUNT_POOLS_ENV",
+    "BUILDIUM_HTTP_POOL_SIZE_ENV",
+    "BUILDIUM_HTTP_READ_TIMEOUT_ENV",
+    "BuildiumHttpResponse",
+    "BuildiumHttpTransport",
+    "close_buildium_http_transport",
+    "configure_buildium_http_transport",
+    "fetch_buildium_response",
+    "get_buildium_http_transport",
+    "send_buildium_request",
+]
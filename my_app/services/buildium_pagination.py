@@ -0,0 +1,303 @@
+"""Auto-paginating iterators for Buildium collection endpoints.
+
+Buildium list endpoints return at most ``limit`` records per call (default
+``50``, maximum ``1000``) starting at ``offset``, and report the size of the
+whole collection in the ``X-Total-Count`` response header. A single
+``GET leases`` therefore silently truncates any account with more than 50
+active leases.
+
+:func:`iter_buildium_pages` follows ``offset``/``limit`` until the collection
+is exhausted and yields each page as soon as it arrives, so callers can start
+on page one while the rest is still in flight. Once the first page reports the
+total, the remaining pages are fetched up to ``BUILDIUM_PAGINATION_CONCURRENCY``
+at a time; without a total they are fetched one after another until a short
+page comes back. Every page request still goes through the per-account rate
+limiter.
+
+:func:`iter_buildium_collection` drives the hand-rolled ``RequestsBuildiumAPI``
+clients over the pooled transport, and :func:`iter_sdk_collection` /
+:func:`iter_leases` do the same for the generated ``openapi_client`` APIs.
+:func:`iter_buildium_collection_async` pages through the async transport used
+on the event loop.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
+from urllib.parse import urlencode
+
+from . import metrics
+from .buildium_async import AsyncBuildiumTransport
+from .buildium_http import fetch_buildium_response
+
+logger = logging.getLogger(__name__)
+
+BUILDIUM_PAGINATION_CONCURRENCY_ENV = "BUILDIUM_PAGINATION_CONCURRENCY"
+
+BUILDIUM_MAX_PAGE_SIZE = 1000
+TOTAL_COUNT_HEADER = "X-Total-Count"
+PAGINATION_PAGES_METRIC = "buildium_pagination_pages_total"
+
+_DEFAULT_CONCURRENCY = 4
+
+
+@dataclass(frozen=True)
+class BuildiumPage:
+    """One page of a collection and, when reported, the collection's size."""
+
+    items: Sequence[Any] = field(default_factory=list)
+    total: Optional[int] = None
+
+
+PageFetcher = Callable[[int, int], BuildiumPage]
+
+
+def _env_concurrency() -> int:
+    raw_value = os.getenv(BUILDIUM_PAGINATION_CONCURRENCY_ENV)
+    if not raw_value:
+        return _DEFAULT_CONCURRENCY
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        return _DEFAULT_CONCURRENCY
+
+
+def parse_total_count(headers: Optional[Mapping[str, Any]]) -> Optional[int]:
+    """Return the ``X-Total-Count`` header as an integer, if present and valid."""
+
+    if not headers:
+        return None
+    value = headers.get(TOTAL_COUNT_HEADER)
+    if value is None:
+        wanted = TOTAL_COUNT_HEADER.lower()
+        value = next(
+            (item for name, item in headers.items() if str(name).lower() == wanted), None
+        )
+    try:
+        total = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return total if total >= 0 else None
+
+
+def iter_buildium_pages(
+    fetch_page: PageFetcher,
+    *,
+    page_size: int = BUILDIUM_MAX_PAGE_SIZE,
+    concurrency: Optional[int] = None,
+) -> Iterator[BuildiumPage]:
+    """Yield every page of a collection in ``offset`` order.
+
+    ``fetch_page(offset, limit)`` performs one request. Pages after the first
+    are fetched concurrently only when the first page reports a total; the
+    collection is then read up to that total. Closing the iterator early
+    cancels the pages not yet requested.
+    """
+
+    page_size = max(1, min(int(page_size), BUILDIUM_MAX_PAGE_SIZE))
+    workers = _env_concurrency() if concurrency is None else max(1, int(concurrency))
+
+    first = fetch_page(0, page_size)
+    metrics.increment(PAGINATION_PAGES_METRIC, 1)
+    yield first
+    total = first.total
+    if len(first.items) < page_size or (total is not None and total <= page_size):
+        return
+
+    if total is None or workers == 1:
+        offset = page_size
+        while True:
+            page = fetch_page(offset, page_size)
+            metrics.increment(PAGINATION_PAGES_METRIC, 1)
+            yield page
+            offset += page_size
+            if len(page.items) < page_size or (total is not None and offset >= total):
+                return
+
+    offsets = iter(range(page_size, total, page_size))
+    workers = min(workers, -(-(total - page_size) // page_size))
+    # A private pool rather than the ``buildium_io`` workload executor: callers
+    # usually iterate on that executor already, and waiting on its own queue
+    # could deadlock it once every worker is paginating.
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="buildium-pages") as pool:
+        pending: Deque["Future[BuildiumPage]"] = deque(
+            pool.submit(fetch_page, offset, page_size) for offset in islice(offsets, workers)
+        )
+        try:
+            while pending:
+                page = pending.popleft().result()
+                metrics.increment(PAGINATION_PAGES_METRIC, 1)
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append(pool.submit(fetch_page, next_offset, page_size))
+                yield page
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_buildium_items(
+    fetch_page: PageFetcher,
+    *,
+    page_size: int = BUILDIUM_MAX_PAGE_SIZE,
+    concurrency: Optional[int] = None,
+) -> Iterator[Any]:
+    """Yield the records of every page from :func:`iter_buildium_pages`."""
+
+    for page in iter_buildium_pages(fetch_page, page_size=page_size, concurrency=concurrency):
+        yield from page.items
+
+
+def _decode_collection(raw: bytes, *, keyed_records: bool = False) -> BuildiumPage:
+    if not raw:
+        return BuildiumPage()
+    return _collection_page(json.loads(raw.decode("utf-8")), keyed_records=keyed_records)
+
+
+def _collection_page(payload: Any, *, keyed_records: bool = False) -> BuildiumPage:
+    if isinstance(payload, list):
+        return BuildiumPage(items=payload)
+    if isinstance(payload, Mapping):
+        items = payload.get("items")
+        if isinstance(items, list):
+            total = payload.get("totalCount")
+            return BuildiumPage(items=items, total=total if isinstance(total, int) else None)
+        if keyed_records:
+            # Records keyed by id, e.g. ``{"4000": {...}, "4100": {...}}``.
+            return BuildiumPage(items=list(payload.values()))
+        # A bare object is a collection of one record.
+        return BuildiumPage(items=[payload])
+    return BuildiumPage()
+
+
+def iter_buildium_collection(
+    url: str,
+    *,
+    headers: Mapping[str, str],
+    params: Optional[Mapping[str, Any]] = None,
+    page_size: int = BUILDIUM_MAX_PAGE_SIZE,
+    concurrency: Optional[int] = None,
+    keyed_records: bool = False,
+) -> Iterator[Any]:
+    """Yield every record of the Buildium collection at ``url``.
+
+    Requests go through :func:`~my_app.services.buildium_http.fetch_buildium_response`,
+    so they share the pooled transport and the per-account rate limiter.
+    Responses may be a JSON list or an ``{"items": [...]}`` envelope. Any other
+    JSON object is read as a single record, or with ``keyed_records`` as
+    records keyed by id (its values).
+    """
+
+    def fetch_page(offset: int, limit: int) -> BuildiumPage:
+        query = urlencode({**(params or {}), "offset": offset, "limit": limit}, doseq=True)
+        response = fetch_buildium_response("GET", f"{url}?{query}", headers=headers)
+        page = _decode_collection(response.data, keyed_records=keyed_records)
+        total = parse_total_count(response.headers)
+        return page if total is None else BuildiumPage(items=page.items, total=total)
+
+    return iter_buildium_items(fetch_page, page_size=page_size, concurrency=concurrency)
+
+
+async def iter_buildium_collection_async(
+    transport: AsyncBuildiumTransport,
+    path: str,
+    *,
+    headers: Mapping[str, str],
+    params: Optional[Mapping[str, Any]] = None,
+    page_size: int = BUILDIUM_MAX_PAGE_SIZE,
+    keyed_records: bool = False,
+) -> AsyncIterator[Any]:
+    """Yield every record of the collection at ``path`` through an async transport.
+
+    The transport returns decoded JSON without response headers, so pages are
+    requested one after another until a short page, or the envelope's
+    ``totalCount``, ends the collection. Responses are read as in
+    :func:`iter_buildium_collection`.
+    """
+
+    page_size = max(1, min(int(page_size), BUILDIUM_MAX_PAGE_SIZE))
+    offset = 0
+    while True:
+        payload = await transport.get_json(
+            path, headers=headers, params={**(params or {}), "offset": offset, "limit": page_size}
+        )
+        page = _collection_page(payload, keyed_records=keyed_records)
+        metrics.increment(PAGINATION_PAGES_METRIC, 1)
+        for item in page.items:
+            yield item
+        offset += page_size
+        if len(page.items) < page_size or (page.total is not None and offset >= page.total):
+            return
+
+
+def iter_sdk_collection(
+    list_with_http_info: Callable[..., Any],
+    *,
+    page_size: int = BUILDIUM_MAX_PAGE_SIZE,
+    concurrency: Optional[int] = None,
+    **params: Any,
+) -> Iterator[Any]:
+    """Yield every model from a generated ``*_with_http_info`` list method.
+
+    ``params`` are the method's filters; ``offset`` and ``limit`` are supplied
+    per page. The generated clients are rate limited once wrapped with
+    :func:`~my_app.services.buildium_rate_limit.rate_limit_api_client`.
+    """
+
+    def fetch_page(offset: int, limit: int) -> BuildiumPage:
+        response = list_with_http_info(offset=offset, limit=limit, **params)
+        data: List[Any] = list(response.data or [])
+        return BuildiumPage(items=data, total=parse_total_count(response.headers))
+
+    return iter_buildium_items(fetch_page, page_size=page_size, concurrency=concurrency)
+
+
+def iter_leases(
+    leases_api: Any,
+    *,
+    page_size: int = BUILDIUM_MAX_PAGE_SIZE,
+    concurrency: Optional[int] = None,
+    **filters: Any,
+) -> Iterator[Any]:
+    """Yield every ``LeaseMessage`` matching ``filters`` from ``LeasesApi.get_leases``."""
+
+    return iter_sdk_collection(
+        leases_api.get_leases_with_http_info,
+        page_size=page_size,
+        concurrency=concurrency,
+        **filters,
+    )
+
+
+__all__ = [
+    "BUILDIUM_MAX_PAGE_SIZE",
+    "BUILDIUM_PAGINATION_CONCURRENCY_ENV",
+    "BuildiumPage",
+    "PAGINATION_PAGES_METRIC",
+    "PageFetcher",
+    "TOTAL_COUNT_HEADER",
+    "iter_buildium_collection",
+    "iter_buildium_collection_async",
+    "iter_buildium_items",
+    "iter_buildium_pages",
+    "iter_leases",
+    "iter_sdk_collection",
+    "parse_total_count",
+]
@@ -0,0 +1,526 @@
+"""Per-account rate limiting for every Buildium API call.
+
+Buildium limits requests per account. Before this module, every
+``RequestsBuildiumAPI`` instance and every generated ``ApiClient`` sent
+requests on its own, so concurrent handlers across uvicorn workers and Cloud
+Run instances burst past the limit and turned into ``429`` storms.
+
+Each call now takes a token from :class:`BuildiumRateLimiter`, keyed by the
+``X-Buildium-Account-Id`` header that :func:`_build_api_headers` sets:
+
+1. The in-process tier is a token bucket per account. When no shared tier is
+   configured it is the whole limit, which suits a single worker.
+2. The optional shared tier (``BUILDIUM_API_RATE_LIMIT_BACKEND=firestore``)
+   keeps one bucket document per account in Firestore. The in-process tier
+   leases ``BUILDIUM_API_RATE_LIMIT_LEASE_SIZE`` tokens per transaction and
+   spends them locally, so the shared bucket costs one transaction per lease
+   rather than one per request. :class:`LocalRateLimitStore` is an in-memory
+   stand-in with the same interface.
+
+A ``429`` response's ``Retry-After`` blocks the account's bucket in both
+tiers, and the request is retried once tokens are available again. If the
+shared tier fails, the limiter falls back to the in-process tier: an outage
+must not stop automations.
+
+:func:`my_app.services.buildium_http.send_buildium_request`,
+:func:`rate_limit_api_client` and the async transport are the three Buildium
+HTTP paths, and all of them go through the shared limiter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Protocol, Tuple
+
+from . import metrics
+from .clients import get_client_registry
+from .executors import WORKLOAD_GOOGLE_IO, run_in_workload
+
+logger = logging.getLogger(__name__)
+
+BUILDIUM_API_RATE_LIMIT_ENV = "BUILDIUM_API_RATE_LIMIT"
+BUILDIUM_API_RATE_BURST_ENV = "BUILDIUM_API_RATE_BURST"
+BUILDIUM_API_RATE_LIMIT_BACKEND_ENV = "BUILDIUM_API_RATE_LIMIT_BACKEND"
+BUILDIUM_API_RATE_LIMIT_LEASE_SIZE_ENV = "BUILDIUM_API_RATE_LIMIT_LEASE_SIZE"
+BUILDIUM_API_RATE_LIMIT_MAX_WAIT_ENV = "BUILDIUM_API_RATE_LIMIT_MAX_WAIT_SECONDS"
+
+RATE_LIMIT_COLLECTION_PATH = "buildium_rate_limits"
+ACCOUNT_ID_HEADER = "X-Buildium-Account-Id"
+
+RATE_LIMIT_WAIT_SECONDS_METRIC = "buildium_api_rate_limit_wait_seconds_total"
+RATE_LIMIT_THROTTLED_METRIC = "buildium_api_throttled_total"
+RATE_LIMIT_SHARED_ERRORS_METRIC = "buildium_api_rate_limit_shared_errors_total"
+
+BACKEND_LOCAL = "local"
+BACKEND_FIRESTORE = "firestore"
+
+HTTP_TOO_MANY_REQUESTS = 429
+MAX_THROTTLED_ATTEMPTS = 3
+
+_DEFAULT_RATE = 10.0
+_DEFAULT_LEASE_SIZE = 5
+_DEFAULT_MAX_WAIT_SECONDS = 60.0
+_DEFAULT_RETRY_AFTER_SECONDS = 1.0
+_DEFAULT_MAX_TRACKED_ACCOUNTS = 10_000
+_UNKNOWN_ACCOUNT_KEY = "<unknown>"
+
+
+class BuildiumRateLimitTimeout(RuntimeError):
+    """Raised when a call would wait longer than the configured maximum for a token."""
+
+
+def _take_tokens(
+    state: Optional[Mapping[str, Any]],
+    requested: int,
+    *,
+    rate: float,
+    burst: float,
+    now: float,
+) -> Tuple[int, float, Dict[str, float]]:
+    """Refill ``state`` to ``now`` and take up to ``requested`` whole tokens.
+
+    Returns the granted count, the seconds until the next token (``0`` when
+    something was granted) and the updated state.
+    """
+
+    state = state or {}
+    tokens = float(state.get("tokens", burst))
+    updated_at = float(state.get("updated_at", now))
+    blocked_until = float(state.get("blocked_until", 0.0))
+
+    if blocked_until > now:
+        new_state = {"tokens": 0.0, "updated_at": now, "blocked_until": blocked_until}
+        return 0, blocked_until - now, new_state
+
+    if blocked_until > updated_at:
+        # A throttle ended since the last update; allow the retry right away.
+        tokens, updated_at = 1.0, blocked_until
+
+    elapsed = max(0.0, now - updated_at)
+    tokens = min(burst, tokens + elapsed * rate)
+    granted = min(requested, int(math.floor(tokens)))
+    tokens -= granted
+    wait = 0.0 if granted else (1.0 - tokens) / rate
+    return granted, wait, {"tokens": tokens, "updated_at": now, "blocked_until": blocked_until}
+
+
+class SharedRateLimitStore(Protocol):
+    """Bucket state shared by every worker and instance."""
+
+    def take(
+        self, account_id: str, requested: int, *, rate: float, burst: float, now: float
+    ) -> Tuple[int, float]:
+        """Take up to ``requested`` tokens; return ``(granted, seconds_until_next)``."""
+
+    def block(self, account_id: str, until: float) -> None:
+        """Grant no tokens for ``account_id`` before ``until`` (epoch seconds)."""
+
+
+class LocalRateLimitStore:
+    """In-memory :class:`SharedRateLimitStore` for development and tests."""
+
+    def __init__(self) -> None:
+        self._states: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(
+        self, account_id: str, requested: int, *, rate: float, burst: float, now: float
+    ) -> Tuple[int, float]:
+        with self._lock:
+            granted, wait, state = _take_tokens(
+                self._states.get(account_id), requested, rate=rate, burst=burst, now=now
+            )
+            self._states[account_id] = state
+        return granted, wait
+
+    def block(self, account_id: str, until: float) -> None:
+        with self._lock:
+            state = self._states.setdefault(account_id, {})
+            state["blocked_until"] = max(float(state.get("blocked_until", 0.0)), until)
+
+
+class FirestoreRateLimitStore:
+    """Firestore-backed buckets, one document per account, updated in transactions."""
+
+    def __init__(
+        self,
+        *,
+        firestore_client: Optional[Any] = None,
+        collection_path: str = RATE_LIMIT_COLLECTION_PATH,
+    ) -> None:
+        self._firestore_client = firestore_client
+        self._collection_path = collection_path
+
+    def _client(self) -> Any:
+        if self._firestore_client is None:
+            self._firestore_client = get_client_registry().firestore()
+        return self._firestore_client
+
+    def _update(
+        self,
+        account_id: str,
+        apply: Callable[[Optional[Mapping[str, Any]]], Tuple[Any, Dict[str, Any]]],
+    ) -> Any:
+        from google.cloud import firestore
+
+        client = self._client()
+        doc_ref = client.collection(self._collection_path).document(account_id)
+
+        @firestore.transactional
+        def _run(transaction: Any) -> Any:
+            snapshot = doc_ref.get(transaction=transaction)
+            current = snapshot.to_dict() if getattr(snapshot, "exists", False) else None
+            result, state = apply(current)
+            transaction.set(doc_ref, {**state, "account_id": account_id})
+            return result
+
+        return _run(client.transaction())
+
+    def take(
+        self, account_id: str, requested: int, *, rate: float, burst: float, now: float
+    ) -> Tuple[int, float]:
+        def _apply(current: Optional[Mapping[str, Any]]) -> Tuple[Tuple[int, float], Dict[str, Any]]:
+            granted, wait, state = _take_tokens(current, requested, rate=rate, burst=burst, now=now)
+            return (granted, wait), state
+
+        return self._update(account_id, _apply)
+
+    def block(self, account_id: str, until: float) -> None:
+        def _apply(current: Optional[Mapping[str, Any]]) -> Tuple[None, Dict[str, Any]]:
+            state = dict(current or {})
+            state.pop("account_id", None)
+            state["blocked_until"] = max(float(state.get("blocked_until", 0.0)), until)
+            return None, state
+
+        self._update(account_id, _apply)
+
+
+class _AccountBucket:
+    __slots__ = ("tokens", "updated_at", "blocked_until")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+        self.blocked_until = 0.0
+
+
+class BuildiumRateLimiter:
+    """Per-account token buckets with an optional shared tier.
+
+    ``rate`` is the sustained number of Buildium calls per second for one
+    account and ``burst`` the bucket capacity. A ``rate`` of zero disables the
+    limiter.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = _DEFAULT_RATE,
+        burst: Optional[float] = None,
+        shared: Optional[SharedRateLimitStore] = None,
+        lease_size: int = _DEFAULT_LEASE_SIZE,
+        max_wait_seconds: float = _DEFAULT_MAX_WAIT_SECONDS,
+        max_tracked_accounts: int = _DEFAULT_MAX_TRACKED_ACCOUNTS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._rate = max(0.0, rate)
+        self._burst = max(1.0, burst if burst is not None else max(1.0, self._rate))
+        self._shared = shared
+        self._lease_size = max(1, min(lease_size, int(self._burst)))
+        self._max_wait_seconds = max_wait_seconds
+        self._max_tracked_accounts = max_tracked_accounts
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: "OrderedDict[str, _AccountBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._rate > 0
+
+    def _bucket(self, key: str, now: float) -> _AccountBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # With a shared tier, local tokens only come from leases.
+            bucket = _AccountBucket(0.0 if self._shared is not None else self._burst, now)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self._max_tracked_accounts:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(key)
+        return bucket
+
+    def _take_local(self, bucket: _AccountBucket, now: float) -> Optional[float]:
+        """Spend a local token; ``None`` means a lease from the shared tier is needed."""
+
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+        if self._shared is None:
+            elapsed = max(0.0, now - bucket.updated_at)
+            bucket.tokens = min(self._burst, bucket.tokens + elapsed * self._rate)
+            bucket.updated_at = now
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return 0.0
+        if self._shared is None:
+            return (1.0 - bucket.tokens) / self._rate
+        return None
+
+    def reserve(self, account_id: Optional[str]) -> float:
+        """Take a token without waiting; return ``0`` or the seconds to wait first."""
+
+        if not self.enabled:
+            return 0.0
+
+        key = account_id or _UNKNOWN_ACCOUNT_KEY
+        now = self._clock()
+        with self._lock:
+            wait = self._take_local(self._bucket(key, now), now)
+        if wait is not None or self._shared is None:
+            return wait or 0.0
+
+        try:
+            granted, wait = self._shared.take(
+                key, self._lease_size, rate=self._rate, burst=self._burst, now=now
+            )
+        except Exception:
+            metrics.increment(RATE_LIMIT_SHARED_ERRORS_METRIC)
+            logger.warning(
+                "Unable to lease Buildium rate limit tokens from the shared tier.",
+                exc_info=True,
+                extra={"account_id": key},
+            )
+            return 0.0
+
+        with self._lock:
+            bucket = self._bucket(key, now)
+            bucket.tokens += granted
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return 0.0
+        return max(wait, 0.001)
+
+    def _check_wait(self, key: str, waited: float, wait: float) -> None:
+        if waited + wait > self._max_wait_seconds:
+            raise BuildiumRateLimitTimeout(
+                f"Buildium rate limit for account {key} would wait more than "
+                f"{self._max_wait_seconds:g} seconds."
+            )
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            metrics.increment(RATE_LIMIT_WAIT_SECONDS_METRIC, waited)
+
+    def acquire(self, account_id: Optional[str]) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+
+        key = account_id or _UNKNOWN_ACCOUNT_KEY
+        waited = 0.0
+        while True:
+            wait = self.reserve(key)
+            if wait <= 0:
+                self._record_wait(waited)
+                return waited
+            self._check_wait(key, waited, wait)
+            self._sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, account_id: Optional[str]) -> float:
+        """Async :meth:`acquire`; shared-tier leases run on the Google I/O pool."""
+
+        key = account_id or _UNKNOWN_ACCOUNT_KEY
+        waited = 0.0
+        while True:
+            if self._shared is None:
+                wait = self.reserve(key)
+            else:
+                wait = await run_in_workload(WORKLOAD_GOOGLE_IO, self.reserve, key)
+            if wait <= 0:
+                self._record_wait(waited)
+                return waited
+            self._check_wait(key, waited, wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def penalize(self, account_id: Optional[str], retry_after_seconds: Optional[float]) -> None:
+        """Feed a ``429`` back into the bucket so no calls go out before it clears."""
+
+        key = account_id or _UNKNOWN_ACCOUNT_KEY
+        delay = retry_after_seconds if retry_after_seconds is not None else _DEFAULT_RETRY_AFTER_SECONDS
+        now = self._clock()
+        until = now + max(0.0, delay)
+        metrics.increment(RATE_LIMIT_THROTTLED_METRIC)
+        logger.warning(
+            "Buildium throttled API calls for account.",
+            extra={"account_id": key, "retry_after_seconds": delay},
+        )
+        if not self.enabled:
+            return
+        with self._lock:
+            bucket = self._bucket(key, now)
+            bucket.blocked_until = max(bucket.blocked_until, until)
+            # Without a shared tier one token is ready when the block ends;
+            # with one, the shared bucket grants it.
+            bucket.tokens = 0.0 if self._shared is not None else 1.0
+            bucket.updated_at = bucket.blocked_until
+        if self._shared is not None:
+            try:
+                self._shared.block(key, until)
+            except Exception:
+                metrics.increment(RATE_LIMIT_SHARED_ERRORS_METRIC)
+                logger.warning(
+                    "Unable to share a Buildium throttle with other instances.",
+                    exc_info=True,
+                    extra={"account_id": key},
+                )
+
+
+def parse_retry_after(value: Optional[str], *, now: Optional[float] = None) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+
+    if value is None or not str(value).strip():
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    current = now if now is not None else datetime.now(timezone.utc).timestamp()
+    return max(0.0, retry_at.timestamp() - current)
+
+
+def rate_limit_key(headers: Mapping[str, Any]) -> str:
+    """Return the bucket key for a request's headers (its Buildium account id)."""
+
+    for name, value in headers.items():
+        if str(name).lower() == ACCOUNT_ID_HEADER.lower() and value:
+            return str(value)
+    return _UNKNOWN_ACCOUNT_KEY
+
+
+def _env_number(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if raw_value is None or not raw_value.strip():
+        return default
+    try:
+        return float(raw_value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s value %r.", env_name, raw_value)
+        return default
+
+
+def create_buildium_rate_limiter() -> BuildiumRateLimiter:
+    """Build the limiter described by the environment."""
+
+    rate = _env_number(BUILDIUM_API_RATE_LIMIT_ENV, _DEFAULT_RATE)
+    burst_value = os.getenv(BUILDIUM_API_RATE_BURST_ENV)
+    burst = _env_number(BUILDIUM_API_RATE_BURST_ENV, rate) if burst_value else None
+    backend = os.getenv(BUILDIUM_API_RATE_LIMIT_BACKEND_ENV, BACKEND_LOCAL).strip().lower()
+    shared: Optional[SharedRateLimitStore] = None
+    if backend == BACKEND_FIRESTORE:
+        shared = FirestoreRateLimitStore()
+    elif backend and backend != BACKEND_LOCAL:
+        logger.warning(
+            "Unknown Buildium rate limit backend; using the in-process limiter only.",
+            extra={"backend": backend},
+        )
+    return BuildiumRateLimiter(
+        rate=rate,
+        burst=burst,
+        shared=shared,
+        lease_size=int(_env_number(BUILDIUM_API_RATE_LIMIT_LEASE_SIZE_ENV, _DEFAULT_LEASE_SIZE)),
+        max_wait_seconds=_env_number(BUILDIUM_API_RATE_LIMIT_MAX_WAIT_ENV, _DEFAULT_MAX_WAIT_SECONDS),
+    )
+
+
+_LIMITER: Optional[BuildiumRateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_buildium_rate_limiter() -> BuildiumRateLimiter:
+    """Return the process-wide limiter, creating it from the environment on first use."""
+
+    global _LIMITER
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = create_buildium_rate_limiter()
+    return _LIMITER
+
+
+def configure_buildium_rate_limiter(
+    limiter: Optional[BuildiumRateLimiter],
+) -> Optional[BuildiumRateLimiter]:
+    """Install ``limiter`` as the shared instance (``None`` re-reads the environment)."""
+
+    global _LIMITER
+    with _LIMITER_LOCK:
+        _LIMITER = limiter
+    return limiter
+
+
+def rate_limit_api_client(
+    api_client: Any, *, max_attempts: int = MAX_THROTTLED_ATTEMPTS
+) -> Any:
+    """Route a generated ``ApiClient``'s requests through the rate limiter.
+
+    The generated REST client is wrapped rather than edited so the vendored
+    SDK can be regenerated. The bucket key comes from the client's default
+    headers.
+    """
+
+    rest_client = api_client.rest_client
+    send = rest_client.request
+
+    def _request(method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        key = rate_limit_key(api_client.default_headers)
+        limiter = get_buildium_rate_limiter()
+        attempt = 0
+        while True:
+            attempt += 1
+            limiter.acquire(key)
+            response = send(method, url, *args, **kwargs)
+            if getattr(response, "status", None) != HTTP_TOO_MANY_REQUESTS:
+                return response
+            limiter.penalize(key, parse_retry_after(response.getheader("Retry-After")))
+            if attempt >= max_attempts:
+                return response
+
+    rest_client.request = _request
+    return api_client
+
+
+__all__ = [
+    "ACCOUNT_ID_HEADER",
+    "BUILDIUM_API_RATE_BURST_ENV",
+    "BUILDIUM_API_RATE_LIMIT_BACKEND_ENV",
+    "BUILDIUM_API_RATE_LIMIT_ENV",
+    "BUILDIUM_API_RATE_LIMIT_LEASE_SIZE_ENV",
+    "BUILDIUM_API_RATE_LIMIT_MAX_WAIT_ENV",
+    "BuildiumRateLimitTimeout",
+    "BuildiumRateLimiter",
+    "FirestoreRateLimitStore",
+    "LocalRateLimitStore",
+    "RATE_LIMIT_COLLECTION_PATH",
+    "SharedRateLimitStore",
+    "configure_buildium_rate_limiter",
+    "create_buildium_rate_limiter",
+    "get_buildium_rate_limiter",
+    "parse_retry_after",
+    "rate_limit_api_client",
+    "rate_limit_key",
+]
@@ -0,0 +1,184 @@
+"""Process-wide Google Cloud clients shared by the listener, tasks and jobs.
+
+Constructing a ``firestore.Client`` or ``SecretManagerServiceClient`` performs
+credential discovery and opens a new gRPC channel, which used to happen for
+every webhook. The registry builds each client once per process (lazily, or
+eagerly through :meth:`GoogleClientRegistry.warm` at startup) and hands the
+same instance to every caller.
+
+Async variants (``firestore.AsyncClient`` and
+``SecretManagerServiceAsyncClient``) are opt-in through
+``BUILDIUM_GOOGLE_ASYNC_CLIENTS`` so account resolution can run on the event
+loop without an executor hop. Async clients are bound to the event loop that
+first uses them, so they must only be used from the listener's loop.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ASYNC_CLIENTS_ENV = "BUILDIUM_GOOGLE_ASYNC_CLIENTS"
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+ClientFactory = Callable[[], Any]
+
+
+def _default_firestore_factory() -> Any:
+    from .account_context import BUILDUM_FIRESTORE_DATABASE, _create_firestore_client
+
+    return _create_firestore_client(database=BUILDUM_FIRESTORE_DATABASE)
+
+
+def _default_secret_manager_factory() -> Any:
+    from google.cloud import secretmanager
+
+    return secretmanager.SecretManagerServiceClient()
+
+
+def _default_async_firestore_factory() -> Any:
+    from google.cloud import firestore
+
+    from .account_context import BUILDUM_FIRESTORE_DATABASE
+
+    return firestore.AsyncClient(database=BUILDUM_FIRESTORE_DATABASE)
+
+
+def _default_async_secret_manager_factory() -> Any:
+    from google.cloud import secretmanager
+
+    return secretmanager.SecretManagerServiceAsyncClient()
+
+
+class GoogleClientRegistry:
+    """Lazily constructed, shared Firestore and Secret Manager clients."""
+
+    def __init__(
+        self,
+        *,
+        firestore_factory: ClientFactory = _default_firestore_factory,
+        secret_manager_factory: ClientFactory = _default_secret_manager_factory,
+        async_firestore_factory: ClientFactory = _default_async_firestore_factory,
+        async_secret_manager_factory: ClientFactory = _default_async_secret_manager_factory,
+        async_enabled: Optional[bool] = None,
+    ) -> None:
+        self._factories = {
+            "firestore": firestore_factory,
+            "secret_manager": secret_manager_factory,
+            "async_firestore": async_firestore_factory,
+            "async_secret_manager": async_secret_manager_factory,
+        }
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        if async_enabled is None:
+            async_enabled = os.getenv(GOOGLE_ASYNC_CLIENTS_ENV, "").strip().lower() in _TRUE_VALUES
+        self._async_enabled = async_enabled
+
+    @property
+    def async_enabled(self) -> bool:
+        return self._async_enabled
+
+    def _get(self, name: str) -> Any:
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._factories[name]()
+                self._clients[name] = client
+                logger.info("Created shared Google Cloud client.", extra={"client": name})
+        return client
+
+    def firestore(self) -> Any:
+        return self._get("firestore")
+
+    def secret_manager(self) -> Any:
+        return self._get("secret_manager")
+
+    def async_firestore(self) -> Any:
+        return self._get("async_firestore")
+
+    def async_secret_manager(self) -> Any:
+        return self._get("async_secret_manager")
+
+    def warm(self) -> None:
+        """Construct the sync clients now so credential discovery happens at startup."""
+
+        self.firestore()
+        self.secret_manager()
+
+    def close(self) -> None:
+        """Close every client that was created and forget it."""
+
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            if name.startswith("async_"):
+                # Async transports must be closed on their own loop; dropping
+                # the reference lets the channel be collected with the loop.
+                continue
+            close = getattr(client, "close", None)
+            if close is None:
+                transport = getattr(client, "transport", None)
+                close = getattr(transport, "close", None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception:  # pragma: no cover - best effort during shutdown
+                logger.warning(
+                    "Failed to close shared Google Cloud client.",
+                    extra={"client": name},
+                    exc_info=True,
+                )
+
+
+_CLIENT_REGISTRY: Optional[GoogleClientRegistry] = None
+_CLIENT_REGISTRY_LOCK = threading.Lock()
+
+
+def get_client_registry() -> GoogleClientRegistry:
+    """Return the process-wide client registry, creating it on first use."""
+
+    global _CLIENT_REGISTRY
+    registry = _CLIENT_REGISTRY
+    if registry is None:
+        with _CLIENT_REGISTRY_LOCK:
+            if _CLIENT_REGISTRY is None:
+                _CLIENT_REGISTRY = GoogleClientRegistry()
+            registry = _CLIENT_REGISTRY
+    return registry
+
+
+def configure_client_registry(registry: GoogleClientRegistry) -> GoogleClientRegistry:
+    """Install ``registry`` as the process-wide registry."""
+
+    global _CLIENT_REGISTRY
+    with _CLIENT_REGISTRY_LOCK:
+        _CLIENT_REGISTRY = registry
+    return registry
+
+
+def reset_client_registry() -> None:
+    """Close and drop the process-wide registry."""
+
+    global _CLIENT_REGISTRY
+    with _CLIENT_REGISTRY_LOCK:
+        registry, _CLIENT_REGISTRY = _CLIENT_REGISTRY, None
+    if registry is not None:
+        registry.close()
+
+
+__all__ = [
+    "GOOGLE_ASYNC_CLIENTS_ENV",
+    "GoogleClientRegistry",
+    "configure_client_registry",
+    "get_client_registry",
+    "reset_client_registry",
+]
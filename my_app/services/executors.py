@@ -0,0 +1,349 @@
+"""Named, bounded executors for each class of blocking work.
+
+Blocking work used to share the default asyncio executor. A long N1
+completion rendering hundreds of notices could then hold every default worker
+while webhook verification waited behind it for an account lookup. Each
+workload class now has its own pool:
+
+* ``buildium_io``: blocking Buildium API calls and the sync automation
+  handlers that mostly make them.
+* ``google_io``: Firestore and Secret Manager round trips, such as account
+  resolution during verification, the initiation check and dedup claims.
+* ``cpu``: CPU-heavy rendering such as N1 notice PDFs. This pool uses worker
+  processes so rendering does not hold the GIL the event loop needs. It falls
+  back to threads when process pools are unavailable or when
+  ``BUILDIUM_EXECUTOR_CPU_MODE=thread``.
+
+Pool sizes come from ``BUILDIUM_EXECUTOR_<CLASS>_WORKERS``. Every pool tracks
+how many submissions are queued and running and how long they waited for a
+worker. These figures are published as metrics and in
+:func:`workload_executor_stats` for the listener's ``/metrics`` endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WORKLOAD_BUILDIUM_IO = "buildium_io"
+WORKLOAD_GOOGLE_IO = "google_io"
+WORKLOAD_CPU = "cpu"
+WORKLOAD_CLASSES = (WORKLOAD_BUILDIUM_IO, WORKLOAD_GOOGLE_IO, WORKLOAD_CPU)
+
+EXECUTOR_WORKERS_ENV = {
+    WORKLOAD_BUILDIUM_IO: "BUILDIUM_EXECUTOR_BUILDIUM_IO_WORKERS",
+    WORKLOAD_GOOGLE_IO: "BUILDIUM_EXECUTOR_GOOGLE_IO_WORKERS",
+    WORKLOAD_CPU: "BUILDIUM_EXECUTOR_CPU_WORKERS",
+}
+EXECUTOR_CPU_MODE_ENV = "BUILDIUM_EXECUTOR_CPU_MODE"
+
+EXECUTOR_QUEUE_DEPTH_METRIC = "buildium_executor_queue_depth"
+EXECUTOR_IN_FLIGHT_METRIC = "buildium_executor_in_flight"
+EXECUTOR_TASKS_METRIC = "buildium_executor_tasks_total"
+EXECUTOR_WAIT_SECONDS_METRIC = "buildium_executor_wait_seconds_total"
+
+_CPU_MODE_PROCESS = "process"
+_CPU_MODE_THREAD = "thread"
+
+_DEFAULT_WORKERS = {
+    WORKLOAD_BUILDIUM_IO: 32,
+    WORKLOAD_GOOGLE_IO: 16,
+    WORKLOAD_CPU: max(1, os.cpu_count() or 1),
+}
+
+# Set in process-pool workers so nested submissions to the same class run inline.
+_WORKER_WORKLOAD: Optional[str] = None
+
+
+def _mark_worker_process(workload: str) -> None:
+    global _WORKER_WORKLOAD
+    _WORKER_WORKLOAD = workload
+
+
+def _timed_call(
+    fn: Callable[..., T], args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Tuple[float, T]:
+    # Wall-clock start so the wait can be measured across process boundaries.
+    return time.time(), fn(*args, **kwargs)
+
+
+class WorkloadExecutor:
+    """A bounded pool for one workload class that records queueing statistics."""
+
+    def __init__(self, name: str, *, max_workers: int, use_processes: bool = False) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._use_processes = use_processes
+        self._thread_prefix = f"workload-{name}"
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @property
+    def kind(self) -> str:
+        return _CPU_MODE_PROCESS if self._use_processes else _CPU_MODE_THREAD
+
+    def owns_current_thread(self) -> bool:
+        """Return ``True`` when called from one of this pool's own workers."""
+
+        if self._use_processes:
+            return _WORKER_WORKLOAD == self.name
+        return threading.current_thread().name.startswith(self._thread_prefix + "_")
+
+    def _create_executor(self) -> Executor:
+        if self._use_processes:
+            try:
+                return ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_mark_worker_process,
+                    initargs=(self.name,),
+                )
+            except (ImportError, NotImplementedError, OSError):
+                logger.warning(
+                    "Process pools are unavailable; running workload on threads.",
+                    extra={"workload": self.name},
+                    exc_info=True,
+                )
+                self._use_processes = False
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=self._thread_prefix
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _discard_executor(self, executor: Executor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[Tuple[float, T]]":
+        """Queue ``fn`` and return a future resolving to ``(started_at, result)``.
+
+        Prefer :func:`call_in_workload` and :func:`run_in_workload`, which
+        unwrap the result.
+        """
+
+        executor = self._get_executor()
+        # Counted before submitting so a fast completion never sees a negative depth.
+        with self._lock:
+            self._pending += 1
+            self._publish_gauges()
+        submitted_at = time.time()
+        try:
+            try:
+                future = executor.submit(_timed_call, fn, args, kwargs)
+            except BrokenProcessPool:
+                # A worker died earlier; start a fresh pool and try once more.
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(_timed_call, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+                self._publish_gauges()
+            raise
+
+        future.add_done_callback(
+            lambda done: self._record_completion(done, executor=executor, submitted_at=submitted_at)
+        )
+        return future
+
+    def _record_completion(
+        self, future: "Future[Tuple[float, Any]]", *, executor: Executor, submitted_at: float
+    ) -> None:
+        wait_seconds: Optional[float] = None
+        failed = future.cancelled()
+        if not failed:
+            error = future.exception()
+            if error is None:
+                wait_seconds = max(0.0, future.result()[0] - submitted_at)
+            else:
+                failed = True
+                if isinstance(error, BrokenProcessPool):
+                    self._discard_executor(executor)
+
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._failed += int(failed)
+            if wait_seconds is not None:
+                self._wait_seconds_total += wait_seconds
+                self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+            self._publish_gauges()
+        metrics.increment(
+            EXECUTOR_TASKS_METRIC, workload=self.name, result="error" if failed else "ok"
+        )
+        if wait_seconds is not None:
+            metrics.increment(EXECUTOR_WAIT_SECONDS_METRIC, wait_seconds, workload=self.name)
+
+    def _publish_gauges(self) -> None:
+        in_flight = min(self._pending, self.max_workers)
+        metrics.set_gauge(EXECUTOR_IN_FLIGHT_METRIC, in_flight, workload=self.name)
+        metrics.set_gauge(
+            EXECUTOR_QUEUE_DEPTH_METRIC, self._pending - in_flight, workload=self.name
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = min(self._pending, self.max_workers)
+            waited = self._completed - self._failed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "in_flight": in_flight,
+                "queue_depth": self._pending - in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+                "wait_seconds_avg": round(self._wait_seconds_total / waited, 6) if waited else 0.0,
+            }
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _env_workers(workload: str) -> int:
+    raw_value = os.getenv(EXECUTOR_WORKERS_ENV[workload], "").strip()
+    if not raw_value:
+        return _DEFAULT_WORKERS[workload]
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        logger.warning(
+            "Invalid executor size; using the default.",
+            extra={"workload": workload, "value": raw_value},
+        )
+        return _DEFAULT_WORKERS[workload]
+
+
+def _cpu_uses_processes() -> bool:
+    mode = os.getenv(EXECUTOR_CPU_MODE_ENV, _CPU_MODE_PROCESS).strip().lower()
+    return mode != _CPU_MODE_THREAD
+
+
+_EXECUTORS: Dict[str, WorkloadExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_workload_executor(workload: str) -> WorkloadExecutor:
+    """Return the shared pool for ``workload``, creating it from the environment."""
+
+    if workload not in EXECUTOR_WORKERS_ENV:
+        raise ValueError(f"Unknown workload class: {workload!r}")
+    executor = _EXECUTORS.get(workload)
+    if executor is not None:
+        return executor
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(workload)
+        if executor is None:
+            executor = WorkloadExecutor(
+                workload,
+                max_workers=_env_workers(workload),
+                use_processes=workload == WORKLOAD_CPU and _cpu_uses_processes(),
+            )
+            _EXECUTORS[workload] = executor
+    return executor
+
+
+def call_in_workload(workload: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn`` on the ``workload`` pool and block until it returns.
+
+    Calls made from one of the pool's own workers run inline, so a handler
+    already running on a pool cannot deadlock waiting for a second slot in it.
+    """
+
+    executor = get_workload_executor(workload)
+    if executor.owns_current_thread():
+        return fn(*args, **kwargs)
+    return executor.submit(fn, *args, **kwargs).result()[1]
+
+
+def map_in_workload(
+    workload: str, fn: Callable[..., T], calls: Iterable[Mapping[str, Any]]
+) -> List[T]:
+    """Run ``fn(**kwargs)`` for every mapping in ``calls`` and return the results in order.
+
+    Every call is queued before the first result is awaited, so the pool's
+    workers run them side by side. Like :func:`call_in_workload`, calls made
+    from one of the pool's own workers run inline.
+    """
+
+    executor = get_workload_executor(workload)
+    if executor.owns_current_thread():
+        return [fn(**kwargs) for kwargs in calls]
+    futures = [executor.submit(fn, **kwargs) for kwargs in calls]
+    return [future.result()[1] for future in futures]
+
+
+async def run_in_workload(workload: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await ``fn`` on the ``workload`` pool without blocking the event loop."""
+
+    future = get_workload_executor(workload).submit(fn, *args, **kwargs)
+    _, result = await asyncio.wrap_future(future)
+    return result
+
+
+def workload_executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Return queueing statistics for every pool created in this process."""
+
+    with _EXECUTORS_LOCK:
+        executors = dict(_EXECUTORS)
+    return {name: executor.stats() for name, executor in sorted(executors.items())}
+
+
+def shutdown_workload_executors(*, wait: bool = True) -> None:
+    """Stop every pool; later submissions create fresh ones."""
+
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+__all__ = [
+    "EXECUTOR_CPU_MODE_ENV",
+    "EXECUTOR_IN_FLIGHT_METRIC",
+    "EXECUTOR_QUEUE_DEPTH_METRIC",
+    "EXECUTOR_TASKS_METRIC",
+    "EXECUTOR_WAIT_SECONDS_METRIC",
+    "EXECUTOR_WORKERS_ENV",
+    "WORKLOAD_BUILDIUM_IO",
+    "WORKLOAD_CLASSES",
+    "WORKLOAD_CPU",
+    "WORKLOAD_GOOGLE_IO",
+    "WorkloadExecutor",
+    "call_in_workload",
+    "get_workload_executor",
+    "map_in_workload",
+    "run_in_workload",
+    "shutdown_workload_executors",
+    "workload_executor_stats",
+]
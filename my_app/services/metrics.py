@@ -0,0 +1,74 @@
+"""Minimal in-process metrics registry.
+
+Counters and gauges are kept per process and exposed as JSON by the
+listener's ``/metrics`` endpoint. Metric names follow the Prometheus
+convention (``_total`` suffix for counters) so they can be scraped and
+relabelled without renaming later.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Mapping, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+_LOCK = threading.Lock()
+_COUNTERS: Dict[str, Dict[LabelSet, float]] = {}
+_GAUGES: Dict[str, Dict[LabelSet, float]] = {}
+
+
+def _label_set(labels: Mapping[str, object]) -> LabelSet:
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items()))
+
+
+def increment(name: str, value: float = 1.0, **labels: object) -> None:
+    """Add ``value`` to the counter ``name`` for the given labels."""
+
+    key = _label_set(labels)
+    with _LOCK:
+        series = _COUNTERS.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels: object) -> None:
+    """Record the current ``value`` of the gauge ``name`` for the given labels."""
+
+    key = _label_set(labels)
+    with _LOCK:
+        _GAUGES.setdefault(name, {})[key] = float(value)
+
+
+def get_counter(name: str, **labels: object) -> float:
+    with _LOCK:
+        return _COUNTERS.get(name, {}).get(_label_set(labels), 0.0)
+
+
+def get_gauge(name: str, **labels: object) -> float:
+    with _LOCK:
+        return _GAUGES.get(name, {}).get(_label_set(labels), 0.0)
+
+
+def _render(series: Mapping[LabelSet, float]) -> list:
+    return [{"labels": dict(labels), "value": value} for labels, value in series.items()]
+
+
+def snapshot() -> Dict[str, Dict[str, list]]:
+    """Return a JSON-serializable copy of every recorded metric."""
+
+    with _LOCK:
+        return {
+            "counters": {name: _render(series) for name, series in _COUNTERS.items()},
+            "gauges": {name: _render(series) for name, series in _GAUGES.items()},
+        }
+
+
+def reset() -> None:
+    """Clear every metric. Intended for tests."""
+
+    with _LOCK:
+        _COUNTERS.clear()
+        _GAUGES.clear()
+
+
+__all__ = ["get_counter", "get_gauge", "increment", "reset", "set_gauge", "snapshot"]
@@ -7,6 +7,7 @@ __all__ = [
     "BuildiumProcessorError",
     "BuildiumWebhookProcessor",
     "enqueue_buildium_webhook",
+    "enqueue_buildium_webhook_async",
 ]
 
 
@@ -4,13 +4,21 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import functools
+import inspect
 import json
 import logging
 import os
+import re
 import sys
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 from typing import Protocol
 
 from google.api_core import exceptions as google_exceptions
@@ -23,16 +31,38 @@ logging.basicConfig(
 )
 
 from ..config import DEFAULT_GCP_PROJECT_ID
-from ..services.account_context import BUILDUM_FIRESTORE_DATABASE
+from ..services import metrics
+from ..services.buildium_async import get_async_buildium_transport
+from ..services.buildium_rate_limit import rate_limit_api_client
+from ..services.clients import get_client_registry
+from ..services.executors import (
+    WORKLOAD_BUILDIUM_IO,
+    WORKLOAD_GOOGLE_IO,
+    call_in_workload,
+    run_in_workload,
+)
 
 if TYPE_CHECKING:
+    from ..services.account_context import BuildiumAccountContext
     from ..webhooks.verification import VerifiedBuildiumWebhook
 from .initiation import (
     FIRESTORE_COLLECTION_PATH as INITIATION_COLLECTION_PATH,
     INITIATION_COMPLETED_FIELD,
     handle_initiation_automation,
 )
-from .n1_increase import handle_n1_increase_automation
+from .n1_increase import (
+    _extract_task_status,
+    handle_n1_increase_automation,
+    handle_n1_increase_automation_async,
+)
+from .payloads import (
+    DEFAULT_COMPRESS_MIN_BYTES,
+    TASK_PAYLOAD_COMPRESS_MIN_BYTES_ENV,
+    TASK_PAYLOAD_FORMAT_COMPACT,
+    TASK_PAYLOAD_FORMAT_ENV,
+    TASK_PAYLOAD_FORMAT_LEGACY,
+    encode_compact_task_payload,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +95,16 @@ LEGACY_CLOUD_TASKS_QUEUE_ENV = "BUILDUM_TASKS_QUEUE"
 LEGACY_CLOUD_TASKS_LOCATION_ENV = "BUILDUM_TASKS_LOCATION"
 LEGACY_TASK_HANDLER_URL_ENV = "BUILDUM_TASKS_SERVICE_URL"
 CLOUD_RUN_REGION_ENV = "CLOUD_RUN_REGION"
+CLOUD_TASKS_DISPATCH_WORKERS_ENV = "CLOUD_TASKS_DISPATCH_WORKERS"
+_DEFAULT_CLOUD_TASKS_DISPATCH_WORKERS = 8
+WEBHOOK_ROUTE_FILTER_ENV = "BUILDIUM_WEBHOOK_ROUTE_FILTER"
+TASK_DETAIL_CACHE_TTL_ENV = "BUILDIUM_TASK_DETAIL_CACHE_TTL_SECONDS"
+PROCESSOR_ASYNC_ENV = "BUILDIUM_PROCESSOR_ASYNC"
+_DEFAULT_TASK_DETAIL_CACHE_TTL_SECONDS = 300.0
+_TASK_DETAIL_CACHE_SIZE = 1000
+
+WEBHOOK_PREFILTERED_METRIC = "buildium_webhook_prefiltered_total"
+TASK_DETAIL_LOOKUPS_METRIC = "buildium_task_detail_lookups_total"
 
 _PROJECT_ID_ENV_CANDIDATES: Tuple[str, ...] = (
     "GOOGLE_CLOUD_PROJECT",
@@ -208,7 +248,16 @@ def _extract_from_candidates(
 
 
 def _prepare_buildium_headers(verified_webhook: "VerifiedBuildiumWebhook") -> Dict[str, str]:
-    """Build Buildium API headers from the stored account context.
+    """Build Buildium API headers from the stored account context."""
+
+    return _build_api_headers(
+        account_id=verified_webhook.account_id,
+        api_secret=verified_webhook.account_context.api_secret,
+    )
+
+
+def _build_api_headers(*, account_id: str, api_secret: Optional[str]) -> Dict[str, str]:
+    """Build Buildium API headers for an account from its API secret payload.
 
     Parses the secret payload to prefer bearer tokens, with fallbacks for
     API keys or basic authentication credentials when necessary.
@@ -216,10 +265,10 @@ def _prepare_buildium_headers(verified_webhook: "VerifiedBuildiumWebhook") -> Di
     headers: Dict[str, str] = {
         "Accept": "application/json",
         "Content-Type": "application/json",
-        "X-Buildium-Account-Id": verified_webhook.account_id,
+        "X-Buildium-Account-Id": account_id,
     }
 
-    secret_payload = verified_webhook.account_context.api_secret or ""
+    secret_payload = api_secret or ""
     parsed_secret = _parse_secret_payload(secret_payload)
 
     if parsed_secret:
@@ -285,6 +334,66 @@ def _extract_gl_mapping(metadata: Mapping[str, Any]) -> Mapping[str, Any]:
     return {}
 
 
+@dataclass(frozen=True)
+class BuildiumAccountProfile:
+    """Per-account values derived from a :class:`BuildiumAccountContext`.
+
+    Profiles are shared between webhooks for the same account and must be
+    treated as read-only.
+    """
+
+    api_headers: Mapping[str, str]
+    gl_mapping: Mapping[str, Any]
+    automated_category_id: Optional[str]
+
+
+_ACCOUNT_PROFILE_CACHE_SIZE = 1000
+# account id -> (context the profile was derived from, profile)
+_ACCOUNT_PROFILES: "OrderedDict[str, Tuple[Any, BuildiumAccountProfile]]" = OrderedDict()
+_ACCOUNT_PROFILES_LOCK = threading.Lock()
+
+
+def _build_account_profile(
+    account_id: str, account_context: BuildiumAccountContext
+) -> BuildiumAccountProfile:
+    metadata = account_context.metadata
+    configured_category_id: Optional[str] = None
+    if isinstance(metadata, Mapping):
+        configured_category_id = _coerce_string(metadata.get(_AUTOMATED_CATEGORY_METADATA_KEY))
+        if isinstance(configured_category_id, str):
+            configured_category_id = configured_category_id.strip() or None
+    return BuildiumAccountProfile(
+        api_headers=_build_api_headers(account_id=account_id, api_secret=account_context.api_secret),
+        gl_mapping=_extract_gl_mapping(metadata),
+        automated_category_id=configured_category_id,
+    )
+
+
+def get_account_profile(
+    account_id: str, account_context: BuildiumAccountContext
+) -> BuildiumAccountProfile:
+    """Return the derived profile for ``account_context``, building it once.
+
+    The account cache hands out the same context object until the entry
+    expires or is invalidated, so a profile is rebuilt exactly when the
+    context it was derived from is replaced.
+    """
+
+    with _ACCOUNT_PROFILES_LOCK:
+        cached = _ACCOUNT_PROFILES.get(account_id)
+        if cached is not None and cached[0] is account_context:
+            _ACCOUNT_PROFILES.move_to_end(account_id)
+            return cached[1]
+
+    profile = _build_account_profile(account_id, account_context)
+    with _ACCOUNT_PROFILES_LOCK:
+        _ACCOUNT_PROFILES[account_id] = (account_context, profile)
+        _ACCOUNT_PROFILES.move_to_end(account_id)
+        while len(_ACCOUNT_PROFILES) > _ACCOUNT_PROFILE_CACHE_SIZE:
+            _ACCOUNT_PROFILES.popitem(last=False)
+    return profile
+
+
 def _resolve_project_id() -> Optional[str]:
     for env_name in _PROJECT_ID_ENV_CANDIDATES:
         value = os.getenv(env_name)
@@ -294,6 +403,139 @@ def _resolve_project_id() -> Optional[str]:
     return default_project_id or None
 
 
+@dataclass(frozen=True)
+class CloudTasksSettings:
+    """Cloud Tasks dispatch configuration resolved from the environment."""
+
+    project_id: Optional[str]
+    queue: str
+    location: str
+    handler_url: str
+    queue_path: Optional[str] = None
+
+
+def _resolve_cloud_tasks_settings() -> CloudTasksSettings:
+    return CloudTasksSettings(
+        project_id=_resolve_project_id(),
+        queue=_get_cloud_tasks_queue().strip(),
+        location=_get_cloud_tasks_location().strip(),
+        handler_url=_get_task_handler_url().strip(),
+    )
+
+
+def _resolve_dispatch_workers() -> int:
+    raw_value = os.getenv(CLOUD_TASKS_DISPATCH_WORKERS_ENV)
+    workers = _coerce_int(raw_value) if raw_value else None
+    if workers is None or workers < 1:
+        return _DEFAULT_CLOUD_TASKS_DISPATCH_WORKERS
+    return workers
+
+
+_CLOUD_TASKS_SETTINGS: Optional[CloudTasksSettings] = None
+_CLOUD_TASKS_CLIENT: Optional[Any] = None
+_CLOUD_TASKS_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_CLOUD_TASKS_LOCK = threading.Lock()
+
+
+def configure_cloud_tasks_dispatch(
+    *,
+    client: Optional[Any] = None,
+    max_workers: Optional[int] = None,
+) -> CloudTasksSettings:
+    """Resolve Cloud Tasks settings once and prepare the shared dispatch pool.
+
+    Intended to run at application startup. Subsequent enqueues reuse the
+    cached queue path, handler URL, and project id instead of re-reading the
+    environment, and share a single Cloud Tasks client across requests.
+    """
+
+    global _CLOUD_TASKS_SETTINGS, _CLOUD_TASKS_CLIENT, _CLOUD_TASKS_EXECUTOR
+
+    settings = _resolve_cloud_tasks_settings()
+    if settings.project_id and settings.location and settings.queue:
+        settings = CloudTasksSettings(
+            project_id=settings.project_id,
+            queue=settings.queue,
+            location=settings.location,
+            handler_url=settings.handler_url,
+            queue_path=tasks_v2.CloudTasksClient.queue_path(
+                settings.project_id, settings.location, settings.queue
+            ),
+        )
+
+    workers = max_workers or _resolve_dispatch_workers()
+    with _CLOUD_TASKS_LOCK:
+        _CLOUD_TASKS_SETTINGS = settings
+        if client is not None:
+            _CLOUD_TASKS_CLIENT = client
+        if _CLOUD_TASKS_EXECUTOR is None:
+            _CLOUD_TASKS_EXECUTOR = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="cloud-tasks-dispatch"
+            )
+
+    logger.info(
+        "Configured Cloud Tasks dispatch.",
+        extra={
+            "queue": settings.queue,
+            "location": settings.location,
+            "queue_path": settings.queue_path,
+            "dispatch_workers": workers,
+        },
+    )
+    return settings
+
+
+def shutdown_cloud_tasks_dispatch() -> None:
+    """Release the shared Cloud Tasks client, executor, and cached settings."""
+
+    global _CLOUD_TASKS_SETTINGS, _CLOUD_TASKS_CLIENT, _CLOUD_TASKS_EXECUTOR
+
+    with _CLOUD_TASKS_LOCK:
+        executor = _CLOUD_TASKS_EXECUTOR
+        _CLOUD_TASKS_EXECUTOR = None
+        _CLOUD_TASKS_CLIENT = None
+        _CLOUD_TASKS_SETTINGS = None
+
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _get_cloud_tasks_settings() -> CloudTasksSettings:
+    settings = _CLOUD_TASKS_SETTINGS
+    if settings is not None:
+        return settings
+    return _resolve_cloud_tasks_settings()
+
+
+def _get_cloud_tasks_client() -> Any:
+    """Return the process-wide Cloud Tasks client, creating it on first use."""
+
+    global _CLOUD_TASKS_CLIENT
+
+    client = _CLOUD_TASKS_CLIENT
+    if client is not None:
+        return client
+    with _CLOUD_TASKS_LOCK:
+        if _CLOUD_TASKS_CLIENT is None:
+            _CLOUD_TASKS_CLIENT = tasks_v2.CloudTasksClient()
+        return _CLOUD_TASKS_CLIENT
+
+
+def _get_dispatch_executor() -> ThreadPoolExecutor:
+    global _CLOUD_TASKS_EXECUTOR
+
+    executor = _CLOUD_TASKS_EXECUTOR
+    if executor is not None:
+        return executor
+    with _CLOUD_TASKS_LOCK:
+        if _CLOUD_TASKS_EXECUTOR is None:
+            _CLOUD_TASKS_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_resolve_dispatch_workers(),
+                thread_name_prefix="cloud-tasks-dispatch",
+            )
+        return _CLOUD_TASKS_EXECUTOR
+
+
 def _serialize_verified_webhook(verified_webhook: "VerifiedBuildiumWebhook") -> Dict[str, Any]:
     headers: Mapping[str, Any]
     if isinstance(verified_webhook.envelope.headers, Mapping):
@@ -324,6 +566,60 @@ def _serialize_verified_webhook(verified_webhook: "VerifiedBuildiumWebhook") ->
     }
 
 
+def _get_task_payload_format() -> str:
+    raw_value = (os.getenv(TASK_PAYLOAD_FORMAT_ENV) or "").strip().lower()
+    if raw_value == TASK_PAYLOAD_FORMAT_LEGACY:
+        return TASK_PAYLOAD_FORMAT_LEGACY
+    if raw_value and raw_value != TASK_PAYLOAD_FORMAT_COMPACT:
+        logger.warning(
+            "Unknown task payload format; using the compact format.",
+            extra={"env": TASK_PAYLOAD_FORMAT_ENV, "value": raw_value},
+        )
+    return TASK_PAYLOAD_FORMAT_COMPACT
+
+
+def _get_task_payload_compress_min_bytes() -> int:
+    raw_value = os.getenv(TASK_PAYLOAD_COMPRESS_MIN_BYTES_ENV)
+    value = _coerce_int(raw_value) if raw_value else None
+    if value is None or value < 0:
+        return DEFAULT_COMPRESS_MIN_BYTES
+    return value
+
+
+def _serialize_compact_task(verified_webhook: "VerifiedBuildiumWebhook") -> Dict[str, Any]:
+    envelope = verified_webhook.envelope
+    parsed_body = envelope.parsed_body
+    routing: Dict[str, Any] = {}
+    if isinstance(parsed_body, Mapping):
+        routing["event_type"] = _extract_event_type(parsed_body)
+        routing["task_id"] = _extract_task_identifier(parsed_body)
+        for key in ("id", "eventId", "event_id"):
+            if key in parsed_body:
+                routing["event_id"] = _coerce_string(parsed_body[key])
+                break
+
+    headers = envelope.headers if isinstance(envelope.headers, Mapping) else {}
+    content_type = headers.get("content-type") or headers.get("Content-Type")
+
+    return encode_compact_task_payload(
+        account_id=verified_webhook.account_id,
+        body=envelope.body or b"",
+        content_type=_coerce_string(content_type),
+        verification_scheme=verified_webhook.verification_scheme,
+        routing=routing,
+        compress_min_bytes=_get_task_payload_compress_min_bytes(),
+        signing_secret=verified_webhook.account_context.webhook_secret,
+    )
+
+
+def _serialize_task_payload(verified_webhook: "VerifiedBuildiumWebhook") -> Dict[str, Any]:
+    """Serialize the webhook using the format selected by ``BUILDIUM_TASK_PAYLOAD_FORMAT``."""
+
+    if _get_task_payload_format() == TASK_PAYLOAD_FORMAT_LEGACY:
+        return _serialize_verified_webhook(verified_webhook)
+    return _serialize_compact_task(verified_webhook)
+
+
 class AutomationHandler(Protocol):
     def __call__(
         self,
@@ -336,15 +632,50 @@ class AutomationHandler(Protocol):
         """Handle a routed automation task."""
 
 
+class AsyncAutomationHandler(Protocol):
+    async def __call__(
+        self,
+        *,
+        account_id: str,
+        api_headers: Mapping[str, str],
+        gl_mapping: Mapping[str, Any],
+        webhook: Mapping[str, Any],
+    ) -> None:
+        """Handle a routed automation task on the event loop."""
+
+
+AnyAutomationHandler = Union[AutomationHandler, AsyncAutomationHandler]
+
+
 _AUTOMATED_TASKS_KEY = "automatedtasks"
 _INITIATION_AUTOMATION_KEY = ("taskcreated", "ontarioautomationsinitiation")
-_AUTOMATION_ROUTING_TABLE: Dict[Tuple[str, str], AutomationHandler] = {
-    _INITIATION_AUTOMATION_KEY: handle_initiation_automation,
-    ("taskcreated", "n1increase"): handle_n1_increase_automation,
-    ("taskstatuschanged", "n1increase"): handle_n1_increase_automation,
+
+
+@dataclass(frozen=True)
+class _AutomationEntry:
+    """A routed handler and the executor class it runs on when it is not a coroutine."""
+
+    handler: AnyAutomationHandler
+    workload: str = WORKLOAD_BUILDIUM_IO
+
+
+# Entries may also be a bare handler, which runs on the Buildium I/O pool.
+_AUTOMATION_ROUTING_TABLE: Dict[Tuple[str, str], Union[_AutomationEntry, AnyAutomationHandler]] = {
+    _INITIATION_AUTOMATION_KEY: _AutomationEntry(handle_initiation_automation, WORKLOAD_BUILDIUM_IO),
+    ("taskcreated", "n1increase"): _AutomationEntry(
+        handle_n1_increase_automation, WORKLOAD_BUILDIUM_IO
+    ),
+    ("taskstatuschanged", "n1increase"): _AutomationEntry(
+        handle_n1_increase_automation, WORKLOAD_BUILDIUM_IO
+    ),
+}
+# Coroutine variants the async pipeline awaits in place of a routed sync handler.
+_ASYNC_HANDLER_VARIANTS: Dict[Any, AsyncAutomationHandler] = {
+    handle_n1_increase_automation: handle_n1_increase_automation_async,
 }
 
 _TASK_DATA_SOURCE_API = "api"
+_TASK_DATA_SOURCE_CACHE = "cache"
 _TASK_DATA_SOURCE_WEBHOOK = "webhook"
 
 _AUTOMATED_CATEGORY_METADATA_KEY = "automated_tasks_category_id"
@@ -525,59 +856,329 @@ def _build_tasks_api(api_headers: Mapping[str, Any]):
         if coerced_name and coerced_value:
             api_client.set_default_header(coerced_name, coerced_value)
 
-    return TasksApi(api_client=api_client)
+    return TasksApi(api_client=rate_limit_api_client(api_client))
 
 
-def _fetch_task_data(
+_CHANGE_TIMESTAMP_KEYS = (
+    "EventDateTime",
+    "eventDateTime",
+    "event_date_time",
+    "EventTimestamp",
+    "eventTimestamp",
+    "Timestamp",
+    "timestamp",
+    "LastUpdatedDateTime",
+    "lastUpdatedDateTime",
+)
+_EXCESS_FRACTION_PATTERN = re.compile(r"(\.\d{6})\d+")
+
+
+def _parse_change_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if value > 1e12 else value
+        try:
+            return datetime.fromtimestamp(seconds, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    text = _coerce_string(value)
+    if not text:
+        return None
+    # Buildium sends up to seven fractional digits; fromisoformat accepts six.
+    text = _EXCESS_FRACTION_PATTERN.sub(r"\1", text.strip().replace("Z", "+00:00"))
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _extract_change_timestamp(webhook: Mapping[str, Any]) -> Optional[datetime]:
+    """Return when the change a webhook reports happened, if the delivery says."""
+
+    candidates: List[Mapping[str, Any]] = [webhook]
+    for key in ("event", "Event", "task", "Task"):
+        value = webhook.get(key)
+        if isinstance(value, Mapping):
+            candidates.append(value)
+    for candidate in candidates:
+        for key in _CHANGE_TIMESTAMP_KEYS:
+            if key in candidate:
+                parsed = _parse_change_timestamp(candidate[key])
+                if parsed is not None:
+                    return parsed
+    return None
+
+
+class TaskDetailCache:
+    """Recently fetched Buildium task details keyed by account and task id.
+
+    Each entry remembers the change timestamp of the webhook that caused the
+    fetch. A later webhook reporting a newer change misses, so routing never
+    sees task details older than the event being processed. Webhooks without
+    a change timestamp may only use an entry when ``allow_unversioned`` is set.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = _DEFAULT_TASK_DETAIL_CACHE_TTL_SECONDS,
+        max_entries: int = _TASK_DETAIL_CACHE_SIZE,
+        clock: Any = time.monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        # (account id, task id) -> (stored at, change timestamp, task data)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Optional[datetime], Mapping[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(
+        self,
+        account_id: str,
+        task_id: int,
+        *,
+        changed_at: Optional[datetime],
+        allow_unversioned: bool = True,
+    ) -> Optional[Mapping[str, Any]]:
+        if self._ttl_seconds <= 0:
+            return None
+        key = (account_id, task_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, cached_changed_at, task_data = entry
+            if self._clock() - stored_at >= self._ttl_seconds:
+                del self._entries[key]
+                return None
+            if changed_at is None:
+                if not allow_unversioned:
+                    return None
+            elif cached_changed_at is None or changed_at > cached_changed_at:
+                return None
+            self._entries.move_to_end(key)
+            return task_data
+
+    def put(
+        self,
+        account_id: str,
+        task_id: int,
+        task_data: Mapping[str, Any],
+        *,
+        changed_at: Optional[datetime],
+    ) -> None:
+        if self._ttl_seconds <= 0:
+            return
+        key = (account_id, task_id)
+        with self._lock:
+            self._entries[key] = (self._clock(), changed_at, dict(task_data))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_TASK_DETAIL_CACHE: Optional[TaskDetailCache] = None
+
+
+def _get_task_detail_cache() -> TaskDetailCache:
+    global _TASK_DETAIL_CACHE
+    if _TASK_DETAIL_CACHE is None:
+        raw_value = os.getenv(TASK_DETAIL_CACHE_TTL_ENV)
+        try:
+            ttl_seconds = float(raw_value) if raw_value else _DEFAULT_TASK_DETAIL_CACHE_TTL_SECONDS
+        except ValueError:
+            ttl_seconds = _DEFAULT_TASK_DETAIL_CACHE_TTL_SECONDS
+        _TASK_DETAIL_CACHE = TaskDetailCache(ttl_seconds=ttl_seconds)
+    return _TASK_DETAIL_CACHE
+
+
+def reset_task_detail_cache() -> None:
+    """Drop cached task details and re-read the TTL from the environment on next use."""
+
+    global _TASK_DETAIL_CACHE
+    _TASK_DETAIL_CACHE = None
+
+
+def _webhook_task_data_is_sufficient(
+    webhook: Mapping[str, Any], task_data: Mapping[str, Any]
+) -> bool:
+    """Whether the delivery carries every task field routing and the handlers read."""
+
+    if not (
+        _extract_task_name(task_data)
+        and _extract_task_category_name(task_data)
+        and _extract_task_category_identifier(task_data)
+    ):
+        return False
+    if _normalize_identifier(_extract_event_type(webhook)) == "taskstatuschanged":
+        return _extract_task_status(task_data, webhook) is not None
+    return True
+
+
+@dataclass
+class _TaskLookup:
+    """A task lookup that may be answered without calling Buildium."""
+
+    account_id: str
+    metadata: Mapping[str, Any]
+    task_identifier: Optional[int]
+    fallback_data: Optional[Mapping[str, Any]]
+    changed_at: Optional[datetime] = None
+    result: Optional[Tuple[Optional[Mapping[str, Any]], str]] = None
+
+    def fallback(self) -> Tuple[Optional[Mapping[str, Any]], str]:
+        return self.fallback_data, _TASK_DATA_SOURCE_WEBHOOK
+
+
+def _plan_task_lookup(
     *,
-    api_headers: Mapping[str, Any],
+    account_id: str,
     metadata: Mapping[str, Any],
     task_identifier: Optional[int],
     webhook_payload: Mapping[str, Any],
-) -> Tuple[Optional[Mapping[str, Any]], str]:
-    fallback_data = _extract_task_data(webhook_payload)
-    fallback_source = _TASK_DATA_SOURCE_WEBHOOK
+) -> _TaskLookup:
+    lookup = _TaskLookup(
+        account_id=account_id,
+        metadata=metadata,
+        task_identifier=task_identifier,
+        fallback_data=_extract_task_data(webhook_payload),
+    )
 
     if task_identifier is None:
-        if fallback_data is None:
+        if lookup.fallback_data is None:
             logger.debug(
                 "No task identifier found in Buildium webhook payload.",
                 extra={**metadata, "has_task_identifier": False},
             )
-        return fallback_data, fallback_source
+        lookup.result = lookup.fallback()
+        return lookup
 
+    if lookup.fallback_data is not None and _webhook_task_data_is_sufficient(
+        webhook_payload, lookup.fallback_data
+    ):
+        metrics.increment(TASK_DETAIL_LOOKUPS_METRIC, result="skipped")
+        lookup.result = lookup.fallback()
+        return lookup
+
+    lookup.changed_at = _extract_change_timestamp(webhook_payload)
+    # A status change without a timestamp must not be answered with an older status.
+    allow_unversioned = _normalize_identifier(_extract_event_type(webhook_payload)) != "taskstatuschanged"
+    cached = _get_task_detail_cache().get(
+        account_id, task_identifier, changed_at=lookup.changed_at, allow_unversioned=allow_unversioned
+    )
+    if cached is not None:
+        metrics.increment(TASK_DETAIL_LOOKUPS_METRIC, result="hit")
+        lookup.result = (cached, _TASK_DATA_SOURCE_CACHE)
+        return lookup
+    metrics.increment(TASK_DETAIL_LOOKUPS_METRIC, result="miss")
+    return lookup
+
+
+def _finish_task_lookup(lookup: _TaskLookup, task: Any) -> Tuple[Optional[Mapping[str, Any]], str]:
+    task_data = _coerce_task_mapping(task)
+    if not task_data:
+        logger.warning(
+            "Received empty Buildium task data from API; using webhook payload data.",
+            extra={**lookup.metadata, "task_id": lookup.task_identifier},
+        )
+        return lookup.fallback()
+
+    _get_task_detail_cache().put(
+        lookup.account_id, lookup.task_identifier, task_data, changed_at=lookup.changed_at
+    )
+    return task_data, _TASK_DATA_SOURCE_API
+
+
+def _warn_task_fetch_failed(lookup: _TaskLookup) -> None:
+    logger.warning(
+        "Failed to retrieve Buildium task details from API; using webhook payload data.",
+        exc_info=True,
+        extra={**lookup.metadata, "task_id": lookup.task_identifier},
+    )
+
+
+def _get_task_with_sdk(
+    lookup: _TaskLookup, api_headers: Mapping[str, Any]
+) -> Tuple[Optional[Mapping[str, Any]], str]:
     tasks_api = _build_tasks_api(api_headers)
     if tasks_api is None:
         logger.warning(
             "Unable to initialize Buildium Tasks API client; using webhook payload data.",
-            extra={**metadata, "task_id": task_identifier},
+            extra={**lookup.metadata, "task_id": lookup.task_identifier},
         )
-        return fallback_data, fallback_source
+        return lookup.fallback()
 
     try:
-        task = tasks_api.get_task_by_id(task_id=task_identifier)
+        task = tasks_api.get_task_by_id(task_id=lookup.task_identifier)
     except Exception:
-        logger.warning(
-            "Failed to retrieve Buildium task details from API; using webhook payload data.",
-            exc_info=True,
-            extra={**metadata, "task_id": task_identifier},
-        )
-        return fallback_data, fallback_source
+        _warn_task_fetch_failed(lookup)
+        return lookup.fallback()
+    return _finish_task_lookup(lookup, task)
 
-    task_data = _coerce_task_mapping(task)
-    if not task_data:
-        logger.warning(
-            "Received empty Buildium task data from API; using webhook payload data.",
-            extra={**metadata, "task_id": task_identifier},
-        )
-        return fallback_data, fallback_source
 
-    return task_data, _TASK_DATA_SOURCE_API
+def _fetch_task_data(
+    *,
+    account_id: str,
+    api_headers: Mapping[str, Any],
+    metadata: Mapping[str, Any],
+    task_identifier: Optional[int],
+    webhook_payload: Mapping[str, Any],
+) -> Tuple[Optional[Mapping[str, Any]], str]:
+    lookup = _plan_task_lookup(
+        account_id=account_id,
+        metadata=metadata,
+        task_identifier=task_identifier,
+        webhook_payload=webhook_payload,
+    )
+    if lookup.result is not None:
+        return lookup.result
+    return _get_task_with_sdk(lookup, api_headers)
+
+
+async def _fetch_task_data_async(
+    *,
+    account_id: str,
+    api_headers: Mapping[str, Any],
+    metadata: Mapping[str, Any],
+    task_identifier: Optional[int],
+    webhook_payload: Mapping[str, Any],
+) -> Tuple[Optional[Mapping[str, Any]], str]:
+    lookup = _plan_task_lookup(
+        account_id=account_id,
+        metadata=metadata,
+        task_identifier=task_identifier,
+        webhook_payload=webhook_payload,
+    )
+    if lookup.result is not None:
+        return lookup.result
+
+    transport = get_async_buildium_transport()
+    if transport is None:
+        return await run_in_workload(WORKLOAD_BUILDIUM_IO, _get_task_with_sdk, lookup, api_headers)
+
+    try:
+        task = await transport.get_json(f"tasks/{task_identifier}", headers=api_headers)
+    except Exception:
+        _warn_task_fetch_failed(lookup)
+        return lookup.fallback()
+    return _finish_task_lookup(lookup, task)
 
 
 def _select_automation_handler(
     *, event_type: Optional[str], task_name: Optional[str]
-) -> Optional[AutomationHandler]:
+) -> Optional[AnyAutomationHandler]:
     """Select the automation handler for a Buildium event/task pair.
 
     Normalizes identifiers to smooth out whitespace and punctuation
@@ -587,7 +1188,22 @@ def _select_automation_handler(
     task_key = _normalize_identifier(task_name)
     if not event_key or not task_key:
         return None
-    return _AUTOMATION_ROUTING_TABLE.get((event_key, task_key))
+    entry = _lookup_automation_entry(event_key, task_key)
+    return entry.handler if entry is not None else None
+
+
+def _lookup_automation_entry(
+    event_key: Optional[str], task_key: Optional[str]
+) -> Optional[_AutomationEntry]:
+    entry = _AUTOMATION_ROUTING_TABLE.get((event_key or "", task_key or ""))
+    if entry is None or isinstance(entry, _AutomationEntry):
+        return entry
+    return _AutomationEntry(entry)
+
+
+def _select_automation_workload(*, event_key: Optional[str], task_key: Optional[str]) -> str:
+    entry = _lookup_automation_entry(event_key, task_key)
+    return entry.workload if entry is not None else WORKLOAD_BUILDIUM_IO
 
 
 def _requires_automated_category(
@@ -600,12 +1216,29 @@ def _requires_automated_category(
     return True
 
 
+def _initiation_completed_from_snapshot(snapshot: Any, *, account_id: str) -> bool:
+    if not getattr(snapshot, "exists", False):
+        return False
+
+    try:
+        payload = snapshot.to_dict() or {}
+    except Exception:
+        logger.warning(
+            "Unable to decode Buildium initiation Firestore document; assuming not completed.",
+            extra={"account_id": account_id},
+        )
+        return False
+
+    status = payload.get(INITIATION_COMPLETED_FIELD)
+    return bool(status)
+
+
 def _has_completed_initiation(*, account_id: str) -> bool:
     """Check Firestore for a flag that the initiation automation has executed."""
 
     try:
-        from google.cloud import firestore  # type: ignore
-    except Exception:  # pragma: no cover - optional dependency safeguard
+        client = get_client_registry().firestore()
+    except ImportError:  # pragma: no cover - optional dependency safeguard
         logger.debug(
             "Firestore client not available when checking initiation status.",
             extra={"account_id": account_id},
@@ -613,7 +1246,6 @@ def _has_completed_initiation(*, account_id: str) -> bool:
         return False
 
     try:
-        client = firestore.Client(database=BUILDUM_FIRESTORE_DATABASE)
         collection = client.collection(INITIATION_COLLECTION_PATH)
         document = collection.document(account_id)
         snapshot = document.get()
@@ -624,20 +1256,127 @@ def _has_completed_initiation(*, account_id: str) -> bool:
         )
         return False
 
-    if not getattr(snapshot, "exists", False):
-        return False
+    return _initiation_completed_from_snapshot(snapshot, account_id=account_id)
+
+
+async def _has_completed_initiation_async(*, account_id: str) -> bool:
+    """Async initiation check; uses the async Firestore client when it is enabled."""
+
+    registry = get_client_registry()
+    if not registry.async_enabled:
+        return await run_in_workload(
+            WORKLOAD_GOOGLE_IO, _has_completed_initiation, account_id=account_id
+        )
 
     try:
-        payload = snapshot.to_dict() or {}
+        client = registry.async_firestore()
+        snapshot = await client.collection(INITIATION_COLLECTION_PATH).document(account_id).get()
     except Exception:
         logger.warning(
-            "Unable to decode Buildium initiation Firestore document; assuming not completed.",
+            "Unable to determine Buildium initiation status from Firestore.",
             extra={"account_id": account_id},
         )
         return False
 
-    status = payload.get(INITIATION_COMPLETED_FIELD)
-    return bool(status)
+    return _initiation_completed_from_snapshot(snapshot, account_id=account_id)
+
+
+def _is_async_handler(handler: Any) -> bool:
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+        getattr(handler, "__call__", None)
+    )
+
+
+async def _call_automation_handler(
+    handler: AnyAutomationHandler,
+    arguments: Mapping[str, Any],
+    *,
+    workload: str = WORKLOAD_BUILDIUM_IO,
+) -> None:
+    """Await coroutine handlers; run sync handlers on their workload pool."""
+
+    if _is_async_handler(handler):
+        await handler(**arguments)
+        return
+    await run_in_workload(workload, handler, **arguments)
+
+
+def processor_async_enabled() -> bool:
+    return os.getenv(PROCESSOR_ASYNC_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+ROUTE_FILTER_EVENT_NOT_ROUTED = "event_not_routed"
+ROUTE_FILTER_TASK_NOT_ROUTED = "task_not_routed"
+ROUTE_FILTER_CATEGORY_NOT_AUTOMATED = "category_not_automated"
+
+
+def route_filter_enabled() -> bool:
+    raw_value = os.getenv(WEBHOOK_ROUTE_FILTER_ENV)
+    if raw_value is None or not raw_value.strip():
+        return True
+    return raw_value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def find_unroutable_reason(webhook: Any) -> Optional[str]:
+    """Return why ``webhook`` can never reach an automation handler, or ``None``.
+
+    Mirrors the checks in :meth:`BuildiumWebhookProcessor._perform_work` using
+    only what the delivery itself carries, so the listener can acknowledge
+    task and lease chatter without enqueueing it or fetching the task from
+    Buildium. Identifiers that are absent from the body never rule a route
+    out; the processor still makes the final decision for what passes.
+
+    Only static routing facts are used. The account's configured category id
+    is left to the processor: a drop here is final, and the cached account
+    profile can predate the id being written during onboarding.
+    """
+
+    if not isinstance(webhook, Mapping):
+        return None
+    event_key = _normalize_identifier(_extract_event_type(webhook))
+    if not event_key:
+        return None
+
+    candidates = [key for key in _AUTOMATION_ROUTING_TABLE if key[0] == event_key]
+    if not candidates:
+        return ROUTE_FILTER_EVENT_NOT_ROUTED
+
+    task_data = _extract_task_data(webhook) or {}
+    task_key = _normalize_identifier(_extract_task_name(task_data))
+    if task_key:
+        candidates = [key for key in candidates if key[1] == task_key]
+        if not candidates:
+            return ROUTE_FILTER_TASK_NOT_ROUTED
+
+    category_key = _normalize_identifier(_extract_task_category_name(task_data))
+    if not category_key or category_key == _AUTOMATED_TASKS_KEY:
+        return None
+    for candidate_event, candidate_task in candidates:
+        if not _requires_automated_category(event_key=candidate_event, task_key=candidate_task):
+            return None
+    return ROUTE_FILTER_CATEGORY_NOT_AUTOMATED
+
+
+def prefilter_verified_webhook(verified_webhook: "VerifiedBuildiumWebhook") -> Optional[str]:
+    """Return the reason to drop ``verified_webhook`` at ingress, counting it, or ``None``."""
+
+    if not route_filter_enabled():
+        return None
+    parsed_body = verified_webhook.envelope.parsed_body
+    if not isinstance(parsed_body, Mapping):
+        return None
+    try:
+        reason = find_unroutable_reason(parsed_body)
+    except Exception:
+        logger.warning(
+            "Unable to pre-filter Buildium webhook; enqueueing it.",
+            extra={"account_id": verified_webhook.account_id},
+            exc_info=True,
+        )
+        return None
+    if reason is not None:
+        metrics.increment(WEBHOOK_PREFILTERED_METRIC, reason=reason)
+    return reason
 
 
 @dataclass
@@ -647,9 +1386,12 @@ class BuildiumWebhookProcessor:
     verified_webhook: "VerifiedBuildiumWebhook"
 
     def __post_init__(self) -> None:
+        self._profile = get_account_profile(
+            self.verified_webhook.account_id, self.verified_webhook.account_context
+        )
         self._processing_context = BuildiumProcessingContext(
-            api_headers=_prepare_buildium_headers(self.verified_webhook),
-            gl_mapping=_extract_gl_mapping(self.verified_webhook.account_context.metadata),
+            api_headers=self._profile.api_headers,
+            gl_mapping=self._profile.gl_mapping,
         )
 
     @property
@@ -687,7 +1429,10 @@ class BuildiumWebhookProcessor:
 
     async def run(self) -> None:
         try:
-            await asyncio.to_thread(self._process)
+            if processor_async_enabled():
+                await self._process_async()
+            else:
+                await run_in_workload(WORKLOAD_BUILDIUM_IO, self._process)
         except asyncio.CancelledError:
             logger.info(
                 "Buildium webhook processor task cancelled.",
@@ -702,6 +1447,12 @@ class BuildiumWebhookProcessor:
             raise
 
     def _process(self) -> None:
+        self._perform_work(self._prepared_payload())
+
+    async def _process_async(self) -> None:
+        await self._perform_work_async(self._prepared_payload())
+
+    def _prepared_payload(self) -> Dict[str, Any]:
         payload = self._build_work_payload()
         logger.debug(
             "Prepared Buildium webhook work payload.",
@@ -710,7 +1461,7 @@ class BuildiumWebhookProcessor:
                 "payload_keys": sorted(payload.keys()),
             },
         )
-        self._perform_work(payload)
+        return payload
 
     def _build_work_payload(self) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
@@ -734,6 +1485,43 @@ class BuildiumWebhookProcessor:
         handler. Passes the prepared account headers and GL mapping to the
         handler.
         """
+        work = self._prepare_work(payload)
+        if work is None:
+            return
+        task_data, task_data_source = _fetch_task_data(**work.lookup_arguments())
+        route = self._route_work(work, task_data, task_data_source)
+        if route is None:
+            return
+        if route.is_initiation and _has_completed_initiation(account_id=work.account_id):
+            self._log_initiation_completed(work)
+            return
+        self._log_dispatch(work, route)
+        call_in_workload(route.workload, route.handler, **work.handler_arguments())
+
+    async def _perform_work_async(self, payload: Mapping[str, Any]) -> None:
+        """Async counterpart of :meth:`_perform_work`.
+
+        Task details come from the shared async Buildium transport, the
+        initiation check uses the async Firestore client when it is enabled,
+        and coroutine handlers are awaited on the event loop. Sync handlers
+        with an entry in ``_ASYNC_HANDLER_VARIANTS`` are swapped for their
+        coroutine variant; the rest run on the executor their route declares.
+        """
+        work = self._prepare_work(payload)
+        if work is None:
+            return
+        task_data, task_data_source = await _fetch_task_data_async(**work.lookup_arguments())
+        route = self._route_work(work, task_data, task_data_source)
+        if route is None:
+            return
+        if route.is_initiation and await _has_completed_initiation_async(account_id=work.account_id):
+            self._log_initiation_completed(work)
+            return
+        self._log_dispatch(work, route)
+        handler = _ASYNC_HANDLER_VARIANTS.get(route.handler, route.handler)
+        await _call_automation_handler(handler, work.handler_arguments(), workload=route.workload)
+
+    def _prepare_work(self, payload: Mapping[str, Any]) -> Optional["_WebhookWork"]:
         metadata = dict(self.metadata)
         logger.info(
             "Dispatched Buildium webhook payload for downstream processing.",
@@ -743,182 +1531,215 @@ class BuildiumWebhookProcessor:
             },
         )
 
+        work = _WebhookWork(
+            metadata=metadata,
+            account_id=_coerce_string(payload.get("account_id")) or self.verified_webhook.account_id,
+            configured_category_id=self._profile.automated_category_id,
+        )
         webhook_payload = payload.get("webhook")
-
-        task_identifier: Optional[int] = None
-        event_type: Optional[str] = None
-        task_category_name: Optional[str] = None
-        task_category_id: Optional[str] = None
-        configured_category_id: Optional[str] = None
-
-        account_metadata = self.verified_webhook.account_context.metadata
-        if isinstance(account_metadata, Mapping):
-            configured_category_id = _coerce_string(
-                account_metadata.get(_AUTOMATED_CATEGORY_METADATA_KEY)
-            )
-            if isinstance(configured_category_id, str):
-                configured_category_id = configured_category_id.strip() or None
-
-        def _log_extra(**kwargs: Any) -> Dict[str, Any]:
-            return {
-                **metadata,
-                "task_identifier": task_identifier,
-                "event_type": event_type,
-                "task_category_name": task_category_name,
-                "configured_category_id": configured_category_id,
-                **kwargs,
-            }
-
         if not isinstance(webhook_payload, Mapping):
             logger.info(
                 "Skipping Buildium webhook without structured task payload.",
-                extra=_log_extra(has_webhook_mapping=False),
+                extra=work.log_extra(has_webhook_mapping=False),
             )
-            return
-
-        webhook_payload = dict(webhook_payload)
+            return None
 
+        work.webhook = dict(webhook_payload)
         raw_api_headers = payload.get("api_headers")
         if isinstance(raw_api_headers, Mapping):
-            api_headers = dict(raw_api_headers)
+            work.api_headers = dict(raw_api_headers)
         else:
-            api_headers = dict(self._processing_context.api_headers)
+            work.api_headers = dict(self._processing_context.api_headers)
+        raw_gl_mapping = payload.get("gl_mapping")
+        work.gl_mapping = dict(raw_gl_mapping) if isinstance(raw_gl_mapping, Mapping) else {}
+        work.task_identifier = _extract_task_identifier(work.webhook)
+        work.event_type = _extract_event_type(work.webhook)
+        return work
+
+    def _route_work(
+        self,
+        work: "_WebhookWork",
+        task_data: Optional[Mapping[str, Any]],
+        task_data_source: str,
+    ) -> Optional["_AutomationRoute"]:
+        """Apply the routing table and category rules to resolved task details."""
 
-        task_identifier = _extract_task_identifier(webhook_payload)
-        event_type = _extract_event_type(webhook_payload)
-        task_data, task_data_source = _fetch_task_data(
-            api_headers=api_headers,
-            metadata=metadata,
-            task_identifier=task_identifier,
-            webhook_payload=webhook_payload,
-        )
         if task_data is None:
             logger.info(
                 "No task details available in Buildium webhook payload.",
-                extra=_log_extra(has_task_data=False),
+                extra=work.log_extra(has_task_data=False),
             )
-            return
+            return None
 
-        webhook_payload["task"] = dict(task_data)
+        work.webhook["task"] = dict(task_data)
 
         task_name = _extract_task_name(task_data)
-        task_category_name = _extract_task_category_name(task_data)
+        work.task_category_name = _extract_task_category_name(task_data)
         task_category_id = _extract_task_category_identifier(task_data)
+        configured_category_id = work.configured_category_id
 
         logger.info(
             "Resolved Buildium task details for automation processing.",
-            extra=_log_extra(
+            extra=work.log_extra(
                 task_data_source=task_data_source,
                 task_name=task_name,
                 task_category_id=task_category_id,
             ),
         )
 
-        event_key = _normalize_identifier(event_type)
+        event_key = _normalize_identifier(work.event_type)
         task_key = _normalize_identifier(task_name)
-        handler = _select_automation_handler(event_type=event_type, task_name=task_name)
+        handler = _select_automation_handler(event_type=work.event_type, task_name=task_name)
         if handler is None:
             logger.info(
                 "No automation handler registered for Buildium task payload.",
                 extra={
-                    **metadata,
-                    "event_type": event_type,
+                    **work.metadata,
+                    "event_type": work.event_type,
                     "task_name": task_name,
                 },
             )
-            return
+            return None
 
         requires_automated_category = _requires_automated_category(
             event_key=event_key, task_key=task_key
         )
-        category_key = _normalize_identifier(task_category_name)
+        category_key = _normalize_identifier(work.task_category_name)
         if requires_automated_category and (category_key != _AUTOMATED_TASKS_KEY):
             logger.info(
                 "Ignoring non-automated Buildium task payload.",
-                extra=_log_extra(
+                extra=work.log_extra(
                     requires_automated_category=requires_automated_category,
                     task_category_key=category_key,
                 ),
             )
-            return
-
-        account_id = _coerce_string(payload.get("account_id")) or self.verified_webhook.account_id
-
-        raw_gl_mapping = payload.get("gl_mapping")
-        gl_mapping: Mapping[str, Any] = dict(raw_gl_mapping) if isinstance(raw_gl_mapping, Mapping) else {}
+            return None
 
         if requires_automated_category:
             if not configured_category_id:
                 logger.warning(
                     "Skipping Buildium automation without configured task category identifier.",
-                    extra=_log_extra(
+                    extra=work.log_extra(
                         task_category_id=task_category_id,
                         configured_task_category_id=configured_category_id,
                     ),
                 )
-                return
+                return None
             if not task_category_id:
                 logger.info(
                     "Skipping Buildium automation without task category identifier.",
-                    extra=_log_extra(
+                    extra=work.log_extra(
                         configured_task_category_id=configured_category_id,
                     ),
                 )
-                return
+                return None
             if task_category_id != configured_category_id:
                 logger.warning(
                     "Ignoring Buildium task with mismatched automation category identifier.",
-                    extra=_log_extra(
+                    extra=work.log_extra(
                         task_category_id=task_category_id,
                         configured_task_category_id=configured_category_id,
                     ),
                 )
-                return
+                return None
 
-        if (event_key, task_key) == _INITIATION_AUTOMATION_KEY and _has_completed_initiation(
-            account_id=account_id
-        ):
-            logger.info(
-                "Skipping Buildium initiation automation; workflow already completed.",
-                extra={**metadata, "account_id": account_id},
-            )
-            return
+        return _AutomationRoute(
+            handler=handler,
+            task_name=task_name,
+            is_initiation=(event_key, task_key) == _INITIATION_AUTOMATION_KEY,
+            workload=_select_automation_workload(event_key=event_key, task_key=task_key),
+        )
 
+    def _log_initiation_completed(self, work: "_WebhookWork") -> None:
+        logger.info(
+            "Skipping Buildium initiation automation; workflow already completed.",
+            extra={**work.metadata, "account_id": work.account_id},
+        )
+
+    def _log_dispatch(self, work: "_WebhookWork", route: "_AutomationRoute") -> None:
         logger.info(
             "Dispatching Buildium automation task to handler.",
             extra={
-                **metadata,
-                "event_type": event_type,
-                "task_name": task_name,
-                "task_category_name": task_category_name,
-                "handler_name": getattr(handler, "__name__", str(handler)),
+                **work.metadata,
+                "event_type": work.event_type,
+                "task_name": route.task_name,
+                "task_category_name": work.task_category_name,
+                "handler_name": getattr(route.handler, "__name__", str(route.handler)),
             },
         )
 
-        handler(
-            account_id=account_id,
-            api_headers=api_headers,
-            gl_mapping=gl_mapping,
-            webhook=webhook_payload,
-        )
+
+@dataclass
+class _WebhookWork:
+    """State gathered while one webhook moves through the processor."""
+
+    metadata: Dict[str, Any]
+    account_id: str
+    configured_category_id: Optional[str]
+    webhook: Dict[str, Any] = field(default_factory=dict)
+    api_headers: Dict[str, Any] = field(default_factory=dict)
+    gl_mapping: Mapping[str, Any] = field(default_factory=dict)
+    task_identifier: Optional[int] = None
+    event_type: Optional[str] = None
+    task_category_name: Optional[str] = None
+
+    def log_extra(self, **kwargs: Any) -> Dict[str, Any]:
+        return {
+            **self.metadata,
+            "task_identifier": self.task_identifier,
+            "event_type": self.event_type,
+            "task_category_name": self.task_category_name,
+            "configured_category_id": self.configured_category_id,
+            **kwargs,
+        }
+
+    def lookup_arguments(self) -> Dict[str, Any]:
+        return {
+            "account_id": self.account_id,
+            "api_headers": self.api_headers,
+            "metadata": self.metadata,
+            "task_identifier": self.task_identifier,
+            "webhook_payload": self.webhook,
+        }
+
+    def handler_arguments(self) -> Dict[str, Any]:
+        return {
+            "account_id": self.account_id,
+            "api_headers": self.api_headers,
+            "gl_mapping": self.gl_mapping,
+            "webhook": self.webhook,
+        }
+
+
+@dataclass(frozen=True)
+class _AutomationRoute:
+    handler: "AnyAutomationHandler"
+    task_name: Optional[str]
+    is_initiation: bool
+    workload: str = WORKLOAD_BUILDIUM_IO
 
 
 def enqueue_buildium_webhook(
     verified_webhook: "VerifiedBuildiumWebhook",
     *,
     client: Optional[tasks_v2.CloudTasksClient] = None,
+    task_id: Optional[str] = None,
 ) -> Any:
     """Enqueue the verified webhook for processing via Cloud Tasks.
 
-    Reads the environment-driven queue, location, and handler URL before posting
-    the serialized webhook to Cloud Tasks. Raises a ``BuildiumProcessorError``
-    when required settings are missing.
+    Uses the settings cached by :func:`configure_cloud_tasks_dispatch` (or reads
+    the environment-driven queue, location, and handler URL when dispatch has
+    not been configured) before posting the serialized webhook to Cloud Tasks.
+    When ``task_id`` is given the task is named so Cloud Tasks rejects a second
+    task with the same id; such duplicates are logged and ``None`` is returned.
+    Raises a ``BuildiumProcessorError`` when required settings are missing.
     """
 
-    queue_name = _get_cloud_tasks_queue().strip()
-    location = _get_cloud_tasks_location().strip()
-    handler_url = _get_task_handler_url().strip()
-    project_id = _resolve_project_id()
+    settings = _get_cloud_tasks_settings()
+    queue_name = settings.queue
+    location = settings.location
+    handler_url = settings.handler_url
+    project_id = settings.project_id
 
     metadata: Dict[str, Any] = {
         "account_id": verified_webhook.account_id,
@@ -947,17 +1768,20 @@ def enqueue_buildium_webhook(
         raise BuildiumProcessorError(message)
 
     if client is None:
-        client = tasks_v2.CloudTasksClient()
+        client = _get_cloud_tasks_client()
 
-    try:
-        parent = client.queue_path(project_id, location, queue_name)
-    except Exception as exc:
-        message = "Unable to resolve Cloud Tasks queue path."
-        logger.exception(message, extra=metadata)
-        raise BuildiumProcessorError(message) from exc
-
-    serialized = _serialize_verified_webhook(verified_webhook)
-    body = json.dumps(serialized, default=str).encode("utf-8")
+    if settings.queue_path:
+        parent = settings.queue_path
+    else:
+        try:
+            parent = client.queue_path(project_id, location, queue_name)
+        except Exception as exc:
+            message = "Unable to resolve Cloud Tasks queue path."
+            logger.exception(message, extra=metadata)
+            raise BuildiumProcessorError(message) from exc
+
+    serialized = _serialize_task_payload(verified_webhook)
+    body = json.dumps(serialized, default=str, separators=(",", ":")).encode("utf-8")
     task: Dict[str, Any] = {
         "http_request": {
             "http_method": tasks_v2.HttpMethod.POST,
@@ -967,10 +1791,23 @@ def enqueue_buildium_webhook(
         }
     }
 
+    if task_id:
+        task["name"] = f"{parent}/tasks/{task_id}"
+
     request = {"parent": parent, "task": task}
 
     try:
         response = client.create_task(request=request)
+    except google_exceptions.AlreadyExists:
+        # Imported lazily: the webhooks package imports this module at startup.
+        from ..webhooks.idempotency import DEDUP_DUPLICATES_METRIC
+
+        metrics.increment(DEDUP_DUPLICATES_METRIC, tier="cloud_tasks")
+        logger.info(
+            "Skipped duplicate Buildium webhook task already present in Cloud Tasks.",
+            extra={**metadata, "queue_path": parent, "task_name": task["name"]},
+        )
+        return None
     except google_exceptions.NotFound as exc:
         message = (
             "Cloud Tasks queue does not exist. Create the queue or configure "
@@ -990,18 +1827,65 @@ def enqueue_buildium_webhook(
     task_name = getattr(response, "name", None)
     logger.info(
         "Enqueued Buildium webhook task in Cloud Tasks.",
-        extra={**metadata, "task_name": task_name, "queue_path": parent},
+        extra={
+            **metadata,
+            "task_name": task_name,
+            "queue_path": parent,
+            "payload_bytes": len(body),
+        },
     )
 
     return response
 
 
+async def enqueue_buildium_webhook_async(
+    verified_webhook: "VerifiedBuildiumWebhook",
+    *,
+    client: Optional[tasks_v2.CloudTasksClient] = None,
+    task_id: Optional[str] = None,
+) -> Any:
+    """Enqueue the verified webhook without blocking the event loop.
+
+    The blocking ``create_task`` call runs on the bounded dispatch executor so
+    a slow Cloud Tasks round trip only occupies one dispatch thread instead of
+    stalling every request served by the worker's event loop.
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_dispatch_executor(),
+        functools.partial(
+            enqueue_buildium_webhook, verified_webhook, client=client, task_id=task_id
+        ),
+    )
+
+
 __all__ = [
+    "BuildiumAccountProfile",
     "BuildiumProcessorError",
     "BuildiumProcessingContext",
     "BuildiumWebhookProcessor",
+    "AsyncAutomationHandler",
+    "AutomationHandler",
+    "CloudTasksSettings",
+    "TaskDetailCache",
+    "configure_cloud_tasks_dispatch",
     "enqueue_buildium_webhook",
+    "enqueue_buildium_webhook_async",
+    "find_unroutable_reason",
+    "get_account_profile",
+    "prefilter_verified_webhook",
+    "processor_async_enabled",
+    "reset_task_detail_cache",
+    "route_filter_enabled",
+    "shutdown_cloud_tasks_dispatch",
     "CLOUD_TASKS_QUEUE_ENV",
     "CLOUD_TASKS_LOCATION_ENV",
     "TASK_HANDLER_URL_ENV",
+    "CLOUD_TASKS_DISPATCH_WORKERS_ENV",
+    "PROCESSOR_ASYNC_ENV",
+    "TASK_DETAIL_CACHE_TTL_ENV",
+    "TASK_DETAIL_LOOKUPS_METRIC",
+    "WEBHOOK_PREFILTERED_METRIC",
+    "WEBHOOK_ROUTE_FILTER_ENV",
 ]
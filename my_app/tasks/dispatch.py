@@ -0,0 +1,573 @@
+"""Pluggable dispatch backends for verified Buildium webhooks.
+
+The webhook listener hands verified webhooks to a :class:`TaskDispatcher`.
+Three backends are available and selected with ``BUILDIUM_TASK_DISPATCHER``:
+
+* ``cloud_tasks`` (default) – enqueue an HTTP task that Cloud Tasks posts back
+  to ``/tasks/buildium-webhook``.
+* ``in_process`` – run :class:`BuildiumWebhookProcessor` on an asyncio worker
+  pool inside the listener process, skipping the HTTP hop entirely.
+* ``sqlite`` – persist tasks to a local SQLite queue and work them with retry
+  and visibility timeouts so in-flight work survives a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Protocol, Tuple
+
+from .buildium_processor import (
+    BuildiumProcessorError,
+    BuildiumWebhookProcessor,
+    _coerce_int,
+    _serialize_task_payload,
+    configure_cloud_tasks_dispatch,
+    enqueue_buildium_webhook_async,
+    shutdown_cloud_tasks_dispatch,
+)
+
+if TYPE_CHECKING:
+    from ..webhooks.verification import VerifiedBuildiumWebhook
+
+logger = logging.getLogger(__name__)
+
+TASK_DISPATCHER_ENV = "BUILDIUM_TASK_DISPATCHER"
+TASK_DISPATCHER_WORKERS_ENV = "BUILDIUM_TASK_DISPATCHER_WORKERS"
+TASK_DISPATCHER_QUEUE_SIZE_ENV = "BUILDIUM_TASK_DISPATCHER_QUEUE_SIZE"
+TASK_DISPATCHER_DRAIN_TIMEOUT_ENV = "BUILDIUM_TASK_DISPATCHER_DRAIN_TIMEOUT"
+SQLITE_QUEUE_PATH_ENV = "BUILDIUM_SQLITE_QUEUE_PATH"
+SQLITE_QUEUE_VISIBILITY_TIMEOUT_ENV = "BUILDIUM_SQLITE_QUEUE_VISIBILITY_TIMEOUT"
+SQLITE_QUEUE_MAX_ATTEMPTS_ENV = "BUILDIUM_SQLITE_QUEUE_MAX_ATTEMPTS"
+CLOUD_TASKS_NAMED_DEDUP_ENV = "BUILDIUM_WEBHOOK_DEDUP_CLOUD_TASKS"
+
+DISPATCHER_CLOUD_TASKS = "cloud_tasks"
+DISPATCHER_IN_PROCESS = "in_process"
+DISPATCHER_SQLITE = "sqlite"
+
+_DEFAULT_DISPATCHER_WORKERS = 4
+_DEFAULT_DISPATCHER_QUEUE_SIZE = 1000
+_DEFAULT_DISPATCHER_DRAIN_TIMEOUT = 30.0
+_DEFAULT_SQLITE_QUEUE_PATH = "buildium_tasks.sqlite3"
+_DEFAULT_SQLITE_VISIBILITY_TIMEOUT = 300.0
+_DEFAULT_SQLITE_MAX_ATTEMPTS = 5
+_DEFAULT_SQLITE_POLL_INTERVAL = 0.5
+_MAX_SQLITE_ERROR_BACKOFF = 30.0
+_SQLITE_RETRY_BACKOFF_BASE = 2.0
+_SQLITE_RETRY_BACKOFF_MAX = 300.0
+
+
+class TaskDispatcher(Protocol):
+    """Interface implemented by every webhook dispatch backend."""
+
+    name: str
+
+    async def start(self) -> None:
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+    async def dispatch(
+        self,
+        verified_webhook: "VerifiedBuildiumWebhook",
+        *,
+        dedup_key: Optional[str] = None,
+    ) -> Any:
+        ...
+
+
+def _get_positive_int_env(env_name: str, default: int) -> int:
+    raw_value = os.getenv(env_name)
+    value = _coerce_int(raw_value) if raw_value else None
+    if value is None or value < 1:
+        return default
+    return value
+
+
+def _get_positive_float_env(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
+    try:
+        value = float(raw_value)
+    except ValueError:
+        logger.warning(
+            "Ignoring invalid numeric dispatcher setting.",
+            extra={"env": env_name, "value": raw_value},
+        )
+        return default
+    return value if value > 0 else default
+
+
+async def _run_processor(verified_webhook: "VerifiedBuildiumWebhook") -> None:
+    processor = BuildiumWebhookProcessor(verified_webhook)
+    logger.info("Processing Buildium webhook in-process.", extra=processor.metadata)
+    await processor.run()
+    logger.info("Completed Buildium webhook in-process.", extra=processor.metadata)
+
+
+class CloudTasksDispatcher:
+    """Dispatch verified webhooks through Cloud Tasks.
+
+    With ``named_tasks`` enabled (``BUILDIUM_WEBHOOK_DEDUP_CLOUD_TASKS``) the
+    idempotency key becomes the task id, so Cloud Tasks itself rejects
+    duplicate deliveries that slipped past the listener's idempotency index.
+    """
+
+    name = DISPATCHER_CLOUD_TASKS
+
+    def __init__(self, *, client: Optional[Any] = None, named_tasks: Optional[bool] = None) -> None:
+        self._client = client
+        if named_tasks is None:
+            raw_value = (os.getenv(CLOUD_TASKS_NAMED_DEDUP_ENV) or "").strip().lower()
+            named_tasks = raw_value in {"1", "true", "yes", "on"}
+        self._named_tasks = named_tasks
+
+    async def start(self) -> None:
+        configure_cloud_tasks_dispatch(client=self._client)
+
+    async def stop(self) -> None:
+        shutdown_cloud_tasks_dispatch()
+
+    async def dispatch(
+        self,
+        verified_webhook: "VerifiedBuildiumWebhook",
+        *,
+        dedup_key: Optional[str] = None,
+    ) -> Any:
+        task_id = dedup_key if self._named_tasks else None
+        return await enqueue_buildium_webhook_async(verified_webhook, task_id=task_id)
+
+
+class InProcessDispatcher:
+    """Run webhook processing on an asyncio worker pool in this process.
+
+    Dispatch only places the webhook on a bounded in-memory queue, so the
+    webhook response is not held up by processing. Work still queued when the
+    process exits is lost; use :class:`SQLiteQueueDispatcher` when delivery
+    must survive restarts.
+    """
+
+    name = DISPATCHER_IN_PROCESS
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        drain_timeout: Optional[float] = None,
+    ) -> None:
+        self._worker_count = workers or _get_positive_int_env(
+            TASK_DISPATCHER_WORKERS_ENV, _DEFAULT_DISPATCHER_WORKERS
+        )
+        self._max_queue_size = max_queue_size or _get_positive_int_env(
+            TASK_DISPATCHER_QUEUE_SIZE_ENV, _DEFAULT_DISPATCHER_QUEUE_SIZE
+        )
+        self._drain_timeout = drain_timeout or _get_positive_float_env(
+            TASK_DISPATCHER_DRAIN_TIMEOUT_ENV, _DEFAULT_DISPATCHER_DRAIN_TIMEOUT
+        )
+        self._queue: Optional["asyncio.Queue[VerifiedBuildiumWebhook]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"buildium-dispatch-{index}")
+            for index in range(self._worker_count)
+        ]
+        logger.info(
+            "Started in-process Buildium webhook dispatcher.",
+            extra={"workers": self._worker_count, "max_queue_size": self._max_queue_size},
+        )
+
+    async def stop(self) -> None:
+        queue = self._queue
+        if queue is None:
+            return
+        try:
+            await asyncio.wait_for(queue.join(), timeout=self._drain_timeout)
+        except asyncio.TimeoutError:
+            # A stuck or crashed worker never calls ``task_done``; give up on
+            # the remaining work rather than hanging shutdown.
+            logger.warning(
+                "In-process dispatch queue did not drain before shutdown.",
+                extra={"pending": queue.qsize(), "drain_timeout": self._drain_timeout},
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def dispatch(
+        self,
+        verified_webhook: "VerifiedBuildiumWebhook",
+        *,
+        dedup_key: Optional[str] = None,
+    ) -> None:
+        if self._queue is None:
+            raise BuildiumProcessorError("In-process dispatcher has not been started.")
+        try:
+            self._queue.put_nowait(verified_webhook)
+        except asyncio.QueueFull as exc:
+            logger.error(
+                "In-process dispatch queue is full.",
+                extra={
+                    "account_id": verified_webhook.account_id,
+                    "max_queue_size": self._max_queue_size,
+                },
+            )
+            raise BuildiumProcessorError("In-process dispatch queue is full.") from exc
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            verified_webhook = await queue.get()
+            try:
+                await _run_processor(verified_webhook)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    "In-process Buildium webhook processing failed.",
+                    extra={"account_id": verified_webhook.account_id, "worker": index},
+                )
+            finally:
+                queue.task_done()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buildium_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    leased_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buildium_tasks_ready
+    ON buildium_tasks (status, available_at);
+"""
+
+SQLITE_STATUS_PENDING = "pending"
+SQLITE_STATUS_DEAD = "dead"
+
+
+class SQLiteTaskQueue:
+    """Durable task queue stored in a local SQLite database.
+
+    A claimed task is leased for ``visibility_timeout`` seconds. If the worker
+    does not acknowledge it before the lease expires (for example because the
+    process crashed) the task becomes visible to other workers again. Failed
+    tasks are retried with exponential backoff until ``max_attempts`` is
+    reached, after which they are kept with ``status = 'dead'`` for inspection.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        visibility_timeout: float = _DEFAULT_SQLITE_VISIBILITY_TIMEOUT,
+        max_attempts: int = _DEFAULT_SQLITE_MAX_ATTEMPTS,
+    ) -> None:
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SQLITE_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def put(self, account_id: str, payload: Mapping[str, Any]) -> int:
+        now = time.time()
+        serialized = json.dumps(payload, default=str)
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO buildium_tasks (account_id, payload, available_at, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (account_id, serialized, now, now),
+            )
+        return int(cursor.lastrowid)
+
+    def claim(self) -> Optional[Tuple[int, int, Dict[str, Any]]]:
+        """Lease the next visible task, returning ``(id, attempt, payload)``."""
+
+        now = time.time()
+        # SELECT then UPDATE in one write transaction rather than
+        # ``UPDATE ... RETURNING``, which needs SQLite 3.35+. ``BEGIN IMMEDIATE``
+        # takes the write lock up front, so other processes sharing the file
+        # cannot claim the same row in between.
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT id, attempts, payload FROM buildium_tasks "
+                    "WHERE status = ? AND available_at <= ? "
+                    "AND (leased_until IS NULL OR leased_until <= ?) "
+                    "ORDER BY available_at, id LIMIT 1",
+                    (SQLITE_STATUS_PENDING, now, now),
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE buildium_tasks SET attempts = attempts + 1, leased_until = ? "
+                        "WHERE id = ?",
+                        (now + self.visibility_timeout, row[0]),
+                    )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        if row is None:
+            return None
+        task_id, attempts, payload = row
+        return int(task_id), int(attempts) + 1, json.loads(payload)
+
+    def ack(self, task_id: int) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM buildium_tasks WHERE id = ?", (task_id,))
+
+    def fail(self, task_id: int, attempt: int, error: str) -> bool:
+        """Record a failed attempt. Returns ``True`` when the task will be retried."""
+
+        if attempt >= self.max_attempts:
+            with self._lock:
+                self._connection.execute(
+                    "UPDATE buildium_tasks SET status = ?, leased_until = NULL, last_error = ? "
+                    "WHERE id = ?",
+                    (SQLITE_STATUS_DEAD, error, task_id),
+                )
+            return False
+
+        delay = min(_SQLITE_RETRY_BACKOFF_BASE ** attempt, _SQLITE_RETRY_BACKOFF_MAX)
+        with self._lock:
+            self._connection.execute(
+                "UPDATE buildium_tasks "
+                "SET available_at = ?, leased_until = NULL, last_error = ? WHERE id = ?",
+                (time.time() + delay, error, task_id),
+            )
+        return True
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM buildium_tasks GROUP BY status"
+            ).fetchall()
+        return {str(status): int(count) for status, count in rows}
+
+
+class SQLiteQueueDispatcher:
+    """Persist webhooks to :class:`SQLiteTaskQueue` and process them locally.
+
+    Tasks are stored in the same serialized form Cloud Tasks receives, so the
+    worker replays exactly what ``/tasks/buildium-webhook`` would have handled
+    and, with the compact format, no secrets are written to disk.
+    """
+
+    name = DISPATCHER_SQLITE
+
+    def __init__(
+        self,
+        *,
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: float = _DEFAULT_SQLITE_POLL_INTERVAL,
+    ) -> None:
+        self._path = path or os.getenv(SQLITE_QUEUE_PATH_ENV) or _DEFAULT_SQLITE_QUEUE_PATH
+        self._worker_count = workers or _get_positive_int_env(
+            TASK_DISPATCHER_WORKERS_ENV, _DEFAULT_DISPATCHER_WORKERS
+        )
+        self._visibility_timeout = visibility_timeout or _get_positive_float_env(
+            SQLITE_QUEUE_VISIBILITY_TIMEOUT_ENV, _DEFAULT_SQLITE_VISIBILITY_TIMEOUT
+        )
+        self._max_attempts = max_attempts or _get_positive_int_env(
+            SQLITE_QUEUE_MAX_ATTEMPTS_ENV, _DEFAULT_SQLITE_MAX_ATTEMPTS
+        )
+        self._poll_interval = poll_interval
+        self._queue: Optional[SQLiteTaskQueue] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def queue(self) -> Optional[SQLiteTaskQueue]:
+        return self._queue
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = await asyncio.to_thread(
+            SQLiteTaskQueue,
+            self._path,
+            visibility_timeout=self._visibility_timeout,
+            max_attempts=self._max_attempts,
+        )
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"buildium-sqlite-dispatch-{index}")
+            for index in range(self._worker_count)
+        ]
+        logger.info(
+            "Started SQLite Buildium webhook dispatcher.",
+            extra={
+                "path": self._path,
+                "workers": self._worker_count,
+                "visibility_timeout": self._visibility_timeout,
+                "max_attempts": self._max_attempts,
+            },
+        )
+
+    async def stop(self) -> None:
+        queue = self._queue
+        if queue is None:
+            return
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._wakeup = None
+        await asyncio.to_thread(queue.close)
+
+    async def dispatch(
+        self,
+        verified_webhook: "VerifiedBuildiumWebhook",
+        *,
+        dedup_key: Optional[str] = None,
+    ) -> int:
+        if self._queue is None:
+            raise BuildiumProcessorError("SQLite dispatcher has not been started.")
+        payload = _serialize_task_payload(verified_webhook)
+        try:
+            task_id = await asyncio.to_thread(
+                self._queue.put, verified_webhook.account_id, payload
+            )
+        except sqlite3.Error as exc:
+            logger.exception(
+                "Failed to persist Buildium webhook to the SQLite queue.",
+                extra={"account_id": verified_webhook.account_id, "path": self._path},
+            )
+            raise BuildiumProcessorError("Unable to persist Buildium webhook task.") from exc
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return task_id
+
+    async def _wait_for_work(self) -> None:
+        assert self._wakeup is not None
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _back_off(self, consecutive_errors: int) -> None:
+        delay = min(_MAX_SQLITE_ERROR_BACKOFF, self._poll_interval * 2 ** consecutive_errors)
+        await asyncio.sleep(delay)
+
+    async def _worker(self, index: int) -> None:
+        # Imported lazily: the listener module imports this one at startup.
+        from ..webhooks.buildium_listener import _load_verified_webhook_task
+
+        assert self._queue is not None
+        queue = self._queue
+        consecutive_errors = 0
+        while True:
+            # A queue error (typically "database is locked") must not end the
+            # worker; an unacknowledged task is reclaimed once its lease expires.
+            try:
+                claimed = await asyncio.to_thread(queue.claim)
+            except sqlite3.Error:
+                logger.exception(
+                    "Failed to claim a task from the SQLite queue.",
+                    extra={"worker": index, "path": self._path},
+                )
+                consecutive_errors += 1
+                await self._back_off(consecutive_errors)
+                continue
+            consecutive_errors = 0
+            if claimed is None:
+                await self._wait_for_work()
+                continue
+
+            task_id, attempt, payload = claimed
+            metadata = {"task_id": task_id, "attempt": attempt, "worker": index}
+            try:
+                verified_webhook = await _load_verified_webhook_task(payload)
+                await _run_processor(verified_webhook)
+            except asyncio.CancelledError:
+                # Leave the lease to expire so another worker picks the task up.
+                raise
+            except Exception as exc:
+                retrying: Optional[bool] = None
+                try:
+                    retrying = await asyncio.to_thread(queue.fail, task_id, attempt, repr(exc))
+                except sqlite3.Error:
+                    logger.exception(
+                        "Failed to record a failed task in the SQLite queue.", extra=metadata
+                    )
+                logger.exception(
+                    "SQLite-queued Buildium webhook processing failed.",
+                    extra={**metadata, "retrying": retrying},
+                )
+                if retrying is None:
+                    await self._back_off(1)
+                continue
+
+            try:
+                await asyncio.to_thread(queue.ack, task_id)
+            except sqlite3.Error:
+                logger.exception(
+                    "Failed to acknowledge a task in the SQLite queue.", extra=metadata
+                )
+                await self._back_off(1)
+
+
+def create_task_dispatcher(backend: Optional[str] = None) -> TaskDispatcher:
+    """Build the dispatcher named by ``backend`` or ``BUILDIUM_TASK_DISPATCHER``."""
+
+    name = (backend or os.getenv(TASK_DISPATCHER_ENV) or DISPATCHER_CLOUD_TASKS).strip().lower()
+    name = name.replace("-", "_")
+    if name == DISPATCHER_CLOUD_TASKS:
+        return CloudTasksDispatcher()
+    if name == DISPATCHER_IN_PROCESS:
+        return InProcessDispatcher()
+    if name == DISPATCHER_SQLITE:
+        return SQLiteQueueDispatcher()
+    raise BuildiumProcessorError(f"Unknown Buildium task dispatcher backend: {name!r}.")
+
+
+__all__ = [
+    "CloudTasksDispatcher",
+    "InProcessDispatcher",
+    "SQLiteQueueDispatcher",
+    "SQLiteTaskQueue",
+    "TaskDispatcher",
+    "create_task_dispatcher",
+    "DISPATCHER_CLOUD_TASKS",
+    "DISPATCHER_IN_PROCESS",
+    "DISPATCHER_SQLITE",
+    "TASK_DISPATCHER_ENV",
+]
@@ -6,10 +6,22 @@ import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Mapping, MutableMapping, Optional, Protocol, Sequence
-from urllib import request as urllib_request
-
-from ..services.account_context import BUILDUM_FIRESTORE_DATABASE
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Protocol,
+    Sequence,
+)
+
+from ..services.account_cache import get_account_context_cache
+from ..services.buildium_http import send_buildium_request
+from ..services.buildium_pagination import iter_buildium_collection
+from ..services.clients import get_client_registry
 
 logger = logging.getLogger(__name__)
 
@@ -55,13 +67,9 @@ class RequestsBuildiumAPI:
         self._headers = dict(self.api_headers)
 
     def _get(self, path: str) -> Any:
-        request = urllib_request.Request(
-            f"{self._base_url}/{path.lstrip('/')}",
-            method="GET",
-            headers=self._headers,
+        payload = send_buildium_request(
+            "GET", f"{self._base_url}/{path.lstrip('/')}", headers=self._headers
         )
-        with urllib_request.urlopen(request) as response:  # pragma: no cover - network
-            payload = response.read()
         if not payload:
             return {}
         payload = json.loads(payload.decode("utf-8"))
@@ -71,39 +79,32 @@ class RequestsBuildiumAPI:
                 return list(items)
         return payload
 
+    def _iter(self, path: str) -> Iterator[Any]:
+        return iter_buildium_collection(
+            f"{self._base_url}/{path.lstrip('/')}", headers=self._headers, keyed_records=True
+        )
+
     def _post(self, path: str, payload: Mapping[str, Any]) -> Mapping[str, Any]:
-        request = urllib_request.Request(
+        raw = send_buildium_request(
+            "POST",
             f"{self._base_url}/{path.lstrip('/')}",
-            data=json.dumps(payload).encode("utf-8"),
+            body=json.dumps(payload).encode("utf-8"),
             headers={
                 **self._headers,
                 "Content-Type": "application/json",
                 "Accept": "application/json",
             },
-            method="POST",
         )
-        with urllib_request.urlopen(request) as response:  # pragma: no cover - network
-            raw = response.read()
         if not raw:
             return {}
         data = json.loads(raw.decode("utf-8"))
         return data if isinstance(data, Mapping) else {"response": data}
 
     def list_gl_accounts(self) -> Sequence[Mapping[str, Any]]:
-        data = self._get("accounting/glaccounts")
-        if isinstance(data, Sequence):
-            return list(data)
-        if isinstance(data, Mapping):
-            return list(data.values())
-        return []
+        return list(self._iter("accounting/glaccounts"))
 
     def list_task_categories(self) -> Sequence[Mapping[str, Any]]:
-        data = self._get("tasks/categories")
-        if isinstance(data, Sequence):
-            return list(data)
-        if isinstance(data, Mapping):
-            return list(data.values())
-        return []
+        return list(self._iter("tasks/categories"))
 
     def get_company_profile(self) -> Mapping[str, Any]:
         profile = self._get("company")
@@ -281,9 +282,7 @@ def handle_initiation_automation(
         buildium_api = RequestsBuildiumAPI(api_headers=api_headers)
 
     if firestore_client is None:
-        from google.cloud import firestore  # type: ignore
-
-        firestore_client = firestore.Client(database=BUILDUM_FIRESTORE_DATABASE)
+        firestore_client = get_client_registry().firestore()
 
     gl_accounts = list(buildium_api.list_gl_accounts())
     normalized_gl_accounts = list(_normalize_gl_accounts(gl_accounts))
@@ -339,6 +338,9 @@ def handle_initiation_automation(
     _merge_dict(merged, updates)
 
     document.set(dict(merged), merge=True)
+    # The processor routes on the cached account context (category id,
+    # initiation flag); drop it so the next webhook sees this write.
+    get_account_context_cache().invalidate(account_id, reason="initiation_completed")
 
     logger.info(
         "Persisted Buildium initiation metadata to Firestore.",
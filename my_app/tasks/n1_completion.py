@@ -20,6 +20,8 @@ from typing import (
     Tuple,
 )
 
+from ..services.account_cache import get_account_context_cache
+from ..services.executors import WORKLOAD_CPU, call_in_workload, map_in_workload
 from . import n1_data
 
 logger = logging.getLogger(__name__)
@@ -80,6 +82,23 @@ def load_document(document: Any) -> Mapping[str, Any]:
         return {}
 
 
+async def load_document_async(document: Any) -> Mapping[str, Any]:
+    """Async counterpart of :func:`load_document` for async Firestore documents."""
+
+    try:
+        snapshot = await document.get()
+    except Exception:
+        logger.exception("Failed to load N1 Firestore document snapshot.")
+        return {}
+    if not getattr(snapshot, "exists", False):
+        return {}
+    try:
+        return snapshot.to_dict() or {}
+    except Exception:
+        logger.exception("Unable to deserialize N1 Firestore document snapshot.")
+        return {}
+
+
 def decode_payload_entries(
     chunks: Sequence[Mapping[str, Any]],
     *,
@@ -137,17 +156,46 @@ def map_entries_by_lease(
     return mapping
 
 
-def render_notice(
-    schedule: Mapping[str, Any], payload_entry: Optional[Mapping[str, Any]] = None
-) -> bytes:
-    from . import n1_notice_pdf
-
+def _notice_arguments(
+    schedule: Mapping[str, Any], payload_entry: Optional[Mapping[str, Any]]
+) -> Dict[str, Any]:
     lease_info: Optional[Mapping[str, Any]] = None
     if isinstance(payload_entry, Mapping):
         lease_candidate = payload_entry.get("lease")
         if isinstance(lease_candidate, Mapping):
             lease_info = lease_candidate
-    return n1_notice_pdf.create_n1_notice_pdf(schedule=schedule, lease=lease_info)
+    return {
+        "schedule": dict(schedule),
+        "lease": dict(lease_info) if lease_info is not None else None,
+    }
+
+
+def render_notice(
+    schedule: Mapping[str, Any], payload_entry: Optional[Mapping[str, Any]] = None
+) -> bytes:
+    from . import n1_notice_pdf
+
+    # Rendering runs on the CPU pool so large completions do not starve the
+    # I/O workers (or the event loop's GIL) while notices are drawn.
+    return call_in_workload(
+        WORKLOAD_CPU,
+        n1_notice_pdf.create_n1_notice_pdf,
+        **_notice_arguments(schedule, payload_entry),
+    )
+
+
+def render_notices(
+    notices: Sequence[Tuple[Mapping[str, Any], Optional[Mapping[str, Any]]]],
+) -> List[bytes]:
+    """Render ``(schedule, payload_entry)`` pairs side by side on the CPU pool."""
+
+    from . import n1_notice_pdf
+
+    return map_in_workload(
+        WORKLOAD_CPU,
+        n1_notice_pdf.create_n1_notice_pdf,
+        [_notice_arguments(schedule, entry) for schedule, entry in notices],
+    )
 
 
 def build_serving_description(
@@ -211,6 +259,7 @@ def fulfill_n1_completion(
 
     property_groups: Dict[str, List[Tuple[Mapping[str, Any], Optional[Mapping[str, Any]]]]] = defaultdict(list)
     processed_leases: List[str] = []
+    eligible: List[Tuple[str, str, Mapping[str, Any], Optional[Mapping[str, Any]]]] = []
 
     for schedule in schedules:
         lease_id = _coerce_string(schedule.get("lease_id") or schedule.get("leaseId"))
@@ -225,9 +274,13 @@ def fulfill_n1_completion(
                 extra={"account_id": account_id, "lease_id": lease_id},
             )
             continue
+        eligible.append((lease_id, property_id, schedule, entry_map.get(lease_id)))
 
-        entry = entry_map.get(lease_id)
+    # Every notice is rendered before the first lease is touched, so a
+    # rendering failure leaves Buildium unchanged.
+    notices = render_notices([(schedule, entry) for _, _, schedule, entry in eligible])
 
+    for (lease_id, property_id, schedule, entry), notice_bytes in zip(eligible, notices):
         _apply_lease_update(api, lease_id, schedule)
         if _should_extend(schedule):
             _extend_lease(api, lease_id, schedule)
@@ -236,7 +289,6 @@ def fulfill_n1_completion(
         if renewal_payload:
             _trigger_lease_renewal(api, lease_id, renewal_payload, schedule, entry)
 
-        notice_bytes = render_notice(schedule, entry)
         api.upload_document(
             lease_id=lease_id,
             property_id=property_id,
@@ -249,7 +301,7 @@ def fulfill_n1_completion(
 
     summary_uploads = _upload_summary_files(api, n1_block.get("summary_files"))
 
-    category_id = _resolve_task_category(api, data, n1_block, document)
+    category_id = _resolve_task_category(api, data, n1_block, document, account_id=account_id)
     task_updates = _create_or_update_tasks(
         api,
         property_groups,
@@ -471,6 +523,8 @@ def _resolve_task_category(
     account_data: Mapping[str, Any],
     n1_block: Mapping[str, Any],
     document: Any,
+    *,
+    account_id: str,
 ) -> Optional[str]:
     for source in (n1_block, account_data):
         candidate = source.get("automated_tasks_category_id")
@@ -497,7 +551,7 @@ def _resolve_task_category(
             or category.get("task_category_id")
         )
         if name and identifier and name.lower() == category_name.lower():
-            document.set({"automated_tasks_category_id": identifier}, merge=True)
+            _store_task_category(document, account_id, identifier)
             return identifier
 
     created = api.create_task_category(name=category_name)
@@ -508,10 +562,17 @@ def _resolve_task_category(
         or created.get("category_id")
     )
     if identifier:
-        document.set({"automated_tasks_category_id": identifier}, merge=True)
+        _store_task_category(document, account_id, identifier)
     return identifier
 
 
+def _store_task_category(document: Any, account_id: str, identifier: str) -> None:
+    document.set({"automated_tasks_category_id": identifier}, merge=True)
+    # Webhook routing reads the category id from the cached account context;
+    # drop it so the next task for this account is checked against the new id.
+    get_account_context_cache().invalidate(account_id, reason="task_category_configured")
+
+
 def _create_or_update_tasks(
     api: "BuildiumN1API",
     property_groups: Mapping[str, Sequence[Tuple[Mapping[str, Any], Optional[Mapping[str, Any]]]]],
@@ -596,10 +657,12 @@ def _record_completion(
 __all__ = [
     "ensure_firestore_document",
     "load_document",
+    "load_document_async",
     "decode_payload_entries",
     "combine_payload_entries",
     "map_entries_by_lease",
     "render_notice",
+    "render_notices",
     "build_serving_description",
     "fulfill_n1_completion",
 ]
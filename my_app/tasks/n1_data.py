@@ -3,17 +3,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import importlib
 import json
 import logging
+import os
 import sys
 import zlib
 from dataclasses import dataclass
 from decimal import Decimal
 from hashlib import sha256
 from types import ModuleType
-from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence
+
+from ..services.executors import WORKLOAD_CPU, run_in_workload
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,9 @@ ENCRYPTION_ALGORITHM = "xor+zlib"
 ENCRYPTION_KEY_VERSION = "v1"
 ENCRYPTION_SECRET = "buildium-n1"
 
+N1_LEASE_CONCURRENCY_ENV = "BUILDIUM_N1_LEASE_CONCURRENCY"
+_DEFAULT_LEASE_CONCURRENCY = 8
+
 
 @dataclass
 class LeaseIncreaseContext:
@@ -123,6 +130,55 @@ def prepare_n1_data(
     """Collect schedules, metadata, and encrypted payload entries."""
 
     gathered = gather_leases_for_increase(api, gl_mapping=gl_mapping)
+    return _assemble_prepared_data(
+        gathered,
+        api,
+        rates=rates,
+        gl_mapping=gl_mapping,
+        max_payload_bytes=max_payload_bytes,
+        encryption_secret=encryption_secret,
+    )
+
+
+async def prepare_n1_data_async(
+    api: "AsyncBuildiumN1API",
+    *,
+    rates: Mapping[str, Any],
+    gl_mapping: Mapping[str, Any],
+    max_payload_bytes: int,
+    encryption_secret: str = ENCRYPTION_SECRET,
+) -> N1PreparedData:
+    """Async counterpart of :func:`prepare_n1_data`.
+
+    Buildium reads are awaited on the event loop; computing the schedules and
+    encrypting the payload run on the CPU pool.
+    """
+
+    gathered = await gather_leases_for_increase_async(api, gl_mapping=gl_mapping)
+    documents = await _prefetch_agi_documents(api, gathered.eligible)
+    return await run_in_workload(
+        WORKLOAD_CPU,
+        _assemble_prepared_data,
+        gathered,
+        _PrefetchedDocuments(documents),
+        rates=dict(rates),
+        gl_mapping=dict(gl_mapping),
+        max_payload_bytes=max_payload_bytes,
+        encryption_secret=encryption_secret,
+    )
+
+
+def _assemble_prepared_data(
+    gathered: GatheredLeases,
+    api: Any,
+    *,
+    rates: Mapping[str, Any],
+    gl_mapping: Mapping[str, Any],
+    max_payload_bytes: int,
+    encryption_secret: str = ENCRYPTION_SECRET,
+) -> N1PreparedData:
+    """Compute schedules and encrypted payload chunks for gathered leases."""
+
     schedules = generate_increases(gathered.eligible, rates=rates, gl_mapping=gl_mapping)
     entries = [
         _build_payload_entry(context, schedule, api, gl_mapping)
@@ -141,6 +197,51 @@ def prepare_n1_data(
     )
 
 
+@dataclass
+class _LeaseIdentity:
+    lease_id: str
+    property_id: str
+    unit_id: str
+    property_name: str
+    unit_name: str
+
+
+def _lease_identity(lease: Mapping[str, Any]) -> _LeaseIdentity:
+    lease_id = _extract_identifier(lease, "leaseId", "id", "lease") or ""
+    property_block = lease.get("property") if isinstance(lease.get("property"), Mapping) else {}
+    property_id = _extract_identifier(lease, "propertyId") or _extract_identifier(property_block or {}, "id") or ""
+    unit_block = lease.get("unit") if isinstance(lease.get("unit"), Mapping) else {}
+    unit_id = _extract_identifier(lease, "unitId") or _extract_identifier(unit_block or {}, "id") or ""
+
+    property_name = ""
+    if isinstance(property_block, Mapping):
+        property_name = str(property_block.get("name") or property_block.get("displayName") or "")
+    if not property_name:
+        property_name = str(lease.get("propertyName") or "")
+
+    unit_name = ""
+    if isinstance(unit_block, Mapping):
+        unit_name = str(unit_block.get("name") or unit_block.get("number") or "")
+    if not unit_name:
+        unit_name = str(lease.get("unitName") or "")
+
+    return _LeaseIdentity(
+        lease_id=str(lease_id),
+        property_id=str(property_id),
+        unit_id=str(unit_id),
+        property_name=property_name,
+        unit_name=unit_name,
+    )
+
+
+def _market_rent_amount(market_info: Mapping[str, Any]) -> Decimal:
+    return _decimal(
+        market_info.get("marketRent")
+        or market_info.get("amount")
+        or market_info.get("rent")
+    )
+
+
 def gather_leases_for_increase(
     api: "BuildiumN1API",
     *,
@@ -148,7 +249,10 @@ def gather_leases_for_increase(
 ) -> GatheredLeases:
     """Return eligible leases along with any filtered entries."""
 
-    leases = list(api.list_eligible_leases())
+    # Clients that stream leases let the per-lease lookups below start on the
+    # first page while later pages are still being fetched.
+    iter_leases = getattr(api, "iter_eligible_leases", None)
+    leases = iter_leases() if callable(iter_leases) else api.list_eligible_leases()
     eligible: List[LeaseIncreaseContext] = []
     excluded: List[Mapping[str, Any]] = []
 
@@ -156,69 +260,137 @@ def gather_leases_for_increase(
         if not isinstance(lease, Mapping):
             continue
 
-        lease_id = _extract_identifier(lease, "leaseId", "id", "lease") or ""
-        property_block = lease.get("property") if isinstance(lease.get("property"), Mapping) else {}
-        property_id = _extract_identifier(lease, "propertyId") or _extract_identifier(property_block or {}, "id") or ""
-        unit_block = lease.get("unit") if isinstance(lease.get("unit"), Mapping) else {}
-        unit_id = _extract_identifier(lease, "unitId") or _extract_identifier(unit_block or {}, "id") or ""
-
-        property_name = ""
-        if isinstance(property_block, Mapping):
-            property_name = str(property_block.get("name") or property_block.get("displayName") or "")
-        if not property_name:
-            property_name = str(lease.get("propertyName") or "")
-
-        unit_name = ""
-        if isinstance(unit_block, Mapping):
-            unit_name = str(unit_block.get("name") or unit_block.get("number") or "")
-        if not unit_name:
-            unit_name = str(lease.get("unitName") or "")
-
-        lease_notes = _safe_sequence_call(api, "list_lease_notes", lease_id)
-        building_notes = _safe_sequence_call(api, "list_building_notes", property_id)
+        identity = _lease_identity(lease)
+        lease_notes = _safe_sequence_call(api, "list_lease_notes", identity.lease_id)
+        building_notes = _safe_sequence_call(api, "list_building_notes", identity.property_id)
 
         exclusion = _determine_exclusion(lease, lease_notes, building_notes)
         if exclusion:
-            excluded.append({"lease_id": lease_id, "reason": exclusion})
+            excluded.append({"lease_id": identity.lease_id, "reason": exclusion})
             continue
 
-        recurring = _safe_sequence_call(api, "list_recurring_transactions", lease_id)
+        recurring = _safe_sequence_call(api, "list_recurring_transactions", identity.lease_id)
         agi_summary = _safe_mapping_call(
             api,
             "get_above_guideline_increase",
-            lease_id=str(lease_id),
+            lease_id=identity.lease_id,
         )
 
         market_info = _safe_mapping_call(
             api,
             "get_market_rent",
-            property_id=str(property_id),
-            unit_id=str(unit_id),
-        )
-        market_rent = _decimal(
-            market_info.get("marketRent")
-            or market_info.get("amount")
-            or market_info.get("rent")
+            property_id=identity.property_id,
+            unit_id=identity.unit_id,
         )
 
-        context = LeaseIncreaseContext(
-            lease=lease,
-            lease_id=str(lease_id),
-            property_id=str(property_id),
-            unit_id=str(unit_id),
-            property_name=property_name,
-            unit_name=unit_name,
-            lease_notes=lease_notes,
-            building_notes=building_notes,
-            recurring_transactions=recurring,
-            agi_summary=agi_summary,
-            market_rent=market_rent,
+        eligible.append(
+            LeaseIncreaseContext(
+                lease=lease,
+                lease_id=identity.lease_id,
+                property_id=identity.property_id,
+                unit_id=identity.unit_id,
+                property_name=identity.property_name,
+                unit_name=identity.unit_name,
+                lease_notes=lease_notes,
+                building_notes=building_notes,
+                recurring_transactions=recurring,
+                agi_summary=agi_summary,
+                market_rent=_market_rent_amount(market_info),
+            )
         )
-        eligible.append(context)
 
     return GatheredLeases(eligible=eligible, excluded=excluded)
 
 
+async def gather_leases_for_increase_async(
+    api: "AsyncBuildiumN1API",
+    *,
+    gl_mapping: Mapping[str, Any],
+    concurrency: Optional[int] = None,
+) -> GatheredLeases:
+    """Async counterpart of :func:`gather_leases_for_increase`.
+
+    Lookups for up to ``BUILDIUM_N1_LEASE_CONCURRENCY`` leases are in flight at
+    once, starting while later lease pages are still being read. Results keep
+    the order Buildium returned the leases in.
+    """
+
+    limit = _env_lease_concurrency() if concurrency is None else max(1, int(concurrency))
+    semaphore = asyncio.Semaphore(limit)
+    pending: List["asyncio.Future[Any]"] = []
+    try:
+        async for lease in api.iter_eligible_leases():
+            if isinstance(lease, Mapping):
+                pending.append(asyncio.ensure_future(_gather_lease_async(api, lease, semaphore)))
+        results = await asyncio.gather(*pending)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+
+    eligible: List[LeaseIncreaseContext] = []
+    excluded: List[Mapping[str, Any]] = []
+    for result in results:
+        if isinstance(result, LeaseIncreaseContext):
+            eligible.append(result)
+        else:
+            excluded.append(result)
+    return GatheredLeases(eligible=eligible, excluded=excluded)
+
+
+async def _gather_lease_async(
+    api: "AsyncBuildiumN1API",
+    lease: Mapping[str, Any],
+    semaphore: asyncio.Semaphore,
+) -> Any:
+    identity = _lease_identity(lease)
+    async with semaphore:
+        lease_notes, building_notes = await asyncio.gather(
+            _safe_sequence_call_async(api, "list_lease_notes", identity.lease_id),
+            _safe_sequence_call_async(api, "list_building_notes", identity.property_id),
+        )
+        exclusion = _determine_exclusion(lease, lease_notes, building_notes)
+        if exclusion:
+            return {"lease_id": identity.lease_id, "reason": exclusion}
+
+        recurring, agi_summary, market_info = await asyncio.gather(
+            _safe_sequence_call_async(api, "list_recurring_transactions", identity.lease_id),
+            _safe_mapping_call_async(
+                api, "get_above_guideline_increase", lease_id=identity.lease_id
+            ),
+            _safe_mapping_call_async(
+                api,
+                "get_market_rent",
+                property_id=identity.property_id,
+                unit_id=identity.unit_id,
+            ),
+        )
+
+    return LeaseIncreaseContext(
+        lease=lease,
+        lease_id=identity.lease_id,
+        property_id=identity.property_id,
+        unit_id=identity.unit_id,
+        property_name=identity.property_name,
+        unit_name=identity.unit_name,
+        lease_notes=lease_notes,
+        building_notes=building_notes,
+        recurring_transactions=recurring,
+        agi_summary=agi_summary,
+        market_rent=_market_rent_amount(market_info),
+    )
+
+
+def _env_lease_concurrency() -> int:
+    raw_value = os.getenv(N1_LEASE_CONCURRENCY_ENV)
+    if not raw_value:
+        return _DEFAULT_LEASE_CONCURRENCY
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        return _DEFAULT_LEASE_CONCURRENCY
+
+
 def generate_increases(
     contexts: Sequence[LeaseIncreaseContext],
     *,
@@ -475,9 +647,9 @@ def _sanitize_agi(summary: Mapping[str, Any], api: "BuildiumN1API") -> Mapping[s
         "effective_date": _string_value(summary.get("effectiveDate") or summary.get("startDate")),
     }
 
-    document_id = summary.get("documentId") or summary.get("downloadId") or summary.get("attachmentId")
+    document_id = _agi_document_id(summary)
     if document_id:
-        document_content = _resolve_presigned_document(api, str(document_id))
+        document_content = _resolve_presigned_document(api, document_id)
         if document_content:
             data["document"] = {"id": str(document_id), "content": document_content}
 
@@ -494,9 +666,7 @@ def _resolve_presigned_document(api: "BuildiumN1API", download_id: str) -> Optio
     except Exception:  # pragma: no cover - defensive
         logger.exception("Failed to resolve presigned download metadata", extra={"download_id": download_id})
         return None
-    url = ""
-    if isinstance(metadata, Mapping):
-        url = str(metadata.get("url") or metadata.get("downloadUrl") or metadata.get("href") or "")
+    url = _presigned_url(metadata)
     if not url:
         return None
     try:
@@ -509,6 +679,53 @@ def _resolve_presigned_document(api: "BuildiumN1API", download_id: str) -> Optio
     return base64.b64encode(bytes(binary)).decode("ascii")
 
 
+def _agi_document_id(summary: Mapping[str, Any]) -> Optional[str]:
+    if not isinstance(summary, Mapping):
+        return None
+    document_id = summary.get("documentId") or summary.get("downloadId") or summary.get("attachmentId")
+    return str(document_id) if document_id else None
+
+
+def _presigned_url(metadata: Any) -> str:
+    if not isinstance(metadata, Mapping):
+        return ""
+    return str(metadata.get("url") or metadata.get("downloadUrl") or metadata.get("href") or "")
+
+
+async def _prefetch_agi_documents(
+    api: "AsyncBuildiumN1API", contexts: Sequence[LeaseIncreaseContext]
+) -> Dict[str, bytes]:
+    """Download the AGI documents referenced by ``contexts`` ahead of payload assembly."""
+
+    documents: Dict[str, bytes] = {}
+    for context in contexts:
+        download_id = _agi_document_id(context.agi_summary)
+        if not download_id or download_id in documents:
+            continue
+        try:
+            url = _presigned_url(await api.get_presigned_download(download_id))
+            binary = await api.download_presigned_url(url) if url else None
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("Failed to download presigned content", extra={"download_id": download_id})
+            continue
+        if isinstance(binary, (bytes, bytearray)):
+            documents[download_id] = bytes(binary)
+    return documents
+
+
+@dataclass
+class _PrefetchedDocuments:
+    """Serves documents from :func:`_prefetch_agi_documents` to :func:`_sanitize_agi`."""
+
+    documents: Mapping[str, bytes]
+
+    def get_presigned_download(self, download_id: str) -> Mapping[str, Any]:
+        return {"url": download_id} if download_id in self.documents else {}
+
+    def download_presigned_url(self, url: str) -> bytes:
+        return self.documents[url]
+
+
 def _extract_residents(lease: Mapping[str, Any]) -> List[str]:
     residents: List[str] = []
     for key in ("residents", "tenants", "occupants"):
@@ -581,6 +798,36 @@ def _safe_mapping_call(api: Any, method_name: str, *args: Any, **kwargs: Any) ->
     return {}
 
 
+async def _safe_sequence_call_async(
+    api: Any, method_name: str, *args: Any, **kwargs: Any
+) -> List[Mapping[str, Any]]:
+    method = getattr(api, method_name, None)
+    if method is None:
+        return []
+    try:
+        result = await method(*args, **kwargs)
+    except Exception:  # pragma: no cover - defensive
+        logger.exception("Failed to call Buildium API sequence method", extra={"method": method_name})
+        return []
+    return _coerce_sequence(result)
+
+
+async def _safe_mapping_call_async(
+    api: Any, method_name: str, *args: Any, **kwargs: Any
+) -> Mapping[str, Any]:
+    method = getattr(api, method_name, None)
+    if method is None:
+        return {}
+    try:
+        result = await method(*args, **kwargs)
+    except Exception:  # pragma: no cover - defensive
+        logger.exception("Failed to call Buildium API mapping method", extra={"method": method_name})
+        return {}
+    if isinstance(result, Mapping):
+        return dict(result)
+    return {}
+
+
 def _coerce_sequence(value: Any) -> List[Mapping[str, Any]]:
     if isinstance(value, Mapping):
         items = value.get("items")
@@ -646,8 +893,11 @@ __all__ = [
     "LeaseIncreaseContext",
     "GatheredLeases",
     "N1PreparedData",
+    "N1_LEASE_CONCURRENCY_ENV",
     "prepare_n1_data",
+    "prepare_n1_data_async",
     "gather_leases_for_increase",
+    "gather_leases_for_increase_async",
     "generate_increases",
     "build_encrypted_chunks",
     "decode_payload_chunk",
@@ -10,13 +10,41 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from io import BytesIO
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Protocol, Sequence
-from urllib import request as urllib_request
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
 from zipfile import ZIP_DEFLATED, ZipFile
 
-from ..services.account_context import BUILDUM_FIRESTORE_DATABASE
+from ..services.buildium_async import AsyncBuildiumTransport, get_async_buildium_transport
+from ..services.buildium_http import send_buildium_request
+from ..services.buildium_pagination import (
+    iter_buildium_collection,
+    iter_buildium_collection_async,
+)
+from ..services.clients import get_client_registry
+from ..services.executors import (
+    WORKLOAD_BUILDIUM_IO,
+    WORKLOAD_CPU,
+    WORKLOAD_GOOGLE_IO,
+    run_in_workload,
+)
 from . import n1_completion
 
+if TYPE_CHECKING:
+    from .n1_data import N1PreparedData
+
 logger = logging.getLogger(__name__)
 
 FIRESTORE_COLLECTION_PATH = "buildium_accounts"
@@ -136,91 +164,68 @@ class RequestsBuildiumAPI:
         if params:
             query = "&".join(f"{key}={value}" for key, value in params.items())
             url = f"{url}?{query}"
-        request = urllib_request.Request(url, headers=self._headers, method="GET")
-        with urllib_request.urlopen(request) as response:  # pragma: no cover - network
-            raw = response.read()
+        raw = send_buildium_request("GET", url, headers=self._headers)
         if not raw:
             return {}
-        payload = json.loads(raw.decode("utf-8"))
-        if isinstance(payload, Mapping) and "items" in payload:
-            items = payload.get("items")
-            if isinstance(items, Iterable):
-                return list(items)
-        return payload
+        return _unwrap_items(json.loads(raw.decode("utf-8")))
+
+    def _iter(
+        self,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        keyed_records: bool = False,
+    ) -> Iterator[Any]:
+        return iter_buildium_collection(
+            f"{self._base_url}/{path.lstrip('/')}",
+            headers=self._headers,
+            params=params,
+            keyed_records=keyed_records,
+        )
 
     def _post(self, path: str, payload: Mapping[str, Any]) -> Mapping[str, Any]:
-        request = urllib_request.Request(
+        raw = send_buildium_request(
+            "POST",
             f"{self._base_url}/{path.lstrip('/')}",
-            data=json.dumps(payload).encode("utf-8"),
+            body=json.dumps(payload).encode("utf-8"),
             headers={
                 **self._headers,
                 "Content-Type": "application/json",
                 "Accept": "application/json",
             },
-            method="POST",
         )
-        with urllib_request.urlopen(request) as response:  # pragma: no cover - network
-            raw = response.read()
         if not raw:
             return {}
         data = json.loads(raw.decode("utf-8"))
         return data if isinstance(data, Mapping) else {"response": data}
 
+    def iter_eligible_leases(self) -> Iterator[Mapping[str, Any]]:
+        """Yield active leases page by page, following ``offset``/``limit``."""
+
+        return self._iter("leases", params={"status": "Active"}, keyed_records=True)
+
     def list_eligible_leases(self) -> Sequence[Mapping[str, Any]]:
-        leases = self._get("leases", params={"status": "Active"})
-        if isinstance(leases, Sequence):
-            return list(leases)
-        if isinstance(leases, Mapping):
-            return list(leases.values())
-        return []
+        return list(self.iter_eligible_leases())
 
     def get_market_rent(self, *, property_id: str, unit_id: str) -> Optional[Mapping[str, Any]]:
         response = self._get(
             "reports/marketrent",
             params={"propertyId": property_id, "unitId": unit_id},
         )
-        if isinstance(response, Sequence):
-            return dict(response[0]) if response else None
-        if isinstance(response, Mapping):
-            return dict(response)
-        return None
+        return _first_record(response)
 
     def get_ontario_increase_rates(self) -> Mapping[str, Any]:
         response = self._get("rentcontrols/ontario")
         return response if isinstance(response, Mapping) else {}
 
     def list_lease_notes(self, lease_id: str) -> Sequence[Mapping[str, Any]]:
-        notes = self._get(f"leases/{lease_id}/notes")
-        if isinstance(notes, Sequence):
-            return [dict(item) if isinstance(item, Mapping) else item for item in notes]
-        if isinstance(notes, Mapping):
-            items = notes.get("items")
-            if isinstance(items, Iterable):
-                return [dict(item) if isinstance(item, Mapping) else item for item in items]
-            return [dict(notes)]
-        return []
+        return _record_list(self._get(f"leases/{lease_id}/notes"))
 
     def list_building_notes(self, property_id: str) -> Sequence[Mapping[str, Any]]:
-        notes = self._get(f"properties/{property_id}/notes")
-        if isinstance(notes, Sequence):
-            return [dict(item) if isinstance(item, Mapping) else item for item in notes]
-        if isinstance(notes, Mapping):
-            items = notes.get("items")
-            if isinstance(items, Iterable):
-                return [dict(item) if isinstance(item, Mapping) else item for item in items]
-            return [dict(notes)]
-        return []
+        return _record_list(self._get(f"properties/{property_id}/notes"))
 
     def list_recurring_transactions(self, lease_id: str) -> Sequence[Mapping[str, Any]]:
-        transactions = self._get(f"leases/{lease_id}/recurringtransactions")
-        if isinstance(transactions, Sequence):
-            return [dict(item) if isinstance(item, Mapping) else item for item in transactions]
-        if isinstance(transactions, Mapping):
-            items = transactions.get("items")
-            if isinstance(items, Iterable):
-                return [dict(item) if isinstance(item, Mapping) else item for item in items]
-            return [dict(transactions)]
-        return []
+        return _record_list(self._get(f"leases/{lease_id}/recurringtransactions"))
 
     def get_above_guideline_increase(self, *, lease_id: str) -> Mapping[str, Any]:
         response = self._get(f"leases/{lease_id}/abovetheguidelineincrease")
@@ -231,10 +236,8 @@ class RequestsBuildiumAPI:
         return dict(response) if isinstance(response, Mapping) else {}
 
     def download_presigned_url(self, url: str) -> bytes:
-        request = urllib_request.Request(url, headers=self._headers, method="GET")
-        with urllib_request.urlopen(request) as response:  # pragma: no cover - network
-            data = response.read()
-        return data or b""
+        # Presigned URLs point at document storage, not the rate-limited API.
+        return send_buildium_request("GET", url, headers=self._headers, rate_limited=False)
 
     def upload_document(
         self,
@@ -287,15 +290,7 @@ class RequestsBuildiumAPI:
         return self._post(f"tasks/{task_id}/history", payload)
 
     def list_task_categories(self) -> Sequence[Mapping[str, Any]]:
-        response = self._get("tasks/categories")
-        if isinstance(response, Sequence) and not isinstance(response, (str, bytes)):
-            return [dict(item) for item in response if isinstance(item, Mapping)]
-        if isinstance(response, Mapping):
-            items = response.get("items")
-            if isinstance(items, Iterable):
-                return [dict(item) for item in items if isinstance(item, Mapping)]
-            return [dict(response)]
-        return []
+        return [dict(item) for item in self._iter("tasks/categories") if isinstance(item, Mapping)]
 
     def create_task_category(self, *, name: str) -> Mapping[str, Any]:
         return self._post("tasks/categories", {"name": name})
@@ -350,17 +345,117 @@ class RequestsBuildiumAPI:
         buffer.write(b"\r\n")
         buffer.write(f"--{boundary}--\r\n".encode("utf-8"))
 
-        request = urllib_request.Request(
+        send_buildium_request(
+            "POST",
             url,
-            data=buffer.getvalue(),
+            body=buffer.getvalue(),
             headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
-            method="POST",
+            rate_limited=False,
         )
-        with urllib_request.urlopen(request) as response:  # pragma: no cover - network
-            response.read()
         return {"status": "uploaded"}
 
 
+@dataclass
+class AsyncBuildiumN1API:
+    """Async counterpart of the read calls N1 preparation makes.
+
+    Requests go through the shared
+    :class:`~my_app.services.buildium_async.AsyncBuildiumTransport`, so they are
+    pooled and rate limited on the event loop instead of holding a
+    ``buildium_io`` worker for the whole preparation.
+    """
+
+    transport: AsyncBuildiumTransport
+    api_headers: Mapping[str, str]
+
+    def __post_init__(self) -> None:
+        self._headers = dict(self.api_headers)
+
+    async def _get(self, path: str, *, params: Optional[Mapping[str, Any]] = None) -> Any:
+        payload = await self.transport.get_json(path, headers=self._headers, params=params)
+        if payload is None:
+            return {}
+        return _unwrap_items(payload)
+
+    def iter_eligible_leases(self) -> AsyncIterator[Mapping[str, Any]]:
+        """Yield active leases page by page, following ``offset``/``limit``."""
+
+        return iter_buildium_collection_async(
+            self.transport,
+            "leases",
+            headers=self._headers,
+            params={"status": "Active"},
+            keyed_records=True,
+        )
+
+    async def get_market_rent(self, *, property_id: str, unit_id: str) -> Optional[Mapping[str, Any]]:
+        response = await self._get(
+            "reports/marketrent",
+            params={"propertyId": property_id, "unitId": unit_id},
+        )
+        return _first_record(response)
+
+    async def get_ontario_increase_rates(self) -> Mapping[str, Any]:
+        response = await self._get("rentcontrols/ontario")
+        return response if isinstance(response, Mapping) else {}
+
+    async def list_lease_notes(self, lease_id: str) -> Sequence[Mapping[str, Any]]:
+        return _record_list(await self._get(f"leases/{lease_id}/notes"))
+
+    async def list_building_notes(self, property_id: str) -> Sequence[Mapping[str, Any]]:
+        return _record_list(await self._get(f"properties/{property_id}/notes"))
+
+    async def list_recurring_transactions(self, lease_id: str) -> Sequence[Mapping[str, Any]]:
+        return _record_list(await self._get(f"leases/{lease_id}/recurringtransactions"))
+
+    async def get_above_guideline_increase(self, *, lease_id: str) -> Mapping[str, Any]:
+        response = await self._get(f"leases/{lease_id}/abovetheguidelineincrease")
+        return dict(response) if isinstance(response, Mapping) else {}
+
+    async def get_presigned_download(self, download_id: str) -> Mapping[str, Any]:
+        response = await self._get(f"documents/{download_id}/downloadurl")
+        return dict(response) if isinstance(response, Mapping) else {}
+
+    async def download_presigned_url(self, url: str) -> bytes:
+        # The transport only speaks JSON to the API host; the rare AGI document
+        # download goes through the blocking client on the I/O pool instead.
+        return await run_in_workload(
+            WORKLOAD_BUILDIUM_IO,
+            send_buildium_request,
+            "GET",
+            url,
+            headers=self._headers,
+            rate_limited=False,
+        )
+
+
+def _unwrap_items(payload: Any) -> Any:
+    if isinstance(payload, Mapping) and "items" in payload:
+        items = payload.get("items")
+        if isinstance(items, Iterable):
+            return list(items)
+    return payload
+
+
+def _first_record(response: Any) -> Optional[Mapping[str, Any]]:
+    if isinstance(response, Sequence):
+        return dict(response[0]) if response else None
+    if isinstance(response, Mapping):
+        return dict(response)
+    return None
+
+
+def _record_list(response: Any) -> Sequence[Mapping[str, Any]]:
+    if isinstance(response, Sequence):
+        return [dict(item) if isinstance(item, Mapping) else item for item in response]
+    if isinstance(response, Mapping):
+        items = response.get("items")
+        if isinstance(items, Iterable):
+            return [dict(item) if isinstance(item, Mapping) else item for item in items]
+        return [dict(response)]
+    return []
+
+
 def _timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -693,15 +788,14 @@ def _render_pdf_summary(schedules: Sequence[Mapping[str, Any]]) -> bytes:
     return output.getvalue()
 
 
-def _persist_schedules(
+def _merge_schedules(
     *,
-    document: Any,
     existing: Mapping[str, Any],
     schedules: Sequence[Mapping[str, Any]],
     payload_chunks: Sequence[Mapping[str, Any]],
     excel_bytes: bytes,
     pdf_bytes: bytes,
-) -> None:
+) -> Dict[str, Any]:
     merged: MutableMapping[str, Any] = dict(existing)
     n1_block: MutableMapping[str, Any] = dict(merged.get("n1_increase") or {})
     n1_block.update(
@@ -717,34 +811,21 @@ def _persist_schedules(
         }
     )
     merged["n1_increase"] = n1_block
-    document.set(dict(merged), merge=True)
-def _handle_task_created(
-    *,
-    account_id: str,
-    api_headers: Mapping[str, str],
-    gl_mapping: Mapping[str, Any],
-    firestore_client: Any,
-    buildium_api: Optional[BuildiumN1API],
-) -> None:
-    from . import n1_data
+    return dict(merged)
 
-    api = buildium_api or RequestsBuildiumAPI(api_headers=api_headers)
 
-    rates = api.get_ontario_increase_rates() or {}
-    prepared = n1_data.prepare_n1_data(
-        api,
-        rates=rates,
-        gl_mapping=gl_mapping,
-        max_payload_bytes=MAX_PAYLOAD_BYTES,
-    )
+def _render_summary_files(schedules: Sequence[Mapping[str, Any]]) -> Tuple[bytes, bytes]:
+    return _render_excel_summary(schedules), _render_pdf_summary(schedules)
 
-    schedules = list(prepared.schedules)
-    payload_chunks = list(prepared.payload_chunks)
-    excel_bytes = _render_excel_summary(schedules)
-    pdf_bytes = _render_pdf_summary(schedules)
 
-    document = n1_completion.ensure_firestore_document(firestore_client, account_id)
-    existing = n1_completion.load_document(document)
+def _prepared_document(
+    existing: Mapping[str, Any],
+    *,
+    gl_mapping: Mapping[str, Any],
+    prepared: "N1PreparedData",
+    excel_bytes: bytes,
+    pdf_bytes: bytes,
+) -> Dict[str, Any]:
     merged_existing = dict(existing)
     merged_existing.setdefault("gl_mapping", dict(gl_mapping))
     existing_n1_block = dict(merged_existing.get("n1_increase") or {})
@@ -752,15 +833,39 @@ def _handle_task_created(
         existing_n1_block["excluded_leases"] = [dict(item) for item in prepared.excluded]
     merged_existing["n1_increase"] = existing_n1_block
 
-    _persist_schedules(
-        document=document,
+    return _merge_schedules(
         existing=merged_existing,
-        schedules=schedules,
-        payload_chunks=payload_chunks,
+        schedules=list(prepared.schedules),
+        payload_chunks=list(prepared.payload_chunks),
         excel_bytes=excel_bytes,
         pdf_bytes=pdf_bytes,
     )
 
+
+def _store_prepared_data(
+    firestore_client: Any,
+    account_id: str,
+    *,
+    gl_mapping: Mapping[str, Any],
+    prepared: "N1PreparedData",
+    excel_bytes: bytes,
+    pdf_bytes: bytes,
+) -> None:
+    document = n1_completion.ensure_firestore_document(firestore_client, account_id)
+    existing = n1_completion.load_document(document)
+    document.set(
+        _prepared_document(
+            existing,
+            gl_mapping=gl_mapping,
+            prepared=prepared,
+            excel_bytes=excel_bytes,
+            pdf_bytes=pdf_bytes,
+        ),
+        merge=True,
+    )
+
+
+def _log_prepared(account_id: str, prepared: "N1PreparedData") -> None:
     if prepared.excluded:
         logger.info(
             "Excluded ineligible leases from N1 preparation.",
@@ -772,9 +877,88 @@ def _handle_task_created(
 
     logger.info(
         "Prepared N1 rent increase schedules.",
-        extra={"account_id": account_id, "lease_count": len(schedules)},
+        extra={"account_id": account_id, "lease_count": len(prepared.schedules)},
+    )
+
+
+def _handle_task_created(
+    *,
+    account_id: str,
+    api_headers: Mapping[str, str],
+    gl_mapping: Mapping[str, Any],
+    firestore_client: Any,
+    buildium_api: Optional[BuildiumN1API],
+) -> None:
+    from . import n1_data
+
+    api = buildium_api or RequestsBuildiumAPI(api_headers=api_headers)
+
+    rates = api.get_ontario_increase_rates() or {}
+    prepared = n1_data.prepare_n1_data(
+        api,
+        rates=rates,
+        gl_mapping=gl_mapping,
+        max_payload_bytes=MAX_PAYLOAD_BYTES,
     )
 
+    excel_bytes, pdf_bytes = _render_summary_files(list(prepared.schedules))
+    _store_prepared_data(
+        firestore_client,
+        account_id,
+        gl_mapping=gl_mapping,
+        prepared=prepared,
+        excel_bytes=excel_bytes,
+        pdf_bytes=pdf_bytes,
+    )
+    _log_prepared(account_id, prepared)
+
+
+async def _handle_task_created_async(
+    *,
+    account_id: str,
+    gl_mapping: Mapping[str, Any],
+    buildium_api: AsyncBuildiumN1API,
+) -> None:
+    from . import n1_data
+
+    rates = await buildium_api.get_ontario_increase_rates() or {}
+    prepared = await n1_data.prepare_n1_data_async(
+        buildium_api,
+        rates=rates,
+        gl_mapping=gl_mapping,
+        max_payload_bytes=MAX_PAYLOAD_BYTES,
+    )
+    excel_bytes, pdf_bytes = await run_in_workload(
+        WORKLOAD_CPU, _render_summary_files, list(prepared.schedules)
+    )
+
+    registry = get_client_registry()
+    if not registry.async_enabled:
+        await run_in_workload(
+            WORKLOAD_GOOGLE_IO,
+            _store_prepared_data,
+            registry.firestore(),
+            account_id,
+            gl_mapping=gl_mapping,
+            prepared=prepared,
+            excel_bytes=excel_bytes,
+            pdf_bytes=pdf_bytes,
+        )
+    else:
+        document = n1_completion.ensure_firestore_document(registry.async_firestore(), account_id)
+        existing = await n1_completion.load_document_async(document)
+        await document.set(
+            _prepared_document(
+                existing,
+                gl_mapping=gl_mapping,
+                prepared=prepared,
+                excel_bytes=excel_bytes,
+                pdf_bytes=pdf_bytes,
+            ),
+            merge=True,
+        )
+    _log_prepared(account_id, prepared)
+
 
 def _handle_task_completed(
     *,
@@ -803,9 +987,7 @@ def handle_n1_increase_automation(
     """Handle Buildium N1 automation task events."""
 
     if firestore_client is None:
-        from google.cloud import firestore  # type: ignore
-
-        firestore_client = firestore.Client(database=BUILDUM_FIRESTORE_DATABASE)
+        firestore_client = get_client_registry().firestore()
 
     event_type = _extract_event_type(webhook)
     task_block = _extract_task_block(webhook)
@@ -836,8 +1018,54 @@ def handle_n1_increase_automation(
             )
 
 
+async def handle_n1_increase_automation_async(
+    *,
+    account_id: str,
+    api_headers: Mapping[str, str],
+    gl_mapping: Mapping[str, Any],
+    webhook: Mapping[str, Any],
+    firestore_client: Optional[Any] = None,
+    buildium_api: Optional[BuildiumN1API] = None,
+) -> None:
+    """Event-loop variant of :func:`handle_n1_increase_automation`.
+
+    ``TaskCreated`` preparation reads Buildium through the shared async
+    transport and writes Firestore through the async client when
+    ``BUILDIUM_GOOGLE_ASYNC_CLIENTS`` is on; rendering and encryption run on the
+    CPU pool. Completion events, injected clients, and processes without
+    ``httpx`` run the blocking handler on the ``buildium_io`` pool.
+    """
+
+    transport = get_async_buildium_transport()
+    if (
+        transport is None
+        or firestore_client is not None
+        or buildium_api is not None
+        or _normalize(_extract_event_type(webhook)) != "taskcreated"
+    ):
+        await run_in_workload(
+            WORKLOAD_BUILDIUM_IO,
+            handle_n1_increase_automation,
+            account_id=account_id,
+            api_headers=api_headers,
+            gl_mapping=gl_mapping,
+            webhook=webhook,
+            firestore_client=firestore_client,
+            buildium_api=buildium_api,
+        )
+        return
+
+    await _handle_task_created_async(
+        account_id=account_id,
+        gl_mapping=gl_mapping,
+        buildium_api=AsyncBuildiumN1API(transport=transport, api_headers=api_headers),
+    )
+
+
 __all__ = [
     "handle_n1_increase_automation",
+    "handle_n1_increase_automation_async",
+    "AsyncBuildiumN1API",
     "RequestsBuildiumAPI",
     "BuildiumN1API",
 ]
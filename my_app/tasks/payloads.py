@@ -0,0 +1,174 @@
+"""Versioned task payload formats for queued Buildium webhooks.
+
+Two formats are understood by the task handler:
+
+* **Legacy** (unversioned) – the full verified webhook including account
+  metadata, plaintext secrets, every header, the base64 body and the parsed
+  body. Still accepted so tasks queued before a rollout drain cleanly.
+* **Compact** (schema version 2) – the account id, the routing fields needed
+  to triage the event, and the raw body exactly once, optionally
+  zlib-compressed. No secrets are written to the queue; the handler resolves
+  the account context again when the task runs. The payload is signed with
+  an HMAC keyed on the account's webhook secret, and the handler refuses a
+  compact task whose signature does not match, so the task endpoint cannot
+  be used to trigger automations for an account with a forged body.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+COMPACT_TASK_SCHEMA_VERSION = 2
+SCHEMA_VERSION_KEY = "v"
+SIGNATURE_KEY = "sig"
+
+TASK_PAYLOAD_FORMAT_ENV = "BUILDIUM_TASK_PAYLOAD_FORMAT"
+TASK_PAYLOAD_COMPRESS_MIN_BYTES_ENV = "BUILDIUM_TASK_PAYLOAD_COMPRESS_MIN_BYTES"
+TASK_PAYLOAD_FORMAT_LEGACY = "legacy"
+TASK_PAYLOAD_FORMAT_COMPACT = "compact"
+
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+
+_ENCODING_IDENTITY = "identity"
+_ENCODING_ZLIB = "zlib"
+# Keeps task signatures distinct from Buildium's own webhook signatures, which
+# use the same secret.
+_SIGNATURE_CONTEXT = b"buildium-task:v2\n"
+
+
+@dataclass(frozen=True)
+class CompactTaskPayload:
+    """Decoded form of a schema version 2 task payload."""
+
+    account_id: str
+    body: bytes
+    content_type: Optional[str]
+    verification_scheme: str
+    routing: Mapping[str, Any]
+
+
+def is_compact_task_payload(payload: Mapping[str, Any]) -> bool:
+    return payload.get(SCHEMA_VERSION_KEY) == COMPACT_TASK_SCHEMA_VERSION
+
+
+def encode_compact_task_payload(
+    *,
+    account_id: str,
+    body: bytes,
+    content_type: Optional[str],
+    verification_scheme: str,
+    routing: Mapping[str, Any],
+    compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+    signing_secret: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build a compact task payload, compressing bodies of ``compress_min_bytes`` or more.
+
+    With ``signing_secret`` the payload is signed; see :func:`sign_compact_task_payload`.
+    """
+
+    encoding = _ENCODING_IDENTITY
+    encoded_body = body or b""
+    if compress_min_bytes > 0 and len(encoded_body) >= compress_min_bytes:
+        compressed = zlib.compress(encoded_body, 6)
+        if len(compressed) < len(encoded_body):
+            encoded_body = compressed
+            encoding = _ENCODING_ZLIB
+
+    payload: Dict[str, Any] = {
+        SCHEMA_VERSION_KEY: COMPACT_TASK_SCHEMA_VERSION,
+        "account_id": account_id,
+        "scheme": verification_scheme,
+        "routing": {key: value for key, value in routing.items() if value is not None},
+        "encoding": encoding,
+        "body": base64.b64encode(encoded_body).decode("ascii") if encoded_body else "",
+    }
+    if content_type:
+        payload["content_type"] = content_type
+    if signing_secret:
+        sign_compact_task_payload(payload, signing_secret)
+    return payload
+
+
+def _signature_digest(payload: Mapping[str, Any], secret: str) -> str:
+    signed = {key: value for key, value in payload.items() if key != SIGNATURE_KEY}
+    message = _SIGNATURE_CONTEXT + json.dumps(
+        signed, sort_keys=True, separators=(",", ":"), default=str
+    ).encode("utf-8")
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def sign_compact_task_payload(payload: Dict[str, Any], secret: str) -> Dict[str, Any]:
+    """Add an HMAC-SHA256 of every other field, keyed on ``secret``, under ``sig``."""
+
+    payload[SIGNATURE_KEY] = _signature_digest(payload, secret)
+    return payload
+
+
+def verify_compact_task_signature(payload: Mapping[str, Any], secret: str) -> bool:
+    """Return whether ``payload`` carries a valid signature for ``secret``."""
+
+    provided = payload.get(SIGNATURE_KEY)
+    if not secret or not isinstance(provided, str) or not provided:
+        return False
+    return hmac.compare_digest(provided, _signature_digest(payload, secret))
+
+
+def decode_compact_task_payload(payload: Mapping[str, Any]) -> CompactTaskPayload:
+    """Validate and decode a compact task payload, raising ``ValueError`` when malformed."""
+
+    if not is_compact_task_payload(payload):
+        raise ValueError("Task payload does not use the compact schema.")
+
+    raw_account_id = payload.get("account_id")
+    if not isinstance(raw_account_id, str) or not raw_account_id.strip():
+        raise ValueError("Task payload is missing the Buildium account identifier.")
+
+    body_encoded = payload.get("body") or ""
+    if not isinstance(body_encoded, str):
+        raise ValueError("Task payload body must be a base64 string.")
+    try:
+        body = base64.b64decode(body_encoded.encode("ascii"), validate=True)
+    except (ValueError, UnicodeEncodeError, binascii.Error) as exc:
+        raise ValueError("Task payload contains an invalid base64-encoded body.") from exc
+
+    encoding = payload.get("encoding") or _ENCODING_IDENTITY
+    if encoding == _ENCODING_ZLIB:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as exc:
+            raise ValueError("Task payload body could not be decompressed.") from exc
+    elif encoding != _ENCODING_IDENTITY:
+        raise ValueError(f"Unsupported task payload encoding: {encoding!r}.")
+
+    routing = payload.get("routing")
+    content_type = payload.get("content_type")
+    scheme = payload.get("scheme")
+
+    return CompactTaskPayload(
+        account_id=raw_account_id.strip(),
+        body=body,
+        content_type=str(content_type) if content_type else None,
+        verification_scheme=str(scheme) if scheme is not None else "",
+        routing=dict(routing) if isinstance(routing, Mapping) else {},
+    )
+
+
+__all__ = [
+    "COMPACT_TASK_SCHEMA_VERSION",
+    "CompactTaskPayload",
+    "TASK_PAYLOAD_FORMAT_COMPACT",
+    "TASK_PAYLOAD_FORMAT_ENV",
+    "TASK_PAYLOAD_FORMAT_LEGACY",
+    "decode_compact_task_payload",
+    "encode_compact_task_payload",
+    "is_compact_task_payload",
+    "sign_compact_task_payload",
+    "verify_compact_task_signature",
+]
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List
+
+import importlib
+
+import pytest
+from fastapi import HTTPException
+
+account_cache = importlib.import_module("my_app.services.account_cache")
+metrics = importlib.import_module("my_app.services.metrics")
+buildium_processor = importlib.import_module("my_app.tasks.buildium_processor")
+BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics() -> None:
+    metrics.reset()
+
+
+def _context(account_id: str = "acct-1", **metadata: Any) -> Any:
+    return BuildiumAccountContext(
+        account_id=account_id,
+        metadata={"api_secret_name": "projects/p/secrets/api/versions/1", **metadata},
+        api_secret='{"access_token": "token"}',
+        webhook_secret="hook",
+    )
+
+
+def test_cache_serves_hits_until_ttl_expires() -> None:
+    now = [0.0]
+    loads: List[str] = []
+    cache = account_cache.AccountContextCache(ttl_seconds=60, clock=lambda: now[0])
+
+    def _load() -> Any:
+        loads.append("acct-1")
+        return _context()
+
+    first = cache.get("acct-1", _load)
+    now[0] = 59.0
+    assert cache.get("acct-1", _load) is first
+    now[0] = 61.0
+    assert cache.get("acct-1", _load) is not first
+
+    assert loads == ["acct-1", "acct-1"]
+    assert metrics.get_counter(account_cache.ACCOUNT_CACHE_REQUESTS_METRIC, result="hit") == 1
+    assert metrics.get_counter(account_cache.ACCOUNT_CACHE_REQUESTS_METRIC, result="miss") == 2
+
+
+def test_cache_does_not_store_failed_loads() -> None:
+    cache = account_cache.AccountContextCache()
+    attempts: List[int] = []
+
+    def _failing() -> Any:
+        attempts.append(1)
+        raise HTTPException(status_code=503, detail="unavailable")
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            cache.get("acct-1", _failing)
+
+    assert len(attempts) == 2
+    assert len(cache) == 0
+
+
+def test_concurrent_async_misses_share_one_load() -> None:
+    cache = account_cache.AccountContextCache()
+    loads: List[str] = []
+
+    async def _load() -> Any:
+        loads.append("acct-1")
+        await asyncio.sleep(0.01)
+        return _context()
+
+    async def _run() -> List[Any]:
+        return await asyncio.gather(*(cache.get_async("acct-1", _load) for _ in range(10)))
+
+    results = asyncio.run(_run())
+
+    assert loads == ["acct-1"]
+    assert all(result is results[0] for result in results)
+    assert metrics.get_counter(account_cache.ACCOUNT_CACHE_REQUESTS_METRIC, result="coalesced") == 9
+
+
+def test_concurrent_thread_misses_share_one_load() -> None:
+    cache = account_cache.AccountContextCache()
+    loads: List[str] = []
+    results: Dict[int, Any] = {}
+
+    def _load() -> Any:
+        loads.append("acct-1")
+        time.sleep(0.05)
+        return _context()
+
+    def _worker(index: int) -> None:
+        results[index] = cache.get("acct-1", _load)
+
+    threads = [threading.Thread(target=_worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["acct-1"]
+    assert len({id(result) for result in results.values()}) == 1
+
+
+def test_observe_invalidates_only_when_secret_references_change() -> None:
+    cache = account_cache.AccountContextCache()
+    cache.get(
+        "acct-1",
+        lambda: _context(webhook_secret_name="projects/p/secrets/hook/versions/3"),
+    )
+
+    unchanged = {
+        "api_secret_name": "projects/p/secrets/api/versions/1",
+        "webhook_secret_name": "projects/p/secrets/hook/versions/3",
+        "gl_mapping": {"rent": "4000"},
+    }
+    assert cache.observe("acct-1", unchanged) is False
+    assert len(cache) == 1
+
+    rotated = dict(unchanged, webhook_secret_name="projects/p/secrets/hook/versions/4")
+    assert cache.observe("acct-1", rotated) is True
+    assert len(cache) == 0
+    assert metrics.get_counter(
+        account_cache.ACCOUNT_CACHE_INVALIDATIONS_METRIC, reason="secret_changed"
+    ) == 1
+
+
+def test_account_profile_is_derived_once_per_context() -> None:
+    context = _context(automated_tasks_category_id=" 42 ", gl_mapping={"rent": "4000"})
+
+    profile = buildium_processor.get_account_profile("acct-1", context)
+
+    assert buildium_processor.get_account_profile("acct-1", context) is profile
+    assert profile.api_headers["Authorization"] == "Bearer token"
+    assert profile.gl_mapping == {"rent": "4000"}
+    assert profile.automated_category_id == "42"
+    assert buildium_processor.get_account_profile("acct-1", _context()) is not profile
+
+
+def test_negative_cache_rejects_unknown_accounts_without_lookups() -> None:
+    now = [0.0]
+    attempts: List[str] = []
+    cache = account_cache.AccountContextCache(negative_ttl_seconds=30, clock=lambda: now[0])
+
+    def _missing() -> Any:
+        attempts.append("lookup")
+        raise HTTPException(status_code=404, detail="Buildium account was not found.")
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc_info:
+            cache.get("acct-gone", _missing)
+        assert exc_info.value.status_code == 404
+
+    assert attempts == ["lookup"]
+    assert cache.negative_entries() == {"acct-gone": account_cache.FAILURE_NOT_FOUND}
+    assert metrics.get_counter(
+        account_cache.ACCOUNT_NEGATIVE_CACHE_HITS_METRIC, failure=account_cache.FAILURE_NOT_FOUND
+    ) == 2
+
+    now[0] = 31.0
+    with pytest.raises(HTTPException):
+        cache.get("acct-gone", _missing)
+    assert attempts == ["lookup", "lookup"]
+
+
+def test_negative_cache_purge_and_document_observation() -> None:
+    cache = account_cache.AccountContextCache()
+
+    def _broken() -> Any:
+        raise HTTPException(status_code=500, detail="Buildium account configuration is invalid.")
+
+    for account_id in ("acct-1", "acct-2", "acct-3"):
+        with pytest.raises(HTTPException):
+            cache.get(account_id, _broken)
+
+    assert cache.purge_negative("acct-1") == 1
+    assert cache.get("acct-1", _context).account_id == "acct-1"
+
+    assert cache.observe("acct-2", {"api_secret_name": "projects/p/secrets/api/versions/2"}) is True
+    assert cache.get("acct-2", lambda: _context("acct-2")).account_id == "acct-2"
+
+    assert cache.purge_negative() == 1
+    assert cache.negative_entries() == {}
+
+
+def test_purge_endpoint_clears_cached_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+
+    buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+    cache = account_cache.AccountContextCache()
+    monkeypatch.setattr(account_cache, "_ACCOUNT_CONTEXT_CACHE", cache)
+
+    def _missing() -> Any:
+        raise HTTPException(status_code=404, detail="Buildium account was not found.")
+
+    with pytest.raises(HTTPException):
+        cache.get("acct-gone", _missing)
+
+    client = TestClient(buildium_listener.app)
+    purge = lambda **kwargs: client.post(  # noqa: E731
+        "/account-cache/purge", params={"account_id": "acct-gone"}, **kwargs
+    )
+    # Only aggregate counts are exposed on the unauthenticated metrics endpoint.
+    assert client.get("/metrics").json()["account_cache"]["negative"] == {"not_found": 1}
+
+    monkeypatch.delenv(buildium_listener.ADMIN_TOKEN_ENV, raising=False)
+    assert purge().status_code == 404
+    monkeypatch.setenv(buildium_listener.ADMIN_TOKEN_ENV, "admin-token")
+    assert purge().status_code == 401
+    assert purge(headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = purge(headers={"Authorization": "Bearer admin-token"})
+    assert response.json()["purged"] == 1
+    assert client.get("/metrics").json()["account_cache"]["negative"] == {}
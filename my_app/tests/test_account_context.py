@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Mapping, Optional, Tuple
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import pytest
 from fastapi import HTTPException, status
@@ -8,6 +9,16 @@ from google.api_core import exceptions as google_exceptions
 
 import my_app.config as config
 import my_app.services.account_context as account_context
+import my_app.services.clients as clients
+
+
+@pytest.fixture(autouse=True)
+def _reset_client_registry() -> Any:
+    clients.reset_client_registry()
+    account_context._reset_default_credentials_project_id()
+    yield
+    clients.reset_client_registry()
+    account_context._reset_default_credentials_project_id()
 
 
 class _FakeSecretPayload:
@@ -238,3 +249,199 @@ def test_get_secret_project_id_uses_default_when_unconfigured(
     project_id = get_secret_project_id(account_id="acct-000", secret_type="api_secret")
 
     assert project_id == config.DEFAULT_GCP_PROJECT_ID
+
+
+def test_account_context_reuses_registry_clients_across_calls() -> None:
+    account_id = "acct-shared"
+    created: List[str] = []
+    firestore_client = _FakeFirestoreClient(
+        {account_id: {"api_secret_name": "projects/p/secrets/api/versions/1", "webhook_secret": "hook"}}
+    )
+    secret_manager_client = _FakeSecretManagerClient({"projects/p/secrets/api/versions/1": b"api"})
+
+    def _firestore() -> Any:
+        created.append("firestore")
+        return firestore_client
+
+    def _secret_manager() -> Any:
+        created.append("secret_manager")
+        return secret_manager_client
+
+    clients.configure_client_registry(
+        clients.GoogleClientRegistry(
+            firestore_factory=_firestore,
+            secret_manager_factory=_secret_manager,
+            async_enabled=False,
+        )
+    )
+
+    for _ in range(3):
+        assert account_context.get_buildium_account_context(account_id).api_secret == "api"
+    context = asyncio.run(account_context.get_buildium_account_context_async(account_id))
+
+    assert context.webhook_secret == "hook"
+    assert created == ["firestore", "secret_manager"]
+    assert len(secret_manager_client.requests) == 4
+
+
+class _FakeAsyncDocumentReference(_FakeDocumentReference):
+    async def get(self) -> _FakeSnapshot:  # type: ignore[override]
+        return _FakeSnapshot(self._data)
+
+
+class _FakeAsyncFirestoreClient(_FakeFirestoreClient):
+    def collection(self, path: str) -> Any:
+        documents = self._documents
+
+        class _Collection:
+            def document(self, document_id: str) -> _FakeAsyncDocumentReference:
+                return _FakeAsyncDocumentReference(f"{path}/{document_id}", documents.get(document_id))
+
+        return _Collection()
+
+
+class _FakeAsyncSecretManagerClient(_FakeSecretManagerClient):
+    async def access_secret_version(self, request: Mapping[str, Any]) -> _FakeSecretResponse:  # type: ignore[override]
+        return _FakeSecretManagerClient.access_secret_version(self, request)
+
+
+def test_get_buildium_account_context_async_uses_async_clients() -> None:
+    account_id = "acct-async"
+    secret_manager_client = _FakeAsyncSecretManagerClient(
+        {
+            "projects/p/secrets/api/versions/1": b"api-secret",
+            "projects/p/secrets/hook/versions/1": b"hook-secret",
+        }
+    )
+
+    def _unexpected() -> Any:
+        raise AssertionError("sync clients must not be created when async clients are enabled")
+
+    registry = clients.GoogleClientRegistry(
+        firestore_factory=_unexpected,
+        secret_manager_factory=_unexpected,
+        async_firestore_factory=lambda: _FakeAsyncFirestoreClient(
+            {
+                account_id: {
+                    "api_secret_name": "projects/p/secrets/api/versions/1",
+                    "webhook_secret_name": "projects/p/secrets/hook/versions/1",
+                }
+            }
+        ),
+        async_secret_manager_factory=lambda: secret_manager_client,
+        async_enabled=True,
+    )
+
+    context = asyncio.run(
+        account_context.get_buildium_account_context_async(account_id, registry=registry)
+    )
+
+    assert context.api_secret == "api-secret"
+    assert context.webhook_secret == "hook-secret"
+    assert secret_manager_client.requests == [
+        "projects/p/secrets/api/versions/1",
+        "projects/p/secrets/hook/versions/1",
+    ]
+
+
+def test_get_buildium_account_contexts_batches_reads_and_reports_errors() -> None:
+    class _BulkFirestoreClient(_FakeFirestoreClient):
+        def __init__(self, documents: Mapping[str, Mapping[str, Any]]) -> None:
+            super().__init__(documents)
+            self.get_all_calls: List[List[str]] = []
+
+        def get_all(self, references: List[Any]) -> Any:
+            self.get_all_calls.append([reference.path for reference in references])
+            for reference in references:
+                snapshot = reference.get()
+                snapshot.id = reference.path.rsplit("/", 1)[-1]
+                yield snapshot
+
+    firestore_client = _BulkFirestoreClient(
+        {
+            "acct-1": {
+                "api_secret_name": "projects/example/secrets/api-1/versions/1",
+                "webhook_secret": "hook-1",
+            },
+            "acct-2": {
+                "api_secret_name": "projects/example/secrets/api-2/versions/1",
+                "webhook_secret_name": "projects/example/secrets/hook-2/versions/1",
+            },
+            "acct-broken": {"webhook_secret": "hook"},
+        }
+    )
+    secret_manager_client = _FakeSecretManagerClient(
+        {
+            "projects/example/secrets/api-1/versions/1": b"api-1",
+            "projects/example/secrets/api-2/versions/1": b"api-2",
+            "projects/example/secrets/hook-2/versions/1": b"hook-2",
+        }
+    )
+
+    batch = account_context.get_buildium_account_contexts(
+        ["acct-2", "acct-missing", "acct-1", "acct-broken", "acct-2"],
+        firestore_client=firestore_client,
+        secret_manager_client=secret_manager_client,
+        max_workers=4,
+    )
+
+    assert len(firestore_client.get_all_calls) == 1
+    assert list(batch.contexts) == ["acct-2", "acct-1"]
+    assert batch.contexts["acct-1"].api_secret == "api-1"
+    assert batch.contexts["acct-2"].webhook_secret == "hook-2"
+    assert list(batch.errors) == ["acct-missing", "acct-broken"]
+    assert batch.errors["acct-missing"].status_code == status.HTTP_404_NOT_FOUND
+    assert batch.errors["acct-broken"].status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def test_iter_buildium_account_ids_pages_with_a_name_only_projection() -> None:
+    class _Snapshot:
+        def __init__(self, doc_id: str) -> None:
+            self.id = doc_id
+
+    class _Query:
+        def __init__(self, ids: List[str], calls: List[Tuple[str, Any]]) -> None:
+            self._ids = ids
+            self._calls = calls
+            self._limit = len(ids)
+            self._after: Optional[str] = None
+
+        def select(self, field_paths: List[str]) -> "_Query":
+            self._calls.append(("select", list(field_paths)))
+            return self
+
+        def order_by(self, field_path: str) -> "_Query":
+            self._calls.append(("order_by", field_path))
+            return self
+
+        def limit(self, count: int) -> "_Query":
+            self._limit = count
+            return self
+
+        def start_after(self, snapshot: _Snapshot) -> "_Query":
+            query = _Query(self._ids, self._calls)
+            query._limit = self._limit
+            query._after = snapshot.id
+            return query
+
+        def stream(self) -> Any:
+            start = 0 if self._after is None else self._ids.index(self._after) + 1
+            self._calls.append(("page", start))
+            return iter([_Snapshot(doc_id) for doc_id in self._ids[start : start + self._limit]])
+
+    calls: List[Tuple[str, Any]] = []
+    ids = [f"acct-{index}" for index in range(5)]
+
+    class _Client:
+        def collection(self, path: str) -> _Query:
+            assert path == account_context._FIRESTORE_COLLECTION_PATH
+            return _Query(ids, calls)
+
+    iterator = account_context.iter_buildium_account_ids(_Client(), page_size=2)
+    assert next(iterator) == "acct-0"
+    assert [call for call in calls if call[0] == "page"] == [("page", 0)]
+
+    assert list(iterator) == ids[1:]
+    # Only the document name is projected; an empty projection returns every field.
+    assert [call for call in calls if call[0] == "select"] == [("select", ["__name__"])]
+    assert [call for call in calls if call[0] == "page"] == [("page", 0), ("page", 2), ("page", 4)]
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+from typing import Any, List
+
+import pytest
+from fastapi import HTTPException
+
+account_cache = importlib.import_module("my_app.services.account_cache")
+account_warmup = importlib.import_module("my_app.services.account_warmup")
+metrics = importlib.import_module("my_app.services.metrics")
+BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics() -> None:
+    metrics.reset()
+
+
+def _context(account_id: str) -> Any:
+    return BuildiumAccountContext(
+        account_id=account_id,
+        metadata={"api_secret_name": "projects/p/secrets/api/versions/1"},
+        api_secret='{"access_token": "token"}',
+        webhook_secret="hook",
+    )
+
+
+def test_warm_loads_every_account_with_bounded_concurrency() -> None:
+    cache = account_cache.AccountContextCache()
+    active = [0]
+    peak = [0]
+
+    async def _list() -> List[str]:
+        return ["acct-1", "acct-2", "acct-3", "acct-gone", "acct-4", "acct-1"]
+
+    async def _load(account_id: str) -> Any:
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        if account_id == "acct-gone":
+            raise HTTPException(status_code=404, detail="Buildium account was not found.")
+        return _context(account_id)
+
+    warmer = account_warmup.AccountCacheWarmer(
+        cache=cache, loader=_load, list_accounts=_list, concurrency=2
+    )
+    assert warmer.ready is False
+
+    asyncio.run(warmer.warm())
+
+    assert warmer.ready is True
+    assert warmer.status() == {"ready": True, "accounts": 5, "loaded": 4, "failed": 1}
+    assert peak[0] == 2
+    assert len(cache) == 4
+    assert metrics.get_counter(account_warmup.ACCOUNT_PREFETCH_METRIC, result="loaded") == 4
+
+
+def test_refresh_replaces_entries_before_they_expire() -> None:
+    now = [0.0]
+    cache = account_cache.AccountContextCache(ttl_seconds=300, clock=lambda: now[0])
+    loads: List[str] = []
+
+    async def _load(account_id: str) -> Any:
+        loads.append(account_id)
+        return _context(account_id)
+
+    async def _list() -> List[str]:
+        return ["acct-1", "acct-2"]
+
+    warmer = account_warmup.AccountCacheWarmer(
+        cache=cache, loader=_load, list_accounts=_list, refresh_ahead_seconds=60
+    )
+
+    async def _run() -> None:
+        await warmer.warm()
+        now[0] = 100.0
+        assert await warmer.refresh_expiring() == 0
+        now[0] = 250.0
+        assert await warmer.refresh_expiring() == 2
+        now[0] = 400.0
+        # Entries were reloaded at t=250, so they are still fresh here.
+        await cache.get_async("acct-1", lambda: _load("acct-1"))
+
+    asyncio.run(_run())
+
+    assert loads == ["acct-1", "acct-2", "acct-1", "acct-2"]
+    assert cache.age("acct-1") == 150.0
+
+
+def test_refresh_evicts_accounts_that_no_longer_resolve() -> None:
+    now = [0.0]
+    cache = account_cache.AccountContextCache(
+        ttl_seconds=300, negative_ttl_seconds=30, clock=lambda: now[0]
+    )
+    loads: List[str] = []
+    deleted = set()
+
+    async def _load(account_id: str) -> Any:
+        loads.append(account_id)
+        if account_id in deleted:
+            raise HTTPException(status_code=404, detail="Buildium account was not found.")
+        return _context(account_id)
+
+    async def _list() -> List[str]:
+        return ["acct-1", "acct-gone"]
+
+    warmer = account_warmup.AccountCacheWarmer(
+        cache=cache, loader=_load, list_accounts=_list, refresh_ahead_seconds=60
+    )
+
+    async def _run() -> None:
+        await warmer.warm()
+        deleted.add("acct-gone")
+        now[0] = 250.0
+        assert await warmer.refresh_expiring() == 1
+        # The deleted account is no longer a refresh candidate.
+        assert cache.expiring(60) == []
+        with pytest.raises(HTTPException):
+            await cache.get_async("acct-gone", lambda: _load("acct-gone"))
+
+    asyncio.run(_run())
+
+    assert loads == ["acct-1", "acct-gone", "acct-1", "acct-gone"]
+    assert len(cache) == 1
+    assert cache.negative_entries() == {"acct-gone": account_cache.FAILURE_NOT_FOUND}
+    assert metrics.get_counter(
+        account_cache.ACCOUNT_CACHE_INVALIDATIONS_METRIC, reason="refresh_failed"
+    ) == 1
+
+
+def test_warm_reports_ready_when_enumeration_fails() -> None:
+    async def _list() -> List[str]:
+        raise RuntimeError("firestore unavailable")
+
+    async def _load(account_id: str) -> Any:  # pragma: no cover - never called
+        return _context(account_id)
+
+    warmer = account_warmup.AccountCacheWarmer(
+        cache=account_cache.AccountContextCache(), loader=_load, list_accounts=_list
+    )
+    asyncio.run(warmer.warm())
+
+    assert warmer.ready is True
+
+
+def test_warmer_is_disabled_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(account_warmup.ACCOUNT_PREFETCH_ENV, raising=False)
+    assert account_warmup.create_account_cache_warmer(account_cache.AccountContextCache()) is None
+
+    monkeypatch.setenv(account_warmup.ACCOUNT_PREFETCH_ENV, "true")
+    assert account_warmup.create_account_cache_warmer(
+        account_cache.AccountContextCache(ttl_seconds=0)
+    ) is None
+    assert account_warmup.create_account_cache_warmer(account_cache.AccountContextCache()) is not None
+
+
+def test_readyz_reflects_warm_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+
+    buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+    client = TestClient(buildium_listener.app)
+
+    monkeypatch.setattr(buildium_listener, "_ACCOUNT_WARMER", None)
+    assert client.get("/readyz").status_code == 200
+
+    async def _list() -> List[str]:
+        return ["acct-1"]
+
+    async def _load(account_id: str) -> Any:
+        return _context(account_id)
+
+    warmer = account_warmup.AccountCacheWarmer(
+        cache=account_cache.AccountContextCache(), loader=_load, list_accounts=_list
+    )
+    monkeypatch.setattr(buildium_listener, "_ACCOUNT_WARMER", warmer)
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming"
+
+    asyncio.run(warmer.warm())
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["account_cache"]["loaded"] == 1
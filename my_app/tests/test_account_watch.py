@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import importlib
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+account_cache = importlib.import_module("my_app.services.account_cache")
+account_watch = importlib.import_module("my_app.services.account_watch")
+metrics = importlib.import_module("my_app.services.metrics")
+BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+
+_API_SECRET = "projects/p/secrets/api/versions/1"
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics() -> None:
+    metrics.reset()
+
+
+class FakeSnapshotSource:
+    """Stands in for ``CollectionReference.on_snapshot``."""
+
+    def __init__(self) -> None:
+        self.callback: Any = None
+        self.unsubscribed = False
+
+    def __call__(self, callback: Any) -> Any:
+        self.callback = callback
+        return SimpleNamespace(unsubscribe=self._unsubscribe)
+
+    def _unsubscribe(self) -> None:
+        self.unsubscribed = True
+
+    def emit(self, change_type: str, account_id: str, data: Optional[Dict[str, Any]] = None) -> None:
+        document = SimpleNamespace(id=account_id, to_dict=lambda: data)
+        change = SimpleNamespace(type=SimpleNamespace(name=change_type), document=document)
+        self.callback([document], [change], None)
+
+
+def _context(account_id: str = "acct-1", **metadata: Any) -> Any:
+    return BuildiumAccountContext(
+        account_id=account_id,
+        metadata={"api_secret_name": _API_SECRET, **metadata},
+        api_secret='{"access_token": "token"}',
+        webhook_secret="hook",
+    )
+
+
+def _watch(cache: Any) -> FakeSnapshotSource:
+    source = FakeSnapshotSource()
+    watcher = account_watch.AccountSnapshotWatcher(cache=cache, source=source)
+    watcher.start()
+    assert watcher.watching
+    return source
+
+
+def test_modified_document_updates_cached_metadata_in_place() -> None:
+    cache = account_cache.AccountContextCache()
+    loads: List[str] = []
+
+    def _load() -> Any:
+        loads.append("acct-1")
+        return _context(gl_mapping={"rent": "4000"})
+
+    cache.get("acct-1", _load)
+    source = _watch(cache)
+
+    source.emit(
+        "MODIFIED",
+        "acct-1",
+        {
+            "api_secret_name": _API_SECRET,
+            "webhook_secret": "hook",
+            "gl_mapping": {"rent": "4100"},
+            "automated_tasks_category_id": 42,
+        },
+    )
+
+    context = cache.get("acct-1", _load)
+    assert loads == ["acct-1"]
+    assert context.metadata == {
+        "api_secret_name": _API_SECRET,
+        "gl_mapping": {"rent": "4100"},
+        "automated_tasks_category_id": 42,
+    }
+    assert metrics.get_counter(account_cache.ACCOUNT_CACHE_UPDATES_METRIC) == 1
+
+
+def test_removed_or_rekeyed_documents_evict_entries() -> None:
+    cache = account_cache.AccountContextCache()
+    cache.get("acct-1", _context)
+    cache.get("acct-2", lambda: _context("acct-2"))
+    source = _watch(cache)
+
+    source.emit("REMOVED", "acct-1")
+    source.emit("MODIFIED", "acct-2", {"api_secret_name": "projects/p/secrets/api/versions/2"})
+
+    assert len(cache) == 0
+    assert metrics.get_counter(
+        account_cache.ACCOUNT_CACHE_INVALIDATIONS_METRIC, reason="document_deleted"
+    ) == 1
+    assert metrics.get_counter(
+        account_cache.ACCOUNT_CACHE_INVALIDATIONS_METRIC, reason="secret_changed"
+    ) == 1
+
+
+def test_added_document_clears_negative_entry_and_stop_unsubscribes() -> None:
+    from fastapi import HTTPException
+
+    cache = account_cache.AccountContextCache()
+
+    def _missing() -> Any:
+        raise HTTPException(status_code=404, detail="Buildium account was not found.")
+
+    with pytest.raises(HTTPException):
+        cache.get("acct-new", _missing)
+
+    source = FakeSnapshotSource()
+    watcher = account_watch.AccountSnapshotWatcher(cache=cache, source=source)
+    watcher.start()
+    source.emit("ADDED", "acct-new", {"api_secret_name": _API_SECRET})
+
+    assert cache.negative_entries() == {}
+    assert cache.get("acct-new", lambda: _context("acct-new")).account_id == "acct-new"
+
+    watcher.stop()
+    assert source.unsubscribed
+    assert not watcher.watching
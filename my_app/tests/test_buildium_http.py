@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from urllib import error as urllib_error
+
+import pytest
+
+buildium_http = importlib.import_module("my_app.services.buildium_http")
+rate_limit = importlib.import_module("my_app.services.buildium_rate_limit")
+metrics = importlib.import_module("my_app.services.metrics")
+n1_increase = importlib.import_module("my_app.tasks.n1_increase")
+
+
+class StubBuildium(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.connections: Set[Tuple[str, int]] = set()
+        self.accept_encodings: List[str] = []
+        self.responses: List[Tuple[int, Dict[str, str], Any]] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid delayed-ACK stalls on reuse.
+    disable_nagle_algorithm = True
+    server: StubBuildium
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        self.server.connections.add(self.client_address)
+        accept_encoding = self.headers.get("Accept-Encoding", "")
+        self.server.accept_encodings.append(accept_encoding)
+        if self.server.responses:
+            status, headers, payload = self.server.responses.pop(0)
+        else:
+            status, headers, payload = 200, {}, {"items": [{"id": 1}, {"id": 2}]}
+        body = json.dumps(payload).encode("utf-8")
+        if "gzip" in accept_encoding:
+            body = gzip.compress(body)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for name, value in {**headers, "Content-Type": "application/json"}.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: Any) -> None:
+        return None
+
+
+@pytest.fixture
+def stub() -> Iterator[StubBuildium]:
+    server = StubBuildium()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _reset_transport() -> Iterator[None]:
+    metrics.reset()
+    rate_limit.configure_buildium_rate_limiter(rate_limit.BuildiumRateLimiter(rate=0))
+    yield
+    buildium_http.close_buildium_http_transport()
+    rate_limit.configure_buildium_rate_limiter(None)
+
+
+def _api(stub: StubBuildium) -> Any:
+    return n1_increase.RequestsBuildiumAPI(
+        api_headers={"X-Buildium-Account-Id": "acct-1", "Authorization": "Bearer token"},
+        base_url=stub.base_url,
+    )
+
+
+def test_clients_reuse_one_gzip_connection(stub: StubBuildium) -> None:
+    api = _api(stub)
+
+    results = [api.list_eligible_leases() for _ in range(5)]
+
+    assert results == [[{"id": 1}, {"id": 2}]] * 5
+    assert len(stub.connections) == 1
+    assert all("gzip" in value for value in stub.accept_encodings)
+
+
+def test_retry_after_blocks_the_bucket_and_the_request_is_retried(stub: StubBuildium) -> None:
+    now = [1_000.0]
+    sleeps: List[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    store = rate_limit.LocalRateLimitStore()
+    rate_limit.configure_buildium_rate_limiter(
+        rate_limit.BuildiumRateLimiter(rate=10, shared=store, clock=lambda: now[0], sleep=sleep)
+    )
+    stub.responses.append((429, {"Retry-After": "3"}, {"message": "slow down"}))
+
+    assert _api(stub).list_eligible_leases() == [{"id": 1}, {"id": 2}]
+    assert sleeps == [pytest.approx(3.0)]
+    assert metrics.get_counter(rate_limit.RATE_LIMIT_THROTTLED_METRIC) == 1
+    # Other instances sharing the store honour the same Retry-After.
+    assert store.take("acct-1", 1, rate=10, burst=10, now=now[0] - 1) == (0, pytest.approx(1.0))
+
+
+def test_error_statuses_raise_http_error(stub: StubBuildium) -> None:
+    stub.responses.append((404, {}, {"message": "missing"}))
+
+    with pytest.raises(urllib_error.HTTPError) as excinfo:
+        _api(stub).get_ontario_increase_rates()
+
+    assert excinfo.value.code == 404
+    assert json.loads(excinfo.value.read()) == {"message": "missing"}
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pagination = importlib.import_module("my_app.services.buildium_pagination")
+buildium_http = importlib.import_module("my_app.services.buildium_http")
+metrics = importlib.import_module("my_app.services.metrics")
+initiation = importlib.import_module("my_app.tasks.initiation")
+n1_increase = importlib.import_module("my_app.tasks.n1_increase")
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics() -> None:
+    metrics.reset()
+
+
+def _fetcher(count: int, *, report_total: bool) -> Tuple[Any, List[Tuple[int, int]]]:
+    calls: List[Tuple[int, int]] = []
+    lock = threading.Lock()
+
+    def fetch_page(offset: int, limit: int) -> Any:
+        with lock:
+            calls.append((offset, limit))
+        items = list(range(offset, min(offset + limit, count)))
+        return pagination.BuildiumPage(items=items, total=count if report_total else None)
+
+    return fetch_page, calls
+
+
+def test_pages_are_followed_until_a_short_page_without_a_total() -> None:
+    fetch_page, calls = _fetcher(25, report_total=False)
+
+    items = list(pagination.iter_buildium_items(fetch_page, page_size=10))
+
+    assert items == list(range(25))
+    assert calls == [(0, 10), (10, 10), (20, 10)]
+    assert metrics.get_counter(pagination.PAGINATION_PAGES_METRIC) == 3
+
+
+def test_default_page_size_is_the_buildium_maximum() -> None:
+    fetch_page, calls = _fetcher(3, report_total=False)
+
+    assert list(pagination.iter_buildium_items(fetch_page)) == [0, 1, 2]
+    assert calls == [(0, 1000)]
+
+
+def test_known_total_fetches_remaining_pages_concurrently_in_order() -> None:
+    in_flight = [0]
+    peak = [0]
+    lock = threading.Lock()
+    both_started = threading.Barrier(2, timeout=5)
+
+    def fetch_page(offset: int, limit: int) -> Any:
+        if offset:
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            if offset <= 2 * limit:
+                # Pages two and three must be in flight at the same time.
+                both_started.wait()
+            with lock:
+                in_flight[0] -= 1
+        return pagination.BuildiumPage(items=list(range(offset, min(offset + limit, 35))), total=35)
+
+    pages = list(pagination.iter_buildium_pages(fetch_page, page_size=10, concurrency=2))
+
+    assert [page.items[0] for page in pages] == [0, 10, 20, 30]
+    assert [item for page in pages for item in page.items] == list(range(35))
+    assert peak[0] == 2
+
+
+def test_items_are_yielded_before_later_pages_are_requested() -> None:
+    fetch_page, calls = _fetcher(50, report_total=False)
+
+    iterator = pagination.iter_buildium_items(fetch_page, page_size=10)
+    assert calls == []
+    assert next(iterator) == 0
+    assert calls == [(0, 10)]
+
+    iterator.close()
+    assert calls == [(0, 10)]
+
+
+def test_parse_total_count_is_case_insensitive() -> None:
+    assert pagination.parse_total_count({"x-total-count": "42"}) == 42
+    assert pagination.parse_total_count({"X-Total-Count": "n/a"}) is None
+    assert pagination.parse_total_count(None) is None
+
+
+def _fake_transport(
+    monkeypatch: pytest.MonkeyPatch, records: List[Dict[str, Any]]
+) -> List[Dict[str, List[str]]]:
+    queries: List[Dict[str, List[str]]] = []
+
+    def fetch(method: str, url: str, *, headers: Any, **_: Any) -> Any:
+        query = parse_qs(urlsplit(url).query)
+        queries.append(query)
+        offset, limit = int(query["offset"][0]), int(query["limit"][0])
+        return buildium_http.BuildiumHttpResponse(
+            status=200,
+            reason="OK",
+            data=json.dumps(records[offset : offset + limit]).encode("utf-8"),
+            headers={"X-Total-Count": str(len(records))},
+        )
+
+    monkeypatch.setattr(pagination, "fetch_buildium_response", fetch)
+    return queries
+
+
+def test_requests_clients_read_every_page(monkeypatch: pytest.MonkeyPatch) -> None:
+    records = [{"id": index} for index in range(2_500)]
+    queries = _fake_transport(monkeypatch, records)
+    headers = {"X-Buildium-Account-Id": "acct-1"}
+
+    leases = n1_increase.RequestsBuildiumAPI(api_headers=headers).list_eligible_leases()
+
+    assert leases == records
+    assert sorted(int(query["offset"][0]) for query in queries) == [0, 1000, 2000]
+    assert all(query["status"] == ["Active"] and query["limit"] == ["1000"] for query in queries)
+
+    queries.clear()
+    accounts = initiation.RequestsBuildiumAPI(api_headers=headers).list_gl_accounts()
+    assert len(accounts) == 2_500
+    assert len(queries) == 3
+
+
+def test_async_collection_reads_pages_until_a_short_page() -> None:
+    records = [{"id": index} for index in range(2_500)]
+    requests: List[Dict[str, Any]] = []
+
+    class _Transport:
+        async def get_json(self, path: str, *, headers: Any, params: Any = None) -> Any:
+            requests.append(dict(params))
+            offset, limit = params["offset"], params["limit"]
+            return {"items": records[offset : offset + limit]}
+
+    async def _collect() -> List[Any]:
+        iterator = pagination.iter_buildium_collection_async(
+            _Transport(), "leases", headers={}, params={"status": "Active"}
+        )
+        return [item async for item in iterator]
+
+    assert asyncio.run(_collect()) == records
+    assert [request["offset"] for request in requests] == [0, 1000, 2000]
+    assert all(request["status"] == "Active" for request in requests)
+    assert metrics.get_counter(pagination.PAGINATION_PAGES_METRIC) == 3
+
+
+def test_bare_object_responses_keep_each_callers_reading(monkeypatch: pytest.MonkeyPatch) -> None:
+    body = {"4000": {"id": 4000, "name": "Rent"}, "4100": {"id": 4100, "name": "Parking"}}
+
+    def fetch(method: str, url: str, *, headers: Any, **_: Any) -> Any:
+        return buildium_http.BuildiumHttpResponse(
+            status=200, reason="OK", data=json.dumps(body).encode("utf-8"), headers={}
+        )
+
+    monkeypatch.setattr(pagination, "fetch_buildium_response", fetch)
+    headers = {"X-Buildium-Account-Id": "acct-1"}
+
+    # Initiation and the lease listing read an object as records keyed by id.
+    assert initiation.RequestsBuildiumAPI(api_headers=headers).list_gl_accounts() == list(body.values())
+    assert n1_increase.RequestsBuildiumAPI(api_headers=headers).list_eligible_leases() == list(
+        body.values()
+    )
+    # N1 task categories have always read an object as a single category.
+    assert n1_increase.RequestsBuildiumAPI(api_headers=headers).list_task_categories() == [body]
+
+
+def test_iter_leases_pages_the_generated_client() -> None:
+    calls: List[Dict[str, Any]] = []
+
+    def get_leases_with_http_info(**kwargs: Any) -> Any:
+        calls.append(kwargs)
+        offset, limit = kwargs["offset"], kwargs["limit"]
+        return SimpleNamespace(
+            data=list(range(offset, min(offset + limit, 1_200))),
+            headers={"X-Total-Count": "1200"},
+        )
+
+    leases_api = SimpleNamespace(get_leases_with_http_info=get_leases_with_http_info)
+
+    leases = list(pagination.iter_leases(leases_api, leasestatuses=["Active"]))
+
+    assert leases == list(range(1_200))
+    assert sorted(call["offset"] for call in calls) == [0, 1000]
+    assert all(call["leasestatuses"] == ["Active"] for call in calls)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import logging
 import sys
 from dataclasses import dataclass
 from types import SimpleNamespace
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional
 from unittest.mock import Mock
 
 import importlib
@@ -28,6 +29,11 @@ _AUTOMATED_CATEGORY_ID = "cat-automated"
 _TASK_DETAILS_MESSAGE = "Resolved Buildium task details for automation processing."
 
 
+@pytest.fixture(autouse=True)
+def _reset_task_detail_cache() -> None:
+    buildium_processor.reset_task_detail_cache()
+
+
 @dataclass(frozen=True)
 class _StubAccountContext:
     account_id: str
@@ -717,6 +723,7 @@ def test_enqueue_buildium_webhook_creates_cloud_task(monkeypatch) -> None:
     monkeypatch.setenv("CLOUD_TASKS_QUEUE", "buildium-webhooks-test")
     monkeypatch.setenv("CLOUD_TASKS_LOCATION", "us-west1")
     monkeypatch.setenv("TASK_HANDLER_URL", "https://example.com/tasks/buildium-webhook")
+    monkeypatch.setenv("BUILDIUM_TASK_PAYLOAD_FORMAT", "legacy")
     monkeypatch.delenv("CLOUD_RUN_REGION", raising=False)
 
     response = buildium_processor.enqueue_buildium_webhook(verified_webhook, client=client)
@@ -741,6 +748,126 @@ def test_enqueue_buildium_webhook_creates_cloud_task(monkeypatch) -> None:
     assert body_payload["envelope"]["body"] == base64.b64encode(b'{"event": "value"}').decode("ascii")
 
 
+def test_enqueue_buildium_webhook_defaults_to_compact_payload(monkeypatch) -> None:
+    body = json.dumps({"EventType": "TaskCreated", "TaskId": 202, "Notes": "x" * 4096}).encode()
+    verified_webhook = VerifiedBuildiumWebhook(
+        account_context=BuildiumAccountContext(
+            account_id="acct-queue",
+            metadata={"gl_mapping": {"code": "value"}},
+            api_secret="api-secret",
+            webhook_secret="hook-secret",
+        ),
+        account_id="acct-queue",
+        envelope=BuildiumWebhookEnvelope(
+            headers={"content-type": "application/json", "x-buildium-signature": "sig"},
+            body=body,
+            parsed_body=json.loads(body),
+        ),
+        signature="sig",
+        verification_scheme="hmac",
+    )
+
+    class _DummyClient:
+        def __init__(self) -> None:
+            self.requests = []
+
+        def queue_path(self, project: str, location: str, queue: str) -> str:
+            return f"projects/{project}/locations/{location}/queues/{queue}"
+
+        def create_task(self, request: Mapping[str, Any]) -> Mapping[str, str]:
+            self.requests.append(request)
+            return {"name": "tasks/example"}
+
+    client = _DummyClient()
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    monkeypatch.delenv("BUILDIUM_TASK_PAYLOAD_FORMAT", raising=False)
+
+    buildium_processor.enqueue_buildium_webhook(verified_webhook, client=client)
+
+    raw_task_body = client.requests[0]["task"]["http_request"]["body"]
+    body_payload = json.loads(raw_task_body)
+    assert body_payload["v"] == 2
+    assert body_payload["account_id"] == "acct-queue"
+    assert body_payload["routing"] == {"event_type": "TaskCreated", "task_id": 202}
+    assert body_payload["encoding"] == "zlib"
+    assert b"api-secret" not in raw_task_body
+    assert b"hook-secret" not in raw_task_body
+    assert "account_context" not in body_payload
+    assert len(raw_task_body) < len(body)
+    assert importlib.import_module("my_app.tasks.payloads").verify_compact_task_signature(
+        body_payload, verified_webhook.account_context.webhook_secret
+    )
+
+
+def test_handle_buildium_webhook_task_resolves_context_for_compact_payload(monkeypatch) -> None:
+    body = b'{"EventType": "TaskCreated", "TaskId": 202}'
+    payload = importlib.import_module("my_app.tasks.payloads").encode_compact_task_payload(
+        account_id="acct-compact",
+        body=body,
+        content_type="application/json",
+        verification_scheme="hmac",
+        routing={"event_type": "TaskCreated"},
+        signing_secret="hook-secret",
+    )
+    resolved: Dict[str, Any] = {}
+
+    async def _resolve(account_id: str) -> Any:
+        resolved["account_id"] = account_id
+        return BuildiumAccountContext(
+            account_id=account_id,
+            metadata={"gl_mapping": {"code": "value"}},
+            api_secret="api-secret",
+            webhook_secret="hook-secret",
+        )
+
+    async def _run(self: Any) -> None:  # type: ignore[override]
+        resolved["parsed_body"] = self.verified_webhook.envelope.parsed_body
+        resolved["api_headers"] = dict(self.processing_context.api_headers)
+
+    monkeypatch.setattr(buildium_listener, "_resolve_task_account_context", _resolve)
+    monkeypatch.setattr(buildium_listener.BuildiumWebhookProcessor, "run", _run)
+
+    response = TestClient(buildium_listener.app).post("/tasks/buildium-webhook", json=payload)
+
+    assert response.status_code == 204
+    assert resolved["account_id"] == "acct-compact"
+    assert resolved["parsed_body"] == {"EventType": "TaskCreated", "TaskId": 202}
+    assert resolved["api_headers"]["X-Buildium-Account-Id"] == "acct-compact"
+
+
+def test_handle_buildium_webhook_task_rejects_forged_compact_payload(monkeypatch) -> None:
+    payloads = importlib.import_module("my_app.tasks.payloads")
+    arguments = dict(
+        account_id="acct-compact",
+        body=b'{"EventType": "TaskCreated", "TaskId": 202}',
+        content_type="application/json",
+        verification_scheme="hmac",
+        routing={"event_type": "TaskCreated"},
+    )
+    processed: List[str] = []
+
+    async def _resolve(account_id: str) -> Any:
+        return BuildiumAccountContext(
+            account_id=account_id, metadata={}, api_secret="api-secret", webhook_secret="hook-secret"
+        )
+
+    async def _run(self: Any) -> None:  # type: ignore[override]
+        processed.append(self.verified_webhook.account_id)
+
+    monkeypatch.setattr(buildium_listener, "_resolve_task_account_context", _resolve)
+    monkeypatch.setattr(buildium_listener.BuildiumWebhookProcessor, "run", _run)
+    client = TestClient(buildium_listener.app)
+
+    unsigned = payloads.encode_compact_task_payload(**arguments)
+    wrong_key = payloads.encode_compact_task_payload(**arguments, signing_secret="guessed")
+    tampered = payloads.encode_compact_task_payload(**arguments, signing_secret="hook-secret")
+    tampered["account_id"] = "acct-other"
+
+    for payload in (unsigned, wrong_key, tampered):
+        assert client.post("/tasks/buildium-webhook", json=payload).status_code == 401
+    assert processed == []
+
+
 def test_enqueue_buildium_webhook_uses_default_project_id(monkeypatch) -> None:
     verified_webhook = _make_verified_webhook()
 
@@ -871,6 +998,71 @@ def test_enqueue_buildium_webhook_uses_cloud_run_region(monkeypatch) -> None:
     assert client.requests, "Cloud Tasks request was not issued."
 
 
+def test_enqueue_buildium_webhook_async_uses_startup_settings(monkeypatch) -> None:
+    verified_webhook = _make_verified_webhook()
+
+    class _DummyClient:
+        def __init__(self) -> None:
+            self.queue_path_calls = 0
+            self.requests = []
+
+        def queue_path(self, project: str, location: str, queue: str) -> str:
+            self.queue_path_calls += 1
+            return f"projects/{project}/locations/{location}/queues/{queue}"
+
+        def create_task(self, request: Mapping[str, Any]) -> Mapping[str, str]:
+            self.requests.append(request)
+            return {"name": "tasks/async"}
+
+    client = _DummyClient()
+
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "startup-project")
+    monkeypatch.setenv("CLOUD_TASKS_QUEUE", "startup-queue")
+    monkeypatch.setenv("CLOUD_TASKS_LOCATION", "us-east1")
+    monkeypatch.setenv("TASK_HANDLER_URL", "https://startup.example.com/tasks/buildium-webhook")
+
+    settings = buildium_processor.configure_cloud_tasks_dispatch(client=client, max_workers=2)
+    try:
+        # Environment changes after startup must not affect the cached settings.
+        monkeypatch.setenv("CLOUD_TASKS_QUEUE", "changed-queue")
+
+        first = asyncio.run(buildium_processor.enqueue_buildium_webhook_async(verified_webhook))
+        second = asyncio.run(buildium_processor.enqueue_buildium_webhook_async(verified_webhook))
+    finally:
+        buildium_processor.shutdown_cloud_tasks_dispatch()
+
+    assert settings.queue_path == "projects/startup-project/locations/us-east1/queues/startup-queue"
+    assert first["name"] == second["name"] == "tasks/async"
+    assert client.queue_path_calls == 0
+    assert [request["parent"] for request in client.requests] == [settings.queue_path] * 2
+    assert buildium_processor._CLOUD_TASKS_SETTINGS is None
+
+
+def test_enqueue_buildium_webhook_reuses_process_wide_client(monkeypatch) -> None:
+    verified_webhook = _make_verified_webhook()
+    created = []
+
+    class _DummyClient:
+        def __init__(self) -> None:
+            created.append(self)
+
+        @staticmethod
+        def queue_path(project: str, location: str, queue: str) -> str:
+            return f"projects/{project}/locations/{location}/queues/{queue}"
+
+        def create_task(self, request: Mapping[str, Any]) -> Mapping[str, str]:
+            return {"name": "tasks/shared"}
+
+    monkeypatch.setattr(buildium_processor.tasks_v2, "CloudTasksClient", _DummyClient)
+    monkeypatch.setattr(buildium_processor, "_CLOUD_TASKS_CLIENT", None)
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+
+    buildium_processor.enqueue_buildium_webhook(verified_webhook)
+    buildium_processor.enqueue_buildium_webhook(verified_webhook)
+
+    assert len(created) == 1
+
+
 def test_handle_buildium_webhook_task_processes_payload(monkeypatch) -> None:
     verified_webhook = _make_verified_webhook()
     payload = buildium_processor._serialize_verified_webhook(verified_webhook)
@@ -893,3 +1085,317 @@ def test_handle_buildium_webhook_task_rejects_invalid_payload() -> None:
     test_client = TestClient(buildium_listener.app)
     response = test_client.post("/tasks/buildium-webhook", json={"invalid": True})
     assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    ("body", "expected"),
+    [
+        ({"EventType": "LeaseUpdated", "LeaseId": 7}, "event_not_routed"),
+        ({"EventType": "TaskCreated", "task": {"taskName": "Call tenant"}}, "task_not_routed"),
+        (
+            {"EventType": "TaskCreated", "task": {"taskName": "N1 Increase", "taskCategoryName": "General"}},
+            "category_not_automated",
+        ),
+        # The configured category id may not be cached yet; the processor decides.
+        ({"EventType": "TaskStatusChanged", "TaskId": 5}, None),
+        ({"EventType": "TaskStatusChanged", "task": {"taskCategoryId": "cat-other"}}, None),
+        ({"EventType": "TaskCreated", "TaskId": 5}, None),
+        ({"TaskId": 5}, None),
+        ({"EventType": "Task.Created", "task": {"taskName": "Ontario Automations Initiation"}}, None),
+    ],
+)
+def test_find_unroutable_reason_mirrors_routing_table(
+    body: Mapping[str, Any], expected: Optional[str]
+) -> None:
+    assert buildium_processor.find_unroutable_reason(body) == expected
+
+
+def test_prefilter_does_not_drop_tasks_of_a_newly_onboarded_account(monkeypatch) -> None:
+    def _profile(*_: Any, **__: Any) -> Any:
+        raise AssertionError("the pre-filter must not consult the cached account profile")
+
+    monkeypatch.setattr(buildium_processor, "get_account_profile", _profile)
+    verified = VerifiedBuildiumWebhook(
+        account_context=BuildiumAccountContext(
+            account_id="acct-new", metadata={}, api_secret="", webhook_secret="hook"
+        ),
+        account_id="acct-new",
+        envelope=buildium_listener.BuildiumWebhookEnvelope(
+            headers={},
+            body=b"",
+            parsed_body={
+                "EventType": "TaskCreated",
+                "task": {"taskName": "N1 Increase", "taskCategoryName": "Automated Tasks"},
+            },
+        ),
+        signature="sig",
+        verification_scheme="hmac",
+    )
+
+    assert buildium_processor.prefilter_verified_webhook(verified) is None
+
+
+def test_handle_buildium_webhook_drops_unroutable_events_before_enqueue(monkeypatch) -> None:
+    metrics = importlib.import_module("my_app.services.metrics")
+    idempotency = importlib.import_module("my_app.webhooks.idempotency")
+    metrics.reset()
+    dispatched: list[Any] = []
+
+    async def _fake_verify(envelope: Any, **_: Any) -> Any:
+        return VerifiedBuildiumWebhook(
+            account_context=BuildiumAccountContext(
+                account_id="acct-route",
+                metadata={"automated_tasks_category_id": _AUTOMATED_CATEGORY_ID},
+                api_secret="",
+                webhook_secret="hook",
+            ),
+            account_id="acct-route",
+            envelope=envelope,
+            signature="sig",
+            verification_scheme="hmac",
+        )
+
+    class _FakeDispatcher:
+        name = "fake"
+
+        async def dispatch(self, verified: Any, **_: Any) -> None:
+            dispatched.append(verified.envelope.parsed_body["Id"])
+
+    monkeypatch.setattr(buildium_listener, "verify_buildium_webhook", _fake_verify)
+    monkeypatch.setattr(buildium_listener, "_TASK_DISPATCHER", _FakeDispatcher())
+    monkeypatch.setattr(
+        buildium_listener,
+        "_IDEMPOTENCY_INDEX",
+        idempotency.WebhookIdempotencyIndex(local=idempotency.LocalSeenSet()),
+    )
+
+    test_client = TestClient(buildium_listener.app)
+    lease = test_client.post("/webhooks/buildium", content=b'{"Id": "evt-1", "EventType": "LeaseUpdated"}')
+    task = test_client.post(
+        "/webhooks/buildium", content=b'{"Id": "evt-2", "EventType": "TaskCreated", "TaskId": 9}'
+    )
+
+    assert (lease.status_code, task.status_code) == (200, 200)
+    assert dispatched == ["evt-2"]
+    assert metrics.get_counter(
+        buildium_processor.WEBHOOK_PREFILTERED_METRIC, reason="event_not_routed"
+    ) == 1
+
+    monkeypatch.setenv(buildium_processor.WEBHOOK_ROUTE_FILTER_ENV, "false")
+    test_client.post("/webhooks/buildium", content=b'{"Id": "evt-3", "EventType": "LeaseUpdated"}')
+    assert dispatched == ["evt-2", "evt-3"]
+
+
+def test_task_details_are_cached_until_a_newer_change_arrives(monkeypatch) -> None:
+    processor = _make_processor({}, metadata={"automated_tasks_category_id": _AUTOMATED_CATEGORY_ID})
+    mock_handler = Mock()
+    monkeypatch.setattr(
+        buildium_processor,
+        "_AUTOMATION_ROUTING_TABLE",
+        {
+            ("taskcreated", "n1increase"): mock_handler,
+            ("taskstatuschanged", "n1increase"): mock_handler,
+        },
+    )
+    stub, _ = _patch_tasks_api(
+        monkeypatch,
+        {
+            "Id": 515,
+            "Title": "N1 Increase",
+            "Status": "InProgress",
+            "Category": {
+                "taskCategoryName": "Automated Tasks",
+                "taskCategoryId": _AUTOMATED_CATEGORY_ID,
+            },
+        },
+    )
+
+    def _deliver(event_type: str, **fields: Any) -> None:
+        processor._perform_work(_base_payload({"EventName": event_type, "TaskId": 515, **fields}))
+
+    _deliver("TaskCreated", EventDateTime="2024-05-01T12:00:00.1234567Z")
+    _deliver("TaskCreated", EventDateTime="2024-05-01T12:00:00Z")
+    _deliver("TaskCreated")
+    assert stub.calls == [515]
+
+    _deliver("TaskStatusChanged", EventDateTime="2024-05-01T12:00:05Z")
+    assert stub.calls == [515, 515]
+    _deliver("TaskStatusChanged")
+    assert stub.calls == [515, 515, 515]
+
+    assert mock_handler.call_count == 5
+    assert mock_handler.call_args.kwargs["webhook"]["task"]["Status"] == "InProgress"
+
+
+def test_task_lookup_is_skipped_when_webhook_carries_routing_fields(monkeypatch, caplog) -> None:
+    processor = _make_processor({}, metadata={"automated_tasks_category_id": _AUTOMATED_CATEGORY_ID})
+    mock_handler = Mock()
+    monkeypatch.setattr(
+        buildium_processor,
+        "_AUTOMATION_ROUTING_TABLE",
+        {("taskstatuschanged", "n1increase"): mock_handler},
+    )
+    stub, _ = _patch_tasks_api(monkeypatch, {"Id": 616, "Title": "N1 Increase"})
+
+    task = {
+        "taskId": 616,
+        "taskName": "N1 Increase",
+        "taskCategoryName": "Automated Tasks",
+        "taskCategoryId": _AUTOMATED_CATEGORY_ID,
+        "status": "Completed",
+    }
+    with caplog.at_level(logging.INFO):
+        processor._perform_work(_base_payload({"eventType": "TaskStatusChanged", "task": task}))
+
+    assert stub.calls == []
+    mock_handler.assert_called_once()
+    assert mock_handler.call_args.kwargs["webhook"]["task"] == task
+    assert _find_log(caplog, _TASK_DETAILS_MESSAGE).task_data_source == "webhook"
+
+
+def test_task_detail_cache_expires_entries() -> None:
+    now = [0.0]
+    cache = buildium_processor.TaskDetailCache(ttl_seconds=30, clock=lambda: now[0])
+    cache.put("acct-1", 7, {"Title": "N1 Increase"}, changed_at=None)
+
+    assert cache.get("acct-1", 7, changed_at=None) == {"Title": "N1 Increase"}
+    assert cache.get("acct-1", 7, changed_at=None, allow_unversioned=False) is None
+    assert cache.get("acct-2", 7, changed_at=None) is None
+    now[0] = 30.0
+    assert cache.get("acct-1", 7, changed_at=None) is None
+    assert len(cache) == 0
+
+
+class _FakeAsyncTransport:
+    def __init__(self, response: Mapping[str, Any]) -> None:
+        self.response = response
+        self.paths: list[str] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_json(self, path: str, *, headers: Mapping[str, str], params: Any = None) -> Any:
+        self.paths.append(path)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.response
+
+    async def aclose(self) -> None:
+        return None
+
+
+def test_async_pipeline_awaits_handlers_and_uses_async_transport(monkeypatch) -> None:
+    buildium_async = importlib.import_module("my_app.services.buildium_async")
+    transport = _FakeAsyncTransport(
+        {
+            "Id": 1,
+            "Title": "N1 Increase",
+            "Category": {"taskCategoryName": "Automated Tasks", "taskCategoryId": _AUTOMATED_CATEGORY_ID},
+        }
+    )
+    monkeypatch.setattr(buildium_async, "_TRANSPORT", transport)
+    monkeypatch.setenv(buildium_processor.PROCESSOR_ASYNC_ENV, "true")
+
+    def _sdk_unused(api_headers: Mapping[str, Any]) -> None:
+        raise AssertionError("the async pipeline must not build the blocking SDK client")
+
+    monkeypatch.setattr(buildium_processor, "_build_tasks_api", _sdk_unused)
+
+    handled: list[str] = []
+
+    async def _async_handler(**kwargs: Any) -> None:
+        await asyncio.sleep(0.01)
+        handled.append(kwargs["webhook"]["task"]["Title"])
+
+    monkeypatch.setattr(
+        buildium_processor,
+        "_AUTOMATION_ROUTING_TABLE",
+        {("taskcreated", "n1increase"): _async_handler},
+    )
+
+    processors = [
+        _make_processor(
+            {"EventName": "TaskCreated", "TaskId": index},
+            metadata={"automated_tasks_category_id": _AUTOMATED_CATEGORY_ID},
+        )
+        for index in range(64)
+    ]
+
+    async def _run_all() -> None:
+        await asyncio.gather(*(processor.run() for processor in processors))
+
+    asyncio.run(_run_all())
+
+    assert len(handled) == 64
+    assert sorted(transport.paths) == sorted(f"tasks/{index}" for index in range(64))
+    # Every lookup was in flight at once; nothing waited on a thread pool slot.
+    assert transport.peak == 64
+
+
+def test_async_pipeline_adapts_sync_handlers_and_blocking_fallbacks(monkeypatch) -> None:
+    buildium_async = importlib.import_module("my_app.services.buildium_async")
+    monkeypatch.setattr(buildium_async, "_TRANSPORT", None)
+    monkeypatch.setattr(buildium_async, "_TRANSPORT_UNAVAILABLE", True)
+    monkeypatch.setattr(buildium_processor, "_has_completed_initiation", lambda account_id: False)
+
+    stub, _ = _patch_tasks_api(
+        monkeypatch,
+        {"Id": 77, "Title": "Ontario Automations Initiation", "Category": {"taskCategoryName": "General"}},
+    )
+    mock_handler = Mock()
+    monkeypatch.setattr(
+        buildium_processor,
+        "_AUTOMATION_ROUTING_TABLE",
+        {buildium_processor._INITIATION_AUTOMATION_KEY: mock_handler},
+    )
+
+    processor = _make_processor({}, metadata={"automated_tasks_category_id": _AUTOMATED_CATEGORY_ID})
+    asyncio.run(
+        processor._perform_work_async(_base_payload({"eventType": "TaskCreated", "taskId": 77}))
+    )
+
+    assert stub.calls == [77]
+    mock_handler.assert_called_once()
+    assert mock_handler.call_args.kwargs["account_id"] == "acct-123"
+
+
+def test_async_pipeline_awaits_the_async_variant_of_a_sync_handler(monkeypatch) -> None:
+    variants = buildium_processor._ASYNC_HANDLER_VARIANTS
+    assert (
+        variants[buildium_processor.handle_n1_increase_automation]
+        is buildium_processor.handle_n1_increase_automation_async
+    )
+
+    buildium_async = importlib.import_module("my_app.services.buildium_async")
+    monkeypatch.setattr(
+        buildium_async,
+        "_TRANSPORT",
+        _FakeAsyncTransport(
+            {
+                "Id": 5,
+                "Title": "N1 Increase",
+                "Category": {"taskCategoryName": "Automated Tasks", "taskCategoryId": _AUTOMATED_CATEGORY_ID},
+            }
+        ),
+    )
+    sync_handler = Mock()
+    handled: list[str] = []
+
+    async def _async_variant(**kwargs: Any) -> None:
+        handled.append(kwargs["account_id"])
+
+    monkeypatch.setattr(
+        buildium_processor,
+        "_AUTOMATION_ROUTING_TABLE",
+        {("taskcreated", "n1increase"): sync_handler},
+    )
+    monkeypatch.setattr(buildium_processor, "_ASYNC_HANDLER_VARIANTS", {sync_handler: _async_variant})
+
+    processor = _make_processor({}, metadata={"automated_tasks_category_id": _AUTOMATED_CATEGORY_ID})
+    asyncio.run(
+        processor._perform_work_async(_base_payload({"eventType": "TaskCreated", "taskId": 5}))
+    )
+
+    assert handled == ["acct-123"]
+    sync_handler.assert_not_called()
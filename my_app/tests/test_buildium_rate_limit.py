@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import importlib
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+rate_limit = importlib.import_module("my_app.services.buildium_rate_limit")
+metrics = importlib.import_module("my_app.services.metrics")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def _reset_limiter() -> Any:
+    metrics.reset()
+    yield
+    rate_limit.configure_buildium_rate_limiter(None)
+
+
+def _limiter(clock: FakeClock, **kwargs: Any) -> Any:
+    return rate_limit.BuildiumRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_local_bucket_limits_each_account_independently() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=2, burst=2)
+
+    assert [limiter.reserve("acct-1") for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve("acct-1") == pytest.approx(0.5)
+    assert limiter.reserve("acct-2") == 0.0
+
+    assert limiter.acquire("acct-1") == pytest.approx(0.5)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_shared_tier_caps_the_combined_rate_of_several_instances() -> None:
+    clock = FakeClock()
+    store = rate_limit.LocalRateLimitStore()
+    first = _limiter(clock, rate=1, burst=4, shared=store, lease_size=2)
+    second = _limiter(clock, rate=1, burst=4, shared=store, lease_size=2)
+
+    granted = [first.reserve("acct-1") for _ in range(2)] + [
+        second.reserve("acct-1") for _ in range(2)
+    ]
+    assert granted == [0.0] * 4
+    assert first.reserve("acct-1") == pytest.approx(1.0)
+    assert second.reserve("acct-1") == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert second.reserve("acct-1") == 0.0
+
+
+def test_shared_tier_failure_falls_back_to_local_tier() -> None:
+    class BrokenStore:
+        def take(self, *_: Any, **__: Any) -> Any:
+            raise RuntimeError("firestore unavailable")
+
+        def block(self, *_: Any, **__: Any) -> None:
+            raise RuntimeError("firestore unavailable")
+
+    limiter = _limiter(FakeClock(), rate=1, shared=BrokenStore())
+
+    assert limiter.reserve("acct-1") == 0.0
+    limiter.penalize("acct-1", 2)
+    assert metrics.get_counter(rate_limit.RATE_LIMIT_SHARED_ERRORS_METRIC) == 2
+
+
+def test_generated_client_requests_are_rate_limited() -> None:
+    clock = FakeClock()
+    rate_limit.configure_buildium_rate_limiter(_limiter(clock, rate=1, burst=1))
+    statuses = [429, 200]
+
+    def request(method: str, url: str, **_: Any) -> Any:
+        return SimpleNamespace(
+            status=statuses.pop(0), getheader=lambda name, default=None: "2"
+        )
+
+    api_client = SimpleNamespace(
+        rest_client=SimpleNamespace(request=request),
+        default_headers={"X-Buildium-Account-Id": "acct-9"},
+    )
+    rate_limit.rate_limit_api_client(api_client)
+
+    assert api_client.rest_client.request("GET", "https://api.buildium.com/v1/tasks/1").status == 200
+    assert clock.sleeps == [pytest.approx(2.0)]
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates() -> None:
+    assert rate_limit.parse_retry_after("5") == 5.0
+    assert rate_limit.parse_retry_after(None) is None
+    assert rate_limit.parse_retry_after(
+        "Wed, 21 Oct 2015 07:28:05 GMT", now=1445412480.0
+    ) == pytest.approx(5.0)
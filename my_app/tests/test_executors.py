@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import threading
+from typing import Any, List
+
+import pytest
+
+executors = importlib.import_module("my_app.services.executors")
+metrics = importlib.import_module("my_app.services.metrics")
+buildium_processor = importlib.import_module("my_app.tasks.buildium_processor")
+
+
+@pytest.fixture(autouse=True)
+def _reset_executors(monkeypatch: pytest.MonkeyPatch) -> Any:
+    for env_name in executors.EXECUTOR_WORKERS_ENV.values():
+        monkeypatch.setenv(env_name, "1")
+    monkeypatch.setenv(executors.EXECUTOR_CPU_MODE_ENV, "thread")
+    executors.shutdown_workload_executors()
+    metrics.reset()
+    yield
+    executors.shutdown_workload_executors()
+
+
+def test_pool_reports_queue_depth_and_wait_time() -> None:
+    pool = executors.get_workload_executor(executors.WORKLOAD_BUILDIUM_IO)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker() -> str:
+        started.set()
+        release.wait(5)
+        return "done"
+
+    futures = [pool.submit(blocker) for _ in range(3)]
+    assert started.wait(5)
+
+    stats = executors.workload_executor_stats()["buildium_io"]
+    assert (stats["kind"], stats["in_flight"], stats["queue_depth"]) == ("thread", 1, 2)
+    assert metrics.get_gauge(executors.EXECUTOR_QUEUE_DEPTH_METRIC, workload="buildium_io") == 2
+
+    release.set()
+    assert [future.result(5)[1] for future in futures] == ["done"] * 3
+
+    stats = pool.stats()
+    assert (stats["in_flight"], stats["queue_depth"], stats["completed"]) == (0, 0, 3)
+    assert stats["wait_seconds_max"] > 0
+    assert metrics.get_counter(
+        executors.EXECUTOR_TASKS_METRIC, workload="buildium_io", result="ok"
+    ) == 3
+    assert metrics.get_counter(
+        executors.EXECUTOR_WAIT_SECONDS_METRIC, workload="buildium_io"
+    ) == pytest.approx(stats["wait_seconds_total"], abs=1e-5)
+
+
+def test_saturated_buildium_pool_does_not_delay_google_io() -> None:
+    release = threading.Event()
+
+    async def scenario() -> str:
+        busy = asyncio.ensure_future(
+            executors.run_in_workload(executors.WORKLOAD_BUILDIUM_IO, release.wait, 5)
+        )
+        queued = asyncio.ensure_future(
+            executors.run_in_workload(executors.WORKLOAD_BUILDIUM_IO, lambda: "late")
+        )
+        resolved = await asyncio.wait_for(
+            executors.run_in_workload(executors.WORKLOAD_GOOGLE_IO, lambda: "account"), 2
+        )
+        assert not queued.done()
+        release.set()
+        await asyncio.gather(busy, queued)
+        return resolved
+
+    assert asyncio.run(scenario()) == "account"
+
+
+def test_nested_call_on_the_same_pool_runs_inline() -> None:
+    def outer() -> List[str]:
+        inner_thread = executors.call_in_workload(
+            executors.WORKLOAD_CPU, lambda: threading.current_thread().name
+        )
+        return [threading.current_thread().name, inner_thread]
+
+    outer_thread, inner_thread = executors.call_in_workload(executors.WORKLOAD_CPU, outer)
+
+    assert outer_thread == inner_thread
+    assert outer_thread.startswith("workload-cpu")
+
+
+def test_map_in_workload_runs_calls_side_by_side(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(executors.EXECUTOR_WORKERS_ENV[executors.WORKLOAD_CPU], "2")
+    # Both calls must be running at once for the barrier to open.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def render(*, label: str) -> str:
+        barrier.wait()
+        return label.upper()
+
+    results = executors.map_in_workload(
+        executors.WORKLOAD_CPU, render, [{"label": "a"}, {"label": "b"}]
+    )
+
+    assert results == ["A", "B"]
+
+
+def test_unknown_workload_class_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        executors.get_workload_executor("gpu")
+
+
+def test_sync_handlers_run_on_the_declared_workload_pool() -> None:
+    seen: List[str] = []
+
+    def handler(**_: Any) -> None:
+        seen.append(threading.current_thread().name)
+
+    asyncio.run(
+        buildium_processor._call_automation_handler(
+            handler, {"account_id": "acct-1"}, workload=executors.WORKLOAD_GOOGLE_IO
+        )
+    )
+
+    assert seen and seen[0].startswith("workload-google_io")
+    assert buildium_processor._select_automation_workload(
+        event_key="taskcreated", task_key="n1increase"
+    ) == executors.WORKLOAD_BUILDIUM_IO
+
+
+def test_routing_entries_declare_their_workload(monkeypatch: pytest.MonkeyPatch) -> None:
+    def handler(**_: Any) -> None:
+        return None
+
+    monkeypatch.setattr(
+        buildium_processor,
+        "_AUTOMATION_ROUTING_TABLE",
+        {
+            ("taskcreated", "render"): buildium_processor._AutomationEntry(
+                handler, executors.WORKLOAD_CPU
+            ),
+            ("taskcreated", "plain"): handler,
+        },
+    )
+
+    assert buildium_processor._select_automation_workload(
+        event_key="taskcreated", task_key="render"
+    ) == executors.WORKLOAD_CPU
+    assert buildium_processor._select_automation_workload(
+        event_key="taskcreated", task_key="plain"
+    ) == executors.WORKLOAD_BUILDIUM_IO
+    assert buildium_processor._select_automation_handler(
+        event_type="TaskCreated", task_name="Render"
+    ) is handler
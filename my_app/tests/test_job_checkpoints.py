@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+checkpoints = importlib.import_module("my_app.jobs.checkpoints")
+processor = importlib.import_module("my_app.jobs.processor")
+account_context = importlib.import_module("my_app.services.account_context")
+
+
+class FakeProcessor:
+    def __init__(self, verified: Any) -> None:
+        self.processing_context = processor.BuildiumProcessingContext(
+            api_headers={"Authorization": "Bearer job"},
+            gl_mapping={},
+        )
+
+
+@pytest.fixture(autouse=True)
+def _patch_processor(monkeypatch: pytest.MonkeyPatch) -> List[List[str]]:
+    loaded: List[List[str]] = []
+
+    def fake_contexts(account_ids: List[str], **_: Any) -> Any:
+        loaded.append(list(account_ids))
+        return account_context.BuildiumAccountContextBatch(
+            contexts={
+                account_id: SimpleNamespace(account_id=account_id, metadata={}, api_secret="{}")
+                for account_id in account_ids
+            },
+            errors={},
+        )
+
+    monkeypatch.setattr(processor, "BuildiumWebhookProcessor", FakeProcessor)
+    monkeypatch.setattr(processor, "get_buildium_account_contexts", fake_contexts)
+    return loaded
+
+
+def test_file_store_round_trips_and_tolerates_torn_lines(tmp_path: Path) -> None:
+    store = checkpoints.FileCheckpointStore(str(tmp_path))
+    store.record("run/1", "acct-1", "initiation")
+    store.record("run/1", "acct-2", "n1increase")
+    with (tmp_path / "run%2F1.jsonl").open("a", encoding="utf-8") as handle:
+        handle.write('{"account_id": "acct-3", "autom')
+
+    assert store.load("run/1") == {("acct-1", "initiation"), ("acct-2", "n1increase")}
+    assert store.load("other") == set()
+
+
+def test_resumed_run_skips_completed_pairs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, _patch_processor: List[List[str]]
+) -> None:
+    calls: List[Dict[str, Any]] = []
+
+    def initiation(**kwargs: Any) -> None:
+        calls.append({"automation": "initiation", "account_id": kwargs["account_id"]})
+
+    def n1(**kwargs: Any) -> None:
+        if kwargs["account_id"] == "acct-2" and not calls_allowed["acct-2"]:
+            raise RuntimeError("crash")
+        calls.append({"automation": "n1increase", "account_id": kwargs["account_id"]})
+
+    calls_allowed = {"acct-2": False}
+    monkeypatch.setitem(processor._AUTOMATION_REGISTRY["initiation"], "handler", initiation)
+    monkeypatch.setitem(processor._AUTOMATION_REGISTRY["n1increase"], "handler", n1)
+
+    store = checkpoints.FileCheckpointStore(str(tmp_path))
+    clients = {
+        "firestore_client": SimpleNamespace(name="firestore"),
+        "secret_manager_client": SimpleNamespace(name="secrets"),
+    }
+
+    first = processor.JobSummary()
+    processor.run_job(
+        account_ids=["acct-1", "acct-2"],
+        checkpoint=checkpoints.JobCheckpoint(store, "run-1"),
+        summary=first,
+        **clients,
+    )
+    assert first.as_dict() == {"handled": 3, "failed": 1, "skipped": 0, "resumed": 0}
+
+    calls.clear()
+    _patch_processor.clear()
+    calls_allowed["acct-2"] = True
+    second = processor.JobSummary()
+    processor.run_job(
+        account_ids=["acct-1", "acct-2"],
+        checkpoint=checkpoints.JobCheckpoint(store, "run-1"),
+        summary=second,
+        **clients,
+    )
+
+    assert calls == [{"automation": "n1increase", "account_id": "acct-2"}]
+    assert _patch_processor == [["acct-2"]]
+    assert second.as_dict() == {"handled": 1, "failed": 0, "skipped": 0, "resumed": 3}
+
+
+def test_firestore_store_writes_one_document_per_pair() -> None:
+    documents: Dict[str, Dict[str, Any]] = {}
+
+    class _Completed:
+        def __init__(self, prefix: str) -> None:
+            self._prefix = prefix
+
+        def document(self, document_id: str) -> Any:
+            path = f"{self._prefix}/{document_id}"
+            return SimpleNamespace(set=lambda data: documents.__setitem__(path, dict(data)))
+
+        def stream(self) -> Any:
+            return [
+                SimpleNamespace(to_dict=lambda data=data: data)
+                for path, data in documents.items()
+                if path.startswith(self._prefix + "/")
+            ]
+
+    class _Client:
+        def collection(self, path: str) -> Any:
+            assert path == checkpoints.CHECKPOINTS_COLLECTION_PATH
+            return SimpleNamespace(
+                document=lambda run_id: SimpleNamespace(
+                    collection=lambda name: _Completed(f"{path}/{run_id}/{name}")
+                )
+            )
+
+    store = checkpoints.FirestoreCheckpointStore(firestore_client=_Client())
+    store.record("exec-1", "acct-1", "initiation")
+    store.record("exec-1", "acct-1", "initiation")
+    store.record("exec-2", "acct-9", "n1increase")
+
+    assert list(documents) == [
+        "buildium_job_checkpoints/exec-1/completed/acct-1%3Ainitiation",
+        "buildium_job_checkpoints/exec-2/completed/acct-9%3An1increase",
+    ]
+    assert store.load("exec-1") == {("acct-1", "initiation")}
+
+
+def test_resume_requires_a_checkpoint_store(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(processor, "firestore", SimpleNamespace(Client=lambda **_: None))
+    monkeypatch.setattr(processor, "secretmanager", SimpleNamespace(SecretManagerServiceClient=lambda: None))
+
+    with pytest.raises(SystemExit):
+        processor.main(["--account", "acct-1", "--resume", "run-1"])
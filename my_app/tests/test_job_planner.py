@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import importlib
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping
+
+import pytest
+
+planner = importlib.import_module("my_app.jobs.planner")
+processor = importlib.import_module("my_app.jobs.processor")
+account_context = importlib.import_module("my_app.services.account_context")
+
+
+def _context(account_id: str) -> Any:
+    return account_context.BuildiumAccountContext(
+        account_id=account_id,
+        metadata={"api_secret_name": "projects/p/secrets/api/versions/1"},
+        api_secret='{"access_token": "token"}',
+        webhook_secret="hook",
+    )
+
+
+class FakeLeaseAPI:
+    def __init__(self, leases: List[Mapping[str, Any]]) -> None:
+        self._leases = leases
+        self.calls = 0
+
+    def list_eligible_leases(self) -> List[Mapping[str, Any]]:
+        self.calls += 1
+        return self._leases
+
+
+class FakeFirestoreClient:
+    def __init__(self, documents: Dict[str, Mapping[str, Any]]) -> None:
+        self._documents = documents
+
+    def collection(self, _path: str) -> Any:
+        return self
+
+    def document(self, account_id: str) -> Any:
+        data = self._documents.get(account_id)
+        return SimpleNamespace(
+            get=lambda: SimpleNamespace(exists=data is not None, to_dict=lambda: data)
+        )
+
+
+@pytest.fixture(autouse=True)
+def _patch_contexts(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fake_contexts(account_ids: List[str], **_: Any) -> Any:
+        return account_context.BuildiumAccountContextBatch(
+            contexts={
+                account_id: _context(account_id)
+                for account_id in account_ids
+                if account_id != "acct-missing"
+            },
+            errors={"acct-missing": Exception("Buildium account was not found.")}
+            if "acct-missing" in account_ids
+            else {},
+        )
+
+    monkeypatch.setattr(planner, "get_buildium_account_contexts", fake_contexts)
+
+
+def test_task_created_plan_projects_per_lease_fan_out() -> None:
+    apis: List[FakeLeaseAPI] = []
+
+    def api_factory(headers: Mapping[str, str]) -> FakeLeaseAPI:
+        assert headers["Authorization"] == "Bearer token"
+        api = FakeLeaseAPI(
+            [
+                {"id": 1, "property": {"id": 10}},
+                {"id": 2, "property": {"id": 10}},
+                {"id": 3, "propertyId": 11},
+            ]
+        )
+        apis.append(api)
+        return api
+
+    plan = planner.plan_job(
+        account_ids=["acct-1", "acct-missing"],
+        automations=["initiation", "n1increase"],
+        event_type="TaskCreated",
+        status=None,
+        firestore_client=FakeFirestoreClient({}),
+        secret_manager_client=None,
+        requests_per_second=4,
+        api_factory=api_factory,
+    )
+    result = plan.as_dict()
+
+    n1 = next(pair for pair in result["pairs"] if pair["automation"] == "n1increase")
+    assert n1["basis"] == {"leases": 3, "properties": 2}
+    assert n1["buildium_calls"] == planner.N1_PREPARE_FIXED_CALLS + 1 + 3 * planner.N1_CALLS_PER_LEASE
+    assert result["total"] == {
+        "buildium_calls": n1["buildium_calls"] + planner.INITIATION_CALLS,
+        "firestore_reads": 2,
+        "firestore_writes": 2,
+        "pdf_renders": 1,
+    }
+    assert result["projected_seconds"] == round(result["total"]["buildium_calls"] / 4, 1)
+    assert result["planning_buildium_calls"] == 1
+    assert [api.calls for api in apis] == [1]
+    assert result["unavailable"] == {"acct-missing": "Buildium account was not found."}
+
+
+def test_task_created_plan_counts_one_listing_call_per_lease_page() -> None:
+    leases = [{"id": index, "propertyId": index % 7} for index in range(2_500)]
+
+    plan = planner.plan_job(
+        account_ids=["acct-1"],
+        automations=["n1increase"],
+        event_type="TaskCreated",
+        status=None,
+        firestore_client=FakeFirestoreClient({}),
+        secret_manager_client=None,
+        requests_per_second=4,
+        api_factory=lambda headers: FakeLeaseAPI(leases),
+    )
+    result = plan.as_dict()
+
+    # 2,500 leases are listed in three pages of 1,000.
+    assert result["pairs"][0]["buildium_calls"] == (
+        planner.N1_PREPARE_FIXED_CALLS + 3 + 2_500 * planner.N1_CALLS_PER_LEASE
+    )
+    assert result["planning_buildium_calls"] == 3
+
+
+def test_completion_plan_reads_prepared_schedules() -> None:
+    document = {
+        "n1_increase": {
+            "schedules": [
+                {"lease_id": "1", "property_id": "10", "is_extended": True},
+                {"lease_id": "2", "property_id": "10"},
+                {"lease_id": "3", "property_id": "11"},
+                {"lease_id": "4", "property_id": "12"},
+            ],
+            "ignored_leases": ["4"],
+            "lease_renewals": {"2": {"term": "12"}},
+            "summary_files": {"excel": "", "pdf": ""},
+            "automated_tasks_category_id": "77",
+        }
+    }
+
+    def api_factory(_headers: Mapping[str, str]) -> Any:
+        raise AssertionError("completion planning should not call Buildium")
+
+    plan = planner.plan_job(
+        account_ids=["acct-1", "acct-empty"],
+        automations=["initiation", "n1increase"],
+        event_type="taskstatuschanged",
+        status=None,
+        firestore_client=FakeFirestoreClient({"acct-1": document}),
+        secret_manager_client=None,
+        api_factory=api_factory,
+    )
+    pairs = {pair.account_id: pair for pair in plan.pairs}
+
+    assert pairs["acct-1"].basis == {"leases": 3, "properties": 2, "extended": 1, "renewals": 1}
+    # 2 per lease, 1 extension, 1 renewal, 2 summary uploads, 2 property tasks.
+    assert pairs["acct-1"].estimate.as_dict() == {
+        "buildium_calls": 12,
+        "firestore_reads": 1,
+        "firestore_writes": 1,
+        "pdf_renders": 3,
+    }
+    assert pairs["acct-empty"].estimate.buildium_calls == 0
+    assert plan.planning_calls == 0
+
+
+def test_main_plan_prints_projection_without_running(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(
+        processor,
+        "firestore",
+        SimpleNamespace(Client=lambda *, database: SimpleNamespace(name="firestore")),
+    )
+    monkeypatch.setattr(
+        processor,
+        "secretmanager",
+        SimpleNamespace(SecretManagerServiceClient=lambda: SimpleNamespace(name="secrets")),
+    )
+
+    def fail_run_job(**_: Any) -> int:
+        raise AssertionError("--plan must not run automations")
+
+    recorded: Dict[str, Any] = {}
+
+    def fake_plan_job(**kwargs: Any) -> Any:
+        recorded["account_ids"] = list(kwargs["account_ids"])
+        recorded["automations"] = kwargs["automations"]
+        recorded["requests_per_second"] = kwargs["requests_per_second"]
+        return planner.JobPlan(event_type="taskcreated", requests_per_second=2.0)
+
+    monkeypatch.setattr(processor, "run_job", fail_run_job)
+    monkeypatch.setattr(processor, "plan_job", fake_plan_job)
+
+    assert processor.main(
+        ["--account", "acct-1", "--plan", "--plan-requests-per-second", "2"]
+    ) == 0
+
+    assert recorded == {
+        "account_ids": ["acct-1"],
+        "automations": ["initiation", "n1increase"],
+        "requests_per_second": 2.0,
+    }
+    assert json.loads(capsys.readouterr().out)["total"]["buildium_calls"] == 0
@@ -9,6 +9,7 @@ import pytest
 
 
 processor = importlib.import_module("my_app.jobs.processor")
+account_context = importlib.import_module("my_app.services.account_context")
 
 
 class FakeProcessor:
@@ -53,8 +54,11 @@ def test_run_job_invokes_registered_handlers(monkeypatch: pytest.MonkeyPatch) ->
         )
     }
 
-    def fake_context(account_id: str, **_: Any) -> Any:
-        return contexts[account_id]
+    def fake_contexts(account_ids: List[str], **_: Any) -> Any:
+        return account_context.BuildiumAccountContextBatch(
+            contexts={account_id: contexts[account_id] for account_id in account_ids},
+            errors={},
+        )
 
     initiation_calls: List[Dict[str, Any]] = []
     n1_calls: List[Dict[str, Any]] = []
@@ -65,7 +69,7 @@ def test_run_job_invokes_registered_handlers(monkeypatch: pytest.MonkeyPatch) ->
     def fake_n1(**kwargs: Any) -> None:
         n1_calls.append(kwargs)
 
-    monkeypatch.setattr(processor, "get_buildium_account_context", fake_context)
+    monkeypatch.setattr(processor, "get_buildium_account_contexts", fake_contexts)
     monkeypatch.setitem(
         processor._AUTOMATION_REGISTRY["initiation"], "handler", fake_initiation
     )
@@ -102,15 +106,18 @@ def test_run_job_supports_status_transition(monkeypatch: pytest.MonkeyPatch) ->
         )
     }
 
-    def fake_context(account_id: str, **_: Any) -> Any:
-        return contexts[account_id]
+    def fake_contexts(account_ids: List[str], **_: Any) -> Any:
+        return account_context.BuildiumAccountContextBatch(
+            contexts={account_id: contexts[account_id] for account_id in account_ids},
+            errors={},
+        )
 
     recorded: List[Dict[str, Any]] = []
 
     def fake_n1(**kwargs: Any) -> None:
         recorded.append(kwargs)
 
-    monkeypatch.setattr(processor, "get_buildium_account_context", fake_context)
+    monkeypatch.setattr(processor, "get_buildium_account_contexts", fake_contexts)
     monkeypatch.setitem(
         processor._AUTOMATION_REGISTRY["n1increase"], "handler", fake_n1
     )
@@ -163,6 +170,7 @@ def test_main_invokes_run_job(monkeypatch: pytest.MonkeyPatch) -> None:
 
     def fake_run_job(**kwargs: Any) -> int:
         recorded.update(kwargs)
+        recorded["account_ids"] = list(kwargs["account_ids"])
         return 7
 
     monkeypatch.setattr(processor, "run_job", fake_run_job)
@@ -184,3 +192,134 @@ def test_main_invokes_run_job(monkeypatch: pytest.MonkeyPatch) -> None:
     assert recorded["firestore_client"] is firestore_client
     assert recorded["secret_manager_client"] is secret_client
     assert recorded_client_args["database"] == processor.BUILDUM_FIRESTORE_DATABASE
+
+
+def test_main_exits_non_zero_when_handlers_fail(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(processor, "firestore", SimpleNamespace(Client=lambda **_: None))
+    monkeypatch.setattr(processor, "secretmanager", SimpleNamespace(SecretManagerServiceClient=lambda: None))
+
+    def fake_run_job(**kwargs: Any) -> int:
+        list(kwargs["account_ids"])
+        kwargs["summary"].handled += 1
+        kwargs["summary"].failed += 1
+        return 2
+
+    monkeypatch.setattr(processor, "run_job", fake_run_job)
+
+    assert processor.main(["--account", "acct-1", "--account", "acct-2"]) == 1
+
+
+def test_run_job_streams_accounts_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    loaded_chunks: List[List[str]] = []
+    enumerated: List[str] = []
+
+    def fake_contexts(account_ids: List[str], **_: Any) -> Any:
+        loaded_chunks.append(list(account_ids))
+        # The next chunk has not been enumerated while this one is loading.
+        assert len(enumerated) == sum(len(chunk) for chunk in loaded_chunks)
+        return account_context.BuildiumAccountContextBatch(
+            contexts={
+                account_id: SimpleNamespace(account_id=account_id, metadata={}, api_secret="{}")
+                for account_id in account_ids
+            },
+            errors={},
+        )
+
+    def account_stream():
+        for index in range(5):
+            enumerated.append(f"acct-{index}")
+            yield f"acct-{index}"
+
+    monkeypatch.setattr(processor, "get_buildium_account_contexts", fake_contexts)
+    monkeypatch.setattr(processor, "_ACCOUNT_LOAD_CHUNK_SIZE", 2)
+    monkeypatch.setitem(processor._AUTOMATION_REGISTRY["n1increase"], "handler", lambda **_: None)
+
+    processed = processor.run_job(
+        account_ids=account_stream(),
+        automations=["n1increase"],
+        firestore_client=SimpleNamespace(name="firestore"),
+        secret_manager_client=SimpleNamespace(name="secrets"),
+    )
+
+    assert processed == 5
+    assert loaded_chunks == [["acct-0", "acct-1"], ["acct-2", "acct-3"], ["acct-4"]]
+
+
+def test_run_job_runs_accounts_concurrently_and_summarizes(monkeypatch: pytest.MonkeyPatch) -> None:
+    import threading
+    from fastapi import HTTPException
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_contexts(account_ids: List[str], **_: Any) -> Any:
+        return account_context.BuildiumAccountContextBatch(
+            contexts={
+                account_id: SimpleNamespace(account_id=account_id, metadata={}, api_secret="{}")
+                for account_id in account_ids
+                if account_id != "acct-bad"
+            },
+            errors={"acct-bad": HTTPException(status_code=404)} if "acct-bad" in account_ids else {},
+        )
+
+    def fake_n1(*, account_id: str, **_: Any) -> None:
+        # Three accounts must be in their handlers at once for the barrier to release.
+        barrier.wait()
+        if account_id == "acct-2":
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(processor, "get_buildium_account_contexts", fake_contexts)
+    monkeypatch.setitem(processor._AUTOMATION_REGISTRY["n1increase"], "handler", fake_n1)
+
+    summary = processor.JobSummary()
+    processed = processor.run_job(
+        account_ids=["acct-1", "acct-2", "acct-3", "acct-bad"],
+        automations=["n1increase"],
+        firestore_client=SimpleNamespace(name="firestore"),
+        secret_manager_client=SimpleNamespace(name="secrets"),
+        concurrency=3,
+        summary=summary,
+    )
+
+    assert processed == 2
+    assert summary.as_dict() == {"handled": 2, "failed": 1, "skipped": 1, "resumed": 0}
+
+
+def test_shards_partition_accounts_stably() -> None:
+    account_ids = [f"acct-{index}" for index in range(200)]
+
+    shards = [list(processor._select_shard(account_ids, index, 4)) for index in range(4)]
+
+    assert sorted(sum(shards, [])) == sorted(account_ids)
+    assert all(shards)
+    assert shards == [list(processor._select_shard(account_ids, index, 4)) for index in range(4)]
+
+
+def test_main_processes_only_its_task_shard(monkeypatch: pytest.MonkeyPatch) -> None:
+    account_ids = [f"acct-{index}" for index in range(20)]
+    monkeypatch.setenv("CLOUD_RUN_TASK_INDEX", "1")
+    monkeypatch.setenv("CLOUD_RUN_TASK_COUNT", "3")
+    monkeypatch.setattr(
+        processor,
+        "firestore",
+        SimpleNamespace(Client=lambda *, database: FakeFirestoreClient(account_ids)),
+    )
+    monkeypatch.setattr(
+        processor,
+        "secretmanager",
+        SimpleNamespace(SecretManagerServiceClient=lambda: SimpleNamespace(name="secrets")),
+    )
+
+    recorded: Dict[str, Any] = {}
+
+    def fake_run_job(**kwargs: Any) -> int:
+        recorded["account_ids"] = list(kwargs["account_ids"])
+        recorded["concurrency"] = kwargs["concurrency"]
+        return 0
+
+    monkeypatch.setattr(processor, "run_job", fake_run_job)
+
+    assert processor.main(["--all-accounts", "--concurrency", "4"]) == 0
+    assert recorded["account_ids"] == [
+        account_id for account_id in account_ids if processor._shard_of(account_id, 3) == 1
+    ]
+    assert recorded["concurrency"] == 4
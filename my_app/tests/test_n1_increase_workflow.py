@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 from collections import defaultdict
 from io import BytesIO
@@ -65,6 +66,28 @@ class FakeFirestore:
         return self.collection_instance
 
 
+class FakeAsyncDocument:
+    def __init__(self, document: FakeDocument) -> None:
+        self._document = document
+
+    async def get(self) -> Any:
+        return self._document.get()
+
+    async def set(self, data: Mapping[str, Any], merge: bool = False) -> None:
+        self._document.set(data, merge=merge)
+
+
+class FakeAsyncFirestore:
+    def __init__(self, firestore: FakeFirestore) -> None:
+        self._firestore = firestore
+
+    def collection(self, path: str) -> Any:
+        collection = self._firestore.collection(path)
+        return SimpleNamespace(
+            document=lambda document_id: FakeAsyncDocument(collection.document(document_id))
+        )
+
+
 class FakeBuildiumAPI:
     def __init__(self) -> None:
         self.leases: List[Mapping[str, Any]] = [
@@ -350,6 +373,116 @@ def test_handle_n1_creation_persists_schedules(monkeypatch) -> None:
     assert decoded_entries[0]["recurring_transactions"][0]["amount"] == "1200.00"
 
 
+class FakeAsyncBuildiumTransport:
+    """Answers async transport requests from a :class:`FakeBuildiumAPI`."""
+
+    def __init__(self, api: "FakeBuildiumAPI") -> None:
+        self.api = api
+        self.paths: List[str] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_json(
+        self, path: str, *, headers: Mapping[str, str], params: Optional[Mapping[str, Any]] = None
+    ) -> Any:
+        self.paths.append(path)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        params = dict(params or {})
+        parts = path.split("/")
+        if path == "leases":
+            offset, limit = int(params["offset"]), int(params["limit"])
+            return self.api.leases[offset : offset + limit]
+        if path == "rentcontrols/ontario":
+            return self.api.get_ontario_increase_rates()
+        if path == "reports/marketrent":
+            return self.api.get_market_rent(property_id=params["propertyId"], unit_id=params["unitId"])
+        if parts[0] == "leases" and parts[2] == "notes":
+            return {"items": self.api.list_lease_notes(parts[1])}
+        if parts[0] == "properties":
+            return self.api.list_building_notes(parts[1])
+        if parts[2] == "recurringtransactions":
+            return self.api.list_recurring_transactions(parts[1])
+        if parts[2] == "abovetheguidelineincrease":
+            return self.api.get_above_guideline_increase(lease_id=parts[1])
+        if parts[0] == "documents":
+            return self.api.get_presigned_download(parts[1])
+        raise AssertionError(f"unexpected Buildium path {path}")
+
+    async def aclose(self) -> None:
+        return None
+
+
+def test_async_n1_creation_prepares_on_the_event_loop(monkeypatch) -> None:
+    buildium_async = importlib.import_module("my_app.services.buildium_async")
+    api = FakeBuildiumAPI()
+    api.agi_summaries["lease-2"] = {"percent": "1.5", "documentId": "doc-1"}
+    api.presigned_urls["doc-1"] = {"url": "https://files.example/doc-1"}
+    api.downloaded_files["https://files.example/doc-1"] = b"agi-order"
+    initial = {"acct-1": {"automated_tasks_category_id": "cat-1"}}
+
+    sync_firestore = FakeFirestore(initial_docs=initial)
+    n1_increase.handle_n1_increase_automation(
+        account_id="acct-1",
+        api_headers={"Authorization": "Bearer token"},
+        gl_mapping={"4000": "Income"},
+        webhook={"eventType": "TaskCreated"},
+        firestore_client=sync_firestore,
+        buildium_api=api,
+    )
+
+    transport = FakeAsyncBuildiumTransport(api)
+    monkeypatch.setattr(buildium_async, "_TRANSPORT", transport)
+    async_firestore = FakeFirestore(initial_docs=initial)
+    monkeypatch.setattr(
+        n1_increase,
+        "get_client_registry",
+        lambda: SimpleNamespace(
+            async_enabled=True, async_firestore=lambda: FakeAsyncFirestore(async_firestore)
+        ),
+    )
+    monkeypatch.setattr(
+        n1_increase,
+        "send_buildium_request",
+        lambda method, url, **_: api.download_presigned_url(url),
+    )
+    workloads: List[str] = []
+    run_in_workload = n1_increase.run_in_workload
+
+    async def _recording_run_in_workload(workload: str, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        workloads.append(workload)
+        return await run_in_workload(workload, fn, *args, **kwargs)
+
+    monkeypatch.setattr(n1_increase, "run_in_workload", _recording_run_in_workload)
+    monkeypatch.setattr(n1_data_module, "run_in_workload", _recording_run_in_workload)
+
+    asyncio.run(
+        n1_increase.handle_n1_increase_automation_async(
+            account_id="acct-1",
+            api_headers={"Authorization": "Bearer token"},
+            gl_mapping={"4000": "Income"},
+            webhook={"eventType": "TaskCreated"},
+        )
+    )
+
+    # Only the AGI document download left the event loop for an I/O worker.
+    assert workloads.count(n1_increase.WORKLOAD_BUILDIUM_IO) == 1
+    assert workloads.count(n1_increase.WORKLOAD_CPU) == 2
+    assert transport.peak > 1
+    assert "leases" in transport.paths
+
+    expected = sync_firestore.collection_instance.document("acct-1").data["n1_increase"]
+    stored = async_firestore.collection_instance.document("acct-1").data["n1_increase"]
+    assert stored["schedules"] == expected["schedules"]
+    assert stored["lease_count"] == 2
+    entries = n1_data_module.decode_payload_chunk(stored["payload_chunks"][0])
+    assert entries == n1_data_module.decode_payload_chunk(expected["payload_chunks"][0])
+    assert entries[1]["agi"]["document"]["content"] == base64.b64encode(b"agi-order").decode("ascii")
+
+
 def test_handle_n1_completion_generates_documents(monkeypatch) -> None:
     api = FakeBuildiumAPI()
     schedules = [
@@ -661,3 +794,30 @@ def test_handle_n1_completion_uploads_summary_documents() -> None:
     assert api.presigned_uploads[0]["content"] == b"binary"
     assert len(api.task_comments) == 1
     assert api.task_comments[0]["task_id"] == "task-5"
+
+
+def test_new_task_category_invalidates_the_cached_account(monkeypatch: Any) -> None:
+    account_cache = importlib.import_module("my_app.services.account_cache")
+    n1_completion = importlib.import_module("my_app.tasks.n1_completion")
+    BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+
+    cache = account_cache.AccountContextCache()
+    monkeypatch.setattr(account_cache, "_ACCOUNT_CONTEXT_CACHE", cache)
+    cache.get(
+        "acct-1",
+        lambda: BuildiumAccountContext(
+            account_id="acct-1", metadata={}, api_secret="", webhook_secret="hook"
+        ),
+    )
+    api = SimpleNamespace(
+        list_task_categories=lambda: [],
+        create_task_category=lambda *, name: {"id": "cat-new"},
+    )
+    document = FakeDocument("buildium_accounts/acct-1")
+
+    category_id = n1_completion._resolve_task_category(api, {}, {}, document, account_id="acct-1")
+
+    assert category_id == "cat-new"
+    assert document.data["automated_tasks_category_id"] == "cat-new"
+    # The next webhook reloads the account and sees the new category id.
+    assert len(cache) == 0
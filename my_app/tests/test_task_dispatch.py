@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from typing import Any, List
+
+import importlib
+
+import pytest
+
+dispatch = importlib.import_module("my_app.tasks.dispatch")
+buildium_processor = importlib.import_module("my_app.tasks.buildium_processor")
+buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+VerifiedBuildiumWebhook = importlib.import_module(
+    "my_app.webhooks.verification"
+).VerifiedBuildiumWebhook
+
+
+def _make_verified_webhook(account_id: str = "acct-dispatch") -> Any:
+    return VerifiedBuildiumWebhook(
+        account_context=BuildiumAccountContext(
+            account_id=account_id,
+            metadata={"gl_mapping": {"code": "value"}},
+            api_secret="api-secret",
+            webhook_secret="hook-secret",
+        ),
+        account_id=account_id,
+        envelope=buildium_listener.BuildiumWebhookEnvelope(
+            headers={"content-type": "application/json"},
+            body=b'{"EventType": "TaskCreated"}',
+            parsed_body={"EventType": "TaskCreated"},
+        ),
+        signature="sig",
+        verification_scheme="hmac",
+    )
+
+
+def _patch_processor_run(monkeypatch: pytest.MonkeyPatch, outcomes: List[Any]) -> List[str]:
+    processed: List[str] = []
+
+    async def _run(self: Any) -> None:
+        processed.append(self.verified_webhook.account_id)
+        outcome = outcomes.pop(0) if outcomes else None
+        if isinstance(outcome, Exception):
+            raise outcome
+
+    monkeypatch.setattr(buildium_processor.BuildiumWebhookProcessor, "run", _run)
+    return processed
+
+
+def test_create_task_dispatcher_selects_backend_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(dispatch.TASK_DISPATCHER_ENV, raising=False)
+    assert isinstance(dispatch.create_task_dispatcher(), dispatch.CloudTasksDispatcher)
+
+    monkeypatch.setenv(dispatch.TASK_DISPATCHER_ENV, "in-process")
+    assert isinstance(dispatch.create_task_dispatcher(), dispatch.InProcessDispatcher)
+
+    monkeypatch.setenv(dispatch.TASK_DISPATCHER_ENV, "sqlite")
+    assert isinstance(dispatch.create_task_dispatcher(), dispatch.SQLiteQueueDispatcher)
+
+    with pytest.raises(buildium_processor.BuildiumProcessorError):
+        dispatch.create_task_dispatcher("carrier-pigeon")
+
+
+def test_in_process_dispatcher_runs_processor_and_drains_on_stop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    processed = _patch_processor_run(monkeypatch, [RuntimeError("boom")])
+
+    async def _exercise() -> None:
+        dispatcher = dispatch.InProcessDispatcher(workers=2, max_queue_size=10)
+        await dispatcher.start()
+        await dispatcher.dispatch(_make_verified_webhook("acct-1"))
+        await dispatcher.dispatch(_make_verified_webhook("acct-2"))
+        await dispatcher.stop()
+
+    asyncio.run(_exercise())
+
+    # A failing webhook is logged and does not stop the worker pool.
+    assert sorted(processed) == ["acct-1", "acct-2"]
+
+
+def test_in_process_dispatcher_rejects_when_queue_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    _patch_processor_run(monkeypatch, [])
+
+    async def _exercise() -> None:
+        dispatcher = dispatch.InProcessDispatcher(workers=1, max_queue_size=1)
+        await dispatcher.start()
+        await dispatcher.dispatch(_make_verified_webhook())
+        with pytest.raises(buildium_processor.BuildiumProcessorError):
+            await dispatcher.dispatch(_make_verified_webhook())
+        await dispatcher.stop()
+
+    asyncio.run(_exercise())
+
+
+def test_in_process_dispatcher_stop_gives_up_on_a_stuck_worker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def _run(self: Any) -> None:
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(buildium_processor.BuildiumWebhookProcessor, "run", _run)
+
+    async def _exercise() -> None:
+        dispatcher = dispatch.InProcessDispatcher(workers=1, max_queue_size=10, drain_timeout=0.05)
+        await dispatcher.start()
+        await dispatcher.dispatch(_make_verified_webhook())
+        await asyncio.wait_for(dispatcher.stop(), timeout=5)
+        assert dispatcher.pending == 0
+
+    asyncio.run(_exercise())
+
+
+def test_sqlite_task_queue_retries_then_dead_letters(tmp_path: Any) -> None:
+    queue = dispatch.SQLiteTaskQueue(
+        str(tmp_path / "queue.sqlite3"), visibility_timeout=60, max_attempts=2
+    )
+    task_id = queue.put("acct-1", {"account_id": "acct-1"})
+
+    claimed = queue.claim()
+    assert claimed == (task_id, 1, {"account_id": "acct-1"})
+    # Leased tasks stay invisible until the visibility timeout expires.
+    assert queue.claim() is None
+
+    assert queue.fail(task_id, 1, "first failure") is True
+    queue._connection.execute("UPDATE buildium_tasks SET available_at = 0")
+    assert queue.claim()[1] == 2
+    assert queue.fail(task_id, 2, "second failure") is False
+    assert queue.counts() == {dispatch.SQLITE_STATUS_DEAD: 1}
+    queue.close()
+
+
+def test_sqlite_task_queue_redelivers_expired_lease(tmp_path: Any) -> None:
+    queue = dispatch.SQLiteTaskQueue(str(tmp_path / "queue.sqlite3"), visibility_timeout=60)
+    task_id = queue.put("acct-1", {"account_id": "acct-1"})
+    assert queue.claim() is not None
+
+    queue._connection.execute("UPDATE buildium_tasks SET leased_until = 0")
+    assert queue.claim()[:2] == (task_id, 2)
+
+    queue.ack(task_id)
+    assert queue.counts() == {}
+    queue.close()
+
+
+def test_sqlite_dispatcher_round_trips_serialized_webhook(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Any
+) -> None:
+    processed = _patch_processor_run(monkeypatch, [])
+
+    async def _resolve(account_id: str) -> Any:
+        return _make_verified_webhook(account_id).account_context
+
+    monkeypatch.setattr(buildium_listener, "_resolve_task_account_context", _resolve)
+
+    async def _exercise() -> Any:
+        dispatcher = dispatch.SQLiteQueueDispatcher(
+            path=str(tmp_path / "queue.sqlite3"), workers=1, poll_interval=0.01
+        )
+        await dispatcher.start()
+        await dispatcher.dispatch(_make_verified_webhook("acct-sqlite"))
+        counts = None
+        for _ in range(200):
+            counts = await asyncio.to_thread(dispatcher.queue.counts)
+            if processed and not counts:
+                break
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+        return counts
+
+    counts = asyncio.run(_exercise())
+
+    assert processed == ["acct-sqlite"]
+    assert counts == {}
+
+
+def test_sqlite_dispatcher_worker_survives_queue_errors(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Any
+) -> None:
+    processed = _patch_processor_run(monkeypatch, [])
+
+    async def _resolve(account_id: str) -> Any:
+        return _make_verified_webhook(account_id).account_context
+
+    monkeypatch.setattr(buildium_listener, "_resolve_task_account_context", _resolve)
+
+    async def _exercise() -> Any:
+        dispatcher = dispatch.SQLiteQueueDispatcher(
+            path=str(tmp_path / "queue.sqlite3"),
+            workers=1,
+            poll_interval=0.01,
+            visibility_timeout=0.05,
+        )
+        await dispatcher.start()
+        queue = dispatcher.queue
+        claim, ack = queue.claim, queue.ack
+        failures = {"claim": 2, "ack": 1}
+
+        def _flaky(name: str, operation: Any) -> Any:
+            def _call(*args: Any) -> Any:
+                if failures[name]:
+                    failures[name] -= 1
+                    raise sqlite3.OperationalError("database is locked")
+                return operation(*args)
+
+            return _call
+
+        monkeypatch.setattr(queue, "claim", _flaky("claim", claim))
+        monkeypatch.setattr(queue, "ack", _flaky("ack", ack))
+        await dispatcher.dispatch(_make_verified_webhook("acct-locked"))
+        counts = None
+        for _ in range(400):
+            counts = await asyncio.to_thread(queue.counts)
+            if not counts:
+                break
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+        return failures, counts
+
+    failures, counts = asyncio.run(_exercise())
+
+    assert failures == {"claim": 0, "ack": 0}
+    # The unacknowledged task is redelivered once its lease expires.
+    assert processed == ["acct-locked", "acct-locked"]
+    assert counts == {}
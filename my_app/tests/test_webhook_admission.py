@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Any, List
+
+import importlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+admission = importlib.import_module("my_app.webhooks.admission")
+metrics = importlib.import_module("my_app.services.metrics")
+buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics() -> None:
+    metrics.reset()
+
+
+def test_token_bucket_limits_each_account_independently() -> None:
+    now = [0.0]
+    controller = admission.WebhookAdmissionController(rate=1.0, burst=2, clock=lambda: now[0])
+
+    decisions = [controller.try_acquire("acct-1").admitted for _ in range(3)]
+    assert decisions == [True, True, False]
+    assert controller.try_acquire("acct-2").admitted is True
+
+    rejected = controller.try_acquire("acct-1")
+    assert rejected.status_code == 429
+    assert rejected.retry_after == 1
+    assert rejected.reason == admission.REJECT_REASON_RATE_LIMITED
+
+    now[0] = 1.0
+    assert controller.try_acquire("acct-1").admitted is True
+    assert metrics.get_counter(
+        admission.ADMISSION_REJECTED_METRIC, reason=admission.REJECT_REASON_RATE_LIMITED
+    ) == 2
+
+
+def test_concurrency_cap_sheds_with_503_until_release() -> None:
+    controller = admission.WebhookAdmissionController(max_concurrency=1)
+
+    assert controller.try_acquire("acct-1").admitted is True
+    rejected = controller.try_acquire("acct-2")
+    assert (rejected.admitted, rejected.status_code) == (False, 503)
+    assert rejected.retry_after == 1
+
+    controller.release()
+    assert controller.try_acquire("acct-2").admitted is True
+    assert metrics.get_gauge(admission.ADMISSION_IN_FLIGHT_METRIC) == 1
+
+
+def test_bucket_levels_report_refilled_tokens() -> None:
+    now = [0.0]
+    controller = admission.WebhookAdmissionController(rate=2.0, burst=4, clock=lambda: now[0])
+    for _ in range(4):
+        controller.try_acquire("acct-1")
+
+    now[0] = 0.5
+    assert controller.bucket_levels() == {"acct-1": pytest.approx(1.0)}
+
+
+def test_disabled_controller_admits_everything(monkeypatch: pytest.MonkeyPatch) -> None:
+    for env_name in (
+        admission.WEBHOOK_ACCOUNT_RATE_ENV,
+        admission.WEBHOOK_ACCOUNT_BURST_ENV,
+        admission.WEBHOOK_MAX_CONCURRENCY_ENV,
+    ):
+        monkeypatch.delenv(env_name, raising=False)
+
+    controller = admission.create_admission_controller()
+
+    assert controller.enabled is False
+    assert all(controller.try_acquire("acct-1").admitted for _ in range(100))
+
+
+def test_handler_sheds_before_resolving_account_context(monkeypatch: pytest.MonkeyPatch) -> None:
+    verified_accounts: List[str] = []
+
+    async def _fake_verify(envelope: Any, **_: Any) -> Any:
+        verified_accounts.append(envelope.parsed_body["AccountId"])
+        raise buildium_listener.HTTPException(status_code=401, detail="stop here")
+
+    monkeypatch.setattr(buildium_listener, "verify_buildium_webhook", _fake_verify)
+    monkeypatch.setattr(
+        buildium_listener,
+        "_ADMISSION_CONTROLLER",
+        admission.WebhookAdmissionController(rate=0.001, burst=1),
+    )
+
+    test_client = TestClient(buildium_listener.app)
+    first = test_client.post("/webhooks/buildium", content=b'{"AccountId": "acct-busy"}')
+    second = test_client.post("/webhooks/buildium", content=b'{"AccountId": "acct-busy"}')
+    other = test_client.post("/webhooks/buildium", content=b'{"AccountId": "acct-quiet"}')
+
+    assert first.status_code == 401
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+    assert other.status_code == 401
+    assert verified_accounts == ["acct-busy", "acct-quiet"]
+    assert buildium_listener._ADMISSION_CONTROLLER.in_flight == 0
+
+    snapshot = test_client.get("/metrics").json()
+    assert snapshot["admission"]["tracked_accounts"] == 2
+    assert snapshot["admission"]["exhausted_accounts"] == 2
+    assert "acct-busy" not in json.dumps(snapshot)
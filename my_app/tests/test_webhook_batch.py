@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+batch = importlib.import_module("my_app.webhooks.batch")
+idempotency = importlib.import_module("my_app.webhooks.idempotency")
+admission = importlib.import_module("my_app.webhooks.admission")
+buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+
+_SECRETS = {"acct-1": "secret-one", "acct-2": "secret-two"}
+
+
+def _line(
+    account_id: str,
+    event_id: str,
+    *,
+    secret: Optional[str] = None,
+    base64_body: bool = False,
+    timestamp: Optional[int] = None,
+) -> str:
+    body = json.dumps({"AccountId": account_id, "Id": event_id}).encode("utf-8")
+    signed = body if timestamp is None else f"{timestamp}.".encode("utf-8") + body
+    signature = hmac.new(
+        (secret or _SECRETS[account_id]).encode("utf-8"), signed, hashlib.sha256
+    ).hexdigest()
+    record: Dict[str, Any] = {"headers": {"X-Buildium-Hmac-SHA256": signature}}
+    if timestamp is not None:
+        record["headers"]["Buildium-Webhook-Timestamp"] = str(timestamp)
+    if base64_body:
+        record["body_base64"] = base64.b64encode(body).decode("ascii")
+    else:
+        record["body"] = body.decode("utf-8")
+    return json.dumps(record)
+
+
+class _RecordingDispatcher:
+    name = "recording"
+
+    def __init__(self) -> None:
+        self.dispatched: List[str] = []
+
+    async def dispatch(self, verified: Any, *, dedup_key: Optional[str] = None) -> None:
+        self.dispatched.append(verified.envelope.parsed_body["Id"])
+
+
+class _SharedSeenSet:
+    ttl_seconds = 24 * 60 * 60
+
+    def __init__(self) -> None:
+        self.keys: set = set()
+
+    def claim(self, key: str, *, account_id: str) -> bool:
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+    def release(self, key: str) -> None:
+        self.keys.discard(key)
+
+
+async def _resolve_with_secrets(account_id: str) -> Any:
+    return BuildiumAccountContext(
+        account_id=account_id, metadata={}, api_secret="", webhook_secret=_SECRETS[account_id]
+    )
+
+
+def test_iter_ndjson_lines_handles_lines_split_across_chunks() -> None:
+    async def _chunks() -> AsyncIterator[bytes]:
+        for chunk in (b'{"a":', b' 1}\n\n{"b"', b": 2}\n", b'{"c": 3}'):
+            yield chunk
+
+    async def _collect() -> List[Any]:
+        return [item async for item in batch.iter_ndjson_lines(_chunks())]
+
+    assert asyncio.run(_collect()) == [(1, b'{"a": 1}'), (3, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+def test_iter_ndjson_lines_drops_oversized_lines_without_buffering_them() -> None:
+    async def _chunks() -> AsyncIterator[bytes]:
+        for chunk in (b'{"a": 1}\n' + b"x" * 8, b"x" * 8, b"x\n{}\n", b"y" * 20):
+            yield chunk
+
+    async def _collect() -> List[Any]:
+        return [item async for item in batch.iter_ndjson_lines(_chunks(), max_line_bytes=10)]
+
+    assert asyncio.run(_collect()) == [(1, b'{"a": 1}'), (2, None), (3, b"{}"), (4, None)]
+
+
+def test_parse_batch_line_rejects_missing_body() -> None:
+    with pytest.raises(ValueError):
+        batch.parse_batch_line(b'{"headers": {}}')
+    with pytest.raises(ValueError):
+        batch.parse_batch_line(b'{"headers": {}, "body_base64": "***"}')
+
+
+def test_batch_endpoint_resolves_each_account_once_and_reports_per_line(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    resolved: List[str] = []
+
+    async def _resolve(account_id: str) -> Any:
+        resolved.append(account_id)
+        return BuildiumAccountContext(
+            account_id=account_id,
+            metadata={},
+            api_secret="",
+            webhook_secret=_SECRETS[account_id],
+        )
+
+    dispatcher = _RecordingDispatcher()
+    monkeypatch.setenv(buildium_listener.ADMIN_TOKEN_ENV, "admin-token")
+    monkeypatch.setattr(buildium_listener, "_resolve_task_account_context", _resolve)
+    monkeypatch.setattr(buildium_listener, "_TASK_DISPATCHER", dispatcher)
+    monkeypatch.setattr(
+        buildium_listener,
+        "_IDEMPOTENCY_INDEX",
+        idempotency.WebhookIdempotencyIndex(
+            local=idempotency.LocalSeenSet(), shared=_SharedSeenSet()
+        ),
+    )
+
+    lines = [
+        _line("acct-1", "evt-1"),
+        _line("acct-2", "evt-2", base64_body=True),
+        "not json",
+        _line("acct-1", "evt-3", secret="wrong-secret"),
+        _line("acct-1", "evt-1"),
+        _line("acct-1", "evt-4"),
+    ]
+    response = TestClient(buildium_listener.app).post(
+        "/webhooks/buildium/batch",
+        content="\n".join(lines).encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson", "Authorization": "Bearer admin-token"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert sorted(resolved) == ["acct-1", "acct-2"]
+    assert sorted(dispatcher.dispatched) == ["evt-1", "evt-2", "evt-4"]
+    assert (report["lines"], report["accounts"]) == (6, 2)
+    assert (report["queued"], report["duplicate"], report["rejected"]) == (3, 1, 2)
+    assert [(item["line"], item["status"], item["status_code"]) for item in report["results"]] == [
+        (1, "queued", 202),
+        (2, "queued", 202),
+        (3, "rejected", 400),
+        (4, "rejected", 401),
+        (5, "duplicate", 200),
+        (6, "queued", 202),
+    ]
+
+
+def test_batch_ingestor_stops_reading_after_line_limit() -> None:
+    async def _resolve(account_id: str) -> Any:
+        return BuildiumAccountContext(
+            account_id=account_id, metadata={}, api_secret="", webhook_secret=_SECRETS[account_id]
+        )
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        for index in range(5):
+            yield (_line("acct-1", f"evt-{index}") + "\n").encode("utf-8")
+
+    ingestor = batch.WebhookBatchIngestor(
+        dispatcher=_RecordingDispatcher(),
+        idempotency_index=idempotency.WebhookIdempotencyIndex(),
+        context_resolver=_resolve,
+        max_lines=2,
+    )
+    report = asyncio.run(ingestor.ingest(_chunks()))
+
+    assert report["queued"] == 2
+    assert report["results"][-1]["status_code"] == 413
+
+
+def test_batch_accepts_signatures_captured_during_an_outage() -> None:
+    async def _resolve(account_id: str) -> Any:
+        return BuildiumAccountContext(
+            account_id=account_id, metadata={}, api_secret="", webhook_secret=_SECRETS[account_id]
+        )
+
+    hour_ago = int(time.time()) - 3600
+    lines = [_line("acct-1", "evt-old", timestamp=hour_ago), _line("acct-1", "evt-old", timestamp=hour_ago)]
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _ingest(**kwargs: Any) -> Any:
+        ingestor = batch.WebhookBatchIngestor(
+            dispatcher=_RecordingDispatcher(),
+            idempotency_index=idempotency.WebhookIdempotencyIndex(local=idempotency.LocalSeenSet()),
+            context_resolver=_resolve,
+            **kwargs,
+        )
+        return asyncio.run(ingestor.ingest(_chunks()))
+
+    report = _ingest()
+    # The hour-old delivery is accepted; replaying it twice is still deduplicated.
+    assert [result["status"] for result in report["results"]] == ["queued", "duplicate"]
+
+    strict = _ingest(max_signature_age_seconds=60)
+    assert {result["status_code"] for result in strict["results"]} == {401}
+
+
+def test_batch_endpoint_requires_admin_token_and_shared_dedup(monkeypatch: pytest.MonkeyPatch) -> None:
+    dispatcher = _RecordingDispatcher()
+    monkeypatch.setenv(buildium_listener.ADMIN_TOKEN_ENV, "admin-token")
+    monkeypatch.setattr(buildium_listener, "_resolve_task_account_context", _resolve_with_secrets)
+    monkeypatch.setattr(buildium_listener, "_TASK_DISPATCHER", dispatcher)
+    monkeypatch.setattr(
+        buildium_listener,
+        "_IDEMPOTENCY_INDEX",
+        idempotency.WebhookIdempotencyIndex(local=idempotency.LocalSeenSet()),
+    )
+    client = TestClient(buildium_listener.app)
+    body = (_line("acct-1", "evt-1") + "\n").encode("utf-8")
+
+    anonymous = client.post("/webhooks/buildium/batch", content=body)
+    assert anonymous.status_code == 401
+
+    local_only = client.post(
+        "/webhooks/buildium/batch", content=body, headers={"Authorization": "Bearer admin-token"}
+    )
+    assert local_only.status_code == 503
+    assert idempotency.WEBHOOK_DEDUP_FIRESTORE_ENV in local_only.json()["detail"]
+    assert dispatcher.dispatched == []
+
+
+def test_batch_rejects_signatures_older_than_the_dedup_retention() -> None:
+    hour_ago = int(time.time()) - 3600
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        yield (_line("acct-1", "evt-old", timestamp=hour_ago) + "\n").encode("utf-8")
+
+    dispatcher = _RecordingDispatcher()
+    ingestor = batch.WebhookBatchIngestor(
+        dispatcher=dispatcher,
+        idempotency_index=idempotency.WebhookIdempotencyIndex(
+            local=idempotency.LocalSeenSet(ttl_seconds=600)
+        ),
+        context_resolver=_resolve_with_secrets,
+        max_signature_age_seconds=7 * 24 * 60 * 60,
+    )
+    report = asyncio.run(ingestor.ingest(_chunks()))
+
+    assert [result["status_code"] for result in report["results"]] == [401]
+    assert dispatcher.dispatched == []
+
+
+def test_batch_applies_webhook_admission_control_per_line() -> None:
+    lines = [_line("acct-1", "evt-1"), _line("acct-1", "evt-2"), _line("acct-2", "evt-3")]
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    controller = admission.WebhookAdmissionController(rate=0.001, burst=1, clock=lambda: 0.0)
+    dispatcher = _RecordingDispatcher()
+    ingestor = batch.WebhookBatchIngestor(
+        dispatcher=dispatcher,
+        idempotency_index=idempotency.WebhookIdempotencyIndex(local=idempotency.LocalSeenSet()),
+        context_resolver=_resolve_with_secrets,
+        admission=controller,
+    )
+    report = asyncio.run(ingestor.ingest(_chunks()))
+
+    assert [(result["status"], result["status_code"]) for result in report["results"]] == [
+        ("queued", 202),
+        ("rejected", 429),
+        ("queued", 202),
+    ]
+    assert sorted(dispatcher.dispatched) == ["evt-1", "evt-3"]
+    assert controller.in_flight == 0
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+from typing import Any, Dict, List
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+envelope_module = importlib.import_module("my_app.webhooks.envelope")
+verification = importlib.import_module("my_app.webhooks.verification")
+buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+BuildiumAccountContext = importlib.import_module(
+    "my_app.services.account_context"
+).BuildiumAccountContext
+
+LazyBuildiumWebhookEnvelope = envelope_module.LazyBuildiumWebhookEnvelope
+
+
+def _count_json_loads(monkeypatch: pytest.MonkeyPatch) -> List[Any]:
+    calls: List[Any] = []
+    original = envelope_module.json.loads
+
+    def _loads(payload: Any, *args: Any, **kwargs: Any) -> Any:
+        calls.append(payload)
+        return original(payload, *args, **kwargs)
+
+    monkeypatch.setattr(envelope_module.json, "loads", _loads)
+    return calls
+
+
+def test_lazy_envelope_parses_body_once_on_first_access(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _count_json_loads(monkeypatch)
+    envelope = LazyBuildiumWebhookEnvelope(
+        headers={"Content-Type": "application/json"},
+        body=b'{"AccountId": "acct-1"}',
+    )
+
+    assert calls == []
+    assert envelope.is_parsed is False
+
+    assert envelope.parsed_body == {"AccountId": "acct-1"}
+    assert envelope.parsed_body == {"AccountId": "acct-1"}
+    assert len(calls) == 1
+    assert envelope.is_parsed is True
+
+
+def test_lazy_envelope_treats_invalid_json_as_unparsed_body() -> None:
+    envelope = LazyBuildiumWebhookEnvelope(headers={}, body=b"not-json")
+
+    assert envelope.parsed_body is None
+    assert envelope.is_parsed is True
+
+
+def test_lazy_envelope_normalizes_raw_headers_once() -> None:
+    envelope = LazyBuildiumWebhookEnvelope.from_raw_headers(
+        [
+            (b"content-type", b"application/json"),
+            (b"x-buildium-signature", b"secret-signature"),
+            (b"x-buildium-signature", b"ignored-duplicate"),
+        ],
+        b"{}",
+    )
+
+    assert isinstance(envelope.headers, verification.NormalizedHeaders)
+    assert verification._normalize_headers(envelope.headers) is envelope.headers
+    assert envelope.headers["x-buildium-signature"] == "secret-signature"
+
+    log_headers = envelope.log_headers
+    assert log_headers["x-buildium-signature"] == "<redacted>"
+    assert log_headers["content-type"] == "application/json"
+    assert envelope.log_headers is log_headers
+
+
+def test_verify_buildium_webhook_accepts_lazy_envelope(monkeypatch: pytest.MonkeyPatch) -> None:
+    account_id = "acct-lazy"
+    secret = "lazy-secret"
+
+    def _fake_context(account_id: str, **_: Any) -> BuildiumAccountContext:
+        return BuildiumAccountContext(
+            account_id=account_id, metadata={}, api_secret="", webhook_secret=secret
+        )
+
+    monkeypatch.setattr(verification, "get_buildium_account_context", _fake_context)
+    calls = _count_json_loads(monkeypatch)
+
+    body = json.dumps({"AccountId": account_id}).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    envelope = LazyBuildiumWebhookEnvelope(
+        headers={"X-Buildium-Hmac-SHA256": signature}, body=body
+    )
+
+    verified = asyncio.run(verification.verify_buildium_webhook(envelope))
+
+    assert verified.account_id == account_id
+    assert verified.envelope is envelope
+    assert len(calls) == 1
+
+
+def test_handle_buildium_webhook_builds_lazy_envelope(monkeypatch: pytest.MonkeyPatch) -> None:
+    captured: Dict[str, Any] = {}
+
+    async def _fake_verify(envelope: Any, **_: Any) -> Any:
+        captured["envelope"] = envelope
+        return verification.VerifiedBuildiumWebhook(
+            account_context=BuildiumAccountContext(
+                account_id="acct-http", metadata={}, api_secret="", webhook_secret="hook"
+            ),
+            account_id="acct-http",
+            envelope=envelope,
+            signature="sig",
+            verification_scheme="hmac",
+        )
+
+    class _FakeDispatcher:
+        name = "fake"
+
+        async def dispatch(self, verified: Any, **_: Any) -> None:
+            captured["verified"] = verified
+
+    monkeypatch.setattr(buildium_listener, "verify_buildium_webhook", _fake_verify)
+    monkeypatch.setattr(buildium_listener, "_TASK_DISPATCHER", _FakeDispatcher())
+
+    test_client = TestClient(buildium_listener.app)
+    response = test_client.post(
+        "/webhooks/buildium",
+        content=b'{"EventType": "TaskCreated", "AccountId": "acct-http"}',
+        headers={"Content-Type": "application/json", "X-Buildium-Signature": "sig"},
+    )
+
+    assert response.status_code == 200
+    envelope = captured["envelope"]
+    assert isinstance(envelope, LazyBuildiumWebhookEnvelope)
+    assert envelope.headers["x-buildium-signature"] == "sig"
+    assert envelope.parsed_body == {"EventType": "TaskCreated", "AccountId": "acct-http"}
+    assert captured["verified"].account_id == "acct-http"
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+from google.api_core import exceptions as google_exceptions
+
+idempotency = importlib.import_module("my_app.webhooks.idempotency")
+metrics = importlib.import_module("my_app.services.metrics")
+buildium_listener = importlib.import_module("my_app.webhooks.buildium_listener")
+buildium_processor = importlib.import_module("my_app.tasks.buildium_processor")
+verification = importlib.import_module("my_app.webhooks.verification")
+BuildiumAccountContext = importlib.import_module("my_app.services.account_context").BuildiumAccountContext
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics() -> None:
+    metrics.reset()
+
+
+def _make_verified_webhook(
+    body: bytes, parsed_body: Optional[Any], account_id: str = "acct-dedup"
+) -> Any:
+    return verification.VerifiedBuildiumWebhook(
+        account_context=BuildiumAccountContext(
+            account_id=account_id, metadata={}, api_secret="", webhook_secret="hook"
+        ),
+        account_id=account_id,
+        envelope=buildium_listener.BuildiumWebhookEnvelope(
+            headers={}, body=body, parsed_body=parsed_body
+        ),
+        signature="sig",
+        verification_scheme="hmac",
+    )
+
+
+class _FakeDocument:
+    def __init__(self, store: Dict[str, Dict[str, Any]], key: str) -> None:
+        self._store = store
+        self._key = key
+
+    def create(self, record: Dict[str, Any]) -> None:
+        if self._key in self._store:
+            raise google_exceptions.AlreadyExists("exists")
+        self._store[self._key] = dict(record)
+
+    def set(self, record: Dict[str, Any]) -> None:
+        self._store[self._key] = dict(record)
+
+    def get(self) -> Any:
+        data = self._store.get(self._key)
+
+        class _Snapshot:
+            exists = data is not None
+
+            def to_dict(self) -> Optional[Dict[str, Any]]:
+                return dict(data) if data is not None else None
+
+        return _Snapshot()
+
+    def delete(self) -> None:
+        self._store.pop(self._key, None)
+
+
+class _FakeFirestore:
+    def __init__(self) -> None:
+        self.store: Dict[str, Dict[str, Any]] = {}
+
+    def collection(self, path: str) -> "_FakeFirestore":
+        assert path == idempotency.WEBHOOK_EVENTS_COLLECTION_PATH
+        return self
+
+    def document(self, key: str) -> _FakeDocument:
+        return _FakeDocument(self.store, key)
+
+
+def test_idempotency_key_prefers_event_id_and_falls_back_to_body_hash() -> None:
+    first = _make_verified_webhook(b'{"Id": "evt-1", "retry": 1}', {"Id": "evt-1", "retry": 1})
+    retry = _make_verified_webhook(b'{"Id": "evt-1", "retry": 2}', {"Id": "evt-1", "retry": 2})
+    other_account = _make_verified_webhook(
+        b'{"Id": "evt-1"}', {"Id": "evt-1"}, account_id="acct-other"
+    )
+    no_id = _make_verified_webhook(b'{"TaskId": 5}', {"TaskId": 5})
+    no_id_other_body = _make_verified_webhook(b'{"TaskId": 6}', {"TaskId": 6})
+
+    key = idempotency.build_idempotency_key(first)
+    assert key == idempotency.build_idempotency_key(retry)
+    assert key != idempotency.build_idempotency_key(other_account)
+    assert len(key) == 64
+    assert idempotency.build_idempotency_key(no_id) != idempotency.build_idempotency_key(
+        no_id_other_body
+    )
+
+
+def test_local_seen_set_expires_and_evicts_entries() -> None:
+    now = [0.0]
+    seen = idempotency.LocalSeenSet(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+
+    assert seen.add_if_absent("a") is True
+    assert seen.add_if_absent("a") is False
+
+    now[0] = 11.0
+    assert seen.add_if_absent("a") is True
+
+    seen.add_if_absent("b")
+    seen.add_if_absent("c")
+    assert len(seen) == 2
+    assert seen.add_if_absent("a") is True
+
+
+def test_index_suppresses_duplicates_across_instances_and_records_metrics() -> None:
+    firestore = _FakeFirestore()
+
+    def _index() -> Any:
+        return idempotency.WebhookIdempotencyIndex(
+            local=idempotency.LocalSeenSet(),
+            shared=idempotency.FirestoreSeenSet(firestore_client=firestore),
+        )
+
+    first_instance, second_instance = _index(), _index()
+
+    async def _exercise() -> List[bool]:
+        return [
+            await first_instance.claim("key-1", account_id="acct"),
+            await first_instance.claim("key-1", account_id="acct"),
+            await second_instance.claim("key-1", account_id="acct"),
+        ]
+
+    assert asyncio.run(_exercise()) == [True, False, False]
+    assert metrics.get_counter(idempotency.DEDUP_CHECKS_METRIC) == 3
+    assert metrics.get_counter(idempotency.DEDUP_DUPLICATES_METRIC, tier="local") == 1
+    assert metrics.get_counter(idempotency.DEDUP_DUPLICATES_METRIC, tier="firestore") == 1
+    assert firestore.store["key-1"]["account_id"] == "acct"
+
+
+def test_firestore_seen_set_reclaims_expired_records() -> None:
+    firestore = _FakeFirestore()
+    firestore.store["key-1"] = {
+        "expires_at": datetime.now(timezone.utc) - timedelta(seconds=1),
+    }
+    seen = idempotency.FirestoreSeenSet(firestore_client=firestore)
+
+    assert seen.claim("key-1", account_id="acct") is True
+    assert seen.claim("key-1", account_id="acct") is False
+
+
+def test_index_fails_open_when_shared_tier_errors() -> None:
+    class _BrokenSeenSet:
+        def claim(self, key: str, *, account_id: str) -> bool:
+            raise google_exceptions.ServiceUnavailable("down")
+
+    index = idempotency.WebhookIdempotencyIndex(shared=_BrokenSeenSet())
+
+    assert asyncio.run(index.claim("key-1", account_id="acct")) is True
+    assert metrics.get_counter(idempotency.DEDUP_ERRORS_METRIC, tier="firestore") == 1
+
+
+def test_handler_drops_duplicates_and_releases_claim_on_dispatch_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    dispatched: List[str] = []
+    failures: List[Exception] = [buildium_processor.BuildiumProcessorError("queue down")]
+
+    async def _fake_verify(envelope: Any, **_: Any) -> Any:
+        return _make_verified_webhook(envelope.body, envelope.parsed_body)
+
+    class _FakeDispatcher:
+        name = "fake"
+
+        async def dispatch(self, verified: Any, *, dedup_key: Optional[str] = None) -> None:
+            if failures:
+                raise failures.pop(0)
+            dispatched.append(dedup_key)
+
+    monkeypatch.setattr(buildium_listener, "verify_buildium_webhook", _fake_verify)
+    monkeypatch.setattr(buildium_listener, "_TASK_DISPATCHER", _FakeDispatcher())
+    monkeypatch.setattr(
+        buildium_listener,
+        "_IDEMPOTENCY_INDEX",
+        idempotency.WebhookIdempotencyIndex(local=idempotency.LocalSeenSet()),
+    )
+
+    test_client = TestClient(buildium_listener.app)
+
+    def _post() -> int:
+        return test_client.post("/webhooks/buildium", content=b'{"Id": "evt-42"}').status_code
+
+    assert _post() == 503
+    assert _post() == 200
+    assert _post() == 200
+    assert len(dispatched) == 1
+
+    snapshot = test_client.get("/metrics").json()
+    duplicates = snapshot["counters"][idempotency.DEDUP_DUPLICATES_METRIC]
+    assert duplicates == [{"labels": {"tier": "local"}, "value": 1.0}]
+
+
+def test_enqueue_with_task_id_names_task_and_skips_existing(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: List[Any] = []
+
+    class _DummyClient:
+        def queue_path(self, project: str, location: str, queue: str) -> str:
+            return f"projects/{project}/locations/{location}/queues/{queue}"
+
+        def create_task(self, request: Any) -> Any:
+            requests.append(request)
+            raise google_exceptions.AlreadyExists("duplicate")
+
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+
+    result = buildium_processor.enqueue_buildium_webhook(
+        _make_verified_webhook(b"{}", {}), client=_DummyClient(), task_id="abc123"
+    )
+
+    assert result is None
+    assert requests[0]["task"]["name"].endswith("/queues/buildium-webhooks/tasks/abc123")
+    assert metrics.get_counter(idempotency.DEDUP_DUPLICATES_METRIC, tier="cloud_tasks") == 1
@@ -61,6 +61,12 @@ _install_google_stubs()
 
 from my_app.services.account_context import BuildiumAccountContext
 import my_app.webhooks.verification as verification
+import my_app.services.account_cache as account_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_account_cache() -> None:
+    account_cache.reset_account_context_cache()
 
 
 class _FakeEnvelope:
@@ -190,3 +196,135 @@ def test_verify_buildium_webhook_rejects_stale_timestamp(monkeypatch: pytest.Mon
         asyncio.run(verification.verify_buildium_webhook(envelope))
 
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_verify_buildium_webhook_accepts_unpadded_urlsafe_signature(monkeypatch: pytest.MonkeyPatch) -> None:
+    account_id = "acct-321"
+    secret = "urlsafe-secret"
+    _install_account_context(monkeypatch, secret)
+
+    body = _build_body(account_id)
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()
+    signature = base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+    envelope = _FakeEnvelope(
+        headers={"X-Buildium-Hmac-SHA256": signature},
+        body=body,
+        parsed_body={"AccountId": account_id},
+    )
+
+    verified = asyncio.run(verification.verify_buildium_webhook(envelope))
+
+    assert verified.signature == signature
+
+
+@pytest.mark.parametrize(
+    "signature",
+    ["not-a-signature", "A" * 64, "ab" * 31, "YWJj" * 11, "A" * 43 + "==="],
+)
+def test_verify_buildium_webhook_rejects_malformed_signature(
+    monkeypatch: pytest.MonkeyPatch, signature: str
+) -> None:
+    account_id = "acct-654"
+    _install_account_context(monkeypatch, "malformed-secret")
+
+    envelope = _FakeEnvelope(
+        headers={"X-Buildium-Hmac-SHA256": signature},
+        body=_build_body(account_id),
+        parsed_body={"AccountId": account_id},
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(verification.verify_buildium_webhook(envelope))
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_verify_buildium_webhook_caches_account_signature_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    account_id = "acct-cache"
+    secret = "cache-secret"
+    _install_account_context(monkeypatch, secret)
+    verification.clear_signature_profiles()
+
+    def _envelope() -> _FakeEnvelope:
+        body = _build_body(account_id)
+        timestamp = str(int(time.time()))
+        digest = hmac.new(
+            secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256
+        ).digest()
+        return _FakeEnvelope(
+            headers={
+                "Buildium-Webhook-Signature": base64.b64encode(digest).decode("ascii"),
+                "Buildium-Webhook-Timestamp": timestamp,
+            },
+            body=body,
+            parsed_body={"AccountId": account_id},
+        )
+
+    asyncio.run(verification.verify_buildium_webhook(_envelope()))
+    profile = verification._get_signature_profile(account_id)
+    assert profile == verification._SignatureProfile(
+        header_name="buildium-webhook-signature",
+        encoding="base64",
+        convention="timestamp.body",
+    )
+
+    envelope = _envelope()
+    original_digest = hmac.digest
+    digests = []
+
+    def _counting_digest(*args: Any, **kwargs: Any) -> Any:
+        digests.append(args)
+        return original_digest(*args, **kwargs)
+
+    monkeypatch.setattr(verification.hmac, "digest", _counting_digest)
+    asyncio.run(verification.verify_buildium_webhook(envelope))
+
+    assert len(digests) == 1
+
+
+def test_verify_buildium_webhook_reloads_cached_context_after_secret_rotation(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    account_id = "acct-rotated"
+    secrets = ["old-secret"]
+    loads = []
+    now = [0.0]
+
+    def _fake_get_buildium_account_context(account_id: str, **_: Any) -> BuildiumAccountContext:
+        loads.append(secrets[0])
+        return BuildiumAccountContext(
+            account_id=account_id, metadata={}, api_secret="", webhook_secret=secrets[0]
+        )
+
+    monkeypatch.setattr(verification, "get_buildium_account_context", _fake_get_buildium_account_context)
+    monkeypatch.setattr(
+        account_cache,
+        "_ACCOUNT_CONTEXT_CACHE",
+        account_cache.AccountContextCache(clock=lambda: now[0]),
+    )
+
+    def _envelope(secret: str) -> _FakeEnvelope:
+        body = _build_body(account_id)
+        signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        return _FakeEnvelope(
+            headers={"X-Buildium-Hmac-SHA256": signature},
+            body=body,
+            parsed_body={"AccountId": account_id},
+        )
+
+    asyncio.run(verification.verify_buildium_webhook(_envelope("old-secret")))
+    asyncio.run(verification.verify_buildium_webhook(_envelope("old-secret")))
+    assert loads == ["old-secret"]
+
+    secrets[0] = "new-secret"
+    with pytest.raises(HTTPException):
+        # A fresh cache entry is trusted; forged signatures cannot force reloads.
+        asyncio.run(verification.verify_buildium_webhook(_envelope("new-secret")))
+    assert loads == ["old-secret"]
+
+    now[0] = verification._CACHED_CONTEXT_RELOAD_MIN_AGE_SECONDS + 1
+    verified = asyncio.run(verification.verify_buildium_webhook(_envelope("new-secret")))
+
+    assert verified.account_context.webhook_secret == "new-secret"
+    assert loads == ["old-secret", "new-secret"]
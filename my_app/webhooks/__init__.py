@@ -1,12 +1,14 @@
 """Webhook handling components for Buildium integrations."""
 
 from .buildium_listener import app, run, BuildiumWebhookEnvelope
+from .envelope import LazyBuildiumWebhookEnvelope
 from .verification import VerifiedBuildiumWebhook, verify_buildium_webhook
 
 __all__ = [
     "app",
     "run",
     "BuildiumWebhookEnvelope",
+    "LazyBuildiumWebhookEnvelope",
     "VerifiedBuildiumWebhook",
     "verify_buildium_webhook",
 ]
@@ -0,0 +1,204 @@
+"""Per-account admission control for the Buildium webhook endpoint.
+
+Every webhook costs a Firestore read, a Secret Manager read and a dispatch,
+so a single account performing a bulk edit in Buildium can starve the other
+tenants served by the same instance. The controller sheds load before any of
+that work happens:
+
+* a token bucket per account limits the sustained rate and burst size, and
+  rejects excess deliveries with ``429`` and a ``Retry-After`` hint;
+* a global in-flight cap rejects requests with ``503`` once the instance is
+  saturated.
+
+Both limits are disabled unless configured through the environment.
+Per-account bucket levels are reported by ``bucket_levels`` rather than as
+individual gauges so the metric set stays bounded.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from ..services import metrics
+
+WEBHOOK_ACCOUNT_RATE_ENV = "BUILDIUM_WEBHOOK_ACCOUNT_RATE"
+WEBHOOK_ACCOUNT_BURST_ENV = "BUILDIUM_WEBHOOK_ACCOUNT_BURST"
+WEBHOOK_MAX_CONCURRENCY_ENV = "BUILDIUM_WEBHOOK_MAX_CONCURRENCY"
+
+_DEFAULT_MAX_TRACKED_ACCOUNTS = 10_000
+_UNKNOWN_ACCOUNT_KEY = "<unknown>"
+
+ADMISSION_REJECTED_METRIC = "buildium_webhook_admission_rejected_total"
+ADMISSION_IN_FLIGHT_METRIC = "buildium_webhook_admission_in_flight"
+
+REJECT_REASON_RATE_LIMITED = "rate_limited"
+REJECT_REASON_OVERLOADED = "overloaded"
+
+
+@dataclass(frozen=True)
+class AdmissionDecision:
+    """Outcome of an admission check."""
+
+    admitted: bool
+    status_code: int = 200
+    retry_after: int = 0
+    reason: Optional[str] = None
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class WebhookAdmissionController:
+    """Token bucket per account plus a global in-flight request cap.
+
+    ``rate`` is the sustained number of webhooks per second admitted for one
+    account and ``burst`` the bucket capacity. A ``rate`` of zero disables the
+    per-account limit; a ``max_concurrency`` of zero disables the global cap.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 0.0,
+        burst: Optional[float] = None,
+        max_concurrency: int = 0,
+        max_tracked_accounts: int = _DEFAULT_MAX_TRACKED_ACCOUNTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = max(0.0, rate)
+        self._burst = max(1.0, burst if burst is not None else max(1.0, self._rate))
+        self._max_concurrency = max(0, max_concurrency)
+        self._max_tracked_accounts = max_tracked_accounts
+        self._clock = clock
+        self._buckets: "OrderedDict[str, _TokenBucket]" = OrderedDict()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._rate > 0 or self._max_concurrency > 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _take_token(self, key: str, now: float) -> float:
+        """Consume a token for ``key``; return seconds until one is available if empty."""
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _TokenBucket(self._burst, now)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self._max_tracked_accounts:
+                self._buckets.popitem(last=False)
+        else:
+            elapsed = max(0.0, now - bucket.updated_at)
+            bucket.tokens = min(self._burst, bucket.tokens + elapsed * self._rate)
+            bucket.updated_at = now
+        self._buckets.move_to_end(key)
+
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return 0.0
+        return (1.0 - bucket.tokens) / self._rate
+
+    def try_acquire(self, account_id: Optional[str]) -> AdmissionDecision:
+        """Admit or reject a webhook for ``account_id``.
+
+        An admitted request holds one in-flight slot and must call
+        :meth:`release` when it finishes.
+        """
+
+        if not self.enabled:
+            return AdmissionDecision(admitted=True)
+
+        key = account_id or _UNKNOWN_ACCOUNT_KEY
+        with self._lock:
+            if self._max_concurrency and self._in_flight >= self._max_concurrency:
+                decision = AdmissionDecision(
+                    admitted=False,
+                    status_code=503,
+                    retry_after=1,
+                    reason=REJECT_REASON_OVERLOADED,
+                )
+            else:
+                wait = self._take_token(key, self._clock()) if self._rate > 0 else 0.0
+                if wait > 0:
+                    decision = AdmissionDecision(
+                        admitted=False,
+                        status_code=429,
+                        retry_after=max(1, math.ceil(wait)),
+                        reason=REJECT_REASON_RATE_LIMITED,
+                    )
+                else:
+                    self._in_flight += 1
+                    decision = AdmissionDecision(admitted=True)
+            in_flight = self._in_flight
+
+        metrics.set_gauge(ADMISSION_IN_FLIGHT_METRIC, in_flight)
+        if not decision.admitted:
+            metrics.increment(ADMISSION_REJECTED_METRIC, reason=decision.reason)
+        return decision
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            in_flight = self._in_flight
+        metrics.set_gauge(ADMISSION_IN_FLIGHT_METRIC, in_flight)
+
+    def bucket_levels(self) -> Dict[str, float]:
+        """Return the current token level per tracked account, refilled to now."""
+
+        now = self._clock()
+        with self._lock:
+            return {
+                key: min(self._burst, bucket.tokens + max(0.0, now - bucket.updated_at) * self._rate)
+                for key, bucket in self._buckets.items()
+            }
+
+
+def _env_float(env_name: str, default: float) -> float:
+    raw_value = os.getenv(env_name)
+    if not raw_value:
+        return default
+    try:
+        return float(raw_value)
+    except ValueError:
+        return default
+
+
+def create_admission_controller() -> WebhookAdmissionController:
+    """Build the admission controller described by the environment."""
+
+    rate = _env_float(WEBHOOK_ACCOUNT_RATE_ENV, 0.0)
+    raw_burst = os.getenv(WEBHOOK_ACCOUNT_BURST_ENV)
+    burst = _env_float(WEBHOOK_ACCOUNT_BURST_ENV, 0.0) if raw_burst else None
+    max_concurrency = int(_env_float(WEBHOOK_MAX_CONCURRENCY_ENV, 0.0))
+    return WebhookAdmissionController(
+        rate=rate,
+        burst=burst if burst and burst > 0 else None,
+        max_concurrency=max_concurrency,
+    )
+
+
+__all__ = [
+    "AdmissionDecision",
+    "WebhookAdmissionController",
+    "create_admission_controller",
+    "WEBHOOK_ACCOUNT_BURST_ENV",
+    "WEBHOOK_ACCOUNT_RATE_ENV",
+    "WEBHOOK_MAX_CONCURRENCY_ENV",
+]
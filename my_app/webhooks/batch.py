@@ -0,0 +1,430 @@
+"""Batch NDJSON ingestion of Buildium webhooks for backfill and replay.
+
+Each line of the request body is one delivery captured from Buildium::
+
+    {"headers": {"x-buildium-signature": "..."}, "body": "{\\"EventType\\": ...}"}
+
+``body`` holds the raw request body as a string; ``body_base64`` may be used
+instead when the exact bytes are not valid UTF-8. Signatures are verified
+against those raw bytes, so every line is authenticated exactly like a live
+delivery.
+
+Lines are processed while the body is still streaming in. The account context
+is resolved once per account no matter how many lines reference it, and
+verified webhooks are dispatched with bounded concurrency. Each line passes the
+same admission control as a live delivery, and signatures older than the
+idempotency index remembers claims are rejected so a replay cannot outlive the
+duplicate check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from fastapi import HTTPException, status
+
+from ..services import metrics
+from ..services.account_context import BuildiumAccountContext
+from ..tasks.buildium_processor import prefilter_verified_webhook
+from .admission import WebhookAdmissionController
+from .envelope import LazyBuildiumWebhookEnvelope
+from .idempotency import WebhookIdempotencyIndex, build_idempotency_key
+from .verification import extract_webhook_account_id, verify_buildium_webhook_with_context
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_BATCH_MAX_LINES_ENV = "BUILDIUM_WEBHOOK_BATCH_MAX_LINES"
+WEBHOOK_BATCH_CONCURRENCY_ENV = "BUILDIUM_WEBHOOK_BATCH_CONCURRENCY"
+WEBHOOK_BATCH_MAX_SIGNATURE_AGE_ENV = "BUILDIUM_WEBHOOK_BATCH_MAX_SIGNATURE_AGE_SECONDS"
+WEBHOOK_BATCH_MAX_LINE_BYTES_ENV = "BUILDIUM_WEBHOOK_BATCH_MAX_LINE_BYTES"
+
+_DEFAULT_MAX_LINES = 10_000
+_DEFAULT_CONCURRENCY = 16
+# Captured deliveries are replayed after an outage, long past the live
+# five-minute signature window; accept signatures up to a week old by default.
+# The effective limit never exceeds the idempotency retention.
+_DEFAULT_MAX_SIGNATURE_AGE_SECONDS = 7 * 24 * 60 * 60
+_DEFAULT_MAX_LINE_BYTES = 1024 * 1024
+# ``starlette.status.HTTP_413_CONTENT_TOO_LARGE`` is missing from the
+# Starlette releases older FastAPI versions pin.
+_HTTP_413_CONTENT_TOO_LARGE = 413
+
+BATCH_STATUS_QUEUED = "queued"
+BATCH_STATUS_DUPLICATE = "duplicate"
+BATCH_STATUS_FILTERED = "filtered"
+BATCH_STATUS_REJECTED = "rejected"
+BATCH_STATUS_FAILED = "failed"
+
+BATCH_LINES_METRIC = "buildium_webhook_batch_lines_total"
+
+ContextResolver = Callable[[str], Awaitable[BuildiumAccountContext]]
+
+
+@dataclass(frozen=True)
+class BatchLineResult:
+    """Outcome of one NDJSON line."""
+
+    line: int
+    status: str
+    status_code: int
+    account_id: Optional[str] = None
+    detail: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "line": self.line,
+            "status": self.status,
+            "status_code": self.status_code,
+        }
+        if self.account_id:
+            result["account_id"] = self.account_id
+        if self.detail:
+            result["detail"] = self.detail
+        return result
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], *, max_line_bytes: int = _DEFAULT_MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Yield ``(line_number, line)`` pairs from a streamed body, skipping blank lines.
+
+    Lines longer than ``max_line_bytes`` are yielded as ``(line_number, None)``;
+    their bytes are dropped as they arrive instead of being buffered.
+    """
+
+    buffer = b""
+    line_number = 0
+    oversized = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for raw_line in complete:
+            line_number += 1
+            if oversized or len(raw_line) > max_line_bytes:
+                oversized = False
+                yield line_number, None
+            elif raw_line.strip():
+                yield line_number, raw_line
+        if len(buffer) > max_line_bytes:
+            buffer = b""
+            oversized = True
+    if oversized:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, buffer
+
+
+def parse_batch_line(raw_line: bytes) -> LazyBuildiumWebhookEnvelope:
+    """Decode one NDJSON line into a webhook envelope, raising ``ValueError`` if malformed."""
+
+    try:
+        record = json.loads(raw_line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise ValueError("Line is not valid JSON.") from exc
+    if not isinstance(record, Mapping):
+        raise ValueError("Line must be a JSON object.")
+
+    headers_block = record.get("headers")
+    if headers_block is None:
+        headers_block = {}
+    if not isinstance(headers_block, Mapping):
+        raise ValueError("Line headers must be a JSON object.")
+    headers = {str(key): str(value) for key, value in headers_block.items()}
+
+    if "body_base64" in record:
+        encoded = record.get("body_base64")
+        if not isinstance(encoded, str):
+            raise ValueError("Line body_base64 must be a string.")
+        try:
+            body = base64.b64decode(encoded.encode("ascii"), validate=True)
+        except (ValueError, UnicodeEncodeError, binascii.Error) as exc:
+            raise ValueError("Line body_base64 is not valid base64.") from exc
+    else:
+        raw_body = record.get("body")
+        if not isinstance(raw_body, str):
+            raise ValueError("Line body must be the raw webhook body as a string.")
+        body = raw_body.encode("utf-8")
+
+    return LazyBuildiumWebhookEnvelope(headers=headers, body=body)
+
+
+def _env_positive_int(env_name: str, default: int) -> int:
+    raw_value = os.getenv(env_name)
+    try:
+        value = int(raw_value) if raw_value else default
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+class WebhookBatchIngestor:
+    """Verify and dispatch a stream of captured Buildium deliveries."""
+
+    def __init__(
+        self,
+        *,
+        dispatcher: Any,
+        idempotency_index: WebhookIdempotencyIndex,
+        context_resolver: ContextResolver,
+        admission: Optional[WebhookAdmissionController] = None,
+        concurrency: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        max_line_bytes: Optional[int] = None,
+        max_signature_age_seconds: Optional[int] = None,
+    ) -> None:
+        self._dispatcher = dispatcher
+        self._idempotency_index = idempotency_index
+        self._context_resolver = context_resolver
+        self._admission = admission or WebhookAdmissionController()
+        self._concurrency = concurrency or _env_positive_int(
+            WEBHOOK_BATCH_CONCURRENCY_ENV, _DEFAULT_CONCURRENCY
+        )
+        self._max_lines = max_lines or _env_positive_int(
+            WEBHOOK_BATCH_MAX_LINES_ENV, _DEFAULT_MAX_LINES
+        )
+        self._max_line_bytes = max_line_bytes or _env_positive_int(
+            WEBHOOK_BATCH_MAX_LINE_BYTES_ENV, _DEFAULT_MAX_LINE_BYTES
+        )
+        max_age = max_signature_age_seconds or _env_positive_int(
+            WEBHOOK_BATCH_MAX_SIGNATURE_AGE_ENV, _DEFAULT_MAX_SIGNATURE_AGE_SECONDS
+        )
+        retention = idempotency_index.retention_seconds
+        if retention is not None:
+            # An older signature could belong to a delivery whose claim has expired.
+            max_age = min(max_age, int(retention))
+        self._max_signature_age_seconds = max_age
+
+    async def ingest(self, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """Process every line of ``chunks`` and return the per-line status report."""
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+        line_slots = asyncio.Semaphore(self._concurrency)
+        contexts: Dict[str, "asyncio.Task[BuildiumAccountContext]"] = {}
+        results: List[BatchLineResult] = []
+        pending: List["asyncio.Task[BatchLineResult]"] = []
+        processed = 0
+
+        async for line_number, raw_line in iter_ndjson_lines(
+            chunks, max_line_bytes=self._max_line_bytes
+        ):
+            processed += 1
+            if processed > self._max_lines:
+                results.append(
+                    BatchLineResult(
+                        line=line_number,
+                        status=BATCH_STATUS_REJECTED,
+                        status_code=_HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"Batch exceeds the {self._max_lines} line limit; "
+                        "remaining lines were not read.",
+                    )
+                )
+                break
+
+            if raw_line is None:
+                results.append(
+                    BatchLineResult(
+                        line=line_number,
+                        status=BATCH_STATUS_REJECTED,
+                        status_code=_HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"Line exceeds the {self._max_line_bytes} byte limit.",
+                    )
+                )
+                continue
+
+            try:
+                envelope = parse_batch_line(raw_line)
+            except ValueError as exc:
+                results.append(
+                    BatchLineResult(
+                        line=line_number,
+                        status=BATCH_STATUS_REJECTED,
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=str(exc),
+                    )
+                )
+                continue
+
+            account_id = extract_webhook_account_id(envelope)
+            if not account_id:
+                results.append(
+                    BatchLineResult(
+                        line=line_number,
+                        status=BATCH_STATUS_REJECTED,
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Buildium webhook is missing the account identifier.",
+                    )
+                )
+                continue
+
+            # Admitted lines hold an in-flight slot until they finish, so the
+            # batch never occupies more than ``concurrency`` slots at once.
+            await line_slots.acquire()
+            decision = self._admission.try_acquire(account_id)
+            if not decision.admitted:
+                line_slots.release()
+                results.append(
+                    BatchLineResult(
+                        line=line_number,
+                        status=BATCH_STATUS_REJECTED,
+                        status_code=decision.status_code,
+                        account_id=account_id,
+                        detail=f"Shed by admission control ({decision.reason}); "
+                        f"retry after {decision.retry_after}s.",
+                    )
+                )
+                continue
+
+            context_task = contexts.get(account_id)
+            if context_task is None:
+                context_task = asyncio.create_task(self._resolve(account_id, semaphore))
+                contexts[account_id] = context_task
+
+            pending.append(
+                asyncio.create_task(
+                    self._admitted_line(
+                        line_slots, line_number, envelope, account_id, context_task, semaphore
+                    )
+                )
+            )
+
+        if pending:
+            results.extend(await asyncio.gather(*pending))
+        results.sort(key=lambda result: result.line)
+
+        summary: Dict[str, int] = {
+            BATCH_STATUS_QUEUED: 0,
+            BATCH_STATUS_DUPLICATE: 0,
+            BATCH_STATUS_FILTERED: 0,
+            BATCH_STATUS_REJECTED: 0,
+            BATCH_STATUS_FAILED: 0,
+        }
+        for result in results:
+            summary[result.status] += 1
+            metrics.increment(BATCH_LINES_METRIC, status=result.status)
+
+        logger.info(
+            "Processed Buildium webhook batch.",
+            extra={"lines": len(results), "accounts": len(contexts), **summary},
+        )
+        return {
+            "lines": len(results),
+            "accounts": len(contexts),
+            **summary,
+            "results": [result.as_dict() for result in results],
+        }
+
+    async def _resolve(
+        self, account_id: str, semaphore: asyncio.Semaphore
+    ) -> BuildiumAccountContext:
+        async with semaphore:
+            return await self._context_resolver(account_id)
+
+    async def _admitted_line(
+        self,
+        line_slots: asyncio.Semaphore,
+        line_number: int,
+        envelope: LazyBuildiumWebhookEnvelope,
+        account_id: str,
+        context_task: "asyncio.Task[BuildiumAccountContext]",
+        semaphore: asyncio.Semaphore,
+    ) -> BatchLineResult:
+        try:
+            return await self._process_line(
+                line_number, envelope, account_id, context_task, semaphore
+            )
+        finally:
+            self._admission.release()
+            line_slots.release()
+
+    async def _process_line(
+        self,
+        line_number: int,
+        envelope: LazyBuildiumWebhookEnvelope,
+        account_id: str,
+        context_task: "asyncio.Task[BuildiumAccountContext]",
+        semaphore: asyncio.Semaphore,
+    ) -> BatchLineResult:
+        def _result(status_name: str, status_code: int, detail: Optional[str] = None) -> BatchLineResult:
+            return BatchLineResult(
+                line=line_number,
+                status=status_name,
+                status_code=status_code,
+                account_id=account_id,
+                detail=detail,
+            )
+
+        try:
+            account_context = await context_task
+            verified_webhook = verify_buildium_webhook_with_context(
+                envelope,
+                account_context,
+                max_signature_age_seconds=self._max_signature_age_seconds,
+            )
+        except HTTPException as exc:
+            return _result(BATCH_STATUS_REJECTED, exc.status_code, str(exc.detail))
+        except Exception:
+            logger.exception(
+                "Unexpected failure while verifying batched Buildium webhook.",
+                extra={"account_id": account_id, "line": line_number},
+            )
+            return _result(
+                BATCH_STATUS_FAILED,
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "Unable to verify Buildium webhook payload.",
+            )
+
+        unroutable_reason = prefilter_verified_webhook(verified_webhook)
+        if unroutable_reason is not None:
+            return _result(BATCH_STATUS_FILTERED, status.HTTP_200_OK, unroutable_reason)
+
+        dedup_key = build_idempotency_key(verified_webhook)
+        if not await self._idempotency_index.claim(dedup_key, account_id=account_id):
+            return _result(BATCH_STATUS_DUPLICATE, status.HTTP_200_OK)
+
+        async with semaphore:
+            try:
+                await self._dispatcher.dispatch(verified_webhook, dedup_key=dedup_key)
+            except Exception:
+                await self._idempotency_index.release(dedup_key, account_id=account_id)
+                logger.exception(
+                    "Failed to dispatch batched Buildium webhook.",
+                    extra={"account_id": account_id, "line": line_number},
+                )
+                return _result(
+                    BATCH_STATUS_FAILED,
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Unable to queue Buildium webhook for processing.",
+                )
+
+        return _result(BATCH_STATUS_QUEUED, status.HTTP_202_ACCEPTED)
+
+
+__all__ = [
+    "BatchLineResult",
+    "WebhookBatchIngestor",
+    "iter_ndjson_lines",
+    "parse_batch_line",
+    "WEBHOOK_BATCH_CONCURRENCY_ENV",
+    "WEBHOOK_BATCH_MAX_LINES_ENV",
+    "WEBHOOK_BATCH_MAX_LINE_BYTES_ENV",
+    "WEBHOOK_BATCH_MAX_SIGNATURE_AGE_ENV",
+]
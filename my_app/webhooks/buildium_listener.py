@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hmac
 import json
 import logging
 import os
 import multiprocessing
+from collections import Counter
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
 
 from fastapi import FastAPI, HTTPException, Request, Response, status
 import uvicorn
@@ -22,29 +26,120 @@ logging.basicConfig(
 from ..tasks.buildium_processor import (
     BuildiumProcessorError,
     BuildiumWebhookProcessor,
-    enqueue_buildium_webhook,
+    prefilter_verified_webhook,
 )
+from ..tasks.dispatch import CloudTasksDispatcher, TaskDispatcher, create_task_dispatcher
+from ..services import metrics
+from ..services.account_cache import get_account_context_cache, resolve_account_context_async
 from ..services.account_context import BuildiumAccountContext
-from .verification import VerifiedBuildiumWebhook, verify_buildium_webhook
+from ..services.account_warmup import AccountCacheWarmer, create_account_cache_warmer
+from ..services.account_watch import create_account_snapshot_watcher
+from ..services.buildium_async import close_async_buildium_transport
+from ..services.buildium_http import close_buildium_http_transport
+from ..services.clients import get_client_registry, reset_client_registry
+from ..services.executors import shutdown_workload_executors, workload_executor_stats
+from ..tasks.payloads import (
+    decode_compact_task_payload,
+    is_compact_task_payload,
+    verify_compact_task_signature,
+)
+from .batch import WebhookBatchIngestor
+from .admission import WebhookAdmissionController, create_admission_controller
+from .envelope import LazyBuildiumWebhookEnvelope
+from .idempotency import (
+    WEBHOOK_DEDUP_FIRESTORE_ENV,
+    WebhookIdempotencyIndex,
+    build_idempotency_key,
+    create_idempotency_index,
+)
+from .verification import (
+    VerifiedBuildiumWebhook,
+    extract_webhook_account_id,
+    verify_buildium_webhook,
+)
 
 logger = logging.getLogger(__name__)
 
-_SENSITIVE_HEADER_PREFIXES = ("authorization",)
-_SENSITIVE_HEADER_KEYS = {
-    "buildium-webhook-secret",
-    "buildium-webhook-signature",
-    "buildium-webhook-token",
-    "x-buildium-hmac-sha256",
-    "x-buildium-hmacsha256",
-    "x-buildium-signature",
-    "x-buildium-verification-secret",
-    "x-buildium-verification-token",
-    "x-buildium-webhook-token",
-    "x-buildium-webhook-secret",
-    "x-hub-signature",
-    "x-hub-signature-256",
-}
-_BODY_PREVIEW_LIMIT = 2048
+ADMIN_TOKEN_ENV = "BUILDIUM_ADMIN_TOKEN"
+
+_TASK_DISPATCHER: Optional[TaskDispatcher] = None
+_IDEMPOTENCY_INDEX: Optional[WebhookIdempotencyIndex] = None
+_ADMISSION_CONTROLLER: Optional[WebhookAdmissionController] = None
+_ACCOUNT_WARMER: Optional[AccountCacheWarmer] = None
+
+
+def _get_task_dispatcher() -> TaskDispatcher:
+    """Return the dispatcher started by the lifespan hook (Cloud Tasks otherwise)."""
+
+    global _TASK_DISPATCHER
+    if _TASK_DISPATCHER is None:
+        _TASK_DISPATCHER = CloudTasksDispatcher()
+    return _TASK_DISPATCHER
+
+
+def _get_idempotency_index() -> WebhookIdempotencyIndex:
+    global _IDEMPOTENCY_INDEX
+    if _IDEMPOTENCY_INDEX is None:
+        _IDEMPOTENCY_INDEX = create_idempotency_index()
+    return _IDEMPOTENCY_INDEX
+
+
+def _get_admission_controller() -> WebhookAdmissionController:
+    global _ADMISSION_CONTROLLER
+    if _ADMISSION_CONTROLLER is None:
+        _ADMISSION_CONTROLLER = create_admission_controller()
+    return _ADMISSION_CONTROLLER
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Create shared clients and start the task dispatcher once per worker process."""
+
+    global _TASK_DISPATCHER, _IDEMPOTENCY_INDEX, _ADMISSION_CONTROLLER, _ACCOUNT_WARMER
+    try:
+        await asyncio.to_thread(get_client_registry().warm)
+    except Exception:
+        logger.warning(
+            "Unable to create shared Google Cloud clients at startup; "
+            "they will be created on first use.",
+            exc_info=True,
+        )
+    _IDEMPOTENCY_INDEX = create_idempotency_index()
+    _ADMISSION_CONTROLLER = create_admission_controller()
+    dispatcher = create_task_dispatcher()
+    await dispatcher.start()
+    _TASK_DISPATCHER = dispatcher
+    logger.info("Buildium task dispatcher ready.", extra={"dispatcher": dispatcher.name})
+    watcher = create_account_snapshot_watcher()
+    if watcher is not None:
+        try:
+            await asyncio.to_thread(watcher.start)
+        except Exception:
+            logger.warning(
+                "Unable to watch Buildium account documents; "
+                "cached contexts will only refresh when they expire.",
+                exc_info=True,
+            )
+    warmer = create_account_cache_warmer()
+    if warmer is not None:
+        # Runs in the background; /readyz reports 503 until the first pass ends.
+        warmer.start()
+    _ACCOUNT_WARMER = warmer
+    try:
+        yield
+    finally:
+        _TASK_DISPATCHER = None
+        _ACCOUNT_WARMER = None
+        if warmer is not None:
+            await warmer.stop()
+        if watcher is not None:
+            await asyncio.to_thread(watcher.stop)
+        await dispatcher.stop()
+        await close_async_buildium_transport()
+        close_buildium_http_transport()
+        await asyncio.to_thread(shutdown_workload_executors)
+        reset_client_registry()
+
 
 app = FastAPI(
     title="Buildium Webhook Listener",
@@ -52,6 +147,7 @@ app = FastAPI(
         "Webhook endpoint that accepts Buildium webhook notifications and "
         "queues them for asynchronous processing."
     ),
+    lifespan=_lifespan,
 )
 
 
@@ -95,28 +191,6 @@ def _extract_metadata(
     return metadata
 
 
-def _summarize_headers_for_logging(headers: Mapping[str, str]) -> Dict[str, str]:
-    sanitized: Dict[str, str] = {}
-    for key, value in headers.items():
-        normalized_key = key.lower()
-        if normalized_key.startswith(_SENSITIVE_HEADER_PREFIXES) or normalized_key in _SENSITIVE_HEADER_KEYS:
-            sanitized[normalized_key] = "<redacted>"
-        else:
-            sanitized[normalized_key] = value
-    return sanitized
-
-
-def _preview_body_for_logging(body: bytes, *, limit: int = _BODY_PREVIEW_LIMIT) -> str:
-    if not body:
-        return ""
-
-    decoded = body.decode("utf-8", "replace")
-    if len(decoded) <= limit:
-        return decoded
-
-    return f"{decoded[:limit]}… <truncated {len(decoded) - limit} characters>"
-
-
 def _deserialize_verified_webhook_task(payload: Mapping[str, Any]) -> VerifiedBuildiumWebhook:
     if not isinstance(payload, Mapping):
         raise ValueError("Task payload must be a JSON object.")
@@ -176,20 +250,58 @@ def _deserialize_verified_webhook_task(payload: Mapping[str, Any]) -> VerifiedBu
     )
 
 
+async def _resolve_task_account_context(account_id: str) -> BuildiumAccountContext:
+    """Resolve the account context for a compact task through the account cache."""
+
+    return await resolve_account_context_async(account_id)
+
+
+async def _load_verified_webhook_task(payload: Any) -> VerifiedBuildiumWebhook:
+    """Rebuild a verified webhook from either task payload format.
+
+    Compact (version 2) payloads carry no secrets, so the account context is
+    resolved again and the payload's signature is checked against the
+    account's webhook secret before anything runs. Legacy payloads are
+    deserialized as before so tasks queued by an older revision still drain.
+    """
+
+    if not isinstance(payload, Mapping):
+        raise ValueError("Task payload must be a JSON object.")
+    if not is_compact_task_payload(payload):
+        return _deserialize_verified_webhook_task(payload)
+
+    compact = decode_compact_task_payload(payload)
+    account_context = await _resolve_task_account_context(compact.account_id)
+    if not verify_compact_task_signature(payload, account_context.webhook_secret):
+        logger.warning(
+            "Rejected Buildium webhook task with a missing or invalid signature.",
+            extra={"account_id": compact.account_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Task payload signature is invalid.",
+        )
+    headers = {"content-type": compact.content_type} if compact.content_type else {}
+    return VerifiedBuildiumWebhook(
+        account_context=account_context,
+        account_id=compact.account_id,
+        envelope=LazyBuildiumWebhookEnvelope(headers=headers, body=compact.body),
+        signature="",
+        verification_scheme=compact.verification_scheme,
+    )
+
+
 @app.post("/webhooks/buildium", status_code=status.HTTP_200_OK)
 async def handle_buildium_webhook(request: Request) -> Response:
 
     """Receive a webhook call from Buildium, verify it, and enqueue processing."""
 
     raw_body = await request.body()
-    parsed_body: Optional[Any]
-    try:
-        parsed_body = await request.json()
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        parsed_body = None
+    envelope = LazyBuildiumWebhookEnvelope.from_raw_headers(request.headers.raw, raw_body)
 
-    headers: Dict[str, str] = dict(request.headers)
-    metadata = _extract_metadata(headers=headers, parsed_body=parsed_body, body=raw_body)
+    metadata = _extract_metadata(
+        headers=envelope.headers, parsed_body=envelope.parsed_body, body=raw_body
+    )
     logger.info("Received Buildium webhook", extra={"metadata": metadata})
 
     if logger.isEnabledFor(logging.DEBUG):
@@ -197,13 +309,44 @@ async def handle_buildium_webhook(request: Request) -> Response:
             "Buildium webhook request payload captured.",
             extra={
                 "metadata": metadata,
-                "headers": _summarize_headers_for_logging(headers),
-                "body_preview": _preview_body_for_logging(raw_body),
-                "parsed_body_type": type(parsed_body).__name__ if parsed_body is not None else None,
+                "headers": envelope.log_headers,
+                "body_preview": envelope.body_preview,
+                "parsed_body_type": type(envelope.parsed_body).__name__
+                if envelope.parsed_body is not None
+                else None,
             },
         )
 
-    envelope = BuildiumWebhookEnvelope(headers=headers, body=raw_body, parsed_body=parsed_body)
+    admission = _get_admission_controller()
+    account_hint = extract_webhook_account_id(envelope)
+    decision = admission.try_acquire(account_hint)
+    if not decision.admitted:
+        logger.warning(
+            "Shed Buildium webhook before verification.",
+            extra={
+                "metadata": {
+                    **metadata,
+                    "account_id": account_hint,
+                    "reason": decision.reason,
+                    "retry_after": decision.retry_after,
+                }
+            },
+        )
+        return Response(
+            status_code=decision.status_code,
+            headers={"Retry-After": str(decision.retry_after)},
+        )
+
+    try:
+        return await _verify_and_dispatch(envelope, metadata)
+    finally:
+        admission.release()
+
+
+async def _verify_and_dispatch(
+    envelope: LazyBuildiumWebhookEnvelope, metadata: Dict[str, Any]
+) -> Response:
+    """Verify an admitted webhook, drop duplicates, and hand it to the dispatcher."""
 
     try:
         verified_webhook = await verify_buildium_webhook(envelope)
@@ -213,7 +356,7 @@ async def handle_buildium_webhook(request: Request) -> Response:
             extra={
                 "metadata": metadata,
                 "status_code": exc.status_code,
-                "headers": _summarize_headers_for_logging(headers),
+                "headers": envelope.log_headers,
             },
         )
         raise
@@ -236,9 +379,27 @@ async def handle_buildium_webhook(request: Request) -> Response:
 
     logger.info("Verified Buildium webhook", extra={"metadata": metadata})
 
+    unroutable_reason = prefilter_verified_webhook(verified_webhook)
+    if unroutable_reason is not None:
+        logger.info(
+            "Dropped Buildium webhook that no automation handles.",
+            extra={"metadata": {**metadata, "reason": unroutable_reason}},
+        )
+        return Response(status_code=status.HTTP_200_OK)
+
+    idempotency_index = _get_idempotency_index()
+    dedup_key = build_idempotency_key(verified_webhook)
+    if not await idempotency_index.claim(dedup_key, account_id=verified_webhook.account_id):
+        logger.info(
+            "Dropped duplicate Buildium webhook delivery.",
+            extra={"metadata": {**metadata, "dedup_key": dedup_key}},
+        )
+        return Response(status_code=status.HTTP_200_OK)
+
     try:
-        enqueue_buildium_webhook(verified_webhook)
+        await _get_task_dispatcher().dispatch(verified_webhook, dedup_key=dedup_key)
     except BuildiumProcessorError as exc:
+        await idempotency_index.release(dedup_key, account_id=verified_webhook.account_id)
         logger.error(
             "Failed to enqueue Buildium webhook for processing.",
             extra={"metadata": metadata},
@@ -248,6 +409,7 @@ async def handle_buildium_webhook(request: Request) -> Response:
             detail="Unable to queue Buildium webhook for processing.",
         ) from exc
     except Exception as exc:  # pragma: no cover - defensive guard
+        await idempotency_index.release(dedup_key, account_id=verified_webhook.account_id)
         logger.exception(
             "Unexpected error while scheduling Buildium webhook processing.",
             extra={"metadata": metadata},
@@ -265,6 +427,34 @@ async def handle_buildium_webhook(request: Request) -> Response:
     return Response(status_code=status.HTTP_200_OK)
 
 
+@app.post("/webhooks/buildium/batch", status_code=status.HTTP_200_OK)
+async def handle_buildium_webhook_batch(request: Request) -> Dict[str, Any]:
+    """Verify and dispatch a streamed NDJSON batch of captured Buildium deliveries.
+
+    Used to replay events after an outage. Every line is verified against its
+    account's webhook secret, and the response reports the outcome per line.
+    Requires the admin token and the shared Firestore seen-set, since replayed
+    signatures are older than the live window and a per-process claim would not
+    stop the same batch from being replayed against another instance.
+    """
+
+    _require_admin(request)
+    idempotency_index = _get_idempotency_index()
+    if not idempotency_index.shared_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Batch replay requires {WEBHOOK_DEDUP_FIRESTORE_ENV}=true.",
+        )
+
+    ingestor = WebhookBatchIngestor(
+        dispatcher=_get_task_dispatcher(),
+        idempotency_index=idempotency_index,
+        context_resolver=_resolve_task_account_context,
+        admission=_get_admission_controller(),
+    )
+    return await ingestor.ingest(request.stream())
+
+
 @app.post("/tasks/buildium-webhook", status_code=status.HTTP_204_NO_CONTENT)
 async def handle_buildium_webhook_task(request: Request) -> Response:
     """Execute queued Buildium webhook work from Cloud Tasks."""
@@ -281,7 +471,9 @@ async def handle_buildium_webhook_task(request: Request) -> Response:
         )
 
     try:
-        verified_webhook = _deserialize_verified_webhook_task(payload)
+        verified_webhook = await _load_verified_webhook_task(payload)
+    except HTTPException:
+        raise
     except ValueError as exc:
         logger.warning(
             "Rejected Buildium webhook task due to invalid payload.",
@@ -323,6 +515,83 @@ async def handle_buildium_webhook_task(request: Request) -> Response:
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@app.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """Expose in-process counters and gauges as JSON."""
+
+    # The endpoint is unauthenticated, so only aggregates are reported; account
+    # ids would reveal which tenants exist or are misconfigured.
+    snapshot: Dict[str, Any] = dict(metrics.snapshot())
+    admission = _get_admission_controller()
+    if admission.enabled:
+        bucket_levels = admission.bucket_levels()
+        snapshot["admission"] = {
+            "in_flight": admission.in_flight,
+            "tracked_accounts": len(bucket_levels),
+            "exhausted_accounts": sum(1 for level in bucket_levels.values() if level < 1),
+        }
+    snapshot["executors"] = workload_executor_stats()
+    account_cache = get_account_context_cache()
+    snapshot["account_cache"] = {
+        "entries": len(account_cache),
+        "negative": dict(Counter(account_cache.negative_entries().values())),
+    }
+    return snapshot
+
+
+@app.get("/readyz")
+async def get_readiness(response: Response) -> Dict[str, Any]:
+    """Report whether the account cache prefetch (when enabled) has finished."""
+
+    warmer = _ACCOUNT_WARMER
+    if warmer is None:
+        return {"status": "ready"}
+    account_cache = warmer.status()
+    if not warmer.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming", "account_cache": account_cache}
+    return {"status": "ready", "account_cache": account_cache}
+
+
+def _require_admin(request: Request) -> None:
+    """Reject requests without the ``BUILDIUM_ADMIN_TOKEN`` bearer token.
+
+    Admin endpoints are disabled (``404``) when no token is configured.
+    """
+
+    expected = os.getenv(ADMIN_TOKEN_ENV)
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, provided = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        provided.strip().encode("utf-8"), expected.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Admin credentials are required.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.post("/account-cache/purge")
+async def purge_account_cache_failures(
+    request: Request, account_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Forget cached lookup failures for one account, or for every account.
+
+    The negative cache lives in each worker process; only the process serving
+    this request is purged.
+    """
+
+    _require_admin(request)
+    purged = get_account_context_cache().purge_negative(account_id)
+    logger.info(
+        "Purged cached Buildium account lookup failures.",
+        extra={"account_id": account_id, "purged": purged, "pid": os.getpid()},
+    )
+    return {"purged": purged, "pid": os.getpid()}
+
+
 def run(host: str = "0.0.0.0", port: int = 8080, workers: Optional[int] = None) -> None:
     """Launch the webhook listener with a concurrent Uvicorn server."""
 
@@ -338,6 +607,9 @@ __all__ = [
     "app",
     "run",
     "BuildiumWebhookEnvelope",
+    "LazyBuildiumWebhookEnvelope",
     "handle_buildium_webhook",
+    "handle_buildium_webhook_batch",
     "handle_buildium_webhook_task",
+    "get_metrics",
 ]
@@ -0,0 +1,112 @@
+"""Lazily evaluated Buildium webhook envelope used on the ingress path."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Mapping, Optional, Tuple, Union
+
+from .verification import (
+    NormalizedHeaders,
+    _normalize_headers,
+    _preview_body_for_logging,
+    _summarize_headers_for_logging,
+)
+
+_UNSET: Any = object()
+
+RawHeaders = Iterable[Tuple[bytes, bytes]]
+
+
+class LazyBuildiumWebhookEnvelope:
+    """Webhook request container that defers parsing until it is needed.
+
+    The raw body is held once, JSON is decoded at most once on first access
+    to :attr:`parsed_body`, headers are lower-cased once, and the redacted
+    logging views are only built when a log record actually asks for them.
+    """
+
+    __slots__ = ("_body", "_headers", "_parsed_body", "_log_headers", "_body_preview")
+
+    def __init__(
+        self,
+        headers: Mapping[str, str],
+        body: bytes,
+        parsed_body: Optional[Any] = _UNSET,
+    ) -> None:
+        self._headers: NormalizedHeaders = _normalize_headers(headers)
+        self._body = body or b""
+        self._parsed_body = parsed_body
+        self._log_headers: Optional[Mapping[str, str]] = None
+        self._body_preview: Optional[str] = None
+
+    @classmethod
+    def from_raw_headers(
+        cls, raw_headers: RawHeaders, body: bytes
+    ) -> "LazyBuildiumWebhookEnvelope":
+        """Build an envelope from ASGI ``(name, value)`` byte pairs.
+
+        ASGI servers already lower-case header names, so the pairs are decoded
+        straight into a :class:`NormalizedHeaders` mapping. The first value
+        wins for repeated headers, matching ``starlette.datastructures.Headers``.
+        """
+
+        headers = NormalizedHeaders()
+        for raw_key, raw_value in raw_headers:
+            key = raw_key.decode("latin-1").lower()
+            if key not in headers:
+                headers[key] = raw_value.decode("latin-1")
+        return cls(headers=headers, body=body)
+
+    @property
+    def headers(self) -> NormalizedHeaders:
+        return self._headers
+
+    @property
+    def body(self) -> bytes:
+        return self._body
+
+    @property
+    def parsed_body(self) -> Optional[Any]:
+        if self._parsed_body is _UNSET:
+            self._parsed_body = _decode_json_body(self._body)
+        return self._parsed_body
+
+    @property
+    def is_parsed(self) -> bool:
+        """Return ``True`` once the JSON body has been decoded."""
+
+        return self._parsed_body is not _UNSET
+
+    @property
+    def log_headers(self) -> Mapping[str, str]:
+        """Redacted header view suitable for structured log records."""
+
+        if self._log_headers is None:
+            self._log_headers = _summarize_headers_for_logging(self._headers)
+        return self._log_headers
+
+    @property
+    def body_preview(self) -> str:
+        """Truncated, UTF-8 decoded body preview for debug logging."""
+
+        if self._body_preview is None:
+            self._body_preview = _preview_body_for_logging(self._body)
+        return self._body_preview
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(payload_bytes={len(self._body)}, "
+            f"header_count={len(self._headers)}, parsed={self.is_parsed})"
+        )
+
+
+def _decode_json_body(body: Union[bytes, bytearray]) -> Optional[Any]:
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+__all__ = ["LazyBuildiumWebhookEnvelope"]
@@ -0,0 +1,325 @@
+"""Idempotency index used to drop duplicate Buildium webhook deliveries.
+
+Buildium retries deliveries it considers failed, so the same event can reach
+the listener several times. Each verified webhook is reduced to a key derived
+from its account and event id (or a SHA-256 of the body when the payload has
+no id) and claimed before it is dispatched:
+
+1. An in-process LRU with TTL answers repeat deliveries to the same instance
+   without any I/O.
+2. An optional Firestore seen-set shares claims across instances. Documents
+   carry an ``expires_at`` timestamp so a Firestore TTL policy can purge them.
+3. Optionally, Cloud Tasks named tasks reject a second task with the same key
+   (see :class:`~my_app.tasks.dispatch.CloudTasksDispatcher`).
+
+Claims are released when dispatch fails so Buildium's retry is not dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ..services import metrics
+from ..services.clients import get_client_registry
+from ..services.executors import WORKLOAD_GOOGLE_IO, run_in_workload
+
+if TYPE_CHECKING:
+    from .verification import VerifiedBuildiumWebhook
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_DEDUP_ENABLED_ENV = "BUILDIUM_WEBHOOK_DEDUP_ENABLED"
+WEBHOOK_DEDUP_FIRESTORE_ENV = "BUILDIUM_WEBHOOK_DEDUP_FIRESTORE"
+WEBHOOK_DEDUP_TTL_ENV = "BUILDIUM_WEBHOOK_DEDUP_TTL_SECONDS"
+WEBHOOK_DEDUP_LOCAL_MAX_ENTRIES_ENV = "BUILDIUM_WEBHOOK_DEDUP_LOCAL_MAX_ENTRIES"
+
+WEBHOOK_EVENTS_COLLECTION_PATH = "buildium_webhook_events"
+
+_DEFAULT_DEDUP_TTL_SECONDS = 24 * 60 * 60
+_DEFAULT_LOCAL_MAX_ENTRIES = 10_000
+_EVENT_ID_KEYS = frozenset({"id", "eventid", "event_id"})
+
+DEDUP_CHECKS_METRIC = "buildium_webhook_dedup_checks_total"
+DEDUP_DUPLICATES_METRIC = "buildium_webhook_duplicates_suppressed_total"
+DEDUP_ERRORS_METRIC = "buildium_webhook_dedup_errors_total"
+DEDUP_SUPPRESSION_RATIO_METRIC = "buildium_webhook_duplicate_suppression_ratio"
+
+
+def _env_flag(env_name: str, default: bool) -> bool:
+    raw_value = os.getenv(env_name)
+    if raw_value is None or not raw_value.strip():
+        return default
+    return raw_value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_positive_int(env_name: str, default: int) -> int:
+    raw_value = os.getenv(env_name)
+    try:
+        value = int(raw_value) if raw_value else default
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _extract_event_id(parsed_body: Any) -> Optional[str]:
+    if not isinstance(parsed_body, dict):
+        return None
+    for key, value in parsed_body.items():
+        if isinstance(key, str) and key.lower() in _EVENT_ID_KEYS:
+            if value is None or isinstance(value, (dict, list)):
+                continue
+            text = str(value).strip()
+            if text:
+                return text
+    return None
+
+
+def build_idempotency_key(verified_webhook: "VerifiedBuildiumWebhook") -> str:
+    """Return a stable, storage-safe key identifying one Buildium delivery.
+
+    The key is a hex SHA-256 digest so it can be used verbatim as a Firestore
+    document id and as a Cloud Tasks task id.
+    """
+
+    envelope = verified_webhook.envelope
+    event_id = _extract_event_id(envelope.parsed_body)
+    if event_id is not None:
+        material = f"{verified_webhook.account_id}\x00event\x00{event_id}".encode("utf-8")
+    else:
+        body_digest = hashlib.sha256(envelope.body or b"").hexdigest()
+        material = f"{verified_webhook.account_id}\x00body\x00{body_digest}".encode("utf-8")
+    return hashlib.sha256(material).hexdigest()
+
+
+class LocalSeenSet:
+    """Bounded LRU of recently claimed keys with per-entry expiry."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = _DEFAULT_LOCAL_MAX_ENTRIES,
+        ttl_seconds: float = _DEFAULT_DEDUP_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds
+
+    def add_if_absent(self, key: str) -> bool:
+        """Record ``key`` and return ``True`` unless it is already present."""
+
+        now = self._clock()
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is not None and expires_at > now:
+                self._entries.move_to_end(key)
+                return False
+            self._entries[key] = now + self._ttl_seconds
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class FirestoreSeenSet:
+    """Firestore-backed seen-set shared by every listener instance.
+
+    ``create`` fails with ``AlreadyExists`` when another instance already
+    claimed the key, which makes the claim atomic without a transaction.
+    """
+
+    def __init__(
+        self,
+        *,
+        firestore_client: Optional[Any] = None,
+        collection_path: str = WEBHOOK_EVENTS_COLLECTION_PATH,
+        ttl_seconds: float = _DEFAULT_DEDUP_TTL_SECONDS,
+    ) -> None:
+        self._firestore_client = firestore_client
+        self._collection_path = collection_path
+        self._ttl_seconds = ttl_seconds
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds
+
+    def _document(self, key: str) -> Any:
+        if self._firestore_client is None:
+            self._firestore_client = get_client_registry().firestore()
+        return self._firestore_client.collection(self._collection_path).document(key)
+
+    def claim(self, key: str, *, account_id: str) -> bool:
+        from google.api_core import exceptions as google_exceptions
+
+        now = datetime.now(timezone.utc)
+        record = {
+            "account_id": account_id,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self._ttl_seconds),
+        }
+        doc_ref = self._document(key)
+        try:
+            doc_ref.create(record)
+            return True
+        except google_exceptions.AlreadyExists:
+            pass
+
+        # Firestore TTL deletion is lazy, so an expired record may linger.
+        snapshot = doc_ref.get()
+        data = snapshot.to_dict() if getattr(snapshot, "exists", False) else None
+        if data is None:
+            # Released between the create and the read; try once more.
+            try:
+                doc_ref.create(record)
+            except google_exceptions.AlreadyExists:
+                return False
+            return True
+
+        expires_at = data.get("expires_at")
+        if isinstance(expires_at, datetime) and expires_at <= now:
+            doc_ref.set(record)
+            return True
+        return False
+
+    def release(self, key: str) -> None:
+        self._document(key).delete()
+
+
+class WebhookIdempotencyIndex:
+    """Two-tier claim check run after verification and before dispatch."""
+
+    def __init__(
+        self,
+        *,
+        local: Optional[LocalSeenSet] = None,
+        shared: Optional[FirestoreSeenSet] = None,
+    ) -> None:
+        self._local = local
+        self._shared = shared
+        self._checks = 0
+        self._duplicates = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._local is not None or self._shared is not None
+
+    @property
+    def shared_enabled(self) -> bool:
+        """Whether claims are shared across listener instances."""
+
+        return self._shared is not None
+
+    @property
+    def retention_seconds(self) -> Optional[float]:
+        """How long a claim is remembered by every enabled tier, or ``None`` when disabled."""
+
+        tiers = [tier.ttl_seconds for tier in (self._local, self._shared) if tier is not None]
+        return min(tiers) if tiers else None
+
+    def _record(self, *, duplicate_tier: Optional[str]) -> None:
+        with self._lock:
+            self._checks += 1
+            if duplicate_tier is not None:
+                self._duplicates += 1
+            ratio = self._duplicates / self._checks
+        metrics.increment(DEDUP_CHECKS_METRIC)
+        if duplicate_tier is not None:
+            metrics.increment(DEDUP_DUPLICATES_METRIC, tier=duplicate_tier)
+        metrics.set_gauge(DEDUP_SUPPRESSION_RATIO_METRIC, ratio)
+
+    async def claim(self, key: str, *, account_id: str) -> bool:
+        """Return ``True`` when this delivery is the first one seen for ``key``."""
+
+        if not self.enabled:
+            return True
+
+        if self._local is not None and not self._local.add_if_absent(key):
+            self._record(duplicate_tier="local")
+            return False
+
+        if self._shared is not None:
+            try:
+                claimed = await run_in_workload(
+                    WORKLOAD_GOOGLE_IO, self._shared.claim, key, account_id=account_id
+                )
+            except Exception:
+                # Fail open: a dedup outage must not drop webhooks.
+                metrics.increment(DEDUP_ERRORS_METRIC, tier="firestore")
+                logger.warning(
+                    "Unable to check the shared webhook idempotency index.",
+                    exc_info=True,
+                    extra={"account_id": account_id},
+                )
+                claimed = True
+            if not claimed:
+                self._record(duplicate_tier="firestore")
+                return False
+
+        self._record(duplicate_tier=None)
+        return True
+
+    async def release(self, key: str, *, account_id: str) -> None:
+        """Forget ``key`` so a retried delivery is processed."""
+
+        if self._local is not None:
+            self._local.discard(key)
+        if self._shared is not None:
+            try:
+                await run_in_workload(WORKLOAD_GOOGLE_IO, self._shared.release, key)
+            except Exception:
+                metrics.increment(DEDUP_ERRORS_METRIC, tier="firestore")
+                logger.warning(
+                    "Unable to release webhook idempotency claim.",
+                    exc_info=True,
+                    extra={"account_id": account_id},
+                )
+
+
+def create_idempotency_index() -> WebhookIdempotencyIndex:
+    """Build the idempotency index described by the environment."""
+
+    if not _env_flag(WEBHOOK_DEDUP_ENABLED_ENV, True):
+        return WebhookIdempotencyIndex()
+
+    ttl_seconds = _env_positive_int(WEBHOOK_DEDUP_TTL_ENV, _DEFAULT_DEDUP_TTL_SECONDS)
+    local = LocalSeenSet(
+        max_entries=_env_positive_int(WEBHOOK_DEDUP_LOCAL_MAX_ENTRIES_ENV, _DEFAULT_LOCAL_MAX_ENTRIES),
+        ttl_seconds=ttl_seconds,
+    )
+    shared = (
+        FirestoreSeenSet(ttl_seconds=ttl_seconds)
+        if _env_flag(WEBHOOK_DEDUP_FIRESTORE_ENV, False)
+        else None
+    )
+    return WebhookIdempotencyIndex(local=local, shared=shared)
+
+
+__all__ = [
+    "FirestoreSeenSet",
+    "LocalSeenSet",
+    "WebhookIdempotencyIndex",
+    "build_idempotency_key",
+    "create_idempotency_index",
+    "WEBHOOK_EVENTS_COLLECTION_PATH",
+]
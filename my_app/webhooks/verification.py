@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-import asyncio
 import base64
+import binascii
 import functools
 import hashlib
 import hmac
 import json
 import logging
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, TYPE_CHECKING
 
@@ -18,7 +20,11 @@ from fastapi import HTTPException, status
 from ..services.account_context import (
     BuildiumAccountContext,
     get_buildium_account_context,
+    get_buildium_account_context_async,
 )
+from ..services.account_cache import get_account_context_cache
+from ..services.clients import get_client_registry
+from ..services.executors import WORKLOAD_GOOGLE_IO, run_in_workload
 
 if TYPE_CHECKING:  # pragma: no cover - imported for type checking only
     from .buildium_listener import BuildiumWebhookEnvelope
@@ -118,8 +124,14 @@ _STRUCTURED_SIGNATURE_KEYS = {
 _SIGNATURE_MAX_AGE_SECONDS = 300
 
 
-def _normalize_headers(headers: Mapping[str, str]) -> Mapping[str, str]:
-    return {key.lower(): value for key, value in headers.items()}
+class NormalizedHeaders(Dict[str, str]):
+    """Header mapping whose keys have already been lower-cased."""
+
+
+def _normalize_headers(headers: Mapping[str, str]) -> NormalizedHeaders:
+    if isinstance(headers, NormalizedHeaders):
+        return headers
+    return NormalizedHeaders((key.lower(), value) for key, value in headers.items())
 
 
 def _summarize_headers_for_logging(headers: Mapping[str, str]) -> Dict[str, str]:
@@ -144,6 +156,22 @@ def _preview_body_for_logging(body: bytes, *, limit: int = _BODY_PREVIEW_LIMIT)
     return f"{decoded[:limit]}… <truncated {len(decoded) - limit} characters>"
 
 
+def _envelope_log_headers(envelope: Any, headers: Mapping[str, str]) -> Mapping[str, str]:
+    """Return the redacted header view, reusing the envelope's cached copy."""
+
+    cached = getattr(envelope, "log_headers", None)
+    if cached is not None:
+        return cached
+    return _summarize_headers_for_logging(headers)
+
+
+def _envelope_body_preview(envelope: Any) -> str:
+    cached = getattr(envelope, "body_preview", None)
+    if cached is not None:
+        return cached
+    return _preview_body_for_logging(envelope.body)
+
+
 def _summarize_signature_metadata(metadata: _SignatureMetadata) -> Dict[str, Any]:
     return {
         "scheme": metadata.scheme,
@@ -285,6 +313,7 @@ def _extract_account_id(
 def _extract_signature(
     *,
     headers: Mapping[str, str],
+    preferred_header: Optional[str] = None,
 ) -> Optional[_SignatureMetadata]:
     normalized_headers = _normalize_headers(headers)
 
@@ -292,6 +321,17 @@ def _extract_signature(
         normalized_headers, _SIGNATURE_TIMESTAMP_HEADERS
     )
 
+    if preferred_header in _HMAC_SIGNATURE_HEADERS:
+        signature = normalized_headers.get(preferred_header)
+        if signature:
+            return _SignatureMetadata(
+                header_name=preferred_header,
+                header_value=signature,
+                scheme="hmac",
+                timestamp=timestamp,
+                timestamp_header_name=timestamp_header_name,
+            )
+
     for candidate in _HMAC_SIGNATURE_HEADERS:
         signature = normalized_headers.get(candidate)
         if signature:
@@ -364,6 +404,91 @@ def _parse_signature_header(signature_header: str) -> Tuple[str, Optional[str],
     return header, None, None, {}
 
 
+_CACHED_CONTEXT_RELOAD_MIN_AGE_SECONDS = 30.0
+_SIGNATURE_DIGEST_SIZE = hashlib.sha256().digest_size
+_HEX_DIGITS = frozenset("0123456789abcdef")
+_SIGNATURE_ENCODING_HEX = "hex"
+_SIGNATURE_ENCODING_BASE64 = "base64"
+_SIGNATURE_ENCODING_BASE64URL = "base64url"
+_SIGNED_BODY = "body"
+_SIGNED_TIMESTAMP_BODY = "timestamp.body"
+_SIGNATURE_PROFILE_CACHE_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class _SignatureProfile:
+    """Signature conventions an account was last verified with."""
+
+    header_name: Optional[str]
+    encoding: str
+    convention: str
+
+
+_SIGNATURE_PROFILES: "OrderedDict[str, _SignatureProfile]" = OrderedDict()
+_SIGNATURE_PROFILES_LOCK = threading.Lock()
+
+
+def _get_signature_profile(account_id: str) -> Optional[_SignatureProfile]:
+    # A single dict read is atomic; the lock only guards insertion and eviction.
+    return _SIGNATURE_PROFILES.get(account_id)
+
+
+def _remember_signature_profile(account_id: str, profile: _SignatureProfile) -> None:
+    with _SIGNATURE_PROFILES_LOCK:
+        _SIGNATURE_PROFILES[account_id] = profile
+        _SIGNATURE_PROFILES.move_to_end(account_id)
+        while len(_SIGNATURE_PROFILES) > _SIGNATURE_PROFILE_CACHE_SIZE:
+            _SIGNATURE_PROFILES.popitem(last=False)
+
+
+def clear_signature_profiles() -> None:
+    """Forget every cached per-account signature profile."""
+
+    with _SIGNATURE_PROFILES_LOCK:
+        _SIGNATURE_PROFILES.clear()
+
+
+def _decode_provided_signature(signature: str) -> Optional[Tuple[str, bytes]]:
+    """Decode a provided signature to the raw SHA-256 digest it encodes.
+
+    Accepts lowercase hex and standard or URL-safe base64 with or without
+    padding, i.e. exactly the spellings a digest can be rendered in. Returns
+    ``(encoding, digest)`` or ``None`` when the value is none of them.
+    """
+
+    value = signature.strip()
+    if len(value) == _SIGNATURE_DIGEST_SIZE * 2 and _HEX_DIGITS.issuperset(value):
+        return _SIGNATURE_ENCODING_HEX, bytes.fromhex(value)
+
+    urlsafe = "-" in value or "_" in value
+    if urlsafe and ("+" in value or "/" in value):
+        return None
+
+    unpadded = value.rstrip("=")
+    padding = "=" * (-len(unpadded) % 4)
+    if value != unpadded and value != unpadded + padding:
+        return None
+
+    try:
+        digest = base64.b64decode(
+            (unpadded + padding).encode("ascii"),
+            altchars=b"-_" if urlsafe else None,
+            validate=True,
+        )
+    except (ValueError, UnicodeEncodeError, binascii.Error):
+        return None
+    if len(digest) != _SIGNATURE_DIGEST_SIZE:
+        return None
+
+    # Reject non-canonical trailing bits so every digest has one spelling.
+    encoder = base64.urlsafe_b64encode if urlsafe else base64.b64encode
+    if encoder(digest).decode("ascii").rstrip("=") != unpadded:
+        return None
+
+    encoding = _SIGNATURE_ENCODING_BASE64URL if urlsafe else _SIGNATURE_ENCODING_BASE64
+    return encoding, digest
+
+
 def _verify_hmac_signature(
     *,
     signature_header: str,
@@ -371,8 +496,18 @@ def _verify_hmac_signature(
     body: bytes,
     account_id: str,
     timestamp: Optional[str] = None,
+    header_name: Optional[str] = None,
+    max_age_seconds: Optional[int] = _SIGNATURE_MAX_AGE_SECONDS,
 ) -> str:
-    body_text_for_logging = body.decode("utf-8", "replace")
+    """Check an HMAC-SHA256 signature header against the raw request body.
+
+    The provided signature is decoded once (hex, base64 or base64url, padded
+    or not) and compared to the raw digest. Signatures may cover the body or
+    ``"<timestamp>." + body``; the convention and encoding an account last
+    used are cached so the common case costs one HMAC and one compare.
+    A signed timestamp further than ``max_age_seconds`` from now is rejected;
+    ``None`` skips that freshness check.
+    """
 
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
@@ -382,7 +517,7 @@ def _verify_hmac_signature(
                 "provided_signature_raw": signature_header,
                 "webhook_secret": webhook_secret,
                 "body_length": len(body),
-                "body_raw": body_text_for_logging,
+                "body_raw": body.decode("utf-8", "replace"),
                 "timestamp_header": timestamp,
             },
         )
@@ -443,14 +578,24 @@ def _verify_hmac_signature(
                 detail="Unsupported Buildium webhook signature algorithm.",
             )
 
-    message_digests = [
-        hmac.new(
-            webhook_secret.encode("utf-8"),
-            body,
-            hashlib.sha256,
-        ).digest()
-    ]
+    decoded_signature = _decode_provided_signature(provided_signature)
+    if decoded_signature is None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Buildium webhook signature is not a recognised SHA-256 encoding.",
+                extra={"account_id": account_id, "provided_signature": provided_signature},
+            )
+        logger.warning(
+            "Buildium webhook signature verification failed.",
+            extra={"account_id": account_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Buildium webhook signature did not match.",
+        )
+    signature_encoding, provided_digest = decoded_signature
 
+    timestamp_prefix: Optional[bytes] = None
     if candidate_timestamp:
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
@@ -481,7 +626,7 @@ def _verify_hmac_signature(
 
             current_timestamp = int(time.time())
             drift = abs(current_timestamp - timestamp_int)
-            if drift > _SIGNATURE_MAX_AGE_SECONDS:
+            if max_age_seconds is not None and drift > max_age_seconds:
                 logger.warning(
                     "Buildium webhook signature timestamp is outside the tolerance window.",
                     extra={
@@ -495,61 +640,46 @@ def _verify_hmac_signature(
                     detail="Buildium webhook signature timestamp is outside the tolerance window.",
             )
 
-            timestamp_bytes = f"{timestamp_int}.".encode("utf-8")
-            message_digests.append(
-                hmac.new(
-                    webhook_secret.encode("utf-8"),
-                    timestamp_bytes + body,
-                    hashlib.sha256,
-                ).digest()
-            )
-            if logger.isEnabledFor(logging.DEBUG):
-                logger.debug(
-                    "Generated timestamp-influenced HMAC digest candidate.",
-                    extra={
-                        "account_id": account_id,
-                        "timestamp_int": timestamp_int,
-                        "webhook_secret": webhook_secret,
-                    },
+            timestamp_prefix = f"{timestamp_int}.".encode("utf-8")
+
+    conventions = [_SIGNED_BODY]
+    if timestamp_prefix is not None:
+        conventions.append(_SIGNED_TIMESTAMP_BODY)
+    profile = _get_signature_profile(account_id)
+    if profile is not None and profile.convention in conventions and conventions[0] != profile.convention:
+        conventions.reverse()
+
+    secret_bytes = webhook_secret.encode("utf-8")
+    for convention in conventions:
+        message = body if convention == _SIGNED_BODY else timestamp_prefix + body
+        digest = hmac.digest(secret_bytes, message, "sha256")
+        if hmac.compare_digest(digest, provided_digest):
+            if (
+                profile is None
+                or profile.convention != convention
+                or profile.encoding != signature_encoding
+                or profile.header_name != header_name
+            ):
+                _remember_signature_profile(
+                    account_id,
+                    _SignatureProfile(
+                        header_name=header_name,
+                        encoding=signature_encoding,
+                        convention=convention,
+                    ),
                 )
-
-    expected_signatures = set()
-    for digest in message_digests:
-        hex_signature = digest.hex()
-        base64_signature = base64.b64encode(digest).decode("ascii")
-        base64_url_signature = base64.urlsafe_b64encode(digest).decode("ascii")
-
-        expected_signatures.add(hex_signature)
-        expected_signatures.add(base64_signature)
-        expected_signatures.add(base64_signature.rstrip("="))
-        expected_signatures.add(base64_url_signature)
-        expected_signatures.add(base64_url_signature.rstrip("="))
-
-    if logger.isEnabledFor(logging.DEBUG):
-        logger.debug(
-            "Computed expected Buildium webhook HMAC signatures.",
-            extra={
-                "account_id": account_id,
-                "expected_signatures": sorted(expected_signatures),
-                "message_digest_count": len(message_digests),
-                "webhook_secret": webhook_secret,
-            },
-        )
-
-    for expected_signature in expected_signatures:
-        if expected_signature and hmac.compare_digest(provided_signature, expected_signature):
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(
                     "Buildium webhook HMAC signature matched expected digest.",
                     extra={
                         "account_id": account_id,
                         "provided_signature": provided_signature,
-                        "matched_signature": expected_signature,
-                        "expected_signatures": sorted(expected_signatures),
-                        "webhook_secret": webhook_secret,
+                        "signature_encoding": signature_encoding,
+                        "signed_payload": convention,
+                        "cached_profile": profile is not None,
                     },
                 )
-            return expected_signature
+            return provided_signature
 
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
@@ -557,9 +687,8 @@ def _verify_hmac_signature(
             extra={
                 "account_id": account_id,
                 "provided_signature": provided_signature,
-                "expected_signatures": sorted(expected_signatures),
-                "webhook_secret": webhook_secret,
-                "body_raw": body_text_for_logging,
+                "signature_encoding": signature_encoding,
+                "signed_payloads": conventions,
                 "timestamp_header": timestamp,
                 "embedded_timestamp": embedded_timestamp,
             },
@@ -629,36 +758,31 @@ def _verify_token_signature(
     return webhook_secret
 
 
-async def verify_buildium_webhook(
+def _prepare_verification(
     envelope: "BuildiumWebhookEnvelope",
-    *,
-    firestore_client: Optional[Any] = None,
-    secret_manager_client: Optional[Any] = None,
-) -> VerifiedBuildiumWebhook:
-    """Validate webhook authenticity and resolve the associated account context."""
+) -> Tuple[NormalizedHeaders, str, "_SignatureMetadata"]:
+    """Resolve the account id and signature header, rejecting incomplete webhooks."""
 
-    raw_headers_for_logging = {str(key): str(value) for key, value in envelope.headers.items()}
-    body_raw_for_logging = envelope.body.decode("utf-8", "replace")
-    headers_for_logging = _summarize_headers_for_logging(envelope.headers)
-    body_preview_for_logging = _preview_body_for_logging(envelope.body)
+    headers = _normalize_headers(envelope.headers)
+    parsed_body = envelope.parsed_body
 
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
             "Starting Buildium webhook verification.",
             extra={
-                "headers_raw": raw_headers_for_logging,
-                "body_raw": body_raw_for_logging,
+                "headers_raw": dict(headers),
+                "body_raw": envelope.body.decode("utf-8", "replace"),
                 "body_length": len(envelope.body or b""),
-                "parsed_body": envelope.parsed_body,
-                "parsed_body_type": type(envelope.parsed_body).__name__
-                if envelope.parsed_body is not None
+                "parsed_body": parsed_body,
+                "parsed_body_type": type(parsed_body).__name__
+                if parsed_body is not None
                 else None,
             },
         )
 
     account_id = _extract_account_id(
-        headers=envelope.headers,
-        parsed_body=envelope.parsed_body,
+        headers=headers,
+        parsed_body=parsed_body,
         body=envelope.body,
     )
     if not account_id:
@@ -666,10 +790,10 @@ async def verify_buildium_webhook(
             logger.debug(
                 "Unable to resolve Buildium account from webhook payload.",
                 extra={
-                    "headers": headers_for_logging,
-                    "body_preview": body_preview_for_logging,
-                    "parsed_body_type": type(envelope.parsed_body).__name__
-                    if envelope.parsed_body is not None
+                    "headers": _envelope_log_headers(envelope, headers),
+                    "body_preview": _envelope_body_preview(envelope),
+                    "parsed_body_type": type(parsed_body).__name__
+                    if parsed_body is not None
                     else None,
                 },
             )
@@ -677,7 +801,7 @@ async def verify_buildium_webhook(
         logger.warning(
             "Received Buildium webhook without an account identifier.",
             extra={
-                "headers": headers_for_logging,
+                "headers": _envelope_log_headers(envelope, headers),
             },
         )
         raise HTTPException(
@@ -690,30 +814,34 @@ async def verify_buildium_webhook(
             "Resolved Buildium account identifier from webhook payload.",
             extra={
                 "account_id": account_id,
-                "headers": headers_for_logging,
-                "body_preview": body_preview_for_logging,
-                "parsed_body_type": type(envelope.parsed_body).__name__
-                if envelope.parsed_body is not None
+                "headers": _envelope_log_headers(envelope, headers),
+                "body_preview": _envelope_body_preview(envelope),
+                "parsed_body_type": type(parsed_body).__name__
+                if parsed_body is not None
                 else None,
             },
         )
 
-    signature_metadata = _extract_signature(headers=envelope.headers)
+    profile = _get_signature_profile(account_id)
+    signature_metadata = _extract_signature(
+        headers=headers,
+        preferred_header=profile.header_name if profile is not None else None,
+    )
     if not signature_metadata:
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 "No Buildium webhook signature header found.",
                 extra={
                     "account_id": account_id,
-                    "headers_raw": raw_headers_for_logging,
-                    "body_raw": body_raw_for_logging,
+                    "headers_raw": dict(headers),
+                    "body_raw": envelope.body.decode("utf-8", "replace"),
                 },
             )
         logger.warning(
             "Received Buildium webhook without a verification signature.",
             extra={
                 "account_id": account_id,
-                "headers": headers_for_logging,
+                "headers": _envelope_log_headers(envelope, headers),
             },
         )
         raise HTTPException(
@@ -734,19 +862,18 @@ async def verify_buildium_webhook(
             },
         )
 
-    loop = asyncio.get_running_loop()
-    resolver = functools.partial(
-        get_buildium_account_context,
-        account_id,
-        firestore_client=firestore_client,
-        secret_manager_client=secret_manager_client,
-    )
+    return headers, account_id, signature_metadata
 
-    if firestore_client is None and secret_manager_client is None:
-        account_context = await loop.run_in_executor(None, resolver)
-    else:
-        account_context = resolver()
 
+def _verify_with_account_context(
+    envelope: "BuildiumWebhookEnvelope",
+    *,
+    headers: NormalizedHeaders,
+    account_id: str,
+    signature_metadata: "_SignatureMetadata",
+    account_context: BuildiumAccountContext,
+    max_signature_age_seconds: Optional[int] = _SIGNATURE_MAX_AGE_SECONDS,
+) -> VerifiedBuildiumWebhook:
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
             "Resolved Buildium account context for verification.",
@@ -768,6 +895,8 @@ async def verify_buildium_webhook(
             body=envelope.body,
             account_id=account_id,
             timestamp=signature_metadata.timestamp,
+            header_name=signature_metadata.header_name,
+            max_age_seconds=max_signature_age_seconds,
         )
     else:
         signature = _verify_token_signature(
@@ -808,4 +937,124 @@ async def verify_buildium_webhook(
     )
 
 
-__all__ = ["VerifiedBuildiumWebhook", "verify_buildium_webhook"]
+def extract_webhook_account_id(envelope: "BuildiumWebhookEnvelope") -> Optional[str]:
+    """Return the Buildium account id a webhook claims to belong to, if any."""
+
+    return _extract_account_id(
+        headers=_normalize_headers(envelope.headers),
+        parsed_body=envelope.parsed_body,
+        body=envelope.body,
+    )
+
+
+def verify_buildium_webhook_with_context(
+    envelope: "BuildiumWebhookEnvelope",
+    account_context: BuildiumAccountContext,
+    *,
+    max_signature_age_seconds: Optional[int] = _SIGNATURE_MAX_AGE_SECONDS,
+) -> VerifiedBuildiumWebhook:
+    """Verify a webhook against an account context the caller already resolved.
+
+    Used by batch ingestion, which resolves each account once and verifies
+    many webhooks against it. Replayed deliveries are older than the live
+    signature tolerance, so the caller sets its own ``max_signature_age_seconds``
+    (``None`` skips the freshness check). Raises ``HTTPException`` exactly like
+    :func:`verify_buildium_webhook`.
+    """
+
+    headers, account_id, signature_metadata = _prepare_verification(envelope)
+    if account_id != account_context.account_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Buildium webhook account does not match the resolved account context.",
+        )
+    return _verify_with_account_context(
+        envelope,
+        headers=headers,
+        account_id=account_id,
+        signature_metadata=signature_metadata,
+        account_context=account_context,
+        max_signature_age_seconds=max_signature_age_seconds,
+    )
+
+
+async def _load_account_context(account_id: str) -> BuildiumAccountContext:
+    if get_client_registry().async_enabled:
+        return await get_buildium_account_context_async(account_id)
+    return await run_in_workload(WORKLOAD_GOOGLE_IO, get_buildium_account_context, account_id)
+
+
+async def verify_buildium_webhook(
+    envelope: "BuildiumWebhookEnvelope",
+    *,
+    firestore_client: Optional[Any] = None,
+    secret_manager_client: Optional[Any] = None,
+) -> VerifiedBuildiumWebhook:
+    """Validate webhook authenticity and resolve the associated account context.
+
+    Without explicit clients the account context comes from the process-wide
+    account cache. A signature mismatch against a cached context older than
+    ``_CACHED_CONTEXT_RELOAD_MIN_AGE_SECONDS`` reloads the account once, so a
+    rotated webhook secret is picked up without waiting for the cache TTL.
+    """
+
+    headers, account_id, signature_metadata = _prepare_verification(envelope)
+
+    if firestore_client is not None or secret_manager_client is not None:
+        account_context = get_buildium_account_context(
+            account_id,
+            firestore_client=firestore_client,
+            secret_manager_client=secret_manager_client,
+        )
+        return _verify_with_account_context(
+            envelope,
+            headers=headers,
+            account_id=account_id,
+            signature_metadata=signature_metadata,
+            account_context=account_context,
+        )
+
+    cache = get_account_context_cache()
+    loader = functools.partial(_load_account_context, account_id)
+    account_context = await cache.get_async(account_id, loader)
+    try:
+        return _verify_with_account_context(
+            envelope,
+            headers=headers,
+            account_id=account_id,
+            signature_metadata=signature_metadata,
+            account_context=account_context,
+        )
+    except HTTPException as exc:
+        age = cache.age(account_id)
+        if (
+            exc.status_code != status.HTTP_401_UNAUTHORIZED
+            or age is None
+            or age < _CACHED_CONTEXT_RELOAD_MIN_AGE_SECONDS
+        ):
+            raise
+        cache.invalidate(account_id, reason="verification_failed")
+        refreshed = await cache.get_async(account_id, loader)
+        if refreshed.webhook_secret == account_context.webhook_secret:
+            raise
+        logger.info(
+            "Reloaded Buildium account context after its webhook secret changed.",
+            extra={"account_id": account_id},
+        )
+        return _verify_with_account_context(
+            envelope,
+            headers=headers,
+            account_id=account_id,
+            signature_metadata=signature_metadata,
+            account_context=refreshed,
+        )
+
+
+__all__ = [
+    "NormalizedHeaders",
+    "VerifiedBuildiumWebhook",
+    "clear_signature_profiles",
+    "extract_webhook_account_id",
+    "verify_buildium_webhook",
+    "verify_buildium_webhook_with_context",
+]
@@ -0,0 +1,138 @@
+"""Benchmark per-call latency of the hand-rolled Buildium clients' transport.
+
+Compares the previous ``urllib.request.urlopen`` per call (new TCP connection
+every time, no compression) against the pooled keep-alive transport in
+:mod:`my_app.services.buildium_http`. Both paths call a local stub server that
+returns a Buildium-style JSON list. The stub speaks plain HTTP on loopback, so
+``--handshake-ms`` delays every new connection to stand in for the TCP and TLS
+round trips a fresh connection to the real API costs.
+
+Usage::
+
+    python scripts/bench_buildium_http.py --requests 2000 --items 50 --handshake-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+from pathlib import Path
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, List
+from urllib import request as urllib_request
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from my_app.services import buildium_rate_limit  # noqa: E402
+from my_app.services.buildium_http import send_buildium_request  # noqa: E402
+
+_HEADERS = {
+    "Accept": "application/json",
+    "Authorization": "Bearer bench-token",
+    "X-Buildium-Account-Id": "acct-bench",
+}
+
+
+def _stub_server(items: int, handshake_seconds: float) -> ThreadingHTTPServer:
+    payload = json.dumps(
+        {
+            "items": [
+                {"id": index, "name": f"Lease {index}", "status": "Active"}
+                for index in range(items)
+            ]
+        }
+    ).encode("utf-8")
+    compressed = gzip.compress(payload)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; avoid delayed-ACK stalls on reuse.
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+            if handshake_seconds:
+                time.sleep(handshake_seconds)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = compressed if gzipped else payload
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_: Any) -> None:
+            return None
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _urlopen_call(url: str) -> bytes:
+    request = urllib_request.Request(url, headers=_HEADERS, method="GET")
+    with urllib_request.urlopen(request) as response:
+        return response.read()
+
+
+def _pooled_call(url: str) -> bytes:
+    return send_buildium_request("GET", url, headers=_HEADERS)
+
+
+def _measure(call: Callable[[str], bytes], url: str, requests: int) -> List[float]:
+    # Warm up imports and, for the pool, the first connection.
+    for _ in range(min(50, requests)):
+        call(url)
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        call(url)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=50, help="leases in each stub response")
+    parser.add_argument(
+        "--handshake-ms", type=float, default=0.0, help="delay added to every new connection"
+    )
+    args = parser.parse_args()
+
+    # Measure the transport, not the Buildium rate limit.
+    buildium_rate_limit.configure_buildium_rate_limiter(
+        buildium_rate_limit.BuildiumRateLimiter(rate=0)
+    )
+    server = _stub_server(args.items, args.handshake_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/leases?status=Active"
+    try:
+        urlopen_ms = _measure(_urlopen_call, url, args.requests)
+        pooled_ms = _measure(_pooled_call, url, args.requests)
+    finally:
+        server.shutdown()
+
+    def _describe(samples: List[float]) -> str:
+        p95 = statistics.quantiles(samples, n=20)[18]
+        mean = statistics.mean(samples)
+        return f"mean {mean:.3f} ms, p50 {statistics.median(samples):.3f} ms, p95 {p95:.3f} ms"
+
+    print(f"requests:          {args.requests}")
+    print(f"handshake delay:   {args.handshake_ms:g} ms")
+    print(f"urlopen per call:  {_describe(urlopen_ms)}")
+    print(f"pooled transport:  {_describe(pooled_ms)}")
+    print(f"mean speedup:      {statistics.mean(urlopen_ms) / statistics.mean(pooled_ms):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
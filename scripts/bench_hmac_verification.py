@@ -0,0 +1,129 @@
+"""Benchmark Buildium HMAC signature verification.
+
+Compares the previous approach (parse the header, compute every candidate
+digest, render each in hex and four base64 variants, then compare the provided
+string against the whole set) with ``verification._verify_hmac_signature``,
+which decodes the provided signature once and checks the account's cached
+convention first.
+
+Usage::
+
+    python scripts/bench_hmac_verification.py --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from pathlib import Path
+import sys
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from my_app.webhooks import verification  # noqa: E402
+
+_SECRET = "bench-secret"
+_ACCOUNT_ID = "acct-bench"
+_BODY_SIZES = (512, 2048, 16384, 65536)
+
+
+def _build_payload(body_bytes: int) -> bytes:
+    payload: Dict[str, object] = {
+        "EventType": "TaskCreated",
+        "AccountId": _ACCOUNT_ID,
+        "TaskId": 12345,
+        "EventDateTime": "2024-01-01T00:00:00Z",
+    }
+    filler = max(0, body_bytes - len(json.dumps(payload)) - 16)
+    payload["Notes"] = "x" * filler
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _legacy_verify(signature: str, body: bytes, timestamp: Optional[str]) -> str:
+    extracted, _, embedded_timestamp, _ = verification._parse_signature_header(signature.strip())
+    signature = extracted or signature.strip()
+    timestamp = timestamp or embedded_timestamp
+    if timestamp and abs(int(time.time()) - int(timestamp)) > verification._SIGNATURE_MAX_AGE_SECONDS:
+        raise ValueError("stale timestamp")
+    digests = [hmac.new(_SECRET.encode("utf-8"), body, hashlib.sha256).digest()]
+    if timestamp:
+        prefix = f"{int(timestamp)}.".encode("utf-8")
+        digests.append(hmac.new(_SECRET.encode("utf-8"), prefix + body, hashlib.sha256).digest())
+
+    expected = set()
+    for digest in digests:
+        expected.add(digest.hex())
+        encoded = base64.b64encode(digest).decode("ascii")
+        expected.add(encoded)
+        expected.add(encoded.rstrip("="))
+        urlsafe = base64.urlsafe_b64encode(digest).decode("ascii")
+        expected.add(urlsafe)
+        expected.add(urlsafe.rstrip("="))
+
+    for candidate in expected:
+        if hmac.compare_digest(signature, candidate):
+            return candidate
+    raise ValueError("signature mismatch")
+
+
+def _current_verify(signature: str, body: bytes, timestamp: Optional[str]) -> str:
+    return verification._verify_hmac_signature(
+        signature_header=signature,
+        webhook_secret=_SECRET,
+        body=body,
+        account_id=_ACCOUNT_ID,
+        timestamp=timestamp,
+        header_name="buildium-webhook-signature",
+    )
+
+
+def _run(
+    verify: Callable[[str, bytes, Optional[str]], str],
+    signature: str,
+    body: bytes,
+    timestamp: Optional[str],
+    iterations: int,
+) -> float:
+    for _ in range(min(500, iterations)):
+        verify(signature, body, timestamp)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        verify(signature, body, timestamp)
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print(f"{'body':>7} {'encoding':>8} {'signed':>14} {'legacy/s':>12} {'current/s':>12} {'speedup':>8}")
+    for size in _BODY_SIZES:
+        body = _build_payload(size)
+        for signed_timestamp in (False, True):
+            timestamp = str(int(time.time())) if signed_timestamp else None
+            message = f"{timestamp}.".encode("utf-8") + body if timestamp else body
+            digest = hmac.new(_SECRET.encode("utf-8"), message, hashlib.sha256).digest()
+            for encoding, signature in (
+                ("hex", digest.hex()),
+                ("base64", base64.b64encode(digest).decode("ascii")),
+            ):
+                verification.clear_signature_profiles()
+                legacy = _run(_legacy_verify, signature, body, timestamp, args.iterations)
+                current = _run(_current_verify, signature, body, timestamp, args.iterations)
+                convention = "timestamp.body" if timestamp else "body"
+                print(
+                    f"{len(body):>7} {encoding:>8} {convention:>14} "
+                    f"{legacy:>12,.0f} {current:>12,.0f} {current / legacy:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
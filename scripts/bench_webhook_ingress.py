@@ -0,0 +1,159 @@
+"""Benchmark the Buildium webhook ingress path (envelope + verification).
+
+Compares the previous eager ingress steps (``request.body()`` followed by
+``request.json()``, ``dict(request.headers)`` and eagerly built logging views)
+against :class:`LazyBuildiumWebhookEnvelope`. Account resolution is stubbed so
+the numbers reflect per-request CPU only.
+
+Usage::
+
+    python scripts/bench_webhook_ingress.py --requests 20000 --body-bytes 4096
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from pathlib import Path
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.requests import Request  # noqa: E402
+
+from my_app.services.account_context import BuildiumAccountContext  # noqa: E402
+from my_app.webhooks import buildium_listener, verification  # noqa: E402
+from my_app.webhooks.envelope import LazyBuildiumWebhookEnvelope  # noqa: E402
+
+_SECRET = "bench-secret"
+_ACCOUNT_ID = "acct-bench"
+
+
+def _build_payload(body_bytes: int) -> bytes:
+    payload: Dict[str, Any] = {
+        "EventType": "TaskCreated",
+        "AccountId": _ACCOUNT_ID,
+        "TaskId": 12345,
+        "EventDateTime": "2024-01-01T00:00:00Z",
+    }
+    filler = max(0, body_bytes - len(json.dumps(payload)) - 16)
+    payload["Notes"] = "x" * filler
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _build_headers(body: bytes) -> List[Tuple[bytes, bytes]]:
+    signature = hmac.new(_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    headers = {
+        "host": "listener.internal",
+        "user-agent": "Buildium-Webhooks/1.0",
+        "content-type": "application/json",
+        "content-length": str(len(body)),
+        "accept-encoding": "gzip",
+        "x-cloud-trace-context": "105445aa7843bc8bf206b12000100000/1;o=1",
+        "x-forwarded-for": "203.0.113.10",
+        "x-forwarded-proto": "https",
+        "traceparent": "00-105445aa7843bc8bf206b12000100000-0000000000000001-01",
+        "x-buildium-hmac-sha256": signature,
+    }
+    return [(key.encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+
+
+def _make_request(raw_headers: List[Tuple[bytes, bytes]], body: bytes) -> Request:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/webhooks/buildium",
+        "headers": raw_headers,
+        "query_string": b"",
+    }
+    sent = False
+
+    async def _receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, _receive)
+
+
+async def _eager_ingress(request: Request) -> Any:
+    raw_body = await request.body()
+    try:
+        parsed_body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        parsed_body = None
+    headers = dict(request.headers)
+    buildium_listener._extract_metadata(headers=headers, parsed_body=parsed_body, body=raw_body)
+    envelope = buildium_listener.BuildiumWebhookEnvelope(
+        headers=headers, body=raw_body, parsed_body=parsed_body
+    )
+    # Logging views the previous verification step built for every request.
+    {str(key): str(value) for key, value in envelope.headers.items()}
+    envelope.body.decode("utf-8", "replace")
+    verification._summarize_headers_for_logging(envelope.headers)
+    verification._preview_body_for_logging(envelope.body)
+    return await verification.verify_buildium_webhook(envelope)
+
+
+async def _lazy_ingress(request: Request) -> Any:
+    raw_body = await request.body()
+    envelope = LazyBuildiumWebhookEnvelope.from_raw_headers(request.headers.raw, raw_body)
+    buildium_listener._extract_metadata(
+        headers=envelope.headers, parsed_body=envelope.parsed_body, body=raw_body
+    )
+    return await verification.verify_buildium_webhook(envelope)
+
+
+async def _run(
+    handler: Callable[[Request], Awaitable[Any]],
+    raw_headers: List[Tuple[bytes, bytes]],
+    body: bytes,
+    requests: int,
+) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await handler(_make_request(raw_headers, body))
+    elapsed = time.perf_counter() - started
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--body-bytes", type=int, default=2048)
+    args = parser.parse_args()
+
+    context = BuildiumAccountContext(
+        account_id=_ACCOUNT_ID, metadata={}, api_secret="", webhook_secret=_SECRET
+    )
+    # Resolve account context inline so the benchmark excludes executor hops.
+    verification.get_buildium_account_context = lambda account_id, **_: context  # type: ignore[assignment]
+
+    body = _build_payload(args.body_bytes)
+    raw_headers = _build_headers(body)
+
+    async def _bench() -> None:
+        async def _resolved(handler: Callable[[Request], Awaitable[Any]]) -> float:
+            # Warm up imports and caches before timing.
+            await _run(handler, raw_headers, body, min(500, args.requests))
+            return await _run(handler, raw_headers, body, args.requests)
+
+        eager = await _resolved(_eager_ingress)
+        lazy = await _resolved(_lazy_ingress)
+        print(f"body bytes:        {len(body)}")
+        print(f"eager envelope:    {eager:,.0f} req/s")
+        print(f"lazy envelope:     {lazy:,.0f} req/s")
+        print(f"speedup:           {lazy / eager:.2f}x")
+
+    asyncio.run(_bench())
+
+
+if __name__ == "__main__":
+    main()